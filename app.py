@@ -18,7 +18,6 @@ load_dotenv()
 
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
-from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.trustedhost import TrustedHostMiddleware
@@ -47,6 +46,7 @@ from services.auth_service import (
 from services.email_service import send_email_verification, send_email
 from tools.backup_manager import start_backup_scheduler_on_startup
 from services.task_scheduler import start_task_scheduler, stop_task_scheduler
+from services.email_outbox import start_email_outbox, stop_email_outbox
 
 # Try to initialize Sentry for production
 try:
@@ -84,11 +84,9 @@ app = FastAPI(
 from core.security import (
     build_cors_config_from_env,
     build_trusted_hosts_from_env,
-    security_headers_middleware,
 )
-from core.request_id import install_request_id_middleware
 from core.logging_ext import attach_request_id_filter
-from core.access_log import install_access_log_middleware
+from core.pipeline import install_request_pipeline
 
 # CORS (env-driven)
 cors_conf = build_cors_config_from_env()
@@ -130,29 +128,31 @@ try:
 except Exception as e:
     logger.warning(f"Security middleware setup issue: {e}")
 
-# Rate limiting
+# Rate limit status endpoint (limiting itself runs in the request pipeline)
 try:
-    # Prefer internal rate limiting middleware to avoid handler coupling issues
-    from middleware.rate_limiting import setup_rate_limiting
-    setup_rate_limiting(app)
+    from middleware.rate_limiting import register_rate_limit_routes
+    register_rate_limit_routes(app)
 except Exception as e:
-    logger.warning(f"Rate limiting not enabled: {e}")
+    logger.warning(f"Rate limit routes not registered: {e}")
 
-# Minimal security headers (last)
-security_headers_middleware(app)
-
-# Request-ID middleware and logging filter (after other middlewares)
-install_request_id_middleware(app)
+# Request-ID logging filter
 try:
     attach_request_id_filter()
 except Exception as e:
     logger.warning(f"Request-ID logging filter not attached: {e}")
 
-# Access log middleware (after request-id so rid is available)
-try:
-    install_access_log_middleware(app)
-except Exception as e:
-    logger.warning(f"Access log middleware not installed: {e}")
+# Per-request query profiling (Server-Timing header, N+1 detection)
+from config import config
+if config.QUERY_PROFILER_ENABLED:
+    try:
+        from middleware.query_monitoring import QueryMonitoringMiddleware
+        app.add_middleware(QueryMonitoringMiddleware)
+    except Exception as e:
+        logger.warning(f"Query profiler not installed: {e}")
+
+# One pure-ASGI pipeline (outermost): metrics, request-id, access log,
+# security headers, rate limiting, user activity
+install_request_pipeline(app)
 
 # Initialize error handler (no-arg constructor per production behavior)
 error_handler = ErrorHandler()
@@ -170,10 +170,12 @@ async def global_exception_handler(request: Request, exc: Exception):
 
 # Removed custom host validation; relying on TrustedHostMiddleware and security headers middleware
 
-# Static files and templates
+# Static files (precompressed variants, immutable caching for fingerprinted assets) and templates
+from utils.static_assets import PrecompressedStaticFiles, install_asset_helpers
 static_dir = Path(__file__).parent / "web" / "static"
-app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
-templates = Jinja2Templates(directory="web/templates")
+app.mount("/static", PrecompressedStaticFiles(directory=str(static_dir)), name="static")
+templates = install_asset_helpers(Jinja2Templates(directory="web/templates"))
+app.state.templates = templates
 
 # Module-level server start time
 server_start_time = datetime.now()
@@ -214,6 +216,58 @@ async def startup_event():
     except Exception:
         pass
     
+    # Categorization counts are upserted inside expense writes; create their table up front
+    try:
+        from models import engine
+        from models.category_model import ensure_table
+        ensure_table(engine)
+    except Exception as e:
+        logger.warning(f"Failed to create category_feature_counts: {e}")
+    
+    # Resume delivery of emails left in the outbox by a previous process
+    try:
+        start_email_outbox()
+    except Exception as e:
+        logger.warning(f"Failed to start email outbox: {e}")
+    
+    # Delete rendered PDF reports past their retention period
+    try:
+        from services.report_renderer import start_report_renderer
+        start_report_renderer()
+    except Exception as e:
+        logger.warning(f"Failed to start report renderer: {e}")
+    
+    # Scan page-cache template mtimes now and then in the background, never in a request
+    try:
+        from utils.page_cache import start_page_cache
+        start_page_cache()
+    except Exception as e:
+        logger.warning(f"Failed to start page cache watcher: {e}")
+    
+    # Single SQLite writer thread (no-op on PostgreSQL)
+    try:
+        from utils.write_queue import start_write_queue
+        start_write_queue()
+    except Exception as e:
+        logger.warning(f"Failed to start SQLite write queue: {e}")
+    
+    # Sample system gauges off the request path
+    if config.METRICS_ENABLED:
+        try:
+            from middleware.monitoring import start_system_sampler
+            start_system_sampler()
+        except Exception as e:
+            logger.warning(f"Failed to start metrics sampler: {e}")
+    
+    # Import the deferred SDKs (openai, stripe, plaid, reportlab, OCR) off the request path
+    if config.IMPORT_WARM_UP_ENABLED:
+        try:
+            from utils.lazy_import import start_warm_up
+            from services.knowledge_index import knowledge_index
+            start_warm_up(delay=config.IMPORT_WARM_UP_DELAY_SECONDS, tasks=(knowledge_index.snapshot,))
+        except Exception as e:
+            logger.warning(f"Failed to start import warm-up: {e}")
+    
     # Log startup info
     logger.info(f"Server started at {server_start_time}")
     logger.info(f"Total routes registered: {len(app.routes)}")
@@ -230,6 +284,59 @@ async def shutdown_event():
     except Exception as e:
         logger.warning(f"Error stopping task scheduler: {e}")
     
+    # Stop the email dispatcher (undelivered rows stay in the outbox for the next start)
+    try:
+        stop_email_outbox()
+    except Exception as e:
+        logger.warning(f"Error stopping email outbox: {e}")
+    
+    # Cancel queued report renders and stop the render processes
+    try:
+        from services.report_renderer import stop_report_renderer
+        stop_report_renderer()
+    except Exception as e:
+        logger.warning(f"Error stopping report renderer: {e}")
+    
+    try:
+        from utils.page_cache import stop_page_cache
+        stop_page_cache()
+    except Exception as e:
+        logger.warning(f"Error stopping page cache watcher: {e}")
+    
+    # Commit writes still queued for the SQLite writer
+    try:
+        from utils.write_queue import stop_write_queue
+        stop_write_queue()
+    except Exception as e:
+        logger.warning(f"Error stopping SQLite write queue: {e}")
+    
+    try:
+        from middleware.monitoring import stop_system_sampler
+        stop_system_sampler()
+    except Exception as e:
+        logger.warning(f"Error stopping metrics sampler: {e}")
+    
+    # Close pooled AsyncSession connections
+    try:
+        from models.async_base import dispose_async_engine
+        await dispose_async_engine()
+    except Exception as e:
+        logger.warning(f"Error disposing async engine: {e}")
+    
+    # Close read-replica connections
+    try:
+        from models.replica import replica_router
+        replica_router.dispose()
+    except Exception as e:
+        logger.warning(f"Error disposing replica engine: {e}")
+
+    # Close keep-alive connections to third-party providers
+    try:
+        from services.integration_http import close_async_clients
+        await close_async_clients()
+    except Exception as e:
+        logger.warning(f"Error closing integration clients: {e}")
+
     # Close Redis connection (no-op in dev)
     try:
         await redis_manager.close()
@@ -25,6 +25,31 @@ class Config:
     # Database Configuration - SQLite for demo reliability
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./cora.db")
     
+    # Async driver URL for the AsyncSession read path (unset = derived: sqlite+aiosqlite / postgresql+asyncpg)
+    ASYNC_DATABASE_URL: Optional[str] = os.getenv("ASYNC_DATABASE_URL")
+    
+    # Read replica for analytics/reporting sessions (unset = everything reads the primary)
+    DATABASE_REPLICA_URL: Optional[str] = os.getenv("DATABASE_REPLICA_URL")
+    REPLICA_MAX_LAG_SECONDS: float = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "30"))
+    REPLICA_CHECK_SECONDS: float = float(os.getenv("REPLICA_CHECK_SECONDS", "10"))
+    
+    # Connection pool (unset = dialect default: SQLite 5 + 0 overflow, PostgreSQL 20 + 30)
+    DB_POOL_SIZE: Optional[int] = int(os.getenv("DB_POOL_SIZE")) if os.getenv("DB_POOL_SIZE") else None
+    DB_MAX_OVERFLOW: Optional[int] = int(os.getenv("DB_MAX_OVERFLOW")) if os.getenv("DB_MAX_OVERFLOW") else None
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_LEAK_SECONDS: float = float(os.getenv("DB_POOL_LEAK_SECONDS", "60"))
+
+    # SQLite tuning (ignored on PostgreSQL)
+    SQLITE_CACHE_SIZE_KB: int = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+    SQLITE_MMAP_SIZE_MB: int = int(os.getenv("SQLITE_MMAP_SIZE_MB", "256"))
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "30000"))
+    # Single writer thread with group commits for small writes
+    SQLITE_WRITE_QUEUE_ENABLED: bool = os.getenv("SQLITE_WRITE_QUEUE_ENABLED", "true").lower() == "true"
+    SQLITE_WRITE_BATCH_MAX: int = int(os.getenv("SQLITE_WRITE_BATCH_MAX", "64"))
+    SQLITE_WRITE_BATCH_WINDOW_MS: float = float(os.getenv("SQLITE_WRITE_BATCH_WINDOW_MS", "2"))
+    SQLITE_CHECKPOINT_SECONDS: float = float(os.getenv("SQLITE_CHECKPOINT_SECONDS", "60"))
+    SQLITE_OPTIMIZE_SECONDS: float = float(os.getenv("SQLITE_OPTIMIZE_SECONDS", "3600"))
+
     # Security Configuration - CRITICAL: No defaults for production secrets
     SECRET_KEY: str = os.getenv("SECRET_KEY")
     JWT_SECRET_KEY: str = os.getenv("JWT_SECRET_KEY")
@@ -41,6 +66,11 @@ class Config:
     PLAID_CLIENT_ID: Optional[str] = os.getenv("PLAID_CLIENT_ID")
     PLAID_SECRET: Optional[str] = os.getenv("PLAID_SECRET")
     PLAID_ENV: str = os.getenv("PLAID_ENV", "sandbox")
+    PLAID_API_URL: Optional[str] = os.getenv("PLAID_API_URL")  # overrides the PLAID_ENV host (local stand-in)
+    PLAID_SYNC_CONCURRENCY: int = int(os.getenv("PLAID_SYNC_CONCURRENCY", "4"))  # items synced in parallel
+    PLAID_SYNC_PAGE_SIZE: int = int(os.getenv("PLAID_SYNC_PAGE_SIZE", "500"))  # /transactions/sync maximum
+    PLAID_WEBHOOK_MAX_AGE_SECONDS: float = float(os.getenv("PLAID_WEBHOOK_MAX_AGE_SECONDS", "300"))  # iat freshness
+    PLAID_WEBHOOK_KEY_LOOKUPS_PER_MINUTE: int = int(os.getenv("PLAID_WEBHOOK_KEY_LOOKUPS_PER_MINUTE", "10"))  # unknown kids
     
     # Stripe Configuration
     STRIPE_API_KEY: Optional[str] = os.getenv("STRIPE_API_KEY")
@@ -49,6 +79,21 @@ class Config:
     # QuickBooks Configuration
     QUICKBOOKS_CLIENT_ID: Optional[str] = os.getenv("QUICKBOOKS_CLIENT_ID")
     QUICKBOOKS_CLIENT_SECRET: Optional[str] = os.getenv("QUICKBOOKS_CLIENT_SECRET")
+    QUICKBOOKS_SYNC_CONCURRENCY: int = int(os.getenv("QUICKBOOKS_SYNC_CONCURRENCY", "4"))  # QBO allows 10 per realm
+    QUICKBOOKS_BATCH_SIZE: int = int(os.getenv("QUICKBOOKS_BATCH_SIZE", "30"))  # QBO batch maximum
+    QUICKBOOKS_RATE_PER_MINUTE: int = int(os.getenv("QUICKBOOKS_RATE_PER_MINUTE", "450"))  # QBO allows 500 per realm
+    QUICKBOOKS_MAX_RETRIES: int = int(os.getenv("QUICKBOOKS_MAX_RETRIES", "3"))
+    QUICKBOOKS_MAX_RETRY_WAIT_SECONDS: float = float(os.getenv("QUICKBOOKS_MAX_RETRY_WAIT_SECONDS", "60"))
+    QUICKBOOKS_CACHE_TTL_SECONDS: float = float(os.getenv("QUICKBOOKS_CACHE_TTL_SECONDS", "900"))
+    
+    # Third-party HTTP (services/integration_http.py; per-provider overrides live there)
+    INTEGRATION_HTTP_TIMEOUT_SECONDS: float = float(os.getenv("INTEGRATION_HTTP_TIMEOUT_SECONDS", "30"))
+    INTEGRATION_HTTP_MAX_RETRIES: int = int(os.getenv("INTEGRATION_HTTP_MAX_RETRIES", "2"))
+    INTEGRATION_HTTP_BACKOFF_SECONDS: float = float(os.getenv("INTEGRATION_HTTP_BACKOFF_SECONDS", "0.5"))
+    INTEGRATION_HTTP_MAX_RETRY_WAIT_SECONDS: float = float(os.getenv("INTEGRATION_HTTP_MAX_RETRY_WAIT_SECONDS", "30"))
+    INTEGRATION_HTTP_HOST_CONCURRENCY: int = int(os.getenv("INTEGRATION_HTTP_HOST_CONCURRENCY", "16"))
+    INTEGRATION_BREAKER_FAILURES: int = int(os.getenv("INTEGRATION_BREAKER_FAILURES", "5"))
+    INTEGRATION_BREAKER_RESET_SECONDS: float = float(os.getenv("INTEGRATION_BREAKER_RESET_SECONDS", "30"))
     
     # Email Configuration
     EMAIL_API_KEY: Optional[str] = os.getenv("EMAIL_API_KEY")
@@ -67,6 +112,64 @@ class Config:
     # AI Configuration
     OPENAI_API_KEY: Optional[str] = os.getenv("OPENAI_API_KEY")
     
+    # Scheduled Task Execution
+    TASK_MAX_CONCURRENCY: int = int(os.getenv("TASK_MAX_CONCURRENCY", "8"))
+    TASK_UNIT_TIMEOUT_SECONDS: float = float(os.getenv("TASK_UNIT_TIMEOUT_SECONDS", "60"))
+    TASK_MAX_RETRIES: int = int(os.getenv("TASK_MAX_RETRIES", "2"))
+    TASK_RETRY_BACKOFF_SECONDS: float = float(os.getenv("TASK_RETRY_BACKOFF_SECONDS", "2"))
+    
+    # Weekly Insights Batch Delivery
+    WEEKLY_INSIGHTS_BATCH_SIZE: int = int(os.getenv("WEEKLY_INSIGHTS_BATCH_SIZE", "500"))
+    WEEKLY_INSIGHTS_SEND_CONCURRENCY: int = int(os.getenv("WEEKLY_INSIGHTS_SEND_CONCURRENCY", "4"))
+    
+    # Per-user Categorization Model
+    CATEGORY_MODEL_CACHE_USERS: int = int(os.getenv("CATEGORY_MODEL_CACHE_USERS", "1000"))
+    CATEGORY_MODEL_TTL_SECONDS: float = float(os.getenv("CATEGORY_MODEL_TTL_SECONDS", "300"))
+    
+    # Email Outbox
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = int(os.getenv("EMAIL_OUTBOX_MAX_ATTEMPTS", "6"))
+    EMAIL_OUTBOX_RETRY_BACKOFF_SECONDS: float = float(os.getenv("EMAIL_OUTBOX_RETRY_BACKOFF_SECONDS", "30"))
+    EMAIL_OUTBOX_POLL_SECONDS: float = float(os.getenv("EMAIL_OUTBOX_POLL_SECONDS", "5"))
+    EMAIL_OUTBOX_CLAIM_TIMEOUT_SECONDS: int = int(os.getenv("EMAIL_OUTBOX_CLAIM_TIMEOUT_SECONDS", "300"))
+    
+    # PDF Report Rendering
+    REPORTS_DIR: str = os.getenv("REPORTS_DIR", "reports")
+    REPORT_RENDER_WORKERS: int = int(os.getenv("REPORT_RENDER_WORKERS", "2"))  # ReportLab processes
+    REPORT_RETENTION_HOURS: float = float(os.getenv("REPORT_RETENTION_HOURS", "24"))
+    REPORT_SWEEP_INTERVAL_SECONDS: float = float(os.getenv("REPORT_SWEEP_INTERVAL_SECONDS", "900"))
+    REPORT_RENDER_TIMEOUT_SECONDS: float = float(os.getenv("REPORT_RENDER_TIMEOUT_SECONDS", "600"))  # stale .pending marker
+    
+    # Account Purge (soft-deleted accounts past retention)
+    ACCOUNT_PURGE_RETENTION_DAYS: int = int(os.getenv("ACCOUNT_PURGE_RETENTION_DAYS", "30"))
+    ACCOUNT_PURGE_CHUNK_SIZE: int = int(os.getenv("ACCOUNT_PURGE_CHUNK_SIZE", "25"))  # users per transaction
+    ACCOUNT_PURGE_CHUNK_PAUSE_MS: float = float(os.getenv("ACCOUNT_PURGE_CHUNK_PAUSE_MS", "50"))
+    UPLOAD_DIR: str = os.getenv("UPLOAD_DIR", "uploads")  # receipts live under uploads/receipts
+    
+    # WebSocket Fan-out
+    WS_SEND_QUEUE_SIZE: int = int(os.getenv("WS_SEND_QUEUE_SIZE", "256"))
+    WS_SEND_TIMEOUT_SECONDS: float = float(os.getenv("WS_SEND_TIMEOUT_SECONDS", "10"))
+    WS_HEARTBEAT_SECONDS: float = float(os.getenv("WS_HEARTBEAT_SECONDS", "30"))
+    WS_IDLE_TIMEOUT_SECONDS: float = float(os.getenv("WS_IDLE_TIMEOUT_SECONDS", "120"))
+    
+    # Query Profiling
+    QUERY_PROFILER_ENABLED: bool = os.getenv("QUERY_PROFILER_ENABLED", "true").lower() == "true"
+    QUERY_SLOW_THRESHOLD_SECONDS: float = float(os.getenv("QUERY_SLOW_THRESHOLD_SECONDS", "0.1"))
+    QUERY_N_PLUS_ONE_THRESHOLD: int = int(os.getenv("QUERY_N_PLUS_ONE_THRESHOLD", "5"))
+    
+    # Request Metrics
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    METRICS_SAMPLE_SECONDS: float = float(os.getenv("METRICS_SAMPLE_SECONDS", "15"))
+    USER_ACTIVITY_TRACKING_ENABLED: bool = os.getenv("USER_ACTIVITY_TRACKING_ENABLED", "false").lower() == "true"
+    
+    # Deferred SDK imports: pre-import them in the background after startup
+    IMPORT_WARM_UP_ENABLED: bool = os.getenv("IMPORT_WARM_UP_ENABLED", "true").lower() == "true"
+    IMPORT_WARM_UP_DELAY_SECONDS: float = float(os.getenv("IMPORT_WARM_UP_DELAY_SECONDS", "2"))
+    
+    # Rendered Page Cache (public marketing/SEO/blog pages)
+    PAGE_CACHE_ENABLED: bool = os.getenv("PAGE_CACHE_ENABLED", "true").lower() == "true"
+    PAGE_CACHE_MAX_ENTRIES: int = int(os.getenv("PAGE_CACHE_MAX_ENTRIES", "512"))
+    PAGE_CACHE_CHECK_SECONDS: float = float(os.getenv("PAGE_CACHE_CHECK_SECONDS", "5"))  # background template scan; 0 = startup only
+    
     # Emotional Intelligence Configuration
     ENABLE_ENHANCED_ORCHESTRATOR: bool = os.getenv("ENABLE_ENHANCED_ORCHESTRATOR", "true").lower() == "true"
     EMOTIONAL_INTELLIGENCE_ENABLED: bool = os.getenv("EMOTIONAL_INTELLIGENCE_ENABLED", "true").lower() == "true"
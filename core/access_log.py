@@ -2,48 +2,42 @@
 """
 🧭 LOCATION: /CORA/core/access_log.py
 🎯 PURPOSE: Lightweight access log middleware (rid-aware)
-📤 EXPORTS: install_access_log_middleware
+📤 EXPORTS: AccessLogHook, install_access_log_middleware
 """
 
 from __future__ import annotations
 
 import logging
-import time
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
 
+from core.pipeline import PipelineHook, RequestContext, RequestPipeline
 
-def _client_ip(req: Request) -> str:
-    xff = req.headers.get("x-forwarded-for", "").split(",")[0].strip()
-    if xff:
-        return xff
-    xr = req.headers.get("x-real-ip")
-    if xr:
-        return xr
-    return req.client.host if req.client else "unknown"
 
+class AccessLogHook(PipelineHook):
+    """One structured 'access' record per request"""
 
-def install_access_log_middleware(app: FastAPI) -> None:
-    logger = logging.getLogger("cora.access")
+    def __init__(self, logger_name: str = "cora.access"):
+        self.logger = logging.getLogger(logger_name)
 
-    @app.middleware("http")
-    async def _access_mw(request: Request, call_next):  # type: ignore
-        t0 = time.perf_counter()
-        response = await call_next(request)
-        ms = int(round((time.perf_counter() - t0) / 0.001))
+    def on_complete(self, ctx: RequestContext) -> None:
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
         try:
-            logger.info(
+            self.logger.info(
                 "access",
                 extra={
-                    "method": request.method,
-                    "path": request.url.path,
-                    "status_code": response.status_code,
-                    "duration_ms": ms,
-                    "user_agent": request.headers.get("user-agent", ""),
-                    "client_ip": _client_ip(request),
+                    "method": ctx.method,
+                    "path": ctx.path,
+                    "status_code": ctx.status,
+                    "duration_ms": int(round(ctx.elapsed / 0.001)),
+                    "user_agent": ctx.headers.get("user-agent", ""),
+                    "client_ip": ctx.client_ip(),
                 },
             )
         except Exception:
             # Never fail request due to logging
             pass
-        return response
 
+
+def install_access_log_middleware(app: FastAPI) -> None:
+    app.add_middleware(RequestPipeline, hooks=[AccessLogHook()])
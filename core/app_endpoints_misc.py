@@ -18,7 +18,7 @@ from sqlalchemy.orm import Session
 from dependencies.database import get_db
 from models import User
 from services.auth_service import create_email_verification_token, verify_email_token
-from services.email_service import send_email_verification, send_email
+from services.email_service import send_email_verification, queue_email
 from utils.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -51,10 +51,11 @@ Sitemap: https://coraai.tech/sitemap.xml
     async def contact_form(request: ContactRequest):
         try:
             if os.getenv("SENDGRID_API_KEY"):
-                await send_email(
+                queue_email(
                     to_email=os.getenv("CONTACT_FORM_EMAIL", "contact@coraai.tech"),
                     subject=f"Contact Form: {request.subject or 'New Inquiry'}",
-                    html_content=(
+                    body=f"Contact form submission from {request.name} <{request.email}>",
+                    html_body=(
                         f"<h2>New Contact Form Submission</h2>"
                         f"<p><strong>Name:</strong> {request.name}</p>"
                         f"<p><strong>Email:</strong> {request.email}</p>"
@@ -106,7 +107,7 @@ Sitemap: https://coraai.tech/sitemap.xml
                 return JSONResponse(status_code=200, content={"message": "Email is already verified."})
 
             token = create_email_verification_token(email)
-            verification_sent = await send_email_verification(email, token)
+            verification_sent = send_email_verification(email, token)
 
             if verification_sent:
                 return JSONResponse(status_code=200, content={"message": "Verification email sent successfully."})
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/core/pipeline.py
+🎯 PURPOSE: Single pure-ASGI middleware running cheap per-request hooks in one pass
+📤 EXPORTS: RequestContext, PipelineHook, RequestPipeline, install_request_pipeline
+🔄 PATTERN: on_request (in order, may short-circuit) → on_response (headers) → on_complete (reverse order)
+
+Each BaseHTTPMiddleware / @app.middleware("http") layer costs an extra task and
+a memory stream per request and buffers streaming responses. Hooks here are
+plain synchronous methods called inline around one downstream call, so adding
+a concern costs a function call, not a layer.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from starlette.datastructures import MutableHeaders
+
+logger = logging.getLogger(__name__)
+
+
+class RequestContext:
+    """Per-request state shared by hooks"""
+
+    __slots__ = ("scope", "method", "path", "started", "status", "response_headers", "state", "_headers")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.method: str = scope.get("method", "GET")
+        self.path: str = scope.get("path", "")
+        self.started = time.perf_counter()
+        self.status = 500
+        self.response_headers: Optional[MutableHeaders] = None
+        self.state: Dict[str, Any] = {}
+        self._headers: Optional[Dict[str, str]] = None
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        """Request headers, lower-cased, decoded on first use"""
+        if self._headers is None:
+            self._headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in self.scope.get("headers", [])}
+        return self._headers
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def client_ip(self) -> str:
+        forwarded = self.headers.get("x-forwarded-for", "").split(",")[0].strip()
+        if forwarded:
+            return forwarded
+        real_ip = self.headers.get("x-real-ip")
+        if real_ip:
+            return real_ip
+        client = self.scope.get("client")
+        return client[0] if client else "unknown"
+
+
+class PipelineHook:
+    """Base hook; override only what you need"""
+
+    def on_request(self, ctx: RequestContext):
+        """Return an ASGI app (e.g. a Response) to short-circuit, or None"""
+        return None
+
+    def on_response(self, ctx: RequestContext, headers: MutableHeaders) -> None:
+        """Adjust response headers before they are sent"""
+
+    def on_complete(self, ctx: RequestContext) -> None:
+        """Called once the response finished (or failed); ctx.status is final"""
+
+
+class RequestPipeline:
+    """ASGI middleware running a list of hooks around the app"""
+
+    def __init__(self, app, hooks: Iterable[PipelineHook] = ()):
+        self.app = app
+        self.hooks: List[PipelineHook] = list(hooks)
+        # Only call overridden methods on the hot path
+        self._response_hooks = [h for h in self.hooks if type(h).on_response is not PipelineHook.on_response]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        ctx = RequestContext(scope)
+        entered: List[PipelineHook] = []
+        response_hooks = self._response_hooks
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                ctx.status = message["status"]
+                if response_hooks:
+                    headers = MutableHeaders(scope=message)
+                    ctx.response_headers = headers
+                    for hook in response_hooks:
+                        if hook in entered:
+                            try:
+                                hook.on_response(ctx, headers)
+                            except Exception as e:
+                                logger.warning(f"{type(hook).__name__}.on_response failed: {e}")
+            await send(message)
+
+        try:
+            short_circuit = None
+            for hook in self.hooks:
+                entered.append(hook)
+                short_circuit = hook.on_request(ctx)
+                if short_circuit is not None:
+                    break
+            app = short_circuit if short_circuit is not None else self.app
+            await app(scope, receive, send_wrapper)
+        finally:
+            for hook in reversed(entered):
+                try:
+                    hook.on_complete(ctx)
+                except Exception as e:
+                    logger.warning(f"{type(hook).__name__}.on_complete failed: {e}")
+
+
+def default_hooks() -> List[PipelineHook]:
+    """Hooks installed by app.py, outermost first"""
+    from config import config
+    from core.request_id import RequestIdHook
+    from core.access_log import AccessLogHook
+    from core.security import SecurityHeadersHook
+    from middleware.rate_limiting import RateLimitHook
+
+    hooks: List[PipelineHook] = []
+    if config.METRICS_ENABLED:
+        from middleware.monitoring import MetricsHook
+        hooks.append(MetricsHook())
+    hooks += [RequestIdHook(), AccessLogHook(), SecurityHeadersHook(), RateLimitHook()]
+    if config.USER_ACTIVITY_TRACKING_ENABLED:
+        from middleware.user_activity import UserActivityHook
+        hooks.append(UserActivityHook())
+    return hooks
+
+
+def install_request_pipeline(app, hooks: Optional[Iterable[PipelineHook]] = None) -> None:
+    """Add one RequestPipeline carrying `hooks` (default_hooks() when omitted)"""
+    app.add_middleware(RequestPipeline, hooks=list(hooks) if hooks is not None else default_hooks())
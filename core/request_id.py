@@ -2,7 +2,7 @@
 """
 🧭 LOCATION: /CORA/core/request_id.py
 🎯 PURPOSE: Per-request ID context + middleware for correlation
-📤 EXPORTS: request_id_var, get_request_id, install_request_id_middleware
+📤 EXPORTS: request_id_var, get_request_id, RequestIdHook, install_request_id_middleware
 """
 
 from __future__ import annotations
@@ -10,7 +10,14 @@ from __future__ import annotations
 import contextvars
 import uuid
 from typing import Optional
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
+
+from core.pipeline import PipelineHook, RequestContext, RequestPipeline
+
+try:
+    import sentry_sdk  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    sentry_sdk = None
 
 
 # Context variable for request id
@@ -27,41 +34,46 @@ def get_request_id() -> str:
         return "-"
 
 
-def install_request_id_middleware(app: FastAPI) -> None:
-    """Attach middleware to ensure every request has a request-id.
+def _tag_sentry(rid: str) -> None:
+    if sentry_sdk is None:
+        return
+    try:
+        with sentry_sdk.configure_scope() as scope:  # type: ignore
+            scope.set_tag("request_id", rid)
+    except Exception:
+        pass
 
-    - Accept inbound X-Request-ID; otherwise generate uuid4
-    - Store in contextvar and echo in X-Request-ID response header
-    - If Sentry is available, attach as a scope tag
-    """
 
-    @app.middleware("http")
-    async def _request_id_mw(request: Request, call_next):  # type: ignore
-        rid = request.headers.get("x-request-id") or str(uuid.uuid4())
-        token = request_id_var.set(rid)
-        # Attach to Sentry scope if available
-        try:
-            import sentry_sdk  # type: ignore
+class RequestIdHook(PipelineHook):
+    """Accept inbound X-Request-ID (or generate uuid4), expose it via the contextvar
+    for the rest of the request and echo it in the response headers."""
 
-            with sentry_sdk.configure_scope() as scope:  # type: ignore
-                try:
-                    scope.set_tag("request_id", rid)
-                except Exception:
-                    pass
-        except Exception:
-            pass
+    def on_request(self, ctx: RequestContext):
+        rid = ctx.headers.get("x-request-id") or str(uuid.uuid4())
+        ctx.state["request_id"] = rid
+        ctx.state["request_id_token"] = request_id_var.set(rid)
+        _tag_sentry(rid)
+        return None
 
+    def on_response(self, ctx: RequestContext, headers) -> None:
+        headers.setdefault("X-Request-ID", ctx.state["request_id"])
+
+    def on_complete(self, ctx: RequestContext) -> None:
+        # Reset so the id does not leak into whatever the task runs next
         try:
-            response = await call_next(request)
-        finally:
-            # Ensure context is reset to avoid leakage across tasks
-            try:
-                request_id_var.reset(token)
-            except Exception:
-                pass
-        try:
-            response.headers.setdefault("X-Request-ID", rid)
+            request_id_var.reset(ctx.state.pop("request_id_token"))
         except Exception:
             pass
-        return response
 
+
+def install_request_id_middleware(app: FastAPI) -> None:
+    """Attach middleware to ensure every request has a request-id.
+
+    - Accept inbound X-Request-ID; otherwise generate uuid4
+    - Store in contextvar and echo in X-Request-ID response header
+    - If Sentry is available, attach as a scope tag
+
+    Prefer core.pipeline.install_request_pipeline, which runs this together
+    with the other per-request hooks in a single middleware.
+    """
+    app.add_middleware(RequestPipeline, hooks=[RequestIdHook()])
@@ -2,14 +2,17 @@
 """
 🧭 LOCATION: /CORA/core/security.py
 🎯 PURPOSE: Build CORS/hosts config from env and attach simple security headers
-📤 EXPORTS: build_cors_config_from_env, build_trusted_hosts_from_env, security_headers_middleware
+📤 EXPORTS: build_cors_config_from_env, build_trusted_hosts_from_env, SecurityHeadersHook,
+            security_headers_middleware
 """
 
 from __future__ import annotations
 
 import os
 from typing import Dict, List, Optional
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
+
+from core.pipeline import PipelineHook, RequestContext, RequestPipeline
 
 
 def _split_csv(value: str) -> List[str]:
@@ -55,8 +58,8 @@ def build_trusted_hosts_from_env() -> List[str]:
     return hosts
 
 
-def security_headers_middleware(app: FastAPI) -> None:
-    """Attach minimal security headers to every response.
+class SecurityHeadersHook(PipelineHook):
+    """Minimal security headers on every response.
 
     - X-Frame-Options: DENY
     - X-Content-Type-Options: nosniff
@@ -64,19 +67,14 @@ def security_headers_middleware(app: FastAPI) -> None:
     - Strict-Transport-Security only when HTTPS
     """
 
-    @app.middleware("http")
-    async def _security_headers(request: Request, call_next):  # type: ignore
-        response = await call_next(request)
-        response.headers.setdefault("X-Frame-Options", "DENY")
-        response.headers.setdefault("X-Content-Type-Options", "nosniff")
-        response.headers.setdefault("Referrer-Policy", "no-referrer")
-        try:
-            if request.url.scheme == "https":
-                response.headers.setdefault(
-                    "Strict-Transport-Security",
-                    "max-age=31536000; includeSubDomains; preload",
-                )
-        except Exception:
-            pass
-        return response
+    def on_response(self, ctx: RequestContext, headers) -> None:
+        headers.setdefault("X-Frame-Options", "DENY")
+        headers.setdefault("X-Content-Type-Options", "nosniff")
+        headers.setdefault("Referrer-Policy", "no-referrer")
+        if ctx.scope.get("scheme") == "https":
+            headers.setdefault("Strict-Transport-Security", "max-age=31536000; includeSubDomains; preload")
 
+
+def security_headers_middleware(app: FastAPI) -> None:
+    """Attach minimal security headers to every response (see SecurityHeadersHook)."""
+    app.add_middleware(RequestPipeline, hooks=[SecurityHeadersHook()])
@@ -3,14 +3,17 @@
 🧭 LOCATION: /CORA/dependencies/auth.py
 🎯 PURPOSE: Authentication dependencies for protected routes
 🔗 IMPORTS: FastAPI, services, models
-📤 EXPORTS: get_current_user, get_current_active_user
+📤 EXPORTS: get_current_user, get_current_user_async, get_current_active_user
 """
 
 from fastapi import Depends, HTTPException, status, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from jose import jwt, JWTError
 
 from models import User, get_db
+from models.async_base import get_async_db
 from services.auth_service import verify_token, get_user_by_email, TokenValidationError
 from config import config
 
@@ -39,11 +42,8 @@ def decode_token(token: str) -> dict:
     except JWTError:
         raise ValueError("Invalid token")
 
-async def get_current_user(
-    request: Request,
-    db: Session = Depends(get_db)
-) -> User:
-    """Get current authenticated user from JWT token in cookie"""
+def _token_email(request: Request) -> str:
+    """Email from the request's JWT (header or cookie); 401 if missing or invalid"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -63,14 +63,40 @@ async def get_current_user(
         raise credentials_exception
     if email is None:
         raise credentials_exception
+    return email
+
+def _unknown_user() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+async def get_current_user(
+    request: Request,
+    db: Session = Depends(get_db)
+) -> User:
+    """Get current authenticated user from JWT token in cookie"""
+    email = _token_email(request)
     
     # Get user from database
     user = get_user_by_email(db, email)
     if user is None:
-        raise credentials_exception
+        raise _unknown_user()
     
     return user
 
+async def get_current_user_async(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    """get_current_user for AsyncSession endpoints (the lookup is awaited, not blocking)"""
+    email = _token_email(request)
+    user = await db.scalar(select(User).where(User.email == email))
+    if user is None:
+        raise _unknown_user()
+    return user
+
 async def get_current_active_user(
     current_user: User = Depends(get_current_user)
 ) -> User:
@@ -1,24 +1,16 @@
 #!/usr/bin/env python3
 """
 🧭 LOCATION: /CORA/dependencies/database.py
-🎯 PURPOSE: Database connection dependency for FastAPI
-🔗 IMPORTS: sqlite3, pathlib
-📤 EXPORTS: get_db
+🎯 PURPOSE: Database session dependency for FastAPI
+🔗 IMPORTS: models.base
+📤 EXPORTS: get_db, session_scope
+
+Kept for routes that import their dependency from here. It used to open a
+raw sqlite3 connection to ./cora.db per request (not the configured
+database, and not an ORM session); it is now the pooled session from
+models.base.
 """
 
-import sqlite3
-from pathlib import Path
-from typing import Generator
+from models.base import get_db, session_scope
 
-def get_db() -> Generator[sqlite3.Connection, None, None]:
-    """Get database connection - Updated to use main cora.db file"""
-    # Use the same database as config.py for consistency
-    db_path = Path("cora.db")
-    
-    conn = sqlite3.connect(str(db_path))
-    conn.row_factory = sqlite3.Row
-    
-    try:
-        yield conn
-    finally:
-        conn.close() 
\ No newline at end of file
+__all__ = ["get_db", "session_scope"]
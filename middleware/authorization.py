@@ -92,46 +92,46 @@ def require_ownership(resource_type: str, id_param: str = "id"):
 async def verify_resource_ownership(resource_type: str, resource_id: str, user_email: str) -> bool:
     """Verify that the user owns the specified resource"""
     try:
-        from dependencies.database import get_db
+        from models.base import session_scope
         from models.expense import Expense
         from models.user import User
         from models.feedback import Feedback
         
-        db = get_db()
-        
-        if resource_type.lower() == "expense":
-            # Check if expense belongs to user
-            expense = db.query(Expense).filter(
-                Expense.id == resource_id,
-                Expense.user_email == user_email
-            ).first()
-            return expense is not None
-            
-        elif resource_type.lower() == "user":
-            # Users can only access their own profile
-            return resource_id == user_email
-            
-        elif resource_type.lower() == "feedback":
-            # Check if feedback belongs to user
-            feedback = db.query(Feedback).filter(
-                Feedback.id == resource_id,
-                Feedback.user_email == user_email
-            ).first()
-            return feedback is not None
-            
-        elif resource_type.lower() == "business_profile":
-            # Check if business profile belongs to user
-            from models.business_profile import BusinessProfile
-            profile = db.query(BusinessProfile).filter(
-                BusinessProfile.id == resource_id,
-                BusinessProfile.user_email == user_email
-            ).first()
-            return profile is not None
-            
-        else:
-            # Unknown resource type - deny access
-            return False
-            
+        with session_scope() as db:
+
+            if resource_type.lower() == "expense":
+                # Check if expense belongs to user
+                expense = db.query(Expense).filter(
+                    Expense.id == resource_id,
+                    Expense.user_email == user_email
+                ).first()
+                return expense is not None
+
+            elif resource_type.lower() == "user":
+                # Users can only access their own profile
+                return resource_id == user_email
+
+            elif resource_type.lower() == "feedback":
+                # Check if feedback belongs to user
+                feedback = db.query(Feedback).filter(
+                    Feedback.id == resource_id,
+                    Feedback.user_email == user_email
+                ).first()
+                return feedback is not None
+
+            elif resource_type.lower() == "business_profile":
+                # Check if business profile belongs to user
+                from models.business_profile import BusinessProfile
+                profile = db.query(BusinessProfile).filter(
+                    BusinessProfile.id == resource_id,
+                    BusinessProfile.user_email == user_email
+                ).first()
+                return profile is not None
+
+            else:
+                # Unknown resource type - deny access
+                return False
+
     except Exception as e:
         # Log the error and deny access for security
         print(f"Error verifying resource ownership: {e}")
@@ -166,14 +166,14 @@ def require_admin(func: Callable) -> Callable:
 async def verify_admin_status(user_email: str) -> bool:
     """Verify that the user has admin privileges"""
     try:
-        from dependencies.database import get_db
+        from models.base import session_scope
         from models.user import User
         
-        db = get_db()
-        user = db.query(User).filter(User.email == user_email).first()
-        
-        return user and user.is_admin
-        
+        with session_scope() as db:
+            user = db.query(User).filter(User.email == user_email).first()
+
+            return user and user.is_admin
+
     except Exception as e:
         print(f"Error verifying admin status: {e}")
         return False
@@ -181,33 +181,33 @@ async def verify_admin_status(user_email: str) -> bool:
 def check_resource_access(resource_type: str, resource_id: str, user_email: str) -> bool:
     """Synchronous function to check resource access (for use in route handlers)"""
     try:
-        from dependencies.database import get_db
+        from models.base import session_scope
         from models.expense import Expense
         from models.user import User
         from models.feedback import Feedback
         
-        db = get_db()
-        
-        if resource_type.lower() == "expense":
-            expense = db.query(Expense).filter(
-                Expense.id == resource_id,
-                Expense.user_email == user_email
-            ).first()
-            return expense is not None
-            
-        elif resource_type.lower() == "user":
-            return resource_id == user_email
-            
-        elif resource_type.lower() == "feedback":
-            feedback = db.query(Feedback).filter(
-                Feedback.id == resource_id,
-                Feedback.user_email == user_email
-            ).first()
-            return feedback is not None
-            
-        else:
-            return False
-            
+        with session_scope() as db:
+
+            if resource_type.lower() == "expense":
+                expense = db.query(Expense).filter(
+                    Expense.id == resource_id,
+                    Expense.user_email == user_email
+                ).first()
+                return expense is not None
+
+            elif resource_type.lower() == "user":
+                return resource_id == user_email
+
+            elif resource_type.lower() == "feedback":
+                feedback = db.query(Feedback).filter(
+                    Feedback.id == resource_id,
+                    Feedback.user_email == user_email
+                ).first()
+                return feedback is not None
+
+            else:
+                return False
+
     except Exception:
         return False
 
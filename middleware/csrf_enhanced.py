@@ -26,6 +26,7 @@ CSRF_EXEMPT_PATHS = {
     "/api/docs",
     "/api/openapi.json",
     "/api/redoc",
+    "/api/integrations/plaid/webhook",  # called by Plaid, not a browser; the route checks its signed JWT
 }
 
 # Methods that require CSRF protection
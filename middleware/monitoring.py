@@ -1,17 +1,49 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/middleware/monitoring.py
+🎯 PURPOSE: Prometheus request metrics by route template, background system sampling
+🔗 IMPORTS: prometheus_client, psutil, threading, utils.db_pool
+📤 EXPORTS: MetricsHook, MetricsMiddleware, monitoring_middleware, get_metrics, get_system_health,
+            start_system_sampler, stop_system_sampler, route_template, business counters
 
+Requests are labelled with the matched route template (/api/expenses/{expense_id}),
+never the raw path, so series count is bounded by the number of routes.
+System metrics are sampled by a background thread instead of per request.
+When PROMETHEUS_MULTIPROC_DIR is set (gunicorn/uvicorn workers), get_metrics()
+aggregates every worker's metric files.
+"""
+
+import os
 import time
 import logging
-from fastapi import Request, Response
-from prometheus_client import Counter, Histogram, generate_latest
+import threading
+from typing import Optional
+
 import psutil
-import os
+from fastapi import Request
+from prometheus_client import (
+    CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess, CONTENT_TYPE_LATEST
+)
+
+from config import config
+from core.pipeline import PipelineHook, RequestContext, RequestPipeline
+from utils.db_pool import pool_monitor
+
+# Request latency buckets (seconds): fine below 100ms where most API calls land
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+KNOWN_METHODS = {"GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS"}
+UNMATCHED_ROUTE = "unmatched"
 
 # Prometheus metrics
-REQUEST_COUNT = Counter('http_requests_total', 'Total HTTP requests', ['method', 'endpoint', 'status'])
-REQUEST_LATENCY = Histogram('http_request_duration_seconds', 'HTTP request latency')
-ACTIVE_CONNECTIONS = Counter('active_connections', 'Active database connections')
-MEMORY_USAGE = Histogram('memory_usage_bytes', 'Memory usage in bytes')
-CPU_USAGE = Histogram('cpu_usage_percent', 'CPU usage percentage')
+REQUEST_COUNT = Counter('http_requests_total', 'Total HTTP requests', ['method', 'route', 'status'])
+REQUEST_LATENCY = Histogram('http_request_duration_seconds', 'HTTP request latency by route',
+                            ['method', 'route'], buckets=LATENCY_BUCKETS)
+REQUESTS_IN_PROGRESS = Gauge('http_requests_in_progress', 'HTTP requests being served',
+                             multiprocess_mode='livesum')
+MEMORY_USAGE = Gauge('system_memory_used_bytes', 'System memory in use', multiprocess_mode='mostrecent')
+CPU_USAGE = Gauge('system_cpu_usage_percent', 'System CPU usage percentage', multiprocess_mode='mostrecent')
+PROCESS_MEMORY = Gauge('process_resident_memory_sampled_bytes', 'Worker resident memory',
+                       ['pid'], multiprocess_mode='liveall')
 
 # Business metrics
 EXPENSES_CREATED = Counter('expenses_created_total', 'Total expenses created', ['source'])
@@ -23,54 +55,154 @@ ALERTS_CREATED = Counter('alerts_created_total', 'Total alerts created', ['sever
 
 logger = logging.getLogger(__name__)
 
+
+def route_template(scope, base_root_path: str = "") -> str:
+    """Matched route template for a request scope, or 'unmatched'"""
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    if path:
+        return path
+    # Mounted sub-apps (static files) only expose the mount prefix
+    root_path = scope.get("root_path") or ""
+    if root_path and root_path != base_root_path:
+        return root_path[len(base_root_path):]
+    return UNMATCHED_ROUTE
+
+
+def _record(method: str, route: str, status: int, duration: float):
+    method = method if method in KNOWN_METHODS else "OTHER"
+    REQUEST_COUNT.labels(method=method, route=route, status=str(status)).inc()
+    REQUEST_LATENCY.labels(method=method, route=route).observe(duration)
+    try:
+        from utils.api_response_optimizer import performance_monitor
+        performance_monitor.record_response_time(route, duration, status)
+    except Exception:
+        pass
+
+
+class MetricsHook(PipelineHook):
+    """Request count and latency per route template, as a pipeline hook"""
+
+    def on_request(self, ctx: RequestContext):
+        ctx.state["base_root_path"] = ctx.scope.get("root_path", "")
+        REQUESTS_IN_PROGRESS.inc()
+        return None
+
+    def on_complete(self, ctx: RequestContext) -> None:
+        REQUESTS_IN_PROGRESS.dec()
+        route = route_template(ctx.scope, ctx.state.get("base_root_path", ""))
+        _record(ctx.method, route, ctx.status, ctx.elapsed)
+
+
+class MetricsMiddleware(RequestPipeline):
+    """ASGI middleware recording request count and latency per route template"""
+
+    def __init__(self, app):
+        super().__init__(app, [MetricsHook()])
+
+
 async def monitoring_middleware(request: Request, call_next):
-    """Monitoring middleware for metrics collection"""
-    start_time = time.time()
-    
-    # Record request start
-    method = request.method
-    endpoint = request.url.path
-    
+    """Function-style equivalent of MetricsMiddleware for @app.middleware("http")"""
+    start_time = time.perf_counter()
+    status = 500
     try:
         response = await call_next(request)
-        
-        # Record metrics
-        duration = time.time() - start_time
-        REQUEST_COUNT.labels(method=method, endpoint=endpoint, status=response.status_code).inc()
-        REQUEST_LATENCY.observe(duration)
-        
-        # Record system metrics
-        MEMORY_USAGE.observe(psutil.virtual_memory().used)
-        CPU_USAGE.observe(psutil.cpu_percent())
-        
+        status = response.status_code
         return response
-        
     except Exception as e:
-        # Record error metrics
-        duration = time.time() - start_time
-        REQUEST_COUNT.labels(method=method, endpoint=endpoint, status=500).inc()
-        REQUEST_LATENCY.observe(duration)
         logger.error(f"Request failed: {str(e)}")
         raise
+    finally:
+        _record(request.method, route_template(request.scope), status, time.perf_counter() - start_time)
+
+
+class SystemSampler:
+    """Background thread refreshing system gauges every interval seconds"""
+
+    def __init__(self, interval: Optional[float] = None):
+        self.interval = interval or config.METRICS_SAMPLE_SECONDS
+        self.latest = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._process = psutil.Process()
+
+    def sample(self):
+        memory = psutil.virtual_memory()
+        cpu = psutil.cpu_percent(interval=None)  # since the previous sample
+        MEMORY_USAGE.set(memory.used)
+        CPU_USAGE.set(cpu)
+        PROCESS_MEMORY.labels(pid=str(os.getpid())).set(self._process.memory_info().rss)
+        self.latest = {
+            'memory_usage': memory.percent,
+            'cpu_usage': cpu,
+            'disk_usage': psutil.disk_usage('/').percent,
+            'load_average': os.getloadavg() if hasattr(os, 'getloadavg') else None,
+            'db_pool': pool_monitor.sample(),  # refreshes pool gauges, reports leaks
+            'sampled_at': time.time()
+        }
+        return self.latest
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.sample()
+            except Exception as e:
+                logger.warning(f"System metrics sample failed: {e}")
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="cora-metrics-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
 
-def get_metrics():
-    """Get Prometheus metrics"""
+
+system_sampler = SystemSampler()
+
+
+def start_system_sampler():
+    system_sampler.start()
+
+
+def stop_system_sampler():
+    system_sampler.stop()
+
+
+def get_metrics() -> bytes:
+    """Get Prometheus metrics (aggregated across workers in multiprocess mode)"""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
     return generate_latest()
 
+
 def get_system_health():
-    """Get system health metrics"""
-    return {
-        'memory_usage': psutil.virtual_memory().percent,
-        'cpu_usage': psutil.cpu_percent(),
-        'disk_usage': psutil.disk_usage('/').percent,
-        'load_average': os.getloadavg() if hasattr(os, 'getloadavg') else None
-    }
+    """Get system health metrics (latest background sample when available)"""
+    latest = system_sampler.latest
+    if latest and time.time() - latest['sampled_at'] < 2 * system_sampler.interval:
+        return {k: v for k, v in latest.items() if k != 'sampled_at'}
+    sample = system_sampler.sample()
+    return {k: v for k, v in sample.items() if k != 'sampled_at'}
 
 # Export business metrics for use in routes
 __all__ = [
+    'MetricsHook',
+    'MetricsMiddleware',
     'monitoring_middleware',
+    'route_template',
     'get_metrics',
     'get_system_health',
+    'start_system_sampler',
+    'stop_system_sampler',
+    'CONTENT_TYPE_LATEST',
     'EXPENSES_CREATED',
     'VOICE_EXPENSES_SUCCESS',
     'VOICE_EXPENSES_FAILED',
@@ -1,166 +1,283 @@
 #!/usr/bin/env python3
 """
 🧭 LOCATION: /CORA/middleware/query_monitoring.py
-🎯 PURPOSE: Database query monitoring and slow query detection
-🔗 IMPORTS: FastAPI, time, logging, sqlalchemy
-📤 EXPORTS: QueryMonitoringMiddleware
+🎯 PURPOSE: Request-scoped database query profiling, slow query and N+1 detection
+🔗 IMPORTS: contextvars, re, time, logging, sqlalchemy
+📤 EXPORTS: QueryProfiler, QueryProfile, QueryMonitoringMiddleware, query_monitor, current_profile
+
+SQLAlchemy cursor events record every query into the QueryProfile held in a
+contextvar, so a request only sees its own queries even when many requests
+run concurrently (sync endpoints run in the threadpool with a copied
+context, which still points at the same profile object). Process-wide data
+lives in bounded structures: a histogram keyed by normalised statement, a
+ring buffer of slow queries and a ring buffer of N+1 incidents.
 """
 
-import time
+import contextvars
 import logging
-from typing import Dict, List, Any
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Deque, Dict, List, Optional
+
 from sqlalchemy import event
-from sqlalchemy.orm import Session
-from models.base import engine
+
+from config import config
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
-class QueryMonitoringMiddleware(BaseHTTPMiddleware):
-    """Middleware for monitoring database query performance"""
-    
-    def __init__(self, app, slow_query_threshold: float = 0.1):
-        super().__init__(app)
-        self.slow_query_threshold = slow_query_threshold
-        self.slow_queries: List[Dict[str, Any]] = []
+# Bounds on process-wide state
+MAX_TRACKED_STATEMENTS = 1000
+SLOW_QUERY_BUFFER = 200
+N_PLUS_ONE_BUFFER = 200
+UNTRACKED = "(untracked statements)"
+
+_current_profile: contextvars.ContextVar[Optional["QueryProfile"]] = contextvars.ContextVar(
+    "query_profile", default=None
+)
+
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\(\s*(?:\?|%s|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%s|%\(\w+\)s|:\w+))+\s*\)")
+_SPACE_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def normalize_statement(statement: str) -> str:
+    """Collapse literals, IN-lists and whitespace so repeated queries share a key"""
+    sql = _SPACE_RE.sub(" ", statement).strip()
+    sql = _LITERAL_RE.sub("?", sql)
+    return _IN_LIST_RE.sub("(?...)", sql)
+
+
+def current_profile() -> Optional["QueryProfile"]:
+    """Profile of the request being handled, if any"""
+    return _current_profile.get()
+
+
+class QueryProfile:
+    """Queries executed on behalf of one request"""
+
+    __slots__ = ("count", "db_time", "statements", "started")
+
+    def __init__(self):
+        self.count = 0
+        self.db_time = 0.0
+        self.statements: Dict[str, List[float]] = {}  # normalised sql -> [count, seconds]
+        self.started = time.perf_counter()
+
+    def record(self, normalized: str, duration: float):
+        self.count += 1
+        self.db_time += duration
+        entry = self.statements.get(normalized)
+        if entry is None:
+            self.statements[normalized] = [1, duration]
+        else:
+            entry[0] += 1
+            entry[1] += duration
+
+    def repeated(self, threshold: int) -> List[Dict[str, Any]]:
+        """SELECT statements executed more than `threshold` times (likely N+1)"""
+        return [
+            {"sql": sql, "count": int(count), "total_time": seconds}
+            for sql, (count, seconds) in self.statements.items()
+            if count > threshold and sql[:6].upper() == "SELECT"
+        ]
+
+    def server_timing(self, n_plus_one: int = 0) -> str:
+        desc = f"{self.count} queries" + (f", {n_plus_one} N+1" if n_plus_one else "")
+        return f'db;dur={self.db_time * 1000:.1f};desc="{desc}"'
+
+
+class QueryProfiler:
+    """Process-wide query statistics fed by SQLAlchemy cursor events"""
+
+    def __init__(self, slow_query_threshold: Optional[float] = None, n_plus_one_threshold: Optional[int] = None):
+        self.slow_query_threshold = (
+            slow_query_threshold if slow_query_threshold is not None else config.QUERY_SLOW_THRESHOLD_SECONDS
+        )
+        self.n_plus_one_threshold = n_plus_one_threshold or config.QUERY_N_PLUS_ONE_THRESHOLD
+        self.slow_queries: Deque[Dict[str, Any]] = deque(maxlen=SLOW_QUERY_BUFFER)
+        self.n_plus_one: Deque[Dict[str, Any]] = deque(maxlen=N_PLUS_ONE_BUFFER)
         self.query_stats: Dict[str, Dict[str, Any]] = {}
-        
-        # Set up SQLAlchemy event listeners
-        self._setup_query_listeners()
-    
-    def _setup_query_listeners(self):
-        """Set up SQLAlchemy event listeners for query monitoring"""
-        @event.listens_for(engine, "before_cursor_execute")
-        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
-            context._query_start_time = time.time()
-            context._query_statement = statement
-            context._query_parameters = parameters
-        
-        @event.listens_for(engine, "after_cursor_execute")
-        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
-            query_time = time.time() - context._query_start_time
-            
-            # Track query statistics
-            query_hash = hash(statement)
-            if query_hash not in self.query_stats:
-                self.query_stats[query_hash] = {
-                    'sql': statement,
-                    'count': 0,
-                    'total_time': 0,
-                    'avg_time': 0,
-                    'min_time': float('inf'),
-                    'max_time': 0,
-                    'last_executed': None
-                }
-            
-            stats = self.query_stats[query_hash]
+        self._lock = threading.Lock()
+        self._engines = set()
+
+    def install(self, engine=None):
+        """Attach cursor listeners to `engine` (the app engine by default) once"""
+        if engine is None:
+            from models.base import engine
+        if id(engine) in self._engines:
+            return
+        self._engines.add(id(engine))
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    @staticmethod
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._query_start_time = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_query_start_time", None)
+        if started is None:
+            return
+        duration = time.perf_counter() - started
+        normalized = normalize_statement(statement)
+
+        profile = _current_profile.get()
+        if profile is not None:
+            profile.record(normalized, duration)
+
+        with self._lock:
+            stats = self.query_stats.get(normalized)
+            if stats is None:
+                key = normalized if len(self.query_stats) < MAX_TRACKED_STATEMENTS else UNTRACKED
+                stats = self.query_stats.setdefault(key, {
+                    'sql': key, 'count': 0, 'total_time': 0.0,
+                    'min_time': float('inf'), 'max_time': 0.0, 'last_executed': None
+                })
             stats['count'] += 1
-            stats['total_time'] += query_time
-            stats['avg_time'] = stats['total_time'] / stats['count']
-            stats['min_time'] = min(stats['min_time'], query_time)
-            stats['max_time'] = max(stats['max_time'], query_time)
+            stats['total_time'] += duration
+            stats['min_time'] = min(stats['min_time'], duration)
+            stats['max_time'] = max(stats['max_time'], duration)
             stats['last_executed'] = time.time()
-            
-            # Log slow queries
-            if query_time > self.slow_query_threshold:
-                slow_query = {
-                    'sql': statement,
-                    'parameters': str(parameters)[:200],
-                    'execution_time': query_time,
-                    'timestamp': time.time(),
-                    'connection_id': id(conn)
-                }
-                self.slow_queries.append(slow_query)
-                
-                logger.warning(
-                    f"Slow query detected: {query_time:.3f}s - {statement[:100]}...",
-                    extra={
-                        'query_time': query_time,
-                        'sql': statement,
-                        'parameters': str(parameters)[:200]
-                    }
-                )
-    
-    async def dispatch(self, request: Request, call_next):
-        """Process request and monitor database queries"""
-        start_time = time.time()
-        
-        # Clear slow queries for this request
-        request_slow_queries = []
-        
-        # Store original query stats
-        original_stats = self.query_stats.copy()
-        
+
+        # Log slow queries
+        if duration > self.slow_query_threshold:
+            self.slow_queries.append({
+                'sql': statement,
+                'parameters': str(parameters)[:200],
+                'execution_time': duration,
+                'timestamp': time.time(),
+                'connection_id': id(conn)
+            })
+            logger.warning(
+                f"Slow query detected: {duration:.3f}s - {statement[:100]}...",
+                extra={'query_time': duration, 'sql': statement, 'parameters': str(parameters)[:200]}
+            )
+
+    @contextmanager
+    def profile(self, label: str = "block"):
+        """Profile queries run inside the block (scripts, jobs, tests)"""
+        profile = QueryProfile()
+        token = _current_profile.set(profile)
         try:
-            response = await call_next(request)
-            
-            # Calculate request processing time
-            request_time = time.time() - start_time
-            
-            # Get queries executed during this request
-            new_stats = {k: v for k, v in self.query_stats.items() 
-                        if k not in original_stats or v['count'] > original_stats[k]['count']}
-            
-            # Log request summary if it had database queries
-            if new_stats:
-                total_queries = sum(stats['count'] - original_stats.get(k, {}).get('count', 0) 
-                                  for k, stats in new_stats.items())
-                total_query_time = sum(stats['total_time'] - original_stats.get(k, {}).get('total_time', 0) 
-                                     for k, stats in new_stats.items())
-                
-                logger.info(
-                    f"Request {request.method} {request.url.path} - "
-                    f"Total time: {request_time:.3f}s, "
-                    f"DB queries: {total_queries}, "
-                    f"DB time: {total_query_time:.3f}s",
-                    extra={
-                        'request_time': request_time,
-                        'db_queries': total_queries,
-                        'db_time': total_query_time,
-                        'method': request.method,
-                        'path': request.url.path
-                    }
-                )
-            
-            return response
-            
-        except Exception as e:
-            logger.error(f"Request failed: {request.method} {request.url.path} - {str(e)}")
-            raise
-    
+            yield profile
+        finally:
+            _current_profile.reset(token)
+            self.finish(profile, label)
+
+    def finish(self, profile: QueryProfile, label: str) -> List[Dict[str, Any]]:
+        """Record N+1 incidents for a finished profile; returns them"""
+        repeated = profile.repeated(self.n_plus_one_threshold)
+        for item in repeated:
+            self.n_plus_one.append(dict(item, endpoint=label, timestamp=time.time()))
+            logger.warning(
+                f"Possible N+1 in {label}: {item['count']}x {item['sql'][:120]}",
+                extra={'endpoint': label, 'sql': item['sql'], 'count': item['count']}
+            )
+        if profile.count:
+            logger.debug(
+                f"{label} - DB queries: {profile.count}, DB time: {profile.db_time:.3f}s",
+                extra={'db_queries': profile.count, 'db_time': profile.db_time, 'path': label}
+            )
+        return repeated
+
     def get_slow_queries(self, limit: int = 100) -> List[Dict[str, Any]]:
         """Get recent slow queries"""
-        return sorted(self.slow_queries, key=lambda x: x['timestamp'], reverse=True)[:limit]
-    
+        return list(reversed(self.slow_queries))[:limit]
+
+    def get_n_plus_one(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Get recent N+1 incidents, newest first"""
+        return list(reversed(self.n_plus_one))[:limit]
+
+    def get_statement_histogram(self, limit: int = 50, order_by: str = "total_time") -> List[Dict[str, Any]]:
+        """Normalised statements ranked by total time (or count)"""
+        with self._lock:
+            rows = [dict(stats, avg_time=stats['total_time'] / stats['count']) for stats in self.query_stats.values()]
+        return sorted(rows, key=lambda r: r.get(order_by, 0), reverse=True)[:limit]
+
     def get_query_statistics(self) -> Dict[str, Any]:
         """Get query performance statistics"""
-        if not self.query_stats:
+        with self._lock:
+            stats = list(self.query_stats.values())
+        if not stats:
             return {
                 'total_queries': 0,
                 'average_query_time': 0,
                 'slowest_query_time': 0,
                 'fastest_query_time': 0,
-                'slow_query_count': len(self.slow_queries)
+                'slow_query_count': len(self.slow_queries),
+                'n_plus_one_count': len(self.n_plus_one)
             }
-        
-        total_queries = sum(stats['count'] for stats in self.query_stats.values())
-        total_time = sum(stats['total_time'] for stats in self.query_stats.values())
-        
+
+        total_queries = sum(s['count'] for s in stats)
+        total_time = sum(s['total_time'] for s in stats)
+
         return {
             'total_queries': total_queries,
             'average_query_time': total_time / total_queries if total_queries > 0 else 0,
-            'slowest_query_time': max(stats['max_time'] for stats in self.query_stats.values()),
-            'fastest_query_time': min(stats['min_time'] for stats in self.query_stats.values()),
+            'slowest_query_time': max(s['max_time'] for s in stats),
+            'fastest_query_time': min(s['min_time'] for s in stats),
             'slow_query_count': len(self.slow_queries),
-            'unique_queries': len(self.query_stats)
+            'n_plus_one_count': len(self.n_plus_one),
+            'unique_queries': len(stats)
         }
-    
+
     def clear_statistics(self):
         """Clear all query statistics"""
-        self.slow_queries.clear()
-        self.query_stats.clear()
+        with self._lock:
+            self.slow_queries.clear()
+            self.n_plus_one.clear()
+            self.query_stats.clear()
+
+
+class QueryMonitoringMiddleware:
+    """ASGI middleware giving each HTTP request its own QueryProfile
+
+    Adds a Server-Timing header (db time, query count, N+1 count) to every
+    response that touched the database and records N+1 incidents per route.
+    """
+
+    def __init__(self, app, slow_query_threshold: Optional[float] = None,
+                 n_plus_one_threshold: Optional[int] = None, profiler: Optional[QueryProfiler] = None):
+        self.app = app
+        self.profiler = profiler or query_monitor
+        if slow_query_threshold is not None:
+            self.profiler.slow_query_threshold = slow_query_threshold
+        if n_plus_one_threshold is not None:
+            self.profiler.n_plus_one_threshold = n_plus_one_threshold
+        self.profiler.install()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = QueryProfile()
+        token = _current_profile.set(profile)
+        threshold = self.profiler.n_plus_one_threshold
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start" and profile.count:
+                n_plus_one = len(profile.repeated(threshold))
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", profile.server_timing(n_plus_one).encode("latin-1")))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_profile.reset(token)
+            route = scope.get("route")
+            label = f"{scope.get('method', '')} {getattr(route, 'path', None) or scope.get('path', '')}"
+            self.profiler.finish(profile, label)
+
 
 # Global instance for easy access
-query_monitor = QueryMonitoringMiddleware(None) 
\ No newline at end of file
+query_monitor = QueryProfiler()
@@ -3,7 +3,7 @@
 🧭 LOCATION: /CORA/middleware/rate_limiting.py
 🎯 PURPOSE: Rate limiting middleware to prevent abuse and brute force attacks
 🔗 IMPORTS: FastAPI, time, collections
-📤 EXPORTS: setup_rate_limiting, RateLimiter
+📤 EXPORTS: setup_rate_limiting, register_rate_limit_routes, RateLimitHook, RateLimiter
 """
 
 from fastapi import Request, HTTPException, Response
@@ -13,6 +13,7 @@ from collections import defaultdict, deque
 from typing import Dict, Deque, Tuple
 import os
 from utils.redis_manager import redis_manager
+from core.pipeline import PipelineHook, RequestContext, RequestPipeline
 
 class RateLimiter:
     """Rate limiter implementation using Redis for persistence"""
@@ -131,17 +132,61 @@ def get_rate_limit_key(request: Request) -> Tuple[str, str]:
     
     return key, rate_limit_type
 
+RATE_LIMIT_EXEMPT = {"/health", "/api/health", "/ping", "/metrics", "/smoke"}
+
+
+def _is_exempt(path: str) -> bool:
+    """Static files and core health/ops endpoints are never limited"""
+    return path.startswith("/static/") or path in RATE_LIMIT_EXEMPT or path.startswith("/health/")
+
+
+def _limit_exceeded_response(rate_limiter: RateLimiter, key: str) -> JSONResponse:
+    reset_time = rate_limiter.get_reset_time(key)
+    remaining_time = reset_time - time.time()
+    return JSONResponse(
+        status_code=429,
+        content={
+            "error": "Rate limit exceeded",
+            "message": f"Too many requests. Try again in {int(remaining_time)} seconds.",
+            "retry_after": int(remaining_time)
+        },
+        headers={
+            "Retry-After": str(int(remaining_time)),
+            "X-RateLimit-Limit": str(rate_limiter.max_requests),
+            "X-RateLimit-Remaining": "0",
+            "X-RateLimit-Reset": str(int(reset_time))
+        }
+    )
+
+
+class RateLimitHook(PipelineHook):
+    """Rate limiting as a request pipeline hook"""
+
+    def on_request(self, ctx: RequestContext):
+        if _is_exempt(ctx.path):
+            return None
+        key, rate_limit_type = get_rate_limit_key(Request(ctx.scope))
+        rate_limiter = RATE_LIMITS.get(rate_limit_type, RATE_LIMITS["default"])
+        if not rate_limiter.is_allowed(key):
+            ctx.state["rate_limited"] = True
+            return _limit_exceeded_response(rate_limiter, key)
+        ctx.state["rate_limit"] = (rate_limiter, key)
+        return None
+
+    def on_response(self, ctx: RequestContext, headers) -> None:
+        limit = ctx.state.get("rate_limit")
+        if limit is None:
+            return
+        rate_limiter, key = limit
+        headers["X-RateLimit-Limit"] = str(rate_limiter.max_requests)
+        headers["X-RateLimit-Remaining"] = str(rate_limiter.get_remaining(key))
+        headers["X-RateLimit-Reset"] = str(int(rate_limiter.get_reset_time(key)))
+
+
 async def rate_limiting_middleware(request: Request, call_next):
-    """Rate limiting middleware"""
-    
-    # Skip rate limiting for static files and core health/ops endpoints
-    if (
-        request.url.path.startswith("/static/")
-        or request.url.path in {"/health", "/api/health", "/ping", "/metrics", "/smoke"}
-        or request.url.path.startswith("/health/")
-    ):
-        response = await call_next(request)
-        return response
+    """Rate limiting middleware (function form; the app uses RateLimitHook)"""
+    if _is_exempt(request.url.path):
+        return await call_next(request)
     
     # Get rate limit key and type
     key, rate_limit_type = get_rate_limit_key(request)
@@ -149,22 +194,7 @@ async def rate_limiting_middleware(request: Request, call_next):
     
     # Check if request is allowed
     if not rate_limiter.is_allowed(key):
-        remaining_time = rate_limiter.get_reset_time(key) - time.time()
-        
-        return JSONResponse(
-            status_code=429,
-            content={
-                "error": "Rate limit exceeded",
-                "message": f"Too many requests. Try again in {int(remaining_time)} seconds.",
-                "retry_after": int(remaining_time)
-            },
-            headers={
-                "Retry-After": str(int(remaining_time)),
-                "X-RateLimit-Limit": str(rate_limiter.max_requests),
-                "X-RateLimit-Remaining": "0",
-                "X-RateLimit-Reset": str(int(rate_limiter.get_reset_time(key)))
-            }
-        )
+        return _limit_exceeded_response(rate_limiter, key)
     
     # Add rate limit headers to response
     response = await call_next(request)
@@ -178,9 +208,8 @@ async def rate_limiting_middleware(request: Request, call_next):
     
     return response
 
-def setup_rate_limiting(app):
-    """Setup rate limiting for the FastAPI app"""
-    app.middleware("http")(rate_limiting_middleware)
+def register_rate_limit_routes(app):
+    """Status endpoint; the limiting itself runs as RateLimitHook in the request pipeline"""
     
     @app.get("/api/rate-limit/status")
     async def get_rate_limit_status(request: Request):
@@ -196,6 +225,11 @@ def setup_rate_limiting(app):
             "reset_time": int(rate_limiter.get_reset_time(key))
         }
 
+def setup_rate_limiting(app):
+    """Setup rate limiting for the FastAPI app as a standalone middleware"""
+    app.add_middleware(RequestPipeline, hooks=[RateLimitHook()])
+    register_rate_limit_routes(app)
+
 # Cleanup function to prevent memory leaks
 def cleanup_old_requests():
     """Clean up old rate limit data"""
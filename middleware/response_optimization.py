@@ -15,6 +15,7 @@ from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.types import ASGIApp
 
 from utils.api_response_optimizer import response_optimizer, performance_monitor
+from middleware.monitoring import route_template
 
 logger = logging.getLogger(__name__)
 
@@ -65,7 +66,7 @@ class ResponseOptimizationMiddleware(BaseHTTPMiddleware):
         if self.enable_monitoring:
             try:
                 performance_monitor.record_response_time(
-                    endpoint=request.url.path,
+                    endpoint=route_template(request.scope),
                     response_time=response_time,
                     status_code=response.status_code,
                     user_id=user_id
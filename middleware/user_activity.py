@@ -1,14 +1,18 @@
 #!/usr/bin/env python3
 """
 🧭 LOCATION: /CORA/middleware/user_activity.py
-🎯 PURPOSE: Middleware to log user actions for analytics
+🎯 PURPOSE: Request pipeline hook to log user actions for analytics
 """
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from sqlalchemy.orm import Session
-from models import UserActivity, get_db
-from dependencies.auth import get_current_user
 import asyncio
+import logging
+from http.cookies import SimpleCookie
+from typing import Optional
+
+from starlette.requests import cookie_parser
+
+from core.pipeline import PipelineHook, RequestContext, RequestPipeline
+
+logger = logging.getLogger(__name__)
 
 TRACKED_PATHS = [
     ("POST", "/api/auth/login", "login"),
@@ -19,44 +23,103 @@ TRACKED_PATHS = [
     ("POST", "/api/onboarding/feedback", "submit_feedback"),
 ]
 
-class UserActivityMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        response = await call_next(request)
-        path = request.url.path
-        method = request.method
-        matched = None
-        for m, p, action in TRACKED_PATHS:
-            if method == m and path.startswith(p):
-                matched = action
-                break
-        if matched:
-            try:
-                # Try to get user from request.state or JWT
-                user_email = None
-                try:
-                    user = await get_current_user(request)
-                    user_email = user.email
-                except Exception:
-                    # Fallback: try to parse from form or JSON
-                    if "username" in await request.form():
-                        user_email = (await request.form())["username"]
-                if user_email:
-                    # Use DB session
-                    db_gen = get_db()
-                    db = next(db_gen)
-                    activity = UserActivity(
-                        user_email=user_email,
-                        action=matched,
-                        details=path
-                    )
-                    db.add(activity)
-                    db.commit()
-                    db.close()
-            except Exception as e:
-                # Don't block request on logging failure
-                pass
-        return response
+
+def _match(method: str, path: str) -> Optional[str]:
+    for m, p, action in TRACKED_PATHS:
+        if method == m and path.startswith(p):
+            return action
+    return None
+
+
+def _email_from_token(token: Optional[str]) -> Optional[str]:
+    if not token:
+        return None
+    try:
+        from dependencies.auth import decode_token
+        return decode_token(token)["email"]
+    except Exception:
+        return None
+
+
+def _insert_activity(db, user_email: str, action: str, path: str, ip_address: str,
+                     user_agent: str, response_time: float, success: bool) -> None:
+    from models import User, UserActivity
+
+    user_id = db.query(User.id).filter(User.email == user_email).scalar()
+    if user_id is None:
+        return
+    db.add(UserActivity(
+        user_id=user_id,
+        action=action,
+        category="feature_usage",
+        details=path,
+        page_url=path,
+        ip_address=ip_address,
+        user_agent=user_agent[:500],
+        response_time=response_time,
+        success=success,
+    ))
+
+
+def record_activity(user_email: str, action: str, path: str, ip_address: str,
+                    user_agent: str, response_time: float, success: bool) -> None:
+    """Queue one UserActivity row (group-committed by the SQLite writer; runs in the threadpool)"""
+    from utils.write_queue import write_queue
+
+    try:
+        write_queue.enqueue(_insert_activity, user_email, action, path, ip_address,
+                            user_agent, response_time, success)
+    except Exception as e:
+        # Don't block request on logging failure
+        logger.debug(f"User activity not recorded: {e}")
+
+
+class UserActivityHook(PipelineHook):
+    """Record tracked actions once the response is sent.
+
+    The user comes from the bearer token / access_token cookie on the request,
+    or for login the access_token cookie set on the response.
+    """
+
+    def on_request(self, ctx: RequestContext):
+        action = _match(ctx.method, ctx.path)
+        if action is None:
+            return None
+        ctx.state["activity"] = action
+        auth = ctx.headers.get("authorization", "")
+        if auth.lower().startswith("bearer "):
+            ctx.state["activity_token"] = auth.split(" ", 1)[1].strip()
+        else:
+            ctx.state["activity_token"] = cookie_parser(ctx.headers.get("cookie", "")).get("access_token")
+        return None
+
+    def on_response(self, ctx: RequestContext, headers) -> None:
+        if "activity" not in ctx.state or ctx.state.get("activity_token"):
+            return
+        for raw in headers.getlist("set-cookie"):
+            cookie = SimpleCookie()
+            cookie.load(raw)
+            if "access_token" in cookie:
+                ctx.state["activity_token"] = cookie["access_token"].value
+
+    def on_complete(self, ctx: RequestContext) -> None:
+        action = ctx.state.get("activity")
+        if action is None:
+            return
+        user_email = _email_from_token(ctx.state.get("activity_token"))
+        if not user_email:
+            return
+        asyncio.get_running_loop().run_in_executor(
+            None, record_activity, user_email, action, ctx.path, ctx.client_ip(),
+            ctx.headers.get("user-agent", ""), ctx.elapsed, ctx.status < 400
+        )
+
+
+class UserActivityMiddleware(RequestPipeline):
+    def __init__(self, app):
+        super().__init__(app, [UserActivityHook()])
+
 
 def setup_user_activity(app):
     app.add_middleware(UserActivityMiddleware)
-    return app 
\ No newline at end of file
+    return app
@@ -3,7 +3,7 @@ Database models package
 Safe restoration - imports all models for easy access
 """
 
-from .base import Base, engine, SessionLocal, get_db
+from .base import Base, engine, SessionLocal, get_db, session_scope, with_session
 from .user import User
 from .expense import Expense
 from .expense_category import ExpenseCategory
@@ -14,7 +14,7 @@ from .business_profile import BusinessProfile
 from .user_preference import UserPreference
 from .password_reset_token import PasswordResetToken
 from .email_verification_token import EmailVerificationToken
-from .plaid_integration import PlaidIntegration, PlaidAccount, PlaidTransaction, PlaidSyncHistory
+from .plaid_integration import PlaidIntegration, PlaidAccount, PlaidTransaction, PlaidSyncHistory, PlaidSyncCursor
 from .quickbooks_integration import QuickBooksIntegration
 from .stripe_integration import StripeIntegration
 from .feedback import Feedback
@@ -25,14 +25,19 @@ from .job_alert import JobAlert
 from .analytics import AnalyticsLog
 from .prediction_feedback import PredictionFeedback
 from .intelligence_state import IntelligenceSignal, EmotionalProfile
+from .task_run import TaskRun
+from .weekly_insights_delivery import WeeklyInsightsDelivery
+from .email_outbox import EmailOutboxMessage
+from .category_model import CategoryFeatureCount
 
 __all__ = [
-    'Base', 'engine', 'SessionLocal', 'get_db',
+    'Base', 'engine', 'SessionLocal', 'get_db', 'session_scope', 'with_session',
     'User', 'Expense', 'ExpenseCategory', 
     'Customer', 'Subscription', 'Payment',
     'BusinessProfile', 'UserPreference', 'PasswordResetToken', 'EmailVerificationToken',
-    'PlaidIntegration', 'PlaidAccount', 'PlaidTransaction', 'PlaidSyncHistory',
+    'PlaidIntegration', 'PlaidAccount', 'PlaidTransaction', 'PlaidSyncHistory', 'PlaidSyncCursor',
     'QuickBooksIntegration', 'StripeIntegration', 'Feedback', 'UserActivity',
     'Job', 'JobNote', 'ContractorWaitlist', 'JobAlert', 'AnalyticsLog', 'PredictionFeedback',
-    'IntelligenceSignal', 'EmotionalProfile'
+    'IntelligenceSignal', 'EmotionalProfile', 'TaskRun', 'WeeklyInsightsDelivery',
+    'EmailOutboxMessage', 'CategoryFeatureCount'
 ] 
\ No newline at end of file
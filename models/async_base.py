@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/models/async_base.py
+🎯 PURPOSE: Async engine and AsyncSession for the hot read endpoints (aiosqlite / asyncpg)
+🔗 IMPORTS: SQLAlchemy asyncio, models.base, utils.db_pool
+📤 EXPORTS: async_database_url, get_async_engine, AsyncSessionLocal, get_async_db, dispose_async_engine
+🔄 PATTERN: same database as models.base.engine, own pool → awaited queries never block the event loop
+
+The sync engine stays the default. Endpoints that are hit constantly and only
+read (expense list, dashboard summary, jobs) take `Depends(get_async_db)`
+instead, so a slow query suspends that request rather than freezing every
+other request on the worker. Writes keep going through the sync session or
+the SQLite write queue. The engine is created on first use so workers that
+never serve these endpoints do not import the async driver.
+"""
+
+import threading
+from typing import AsyncGenerator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from config import config
+from models.base import DATABASE_URL, pool_settings, sqlite_pragmas
+from utils.db_pool import MonitoredQueuePool, pool_monitor
+
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+# Bound to the engine on first use; expire_on_commit=False so loaded rows stay readable
+AsyncSessionLocal = async_sessionmaker(class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+_engine: Optional[AsyncEngine] = None
+_engine_lock = threading.Lock()
+
+
+def async_database_url(url: str) -> str:
+    """The async-driver form of a sync database URL"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend} databases")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+def _set_sqlite_pragma(dbapi_connection, connection_record):
+    """Same PRAGMA profile as the sync engine (runs through the aiosqlite adapter)"""
+    cursor = dbapi_connection.cursor()
+    for name, value in sqlite_pragmas().items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+
+def build_async_engine(url: str = DATABASE_URL, **overrides) -> AsyncEngine:
+    """Async engine with the sync engine's pool sizing, pragmas and pool monitoring"""
+    settings = pool_settings(url)
+    if settings.get("poolclass") is MonitoredQueuePool:
+        del settings["poolclass"]  # async engines use AsyncAdaptedQueuePool
+    settings["pool_logging_name"] = "async"
+    settings.update(overrides)
+    engine = create_async_engine(config.ASYNC_DATABASE_URL or async_database_url(url), **settings)
+    if engine.dialect.name == "sqlite":
+        event.listen(engine.sync_engine, "connect", _set_sqlite_pragma)
+    pool_monitor.install(engine.sync_engine, "async")
+    return engine
+
+
+def get_async_engine() -> AsyncEngine:
+    """The process-wide async engine, created on first use"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = build_async_engine(DATABASE_URL)
+                AsyncSessionLocal.configure(bind=_engine)
+                if config.QUERY_PROFILER_ENABLED:
+                    from middleware.query_monitoring import query_monitor
+                    query_monitor.install(_engine.sync_engine)
+    return _engine
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """Dependency to get an async database session"""
+    get_async_engine()
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def dispose_async_engine() -> None:
+    """Close pooled async connections (app shutdown)"""
+    global _engine
+    if _engine is not None:
+        await _engine.dispose()
+        _engine = None
@@ -1,14 +1,28 @@
 #!/usr/bin/env python3
 """
 🧭 LOCATION: /CORA/models/base.py
-🎯 PURPOSE: Database configuration and base model
-🔗 IMPORTS: SQLAlchemy
-📤 EXPORTS: Base, engine, SessionLocal
+🎯 PURPOSE: The one database engine per process, its session factory and the base model
+🔗 IMPORTS: SQLAlchemy, utils.db_pool
+📤 EXPORTS: Base, engine, SessionLocal, get_db, session_scope, with_session, build_engine, pool_settings,
+            sqlite_pragmas
+🔄 PATTERN: one engine per process → session per request (get_db) or per unit of work (session_scope)
+
+Everything that talks to the application database goes through `engine`:
+request handlers via the get_db dependency, background jobs via
+session_scope()/@with_session, and raw SQL via engine.connect(). Nothing
+should call create_engine() or sqlite3.connect() for the app database.
 """
 
-from sqlalchemy import create_engine
+import functools
+import inspect
+from contextlib import contextmanager
+from typing import Any, Callable, Dict
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 import os
 from dotenv import load_dotenv
 
@@ -18,50 +32,82 @@ if os.getenv("CORA_SKIP_DOTENV") != "1":
 
 # Import centralized config
 from config import config
+from utils.db_pool import MonitoredQueuePool, pool_monitor
 
 # Database URL from centralized config
 DATABASE_URL = config.DATABASE_URL
 
-# Create engine with PostgreSQL-specific configuration
-if "postgresql" in DATABASE_URL:
-    engine = create_engine(
-        DATABASE_URL,
-        pool_size=20,
-        max_overflow=30,
-        pool_timeout=30,
-        pool_recycle=3600,
-        pool_pre_ping=True
-    )
-else:
-    # SQLite configuration with connection pooling for concurrent users
-    from sqlalchemy import event
-    import sqlite3
-    
-    engine = create_engine(
-        DATABASE_URL,
-        connect_args={
+# Pool defaults per dialect. SQLite has a single writer: in WAL mode readers
+# run alongside it, but extra connections beyond a handful only queue on the
+# write lock, so SQLite gets a small pool and no overflow.
+POOL_DEFAULTS = {
+    "postgresql": {"pool_size": 20, "max_overflow": 30},
+    "sqlite": {"pool_size": 5, "max_overflow": 0},
+}
+
+
+def pool_settings(url: str) -> Dict[str, Any]:
+    """create_engine() keyword arguments for `url` (pool sizing and driver options)"""
+    parsed = make_url(url)
+    dialect = parsed.get_backend_name()
+    if dialect == "sqlite" and parsed.database in (None, "", ":memory:"):
+        # In-memory databases exist per connection: share the one connection
+        return {"poolclass": StaticPool, "connect_args": {"check_same_thread": False}}
+
+    defaults = POOL_DEFAULTS.get(dialect, POOL_DEFAULTS["postgresql"])
+    settings = {
+        "poolclass": MonitoredQueuePool,
+        "pool_size": config.DB_POOL_SIZE if config.DB_POOL_SIZE is not None else defaults["pool_size"],
+        "max_overflow": config.DB_MAX_OVERFLOW if config.DB_MAX_OVERFLOW is not None else defaults["max_overflow"],
+        "pool_timeout": config.DB_POOL_TIMEOUT,
+        "pool_recycle": 3600,
+        "pool_pre_ping": True,
+    }
+    if dialect == "sqlite":
+        settings["connect_args"] = {
             "check_same_thread": False,
-            "timeout": 30,  # 30 second timeout for lock contention
-        },
-        pool_size=10,           # Max concurrent connections
-        max_overflow=20,        # Additional connections during peak
-        pool_timeout=30,        # Wait time for connection
-        pool_recycle=3600,      # Recycle connections every hour
-        pool_pre_ping=True      # Verify connection before use
-    )
-    
-    # Enable WAL mode for better concurrent access
-    @event.listens_for(engine, "connect")
-    def set_sqlite_pragma(dbapi_connection, connection_record):
-        if isinstance(dbapi_connection, sqlite3.Connection):
-            cursor = dbapi_connection.cursor()
-            # Enable WAL mode for better concurrent access
-            cursor.execute("PRAGMA journal_mode=WAL")
-            # Optimize for performance
-            cursor.execute("PRAGMA synchronous=NORMAL")
-            cursor.execute("PRAGMA cache_size=1000")
-            cursor.execute("PRAGMA temp_store=MEMORY")
-            cursor.close()
+            "timeout": config.SQLITE_BUSY_TIMEOUT_MS / 1000,  # busy timeout for lock contention
+        }
+    return settings
+
+
+def sqlite_pragmas() -> Dict[str, Any]:
+    """Per-connection PRAGMA profile for SQLite"""
+    return {
+        "journal_mode": "WAL",  # readers never block the writer
+        "synchronous": "NORMAL",  # safe with WAL; fsync at checkpoint only
+        "busy_timeout": config.SQLITE_BUSY_TIMEOUT_MS,
+        "cache_size": -config.SQLITE_CACHE_SIZE_KB,  # negative = KiB, not pages
+        "mmap_size": config.SQLITE_MMAP_SIZE_MB * 1024 * 1024,
+        "temp_store": "MEMORY",
+    }
+
+
+def _set_sqlite_pragma(dbapi_connection, connection_record):
+    """Apply the PRAGMA profile to each new SQLite connection"""
+    import sqlite3
+
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        for name, value in sqlite_pragmas().items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def build_engine(url: str = DATABASE_URL, name: str = "primary", **overrides):
+    """Engine with the app's pool settings, SQLite pragmas and pool monitoring (metrics labelled `name`)"""
+    settings = pool_settings(url)
+    settings["pool_logging_name"] = name
+    settings.update(overrides)
+    new_engine = create_engine(url, **settings)
+    if new_engine.dialect.name == "sqlite":
+        event.listen(new_engine, "connect", _set_sqlite_pragma)
+    pool_monitor.install(new_engine, name)
+    return new_engine
+
+
+# The process-wide engine
+engine = build_engine(DATABASE_URL)
 
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -75,4 +121,32 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+@contextmanager
+def session_scope():
+    """Session per unit of work for background jobs: commit on success, rollback on error"""
+    db = SessionLocal()
+    try:
+        yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+def with_session(func: Callable) -> Callable:
+    """Run `func(db, *args, **kwargs)` in its own session_scope() (sync or async jobs)"""
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            with session_scope() as db:
+                return await func(db, *args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with session_scope() as db:
+            return func(db, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/models/category_model.py
+🎯 PURPOSE: Persisted per-user categorization counts, kept in step with every expense write
+🔗 IMPORTS: SQLAlchemy, base model, Expense
+📤 EXPORTS: CategoryFeatureCount, expense_features, amount_bucket, on_category_deltas, ensure_table
+🔄 PATTERN: expense insert/update/delete → flush hook → counts upserted in the same transaction → listeners after commit
+
+Each row counts how often one feature of a user's expenses (a description
+token, the vendor, or the amount bucket) went with one category. The flush
+hook below turns every categorized expense that is inserted, recategorized,
+edited or deleted into +/- deltas on those rows, so the counts never need a
+full rescan. Once the transaction commits, registered listeners (the
+in-memory model cache in services.category_model) receive the same deltas.
+"""
+
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+from weakref import WeakSet
+
+from sqlalchemy import Column, ForeignKey, Integer, String, event, inspect
+from sqlalchemy.orm import Session
+
+from .base import Base
+from .expense import Expense
+
+FEATURE_MAX_LENGTH = 200
+TRACKED_FIELDS = ("description", "vendor", "amount_cents", "category_id")
+
+# {(user_id, category_id): Counter({(kind, feature): delta})}
+Deltas = Dict[Tuple[int, int], Counter]
+
+
+class CategoryFeatureCount(Base):
+    """How often one expense feature went with one category, per user"""
+    __tablename__ = "category_feature_counts"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    kind = Column(String(10), primary_key=True)  # token, vendor, amount
+    feature = Column(String(FEATURE_MAX_LENGTH), primary_key=True)
+    category_id = Column(Integer, ForeignKey("expense_categories.id"), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<CategoryFeatureCount {self.user_id}:{self.kind}:{self.feature} → {self.category_id} x{self.count}>"
+
+
+def amount_bucket(amount_cents: Optional[int]) -> str:
+    """Amount range used as a categorization feature"""
+    dollars = (amount_cents or 0) / 100
+    if dollars < 50:
+        return "small"
+    elif dollars < 200:
+        return "medium"
+    elif dollars < 1000:
+        return "large"
+    return "very_large"
+
+
+def expense_features(description: Optional[str], vendor: Optional[str], amount_cents: Optional[int]) -> Counter:
+    """Counter of (kind, feature) for one expense: description words (3+ chars), vendor, amount bucket"""
+    features = Counter(("token", word[:FEATURE_MAX_LENGTH])
+                       for word in (description or "").lower().split() if len(word) > 2)
+    if vendor:
+        features[("vendor", vendor.lower()[:FEATURE_MAX_LENGTH])] += 1
+    features[("amount", amount_bucket(amount_cents))] += 1
+    return features
+
+
+# ------------------------------------------------------------------ flush hook
+_listeners: List[Callable[[Deltas], None]] = []
+_ready_engines: "WeakSet" = WeakSet()
+
+
+def on_category_deltas(listener: Callable[[Deltas], None]) -> None:
+    """Call `listener(deltas)` after every commit that changed categorization counts"""
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def _add(deltas: Deltas, user_id, category_id, fields: Tuple, sign: int) -> None:
+    if user_id is None or category_id is None:
+        return
+    bucket = deltas.setdefault((user_id, category_id), Counter())
+    for feature, n in expense_features(*fields).items():
+        bucket[feature] += sign * n
+
+
+def _previous(expense: Expense) -> Optional[Tuple]:
+    """(description, vendor, amount_cents, category_id) before this flush, or None if unchanged"""
+    state = inspect(expense)
+    values, changed = [], False
+    for field in TRACKED_FIELDS:
+        history = state.attrs[field].history
+        if history.deleted:
+            changed = True
+            values.append(history.deleted[0])
+        elif history.added:
+            changed = True
+            values.append(None)  # was unset
+        else:
+            values.append(getattr(expense, field))
+    return tuple(values) if changed else None
+
+
+@event.listens_for(Session, "before_flush")
+def _ensure_counts_table(session, flush_context, instances):
+    # On the session's own connection: a second connection would wait on the SQLite write lock we may hold
+    if any(isinstance(obj, Expense) for obj in (*session.new, *session.deleted, *session.dirty)):
+        ensure_table(session.connection(), session)
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_deletes(session, flush_context, instances):
+    # Deleted rows are read before the flush removes them
+    for obj in session.deleted:
+        if isinstance(obj, Expense):
+            _add(session.info.setdefault("category_deltas", {}), obj.user_id, obj.category_id,
+                 (obj.description, obj.vendor, obj.amount_cents), -1)
+
+
+@event.listens_for(Session, "after_flush")
+def _apply_deltas(session, flush_context):
+    deltas: Deltas = session.info.pop("category_deltas", {})
+    for obj in session.new:
+        if isinstance(obj, Expense):
+            _add(deltas, obj.user_id, obj.category_id, (obj.description, obj.vendor, obj.amount_cents), 1)
+    for obj in session.dirty:
+        if not isinstance(obj, Expense):
+            continue
+        previous = _previous(obj)
+        if previous is None:
+            continue
+        _add(deltas, obj.user_id, previous[3], previous[:3], -1)
+        _add(deltas, obj.user_id, obj.category_id, (obj.description, obj.vendor, obj.amount_cents), 1)
+
+    rows = [{"user_id": user_id, "kind": kind, "feature": feature, "category_id": category_id, "count": n}
+            for (user_id, category_id), features in deltas.items()
+            for (kind, feature), n in features.items() if n]
+    if not rows:
+        return
+    _upsert(session.connection(), rows)
+    session.info.setdefault("category_committed", []).append(deltas)
+
+
+def ensure_table(bind, session: Optional[Session] = None) -> None:
+    """Create category_feature_counts if it is missing
+
+    Pass the engine at startup, or a session's connection (and the session)
+    to create it lazily inside that session's transaction. DDL there rolls
+    back with the request, so the engine is only marked ready once the
+    session commits; until then each call checks again.
+    """
+    engine = getattr(bind, "engine", bind)
+    if engine in _ready_engines:
+        return
+    CategoryFeatureCount.__table__.create(bind=bind, checkfirst=True)
+    if bind is engine:
+        _ready_engines.add(engine)
+    elif session is not None:
+        session.info["category_table_engine"] = engine
+
+
+def _upsert(connection, rows: List[Dict]) -> None:
+    """count += delta for each row, inserting missing rows (same transaction as the expense write)"""
+    table = CategoryFeatureCount.__table__
+    if connection.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    stmt = insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.kind, table.c.feature, table.c.category_id],
+        set_={"count": table.c.count + stmt.excluded.count},
+    )
+    connection.execute(stmt, rows)
+
+
+@event.listens_for(Session, "after_commit")
+def _notify(session):
+    engine = session.info.pop("category_table_engine", None)
+    if engine is not None:
+        _ready_engines.add(engine)
+    for deltas in session.info.pop("category_committed", []):
+        for listener in _listeners:
+            listener(deltas)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard(session):
+    session.info.pop("category_deltas", None)
+    session.info.pop("category_committed", None)
+    session.info.pop("category_table_engine", None)
+
+
+def _keep_old_value(target, value, oldvalue, initiator):
+    pass
+
+
+# active_history loads the old value when one of these is assigned on an expired
+# instance, so the flush hook can subtract what the expense used to count towards
+for _field in TRACKED_FIELDS:
+    event.listen(getattr(Expense, _field), "set", _keep_old_value, active_history=True)
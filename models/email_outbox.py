@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/models/email_outbox.py
+🎯 PURPOSE: Durable queue of outgoing emails with retry state and dedup keys
+🔗 IMPORTS: SQLAlchemy base and types
+📤 EXPORTS: EmailOutboxMessage model
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime, Text, Index
+from datetime import datetime
+
+from .base import Base
+
+class EmailOutboxMessage(Base):
+    """One outgoing email; delivered and retried by services.email_outbox"""
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        Index("idx_email_outbox_due", "status", "next_attempt_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    dedup_key = Column(String(200), unique=True, nullable=True)  # same key is only ever sent once
+    to_email = Column(String(255), nullable=False)
+    from_name = Column(String(100), nullable=True)
+    subject = Column(String(500), nullable=False)
+    body = Column(Text, nullable=True)
+    html_body = Column(Text, nullable=True)
+    attachment_path = Column(String(500), nullable=True)
+    status = Column(String(20), nullable=False, default="pending")  # pending, sending, sent, dead
+    attempts = Column(Integer, default=0)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow)
+    claimed_at = Column(DateTime, nullable=True)
+    last_status = Column(Integer, nullable=True)  # provider HTTP status of the last attempt
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<EmailOutboxMessage {self.id}: {self.to_email} - {self.status}>"
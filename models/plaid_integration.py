@@ -3,7 +3,7 @@
 🧭 LOCATION: /CORA/models/plaid_integration.py
 🎯 PURPOSE: Plaid integration model for bank account connections and transaction sync
 🔗 IMPORTS: SQLAlchemy, datetime
-📤 EXPORTS: PlaidIntegration, PlaidAccount, PlaidTransaction classes
+📤 EXPORTS: PlaidIntegration, PlaidAccount, PlaidTransaction, PlaidSyncHistory, PlaidSyncCursor classes
 """
 
 from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Float, ForeignKey, JSON
@@ -204,4 +204,20 @@ class PlaidSyncHistory(Base):
     # Relationships
     integration = relationship("PlaidIntegration")
     account = relationship("PlaidAccount")
-    expense = relationship("Expense", back_populates="plaid_sync_history") 
\ No newline at end of file
+    expense = relationship("Expense", back_populates="plaid_sync_history") 
+
+class PlaidSyncCursor(Base):
+    """Per-item position in Plaid's /transactions/sync change feed"""
+    
+    __tablename__ = "plaid_sync_cursors"
+    
+    # Plaid sync cursors are scoped to an item (one connected institution login), i.e. one integration
+    integration_id = Column(Integer, ForeignKey("plaid_integrations.id"), primary_key=True)
+    
+    # Cursor returned by the last page of the last complete run; the next run starts here
+    cursor = Column(Text, nullable=True)
+    # Run in progress: next_cursor of the last committed page, to resume after an interruption
+    pending_cursor = Column(Text, nullable=True)
+    
+    last_completed_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
@@ -3,10 +3,10 @@
 🧭 LOCATION: /CORA/models/quickbooks_integration.py
 🎯 PURPOSE: QuickBooks integration model for OAuth tokens and sync settings
 🔗 IMPORTS: SQLAlchemy Base, Column types
-📤 EXPORTS: QuickBooksIntegration model
+📤 EXPORTS: QuickBooksIntegration, QuickBooksSyncHistory, QuickBooksVendor, QuickBooksAccount, QuickBooksExpenseSync models
 """
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, UniqueConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime, timedelta
 from models.base import Base
@@ -155,4 +155,27 @@ class QuickBooksAccount(Base):
     integration = relationship("QuickBooksIntegration")
     
     def __repr__(self):
-        return f"<QuickBooksAccount(quickbooks_id={self.quickbooks_id}, account_name={self.account_name})>" 
\ No newline at end of file
+        return f"<QuickBooksAccount(quickbooks_id={self.quickbooks_id}, account_name={self.account_name})>" 
+
+class QuickBooksExpenseSync(Base):
+    """Per-expense QuickBooks sync state, so only new or changed expenses are pushed"""
+    
+    __tablename__ = "quickbooks_expense_sync"
+    __table_args__ = (UniqueConstraint("integration_id", "expense_id", name="uq_quickbooks_expense_sync"),)
+    
+    id = Column(Integer, primary_key=True)
+    integration_id = Column(Integer, ForeignKey("quickbooks_integrations.id"), nullable=False)
+    expense_id = Column(Integer, ForeignKey("expenses.id", ondelete="CASCADE"), nullable=False, index=True)
+    
+    # QuickBooks purchase this expense became
+    quickbooks_id = Column(String(50))
+    sync_token = Column(String(20))  # QuickBooks optimistic-lock token, needed for updates
+    
+    # Hash of the pushed fields; a mismatch means the expense changed since
+    fingerprint = Column(String(40))
+    status = Column(String(20), nullable=False, default="pending")  # success, error
+    error_message = Column(Text)
+    synced_at = Column(DateTime)
+    
+    def __repr__(self):
+        return f"<QuickBooksExpenseSync(expense_id={self.expense_id}, quickbooks_id={self.quickbooks_id}, status={self.status})>"
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/models/replica.py
+🎯 PURPOSE: Route read-only analytics sessions to a replica engine, falling back to the primary when it lags
+🔗 IMPORTS: SQLAlchemy, prometheus_client, models.base
+📤 EXPORTS: ReplicaRouter, replica_router, analytics_scope, get_analytics_db
+🔄 PATTERN: analytics session → lag checked every REPLICA_CHECK_SECONDS → replica if fresh, else primary
+
+Full-history reports (vendor performance, cost forecasts, dashboard CSV
+export) take `Depends(get_analytics_db)` or `analytics_scope()` instead of
+the primary session, so they scale out on DATABASE_REPLICA_URL and stop
+competing with expense entry for primary connections. Before handing out a
+replica session the router makes sure the replica answered its lag probe
+within REPLICA_CHECK_SECONDS and was no more than REPLICA_MAX_LAG_SECONDS
+behind; otherwise the session comes from the primary. PostgreSQL standbys
+report replay lag; other backends (a local SQLite copy standing in for a
+replica) only need to be reachable. Writes never go to the replica.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Generator, Optional
+
+from prometheus_client import Counter, Gauge
+from sqlalchemy import text
+from sqlalchemy.orm import Session, sessionmaker
+
+from config import config
+from models.base import SessionLocal, build_engine
+
+logger = logging.getLogger(__name__)
+
+REPLICA_LAG = Gauge("db_replica_lag_seconds", "Replay lag at the last replica check (-1 = unreachable)",
+                    multiprocess_mode="max")
+ANALYTICS_SESSIONS = Counter("db_analytics_sessions_total", "Analytics sessions by the engine serving them",
+                             ["target"])
+
+# Seconds behind the primary; 0 on an idle standby that has replayed everything it received
+_POSTGRES_LAG = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+def _postgres_lag(conn) -> float:
+    return float(conn.execute(_POSTGRES_LAG).scalar())
+
+
+REPLICA_LAG_PROBES: Dict[str, Callable] = {
+    "postgresql": _postgres_lag,
+}
+
+
+class ReplicaRouter:
+    """Hands out replica sessions for analytics while the replica is reachable and fresh"""
+
+    def __init__(self, url: Optional[str] = None, max_lag_seconds: Optional[float] = None,
+                 check_seconds: Optional[float] = None, lag_probe: Optional[Callable] = None,
+                 primary_sessions: Optional[Callable] = None):
+        self.url = url if url is not None else config.DATABASE_REPLICA_URL
+        self.max_lag_seconds = (max_lag_seconds if max_lag_seconds is not None
+                                else config.REPLICA_MAX_LAG_SECONDS)
+        self.check_seconds = check_seconds if check_seconds is not None else config.REPLICA_CHECK_SECONDS
+        self._lag_probe = lag_probe
+        self._primary_sessions = primary_sessions
+        self._replica_sessions: Optional[sessionmaker] = None
+        self._lock = threading.Lock()
+        self._checked_at: Optional[float] = None
+        self._healthy = False
+        self.lag_seconds: Optional[float] = None
+        self.stats = {"replica_sessions": 0, "primary_fallbacks": 0, "checks": 0, "check_errors": 0}
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.url)
+
+    def _replica(self) -> sessionmaker:
+        """Replica session factory; the engine is built on first use"""
+        if self._replica_sessions is None:
+            self._replica_sessions = sessionmaker(autocommit=False, autoflush=False,
+                                                  bind=build_engine(self.url, name="replica"))
+        return self._replica_sessions
+
+    def _primary(self) -> Callable:
+        return self._primary_sessions if self._primary_sessions is not None else SessionLocal
+
+    # ------------------------------------------------------------------ staleness
+    def _measure(self, conn) -> float:
+        probe = self._lag_probe or REPLICA_LAG_PROBES.get(conn.dialect.name)
+        if probe is None:
+            conn.execute(text("SELECT 1"))  # reachable is all a non-replicating stand-in can report
+            return 0.0
+        return float(probe(conn))
+
+    def check(self) -> bool:
+        """Probe the replica now; True when it is reachable and within the lag budget"""
+        try:
+            with self._replica().kw["bind"].connect() as conn:
+                lag: Optional[float] = self._measure(conn)
+        except Exception as e:
+            lag = None
+            self.stats["check_errors"] += 1
+            logger.warning(f"Replica check failed, analytics read the primary: {e}")
+        self.stats["checks"] += 1
+        healthy = lag is not None and lag <= self.max_lag_seconds
+        if self._healthy and not healthy and lag is not None:
+            logger.warning(f"Replica {lag:.1f}s behind (limit {self.max_lag_seconds:.0f}s), "
+                           "analytics read the primary")
+        self.lag_seconds, self._healthy = lag, healthy
+        self._checked_at = time.monotonic()
+        REPLICA_LAG.set(lag if lag is not None else -1)
+        return healthy
+
+    def use_replica(self) -> bool:
+        """Whether the next analytics session should go to the replica (re-checks when due)"""
+        if not self.configured:
+            return False
+        if self._checked_at is None or time.monotonic() - self._checked_at >= self.check_seconds:
+            with self._lock:  # one probe at a time; the others use its result
+                if self._checked_at is None or time.monotonic() - self._checked_at >= self.check_seconds:
+                    self.check()
+        return self._healthy
+
+    # ------------------------------------------------------------------ sessions
+    def session(self) -> Session:
+        """A session for read-only analytics work: replica when fresh, otherwise primary"""
+        if self.use_replica():
+            self.stats["replica_sessions"] += 1
+            ANALYTICS_SESSIONS.labels("replica").inc()
+            return self._replica()()
+        if self.configured:
+            self.stats["primary_fallbacks"] += 1
+        ANALYTICS_SESSIONS.labels("primary").inc()
+        return self._primary()()
+
+    def status(self) -> Dict[str, Any]:
+        return dict(self.stats, configured=self.configured, healthy=self._healthy,
+                    lag_seconds=self.lag_seconds, max_lag_seconds=self.max_lag_seconds)
+
+    def dispose(self) -> None:
+        if self._replica_sessions is not None:
+            self._replica_sessions.kw["bind"].dispose()
+
+
+replica_router = ReplicaRouter()
+
+
+@contextmanager
+def analytics_scope() -> Generator[Session, None, None]:
+    """Read-only session for background reports; nothing is committed"""
+    db = replica_router.session()
+    try:
+        yield db
+    finally:
+        db.rollback()
+        db.close()
+
+
+def get_analytics_db() -> Generator[Session, None, None]:
+    """Dependency for read-only analytics endpoints (replica when fresh)"""
+    db = replica_router.session()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -3,7 +3,7 @@
 🧭 LOCATION: /CORA/models/stripe_integration.py
 🎯 PURPOSE: Stripe integration model for OAuth tokens and sync history
 🔗 IMPORTS: SQLAlchemy, datetime
-📤 EXPORTS: StripeIntegration, StripeSyncHistory classes
+📤 EXPORTS: StripeIntegration, StripeSyncHistory, StripeTransaction, StripeSyncCursor classes
 """
 
 from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Float, ForeignKey
@@ -128,4 +128,20 @@ class StripeTransaction(Base):
     
     # Relationships
     integration = relationship("StripeIntegration")
-    expense = relationship("Expense", back_populates="stripe_transactions") 
\ No newline at end of file
+    expense = relationship("Expense", back_populates="stripe_transactions") 
+
+class StripeSyncCursor(Base):
+    """Per-integration position of the incremental charge sync"""
+    
+    __tablename__ = "stripe_sync_cursors"
+    
+    integration_id = Column(Integer, ForeignKey("stripe_integrations.id"), primary_key=True)
+    
+    # Unix `created` of the newest charge covered by the last complete run; the next run lists created >= this
+    high_water = Column(Integer, nullable=True)
+    # Run in progress: newest `created` seen so far and the charge id to resume paging after
+    pending_high_water = Column(Integer, nullable=True)
+    resume_after = Column(String(255), nullable=True)
+    
+    last_completed_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
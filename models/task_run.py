@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/models/task_run.py
+🎯 PURPOSE: Persisted history of scheduled business-task runs
+🔗 IMPORTS: SQLAlchemy base and types
+📤 EXPORTS: TaskRun model
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime, Float, JSON, Text
+from datetime import datetime
+
+from .base import Base
+
+class TaskRun(Base):
+    """One fleet-wide execution of a business task"""
+    __tablename__ = "task_runs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    task_name = Column(String(100), nullable=False, index=True)
+    trigger = Column(String(20), nullable=False, default="scheduled")  # scheduled, manual
+    status = Column(String(20), nullable=False, default="running")  # running, completed, failed
+    started_at = Column(DateTime, default=datetime.utcnow, index=True)
+    finished_at = Column(DateTime, nullable=True)
+    duration_seconds = Column(Float, nullable=True)
+    total_users = Column(Integer, default=0)
+    succeeded = Column(Integer, default=0)
+    failed = Column(Integer, default=0)
+    timed_out = Column(Integer, default=0)
+    retries = Column(Integer, default=0)
+    failures = Column(JSON, nullable=True)  # sample of {user_id, error}
+    error = Column(Text, nullable=True)
+    
+    def to_dict(self):
+        executed = (self.succeeded or 0) + (self.failed or 0)
+        return {
+            "id": self.id,
+            "task_name": self.task_name,
+            "trigger": self.trigger,
+            "status": self.status,
+            "executed_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "duration_seconds": self.duration_seconds,
+            "total_users": self.total_users,
+            "total_executed": executed,
+            "total_success": self.succeeded,
+            "total_failed": self.failed,
+            "timed_out": self.timed_out,
+            "retries": self.retries,
+            "success_rate": (self.succeeded / executed * 100) if executed else 0,
+            "failures": self.failures or [],
+            "error": self.error
+        }
+    
+    def __repr__(self):
+        return f"<TaskRun {self.id}: {self.task_name} - {self.status}>"
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/models/weekly_insights_delivery.py
+🎯 PURPOSE: Per-week delivery checkpoint for the weekly insights batch job
+🔗 IMPORTS: SQLAlchemy base and types
+📤 EXPORTS: WeeklyInsightsDelivery model
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint
+from datetime import datetime
+
+from .base import Base
+
+class WeeklyInsightsDelivery(Base):
+    """One row per user per ISO week once their weekly email was handed to the provider"""
+    __tablename__ = "weekly_insights_deliveries"
+    __table_args__ = (
+        UniqueConstraint("week_key", "user_id", name="uq_weekly_insights_week_user"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    week_key = Column(String(10), nullable=False, index=True)  # e.g. 2025-W37
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    status = Column(String(20), nullable=False, default="sent")
+    sent_at = Column(DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<WeeklyInsightsDelivery {self.week_key} user={self.user_id} {self.status}>"
@@ -261,6 +261,8 @@ async def get_query_monitoring_stats(
         "status": "success",
         "statistics": stats,
         "slow_queries": slow_queries,
+        "n_plus_one": query_monitor.get_n_plus_one(limit=50),
+        "top_statements": query_monitor.get_statement_histogram(limit=25),
         "timestamp": datetime.now().isoformat()
     }
 
@@ -4,6 +4,7 @@ Handles blog posts targeting high-value keywords
 """
 from fastapi import APIRouter, Request, HTTPException
 from fastapi.responses import HTMLResponse
+from utils.page_cache import cached_page
 import os
 
 router = APIRouter()
@@ -62,6 +63,7 @@ BLOG_POSTS = [
 ]
 
 @router.get("/blog", response_class=HTMLResponse)
+@cached_page()
 async def blog_index(request: Request):
     """Blog index page showing all posts"""
     return request.app.state.templates.TemplateResponse("blog/index.html", {
@@ -73,6 +75,7 @@ async def blog_index(request: Request):
     })
 
 @router.get("/blog/{slug}", response_class=HTMLResponse)
+@cached_page()
 async def blog_post(request: Request, slug: str):
     """Individual blog post page"""
     # Find the post
@@ -93,6 +96,7 @@ async def blog_post(request: Request, slug: str):
     })
 
 @router.get("/blog/category/{category}", response_class=HTMLResponse)
+@cached_page()
 async def blog_category(request: Request, category: str):
     """Blog posts by category"""
     # Filter posts by category
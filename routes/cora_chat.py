@@ -18,36 +18,27 @@ from pydantic import BaseModel
 from typing import Optional, Dict, List, Any
 from datetime import datetime, timedelta
 import os
-import json
 import hashlib
 import logging
 from collections import defaultdict
-from pathlib import Path
 from models import AnalyticsLog
-from models import get_db
+from models import session_scope
 
 logger = logging.getLogger(__name__)
 
-# OpenAI import
-try:
-    import openai
-    OPENAI_AVAILABLE = True
-except ImportError:
-    # Only print warning in debug mode
-    if os.getenv('DEBUG', '').lower() == 'true':
-        print("Warning: OpenAI module not installed. Run 'pip install openai' to enable AI responses.")
-    OPENAI_AVAILABLE = False
+# OpenAI import (deferred until the first AI response)
+from utils.lazy_import import lazy_import
+openai = lazy_import("openai", optional=True)
+OPENAI_AVAILABLE = openai is not None
+if not OPENAI_AVAILABLE and os.getenv('DEBUG', '').lower() == 'true':
+    print("Warning: OpenAI module not installed. Run 'pip install openai' to enable AI responses.")
     
 from config import config
 
-# Load CORA Sales Intelligence Knowledge Base
-KNOWLEDGE_BASE_PATH = Path(__file__).parent.parent / "data" / "cora_knowledge_base.json"
-try:
-    with open(KNOWLEDGE_BASE_PATH, 'r') as f:
-        CORA_KNOWLEDGE = json.load(f)
-except FileNotFoundError:
-    print(f"Warning: Knowledge base not found at {KNOWLEDGE_BASE_PATH}")
-    CORA_KNOWLEDGE = {}
+from services.knowledge_index import knowledge_index
+
+# CORA Sales Intelligence Knowledge Base (compiled index, hot-reloaded on change)
+KNOWLEDGE_BASE_PATH = knowledge_index.sources["knowledge"]
 
 # Create router
 cora_chat_router = APIRouter(prefix="/api/cora-chat", tags=["cora-chat"])
@@ -90,57 +81,30 @@ def check_rate_limit(visitor_id: str) -> tuple[bool, int]:
 # Knowledge base helper functions
 def get_pricing_info(tier_name: Optional[str] = None) -> Dict[str, Any]:
     """Get pricing information from knowledge base"""
-    if not CORA_KNOWLEDGE:
-        return {}
-    
-    pricing = CORA_KNOWLEDGE.get("pricing", {})
+    pricing = knowledge_index.data("knowledge").get("pricing", {})
     if tier_name:
-        for tier in pricing.get("tiers", []):
-            if tier["name"].lower() == tier_name.lower():
-                return tier
+        return knowledge_index.pricing_tier(tier_name) or pricing
     return pricing
 
 def get_feature_info(feature_name: str) -> Dict[str, Any]:
     """Get specific feature information"""
-    if not CORA_KNOWLEDGE:
-        return {}
-    
-    features = CORA_KNOWLEDGE.get("features", {})
-    # Search in core features
-    for category in features.values():
-        if isinstance(category, dict):
-            for key, feature in category.items():
-                if feature_name.lower() in key.lower() or feature_name.lower() in str(feature).lower():
-                    return feature
-    return {}
+    return knowledge_index.feature(feature_name)
 
 def get_integration_info(integration_name: str) -> Dict[str, Any]:
     """Get integration setup information"""
-    if not CORA_KNOWLEDGE:
-        return {}
-    
-    integrations = CORA_KNOWLEDGE.get("integrations_guide", {})
-    for key, integration in integrations.items():
-        if integration_name.lower() in key.lower() or integration_name.lower() in integration.get("name", "").lower():
-            return integration
-    return {}
+    return knowledge_index.integration(integration_name)
 
 def get_comparison_info(competitor: str) -> List[str]:
     """Get comparison advantages"""
-    if not CORA_KNOWLEDGE:
-        return []
-    
-    comparisons = CORA_KNOWLEDGE.get("comparisons", {})
-    for key, comparison in comparisons.items():
-        if competitor.lower() in key.lower():
-            return comparison.get("advantages", [])
-    return []
+    return knowledge_index.comparison(competitor).get("advantages", [])
 
 # Enhanced CORA Sales Intelligence System Prompt
-CORA_SYSTEM_PROMPT = f"""You are CORA, an AI-powered Financial Wellness Companion and sales representative for CORA AI. You help stressed entrepreneurs save 20+ hours per month while reducing financial anxiety.
+# Only the knowledge snippets relevant to the visitor's message are injected
+# into {knowledge}; see build_system_prompt().
+CORA_SYSTEM_PROMPT_TEMPLATE = """You are CORA, an AI-powered Financial Wellness Companion and sales representative for CORA AI. You help stressed entrepreneurs save 20+ hours per month while reducing financial anxiety.
 
-YOUR KNOWLEDGE BASE:
-{json.dumps(CORA_KNOWLEDGE, indent=2)}
+RELEVANT KNOWLEDGE:
+{knowledge}
 
 YOUR PERSONALITY:
 - Warm, empathetic, and genuinely caring about their financial stress
@@ -199,6 +163,12 @@ RESPONSE STYLE:
 
 Remember: You're not just selling software - you're offering peace of mind and 20+ hours of their life back every month."""
 
+def build_system_prompt(message: str, history: Optional[List[Dict]] = None) -> str:
+    """System prompt with the knowledge snippets relevant to this conversation"""
+    recent = " ".join(m["content"] for m in (history or [])[-4:] if m.get("role") == "user")
+    knowledge = knowledge_index.relevant_context(f"{message} {recent}")
+    return CORA_SYSTEM_PROMPT_TEMPLATE.format(knowledge=knowledge or "- (no specific match; use general CORA knowledge)")
+
 @cora_chat_router.post("/", response_model=ChatResponse)
 async def chat_with_cora(
     chat_message: ChatMessage,
@@ -237,7 +207,7 @@ async def chat_with_cora(
             response_message = await generate_openai_response(
                 chat_message.message, 
                 history,
-                CORA_SYSTEM_PROMPT
+                build_system_prompt(chat_message.message, history)
             )
             if response_message is None:
                 # OpenAI not available, use fallback
@@ -271,9 +241,8 @@ async def chat_with_cora(
         response_status="success",
         variant="mock" if not OPENAI_AVAILABLE or not config.OPENAI_API_KEY or config.OPENAI_API_KEY == "your-openai-api-key-here" else "openai"
     )
-    db = next(get_db())
-    db.add(analytics)
-    db.commit()
+    with session_scope() as db:
+        db.add(analytics)
     
     return ChatResponse(
         message=response_message,
@@ -316,7 +285,7 @@ def generate_mock_response(message: str, conversation_length: int) -> str:
     
     # Tax concerns - use testimonials
     if any(word in message_lower for word in ["tax", "deduction", "irs", "audit", "write off"]):
-        testimonials = CORA_KNOWLEDGE.get("testimonials", {}).get("success_stories", [])
+        testimonials = knowledge_index.data("knowledge").get("testimonials", {}).get("success_stories", [])
         return "I track deductions automatically - Mike found $2,134 in missed write-offs his first month! Plus quarterly tax estimates so no surprises. Try free for 30 days and see what you're missing?"
     
     # Time savings emphasis
@@ -358,7 +327,7 @@ def generate_mock_response(message: str, conversation_length: int) -> str:
     
     # Security concerns
     if any(word in message_lower for word in ["secure", "safe", "privacy", "data", "security"]):
-        security = CORA_KNOWLEDGE.get("technical_details", {}).get("security", {})
+        security = knowledge_index.data("knowledge").get("technical_details", {}).get("security", {})
         return "Bank-level encryption, SOC 2 compliant, and 6,000+ entrepreneurs trust me with their finances. Your data is never sold! Start with manual entry during your free trial if you prefer?"
     
     # Stress and overwhelm
@@ -478,79 +447,16 @@ async def get_chat_stats(request: Request):
 @cora_chat_router.post("/reload-knowledge")
 async def reload_knowledge_base():
     """Reload the knowledge base from file (admin endpoint - add auth in production)"""
-    global CORA_KNOWLEDGE, CORA_SYSTEM_PROMPT
-    
     try:
-        with open(KNOWLEDGE_BASE_PATH, 'r') as f:
-            CORA_KNOWLEDGE = json.load(f)
-        
-        # Regenerate system prompt with new knowledge
-        CORA_SYSTEM_PROMPT = f"""You are CORA, an AI-powered Financial Wellness Companion and sales representative for CORA AI. You help stressed entrepreneurs save 20+ hours per month while reducing financial anxiety.
-
-YOUR KNOWLEDGE BASE:
-{json.dumps(CORA_KNOWLEDGE, indent=2)}
-
-YOUR PERSONALITY:
-- Warm, empathetic, and genuinely caring about their financial stress
-- Professional yet conversational (like a knowledgeable friend, not a salesperson)
-- Solution-focused - always connect their pain points to how CORA helps
-- Confident in CORA's value but never pushy
-- Use "I" statements - you ARE CORA, not talking about CORA
-
-CONVERSATION GUIDELINES:
-
-1. DISCOVERY PHASE (First 2-3 messages):
-   - Understand their specific pain points
-   - Ask about their current financial management process
-   - Identify time wasters and stress points
-   - Show genuine empathy for their struggles
-
-2. EDUCATION PHASE (Messages 3-5):
-   - Connect their specific problems to CORA's solutions
-   - Share relevant success stories from the knowledge base
-   - Highlight time savings (20+ hours/month)
-   - Mention specific features that address their needs
-
-3. CONVERSION PHASE (Messages 6+):
-   - Address any objections using the knowledge base
-   - Emphasize the 30-day free trial (no credit card required)
-   - Create urgency by quantifying their current losses
-   - Guide them to take action
-
-KEY SELLING POINTS TO EMPHASIZE:
-- 30-day free trial with no credit card required
-- Save 20+ hours per month (worth $1000+ at $50/hour)
-- Most users find $2000+ in missed tax deductions
-- Voice-first design - capture expenses in seconds
-- Designed for entrepreneurs, not accountants
-- Persistent AI memory - I get smarter about your business over time
-
-PRICING GUIDANCE:
-- Lead with Founders Pricing (limited time)
-- $47 Basic, $97 Professional (most popular), $197 Enterprise
-- Regular pricing: $79, $149, $299 (emphasize savings)
-- Compare to manual bookkeeping costs: "Save $500+ monthly"
-- Always mention "First 1,000 contractors only - lock in forever"
-
-OBJECTION HANDLING:
-- Price: Compare to time saved, tax deductions found, peace of mind value
-- Time to learn: "10-minute setup, then I learn YOUR way of working"
-- Already using QuickBooks: "I'm 10x faster and designed for entrepreneurs, not accountants"
-- Security concerns: "Bank-level encryption, SOC 2 compliant, your data is never sold"
-
-RESPONSE STYLE:
-- Keep responses to 2-3 sentences for easy reading
-- Use natural, conversational language
-- Include specific numbers and examples when possible
-- End with a question to keep engagement high
-- Be enthusiastic about helping them succeed
-
-Remember: You're not just selling software - you're offering peace of mind and 20+ hours of their life back every month."""
+        # Broadcast so every worker swaps in the new index on its next lookup
+        snapshot = knowledge_index.reload(broadcast=True)
+        knowledge = snapshot.data.get("knowledge", {})
         
         return {
             "success": True,
             "message": "Knowledge base reloaded successfully",
-            "knowledge_items": len(CORA_KNOWLEDGE.keys()) if CORA_KNOWLEDGE else 0
+            "knowledge_items": len(knowledge.keys()) if knowledge else 0,
+            "version": snapshot.version
         }
     except Exception as e:
         return {
@@ -561,16 +467,18 @@ Remember: You're not just selling software - you're offering peace of mind and 2
 @cora_chat_router.get("/knowledge-summary")
 async def get_knowledge_summary():
     """Get a summary of the current knowledge base (admin endpoint)"""
-    if not CORA_KNOWLEDGE:
+    knowledge = knowledge_index.data("knowledge")
+    if not knowledge:
         return {"error": "Knowledge base not loaded"}
     
     summary = {
-        "pricing_tiers": len(CORA_KNOWLEDGE.get("pricing", {}).get("tiers", [])),
-        "feature_categories": list(CORA_KNOWLEDGE.get("features", {}).keys()),
-        "integrations": len(CORA_KNOWLEDGE.get("integrations_guide", {})),
-        "testimonials": len(CORA_KNOWLEDGE.get("testimonials", {}).get("success_stories", [])),
-        "faq_count": len(CORA_KNOWLEDGE.get("faq", {}).get("common_questions", [])),
-        "comparisons": list(CORA_KNOWLEDGE.get("comparisons", {}).keys())
+        "pricing_tiers": len(knowledge.get("pricing", {}).get("tiers", [])),
+        "feature_categories": list(knowledge.get("features", {}).keys()),
+        "integrations": len(knowledge.get("integrations_guide", {})),
+        "testimonials": len(knowledge.get("testimonials", {}).get("success_stories", [])),
+        "faq_count": len(knowledge.get("faq", {}).get("common_questions", [])),
+        "comparisons": list(knowledge.get("comparisons", {}).keys()),
+        "index": knowledge_index.summary()
     }
     
     return summary
\ No newline at end of file
@@ -31,39 +31,23 @@ from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
-# OpenAI import
-try:
-    import openai
-    OPENAI_AVAILABLE = True
-except ImportError:
-    if os.getenv('DEBUG', '').lower() == 'true':
-        print("Warning: OpenAI module not installed. Run 'pip install openai' to enable AI responses.")
-    OPENAI_AVAILABLE = False
+# OpenAI import (deferred until the first AI response)
+from utils.lazy_import import lazy_import
+openai = lazy_import("openai", optional=True)
+OPENAI_AVAILABLE = openai is not None
+if not OPENAI_AVAILABLE and os.getenv('DEBUG', '').lower() == 'true':
+    print("Warning: OpenAI module not installed. Run 'pip install openai' to enable AI responses.")
     
 from config import config
 
-# Load enhanced personality and conversation scripts
-DATA_PATH = Path(__file__).parent.parent / "data"
-KNOWLEDGE_BASE_PATH = DATA_PATH / "cora_knowledge_base.json"
-PERSONALITY_PATH = DATA_PATH / "cora_contractor_personality.json"
-IMPLEMENTATION_PATH = DATA_PATH / "cora_conversation_implementation.json"
+from services.knowledge_index import knowledge_index
 
-def load_json_file(path: Path) -> Dict:
-    """Safely load JSON file with error handling"""
-    try:
-        with open(path, 'r') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        logger.warning(f"File not found: {path}")
-        return {}
-    except json.JSONDecodeError as e:
-        logger.error(f"Invalid JSON in {path}: {e}")
-        return {}
-
-# Load all personality and knowledge data
-CORA_KNOWLEDGE = load_json_file(KNOWLEDGE_BASE_PATH)
-CONTRACTOR_PERSONALITY = load_json_file(PERSONALITY_PATH)
-CONVERSATION_IMPLEMENTATION = load_json_file(IMPLEMENTATION_PATH)
+# Enhanced personality and conversation scripts are served from the shared
+# compiled knowledge index, which reloads itself when the JSON files change
+DATA_PATH = Path(__file__).parent.parent / "data"
+KNOWLEDGE_BASE_PATH = knowledge_index.sources["knowledge"]
+PERSONALITY_PATH = knowledge_index.sources["personality"]
+IMPLEMENTATION_PATH = knowledge_index.sources["implementation"]
 
 # Create router
 cora_chat_enhanced_router = APIRouter(prefix="/api/cora-chat-v2", tags=["cora-chat-enhanced"])
@@ -205,8 +189,9 @@ def analyze_user_context(message: str, history: List[Dict], user_profile: Dict =
 
 def get_personality_response(context: Dict[str, Any], message: str, history: List[Dict]) -> str:
     """Generate a personality-driven response based on context"""
-    personality = CONTRACTOR_PERSONALITY.get("personality", {})
-    scripts = CONTRACTOR_PERSONALITY.get("conversation_scripts", {})
+    contractor_personality = knowledge_index.data("personality")
+    personality = contractor_personality.get("personality", {})
+    scripts = contractor_personality.get("conversation_scripts", {})
     
     # Get appropriate greeting if first message
     if len(history) == 0:
@@ -292,7 +277,7 @@ def generate_enhanced_response(message: str, history: List[Dict], metadata: Dict
     # Check if this is onboarding FIRST - this takes priority
     if metadata and metadata.get('onboarding'):
         # Use OpenAI for onboarding responses to ensure proper instruction following
-        system_prompt = generate_enhanced_system_prompt(metadata)
+        system_prompt = generate_enhanced_system_prompt(metadata, message)
         response = generate_openai_response_sync(message, history, system_prompt, metadata)
         if response:
             return response
@@ -475,10 +460,10 @@ def generate_onboarding_fallback_response(message: str, history: List[Dict], met
     return "Thanks for sharing that! Let's continue with the next question."
 
 # Enhanced system prompt with full personality
-def generate_enhanced_system_prompt(metadata=None) -> str:
+def generate_enhanced_system_prompt(metadata=None, message: Optional[str] = None) -> str:
     """Generate system prompt with full personality implementation"""
-    personality = CONTRACTOR_PERSONALITY.get("personality", {})
-    implementation = CONVERSATION_IMPLEMENTATION.get("implementation_guide", {})
+    personality = knowledge_index.data("personality").get("personality", {})
+    implementation = knowledge_index.data("implementation").get("implementation_guide", {})
     
     # Check if this is onboarding
     if metadata and metadata.get('onboarding'):
@@ -551,8 +536,8 @@ YOUR PERSONALITY:
 CONVERSATION RULES:
 {json.dumps(implementation.get("personality_rules", {}), indent=2)}
 
-YOUR KNOWLEDGE BASE:
-{json.dumps(CORA_KNOWLEDGE, indent=2)}
+RELEVANT KNOWLEDGE:
+{knowledge_index.relevant_context(message or "") or "- (no specific match; use general CORA knowledge)"}
 
 CRITICAL GUIDELINES:
 1. ALWAYS speak as CORA directly using "I" and "me"
@@ -658,7 +643,7 @@ async def chat_with_enhanced_cora(
             response_message = await generate_openai_response(
                 chat_message.message, 
                 history,
-                generate_enhanced_system_prompt(stored_metadata),
+                generate_enhanced_system_prompt(stored_metadata, chat_message.message),
                 stored_metadata
             )
             if response_message is None:
@@ -873,7 +858,7 @@ async def simulate_contractor_conversation(
     """Simulate a contractor conversation for testing (admin endpoint)"""
     
     # Get the appropriate script
-    scripts = CONTRACTOR_PERSONALITY.get("conversation_scripts", {})
+    scripts = knowledge_index.data("personality").get("conversation_scripts", {})
     
     if scenario == "first_visit":
         visitor_scripts = scripts.get("first_time_visitors", {})
@@ -8,7 +8,8 @@
 
 from fastapi import APIRouter, Depends, Query
 from fastapi.responses import StreamingResponse
-from sqlalchemy import func, or_
+from sqlalchemy import func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta, date
 from typing import Dict, Any
@@ -18,7 +19,9 @@ import logging
 from functools import lru_cache
 
 from models import get_db, User, Expense, ExpenseCategory, Job
-from dependencies.auth import get_current_user
+from models.async_base import get_async_db
+from models.replica import get_analytics_db
+from dependencies.auth import get_current_user, get_current_user_async
 from utils.filenames import generate_filename
 
 logger = logging.getLogger(__name__)
@@ -54,43 +57,40 @@ def _period_range(period: str) -> tuple[datetime, datetime]:
     return start, end
 
 
-def _job_cost_cents(db: Session, user_id: int, job: Job, start: datetime | None = None, end: datetime | None = None) -> int:
-    q = db.query(func.sum(Expense.amount_cents)).filter(Expense.user_id == user_id)
-    # Prefer matching by job_id if present, otherwise by job_name
-    if job.job_id:
-        q = q.filter(Expense.job_id == job.job_id)
-    else:
-        q = q.filter(Expense.job_name == job.job_name)
-    if start is not None:
-        q = q.filter(Expense.expense_date >= start)
-    if end is not None:
-        q = q.filter(Expense.expense_date <= end)
-    return q.scalar() or 0
+async def _job_costs_cents(db: AsyncSession, user_id: int, jobs: list[Job],
+                           start: datetime | None = None, end: datetime | None = None) -> dict[int, int]:
+    """Expense totals per job in two grouped queries (by job_id, else by job_name)"""
+    def total_by(column, keys):
+        q = select(column, func.sum(Expense.amount_cents)).where(
+            Expense.user_id == user_id, column.in_(keys))
+        if start is not None:
+            q = q.where(Expense.expense_date >= start)
+        if end is not None:
+            q = q.where(Expense.expense_date <= end)
+        return q.group_by(column)
 
+    # Prefer matching by job_id if present, otherwise by job_name
+    ids = {j.job_id for j in jobs if j.job_id}
+    names = {j.job_name for j in jobs if not j.job_id}
+    by_id = dict((await db.execute(total_by(Expense.job_id, ids))).all()) if ids else {}
+    by_name = dict((await db.execute(total_by(Expense.job_name, names))).all()) if names else {}
+    return {
+        j.id: (by_id.get(j.job_id) if j.job_id else by_name.get(j.job_name)) or 0
+        for j in jobs
+    }
 
-@dashboard_router.get("/jobs")
-async def get_jobs(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    """Return the user's jobs with basic profit approximation.
 
-    Note: We currently do not have per-job cost aggregation wired here.
-    Profit is approximated as quoted_amount for now to unblock UI; when
-    job-level expenses are modeled, subtract costs accordingly.
-    """
-    jobs = (
-        db.query(Job)
-        .filter(Job.user_id == current_user.id)
-        .order_by(Job.created_at.desc())
-        .limit(50)
-        .all()
-    )
-    start, end = _period_range("month")
+async def _jobs_payload(db: AsyncSession, user_id: int, start: datetime, end: datetime,
+                        status: str | None = None, limit: int = 50) -> list[Dict[str, Any]]:
+    q = select(Job).where(Job.user_id == user_id)
+    if status:
+        q = q.where(Job.status == status)
+    jobs = (await db.execute(q.order_by(Job.created_at.desc()).limit(limit))).scalars().all()
+    costs = await _job_costs_cents(db, user_id, jobs, start, end)
     payload = []
     for j in jobs:
         quoted_cents = int((j.quoted_amount or 0) * 100)
-        cost_cents = _job_cost_cents(db, current_user.id, j, start, end)
+        cost_cents = costs[j.id]
         profit_cents = quoted_cents - cost_cents
         margin_pct = round((profit_cents / quoted_cents * 100), 1) if quoted_cents > 0 else 0
         payload.append({
@@ -102,7 +102,20 @@ async def get_jobs(
             "profit": profit_cents / 100.0,
             "margin": margin_pct,
         })
-    result = {"jobs": payload}
+    return payload
+
+
+@dashboard_router.get("/jobs")
+async def get_jobs(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    """Return the user's jobs with basic profit approximation.
+
+    Profit is quoted_amount minus this month's expenses matched to the job.
+    """
+    start, end = _period_range("month")
+    result = {"jobs": await _jobs_payload(db, current_user.id, start, end)}
     return result
 
 
@@ -110,30 +123,12 @@ async def get_jobs(
 async def get_jobs_filtered(
     period: str = "month",
     status: str | None = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     start, end = _period_range(period)
-    q = db.query(Job).filter(Job.user_id == current_user.id)
-    if status:
-        q = q.filter(Job.status == status)
-    jobs = q.order_by(Job.created_at.desc()).limit(200).all()
-    payload = []
-    for j in jobs:
-        quoted_cents = int((j.quoted_amount or 0) * 100)
-        cost_cents = _job_cost_cents(db, current_user.id, j, start, end)
-        profit_cents = quoted_cents - cost_cents
-        margin_pct = round((profit_cents / quoted_cents * 100), 1) if quoted_cents > 0 else 0
-        payload.append({
-            "id": j.id,
-            "name": j.job_name,
-            "status": j.status,
-            "quoted": float(j.quoted_amount or 0),
-            "cost": cost_cents / 100.0,
-            "profit": profit_cents / 100.0,
-            "margin": margin_pct,
-        })
-    return {"period": period, "jobs": payload}
+    jobs = await _jobs_payload(db, current_user.id, start, end, status=status, limit=200)
+    return {"period": period, "jobs": jobs}
 
 @dashboard_router.get("/plaid-data")
 async def get_plaid_dashboard_data(
@@ -283,18 +278,18 @@ async def get_plaid_dashboard_data(
 
 @dashboard_router.get("/summary")
 async def get_dashboard_summary(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ) -> Dict[str, Any]:
-    """Get comprehensive dashboard summary with optimized queries and caching"""
+    """Get comprehensive dashboard summary with optimized queries and caching (AsyncSession)"""
     
     try:
-        from utils.query_optimizer import get_optimized_dashboard_summary
+        from utils.query_optimizer import get_optimized_dashboard_summary_async
         from utils.api_response_optimizer import optimize_api_response
         
         @optimize_api_response(compress=True, cache=True, cache_ttl=300)
         async def get_dashboard_data():
-            return get_optimized_dashboard_summary(db, current_user.id)
+            return await get_optimized_dashboard_summary_async(db, current_user.id)
         
         return await get_dashboard_data()
     except ImportError:
@@ -676,7 +671,7 @@ def calculate_tracking_streak(db: Session, user_id: str) -> int:
 @dashboard_router.get("/export")
 async def export_dashboard_data(
     format: str = "csv",
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_analytics_db),
     current_user: User = Depends(get_current_user),
     start: str | None = Query(None, description="Start date (YYYY-MM-DD)"),
     end: str | None = Query(None, description="End date (YYYY-MM-DD)"),
@@ -7,6 +7,8 @@ LAUNCH CRITICAL - Keep it simple!
 from fastapi import APIRouter, Depends, Request, Form, HTTPException, Query
 from fastapi.responses import HTMLResponse, RedirectResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import datetime, date
 import csv
@@ -14,12 +16,15 @@ import io
 from typing import Optional
 
 from models import get_db, User, Expense
-from dependencies.auth import get_current_user
+from models.async_base import get_async_db
+from dependencies.auth import get_current_user, get_current_user_async
 from utils.filenames import generate_filename
+from utils.static_assets import install_asset_helpers
+from utils.write_queue import write_queue
 
 # Router setup
 expense_router = APIRouter(prefix="", tags=["Expenses"])
-templates = Jinja2Templates(directory="web/templates")
+templates = install_asset_helpers(Jinja2Templates(directory="web/templates"))
 
 # Hardcoded categories for MVP (don't overcomplicate)
 EXPENSE_CATEGORIES = [
@@ -38,15 +43,15 @@ EXPENSE_CATEGORIES = [
 @expense_router.get("/expenses", response_class=HTMLResponse)
 async def expenses_page(
     request: Request,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """Display user's expenses in a simple table"""
     
     # Get user's expenses, newest first
-    expenses = db.query(Expense).filter(
-        Expense.user_id == current_user.id
-    ).order_by(Expense.expense_date.desc()).all()
+    expenses = (await db.scalars(
+        select(Expense).where(Expense.user_id == current_user.id).order_by(Expense.expense_date.desc())
+    )).all()
     
     # Calculate total
     total_cents = sum(e.amount_cents for e in expenses)
@@ -97,6 +102,12 @@ async def add_expense_page(
         "user": current_user
     })
 
+def _insert_expense(db: Session, fields: dict) -> int:
+    expense = Expense(**fields)
+    db.add(expense)
+    db.flush()
+    return expense.id
+
 @expense_router.post("/api/expenses/add")
 async def create_expense(
     amount: float = Form(...),
@@ -105,7 +116,6 @@ async def create_expense(
     vendor: str = Form(None),
     job_name: str = Form(None),
     expense_date: str = Form(...),
-    db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Add a new expense"""
@@ -117,8 +127,8 @@ async def create_expense(
         # Parse date
         exp_date = datetime.strptime(expense_date, '%Y-%m-%d')
         
-        # Create expense
-        expense = Expense(
+        # Create expense through the single writer (group-committed on SQLite)
+        await write_queue.run_async(_insert_expense, dict(
             user_id=current_user.id,
             amount_cents=amount_cents,
             category_id=category,
@@ -127,16 +137,12 @@ async def create_expense(
             job_name=job_name,
             expense_date=exp_date,
             created_at=datetime.now()
-        )
-        
-        db.add(expense)
-        db.commit()
+        ))
         
         # Redirect back to expenses list
         return RedirectResponse(url="/expenses", status_code=303)
         
     except Exception as e:
-        db.rollback()
         raise HTTPException(status_code=400, detail=str(e))
 
 @expense_router.post("/api/expenses/delete/{expense_id}")
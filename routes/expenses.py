@@ -9,6 +9,7 @@
 from fastapi import APIRouter, HTTPException, Depends, Query, Request
 from fastapi.responses import Response
 from pydantic import BaseModel, validator
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import datetime
 from typing import List, Optional
@@ -17,149 +18,27 @@ import logging
 import hashlib
 
 from models import get_db, Expense, ExpenseCategory, User
+from models.async_base import get_async_db
 from utils.redis_manager import redis_manager
+from utils.write_queue import write_queue
 from utils.filenames import generate_filename
-from dependencies.auth import get_current_user
+from dependencies.auth import get_current_user, get_current_user_async
 import re
 import asyncio
 from routes.websocket import broadcast_expense_update
 from middleware.monitoring import EXPENSES_CREATED, VOICE_EXPENSES_SUCCESS, VOICE_EXPENSES_FAILED
 from services.alert_checker import AlertChecker
 
-# AI Categorization mappings
-CATEGORY_PATTERNS = {
-    # Construction categories
-    "Materials - Lumber": {
-        "vendors": ["home depot", "lowes", "lumber", "wood"],
-        "keywords": ["lumber", "wood", "plywood", "2x4", "2x6", "framing", "studs", "boards"],
-        "weight": 1.2
-    },
-    "Materials - Electrical": {
-        "vendors": ["home depot", "lowes", "electrical supply", "graybar"],
-        "keywords": ["wire", "outlet", "switch", "breaker", "panel", "electrical", "conduit"],
-        "weight": 1.2
-    },
-    "Materials - Plumbing": {
-        "vendors": ["home depot", "lowes", "ferguson", "plumbing"],
-        "keywords": ["pipe", "fitting", "valve", "faucet", "plumbing", "pvc", "copper", "pex"],
-        "weight": 1.2
-    },
-    "Materials - Hardware": {
-        "vendors": ["home depot", "lowes", "ace hardware", "true value"],
-        "keywords": ["screws", "nails", "bolts", "fasteners", "hardware", "brackets", "hinges"],
-        "weight": 1.1
-    },
-    "Equipment - Fuel": {
-        "vendors": ["shell", "chevron", "exxon", "gas station", "fuel"],
-        "keywords": ["gas", "diesel", "fuel", "gasoline"],
-        "weight": 1.1
-    },
-    "Labor - Subcontractors": {
-        "vendors": [],
-        "keywords": ["subcontractor", "sub", "contractor", "labor", "crew", "helper"],
-        "weight": 1.0
-    },
-    # Original categories
-    "Office Supplies": {
-        "vendors": ["staples", "office depot", "amazon"],
-        "keywords": ["supplies", "printer", "ink", "paper", "desk", "chair", "stationery"],
-        "weight": 1.0
-    },
-    "Meals & Entertainment": {
-        "vendors": ["chipotle", "starbucks", "mcdonalds", "subway", "olive garden", "restaurant"],
-        "keywords": ["lunch", "dinner", "breakfast", "coffee", "meal", "food", "client lunch", "networking"],
-        "weight": 1.0
-    },
-    "Transportation": {
-        "vendors": ["uber", "lyft", "taxi", "parking"],
-        "keywords": ["ride", "transport", "parking", "gas", "fuel", "mileage"],
-        "weight": 1.0
-    },
-    "Software & Subscriptions": {
-        "vendors": ["adobe", "microsoft", "google", "dropbox", "slack", "zoom"],
-        "keywords": ["software", "subscription", "saas", "license", "cloud", "app"],
-        "weight": 1.0
-    },
-    "Marketing & Advertising": {
-        "vendors": ["facebook", "google ads", "mailchimp", "godaddy"],
-        "keywords": ["marketing", "advertising", "promotion", "domain", "hosting", "seo", "ads"],
-        "weight": 1.0
-    },
-    "Shipping & Postage": {
-        "vendors": ["usps", "fedex", "ups", "dhl"],
-        "keywords": ["shipping", "postage", "mail", "package", "delivery"],
-        "weight": 1.0
-    },
-    "Professional Development": {
-        "vendors": ["udemy", "coursera", "conference"],
-        "keywords": ["training", "course", "conference", "workshop", "seminar", "education"],
-        "weight": 1.0
-    },
-    "Travel": {
-        "vendors": ["hotel", "airline", "airbnb", "booking.com"],
-        "keywords": ["flight", "hotel", "travel", "accommodation", "lodging"],
-        "weight": 1.0
-    },
-    "Utilities": {
-        "vendors": ["electric", "water", "internet", "phone"],
-        "keywords": ["utility", "electric", "water", "internet", "phone", "telecom"],
-        "weight": 1.0
-    },
-    "Insurance": {
-        "vendors": ["state farm", "geico", "allstate"],
-        "keywords": ["insurance", "premium", "coverage", "liability"],
-        "weight": 1.0
-    }
-}
+# AI Categorization mappings (compiled once in the shared engine)
+from services.categorization_engine import expense_categorizer
+from services.voice_parser import voice_parser
 
 def categorize_expense(description: str, vendor: str = None, amount_cents: int = None) -> tuple[str, int]:
     """
     AI-powered expense categorization
     Returns: (category_name, confidence_score)
     """
-    # Normalize inputs
-    desc_lower = description.lower() if description else ""
-    vendor_lower = vendor.lower() if vendor else ""
-    
-    category_scores = {}
-    
-    # Score each category based on pattern matching
-    for category, patterns in CATEGORY_PATTERNS.items():
-        score = 0
-        
-        # Check vendor match (highest weight)
-        for vendor_pattern in patterns["vendors"]:
-            if vendor_pattern in vendor_lower:
-                score += 50
-                break
-        
-        # Check keyword matches
-        for keyword in patterns["keywords"]:
-            if keyword in desc_lower:
-                score += 20
-            if vendor and keyword in vendor_lower:
-                score += 15
-        
-        # Amount-based heuristics
-        if amount_cents:
-            if category == "Meals & Entertainment" and 500 <= amount_cents <= 15000:
-                score += 10
-            elif category == "Transportation" and 1000 <= amount_cents <= 10000:
-                score += 10
-            elif category == "Professional Development" and amount_cents > 50000:
-                score += 10
-        
-        if score > 0:
-            category_scores[category] = score
-    
-    # Get best match
-    if category_scores:
-        best_category = max(category_scores, key=category_scores.get)
-        confidence = min(category_scores[best_category], 95)  # Cap at 95%
-        return best_category, confidence
-    
-    # Default fallback
-    return "Other", 0
+    return expense_categorizer.categorize(description, vendor, amount_cents)
 
 # Import unified currency service
 from utils.currency import format_currency
@@ -459,18 +338,18 @@ async def get_expenses(
     request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get all expenses for a user with optimized queries and caching"""
+    """Get all expenses for a user with optimized queries and caching (AsyncSession)"""
     
-    from utils.query_optimizer import get_optimized_expenses
+    from utils.query_optimizer import get_optimized_expenses_async
     from utils.api_response_optimizer import optimize_api_response
     
     @optimize_api_response(compress=True, cache=True, cache_ttl=300)
     async def get_expenses_data():
         # Get optimized expenses
-        expenses_data = get_optimized_expenses(db, current_user.id, skip, limit)
+        expenses_data = await get_optimized_expenses_async(db, current_user.id, skip, limit)
         
         # Convert to ExpenseResponse format
         result = []
@@ -537,6 +416,12 @@ async def get_expense(
         raise HTTPException(status_code=404, detail="Expense not found")
     return expense
 
+def _insert_expense(db: Session, expense_data: dict, user_id: int) -> int:
+    expense = Expense(**expense_data, user_id=user_id)
+    db.add(expense)
+    db.flush()
+    return expense.id
+
 @expense_router.post("/", response_model=ExpenseResponse)
 async def create_expense(
     expense: ExpenseCreate,
@@ -571,13 +456,9 @@ async def create_expense(
     if expense_data.get('job_id') is None:
         expense_data.pop('job_id', None)
     
-    db_expense = Expense(
-        **expense_data,
-        user_id=current_user.id
-    )
-    db.add(db_expense)
-    db.commit()
-    db.refresh(db_expense)
+    # Insert through the single writer (group-committed on SQLite), then read it back
+    expense_id = await write_queue.run_async(_insert_expense, expense_data, current_user.id)
+    db_expense = db.get(Expense, expense_id)
     
     # Invalidate user cache since expenses changed
     invalidate_user_cache(current_user.email)
@@ -800,172 +681,9 @@ class VoiceExpenseResponse(BaseModel):
     parsed: Optional[dict] = None
 
 
-# Construction job patterns for voice parsing
-JOB_PATTERNS = [
-    r"for (?:the )?([a-zA-Z]+(?:\s+[a-zA-Z]+)*?)\s+(?:job|project)",
-    r"on (?:the )?([a-zA-Z]+(?:\s+[a-zA-Z]+)*?)\s+(?:job|project|bathroom|kitchen|house|roof|deck)",
-    r"([a-zA-Z]+)\s+(bathroom|kitchen|house|roof|deck|basement|garage|addition|remodel)",
-    r"([a-zA-Z]+(?:\s+[a-zA-Z]+)*?)\s+(?:job|project)(?:\s|$)"
-]
-
-# Construction vendor mappings
-CONSTRUCTION_VENDORS = {
-    'home depot': {'category': 'Materials - Hardware', 'common': True},
-    'lowes': {'category': 'Materials - Hardware', 'common': True},
-    'menards': {'category': 'Materials - Hardware', 'common': True},
-    'ace hardware': {'category': 'Materials - Hardware', 'common': True},
-    'lumber yard': {'category': 'Materials - Lumber', 'common': True},
-    'electrical supply': {'category': 'Materials - Electrical', 'common': True},
-    'plumbing supply': {'category': 'Materials - Plumbing', 'common': True},
-    'gas station': {'category': 'Equipment - Fuel', 'common': True},
-    'equipment rental': {'category': 'Equipment - Rental', 'common': True}
-}
-
-
 def parse_voice_expense(transcript: str) -> dict:
-    """Parse voice transcript into expense data"""
-    text = transcript.lower()
-    
-    # Extract job name
-    job_name = None
-    for pattern in JOB_PATTERNS:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            job_name = match.group(1).strip()
-            # Capitalize each word
-            job_name = ' '.join(word.capitalize() for word in job_name.split())
-            break
-    
-    # Extract amount
-    amount = None
-    
-    # First try standard patterns
-    amount_patterns = [
-        r'\$(\d+(?:\.\d{2})?)',  # $123.45
-        r'(\d+(?:\.\d{2})?)\s*dollars?',  # 123 dollars
-        r'(\d+)\s*(?:bucks?|dollars?)',  # 45 bucks
-    ]
-    
-    for pattern in amount_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            amount = float(match.group(1))
-            break
-    
-    # Handle compound word numbers like "three forty seven" or "twenty three fifty"
-    if not amount:
-        # Word to number mappings
-        word_numbers = {
-            'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5,
-            'six': 6, 'seven': 7, 'eight': 8, 'nine': 9,
-            'ten': 10, 'eleven': 11, 'twelve': 12, 'thirteen': 13,
-            'fourteen': 14, 'fifteen': 15, 'sixteen': 16, 'seventeen': 17,
-            'eighteen': 18, 'nineteen': 19, 'twenty': 20, 'thirty': 30,
-            'forty': 40, 'fifty': 50, 'sixty': 60, 'seventy': 70,
-            'eighty': 80, 'ninety': 90, 'hundred': 100, 'thousand': 1000
-        }
-        
-        # Look for patterns like "three forty seven" (347) or "twenty three fifty" (23.50)
-        compound_pattern = r'(' + '|'.join(word_numbers.keys()) + r')\s+(' + '|'.join(word_numbers.keys()) + r')(?:\s+(' + '|'.join(word_numbers.keys()) + r'))?'
-        match = re.search(compound_pattern, text)
-        if match:
-            parts = [g for g in match.groups() if g]
-            if len(parts) == 3:
-                # Pattern like "three forty seven" = 347
-                first = word_numbers.get(parts[0], 0)
-                second = word_numbers.get(parts[1], 0)
-                third = word_numbers.get(parts[2], 0)
-                
-                # If middle is "hundred", multiply first by 100
-                if parts[1] == 'hundred':
-                    amount = first * 100 + third
-                # If last is "fifty", treat as cents (x.50)
-                elif parts[2] == 'fifty':
-                    # For "twenty three fifty", first=20, second=3, third=50 -> 23.50
-                    if first >= 20 and first <= 90:
-                        amount = first + second + 0.50
-                    else:
-                        amount = second + 0.50
-                else:
-                    # Otherwise concatenate as digits (3-4-7 = 347)
-                    amount = first * 100 + second + third
-            elif len(parts) == 2:
-                # Pattern like "twenty five" = 25
-                first = word_numbers.get(parts[0], 0)
-                second = word_numbers.get(parts[1], 0)
-                
-                # If "fifty" at end, treat as .50
-                if parts[1] == 'fifty' and first < 100:
-                    amount = first + 0.50
-                # If first is tens (twenty, thirty, etc)
-                elif first >= 20 and first <= 90 and second < 10:
-                    amount = first + second
-                else:
-                    amount = first * 10 + second
-    
-    # If still no amount, try simple word numbers
-    if not amount:
-        for word, value in word_numbers.items():
-            if word in text and value >= 10:  # Only match tens and above as standalone
-                amount = value
-                break
-    
-    # Extract vendor
-    vendor = None
-    category = 'Materials - Other'
-    
-    # Check known construction vendors
-    for vendor_name, info in CONSTRUCTION_VENDORS.items():
-        if vendor_name in text:
-            vendor = ' '.join(word.capitalize() for word in vendor_name.split())
-            category = info['category']
-            break
-    
-    # If no known vendor, try patterns
-    if not vendor:
-        vendor_patterns = [
-            r'(?:at|from)\s+([a-zA-Z]+(?:\s+[a-zA-Z]+)*?)(?:\s+for|\s+on|\s|$)',
-            r'([a-zA-Z]+(?:\s+[a-zA-Z]+)*?)\s+(?:receipt|purchase)'
-        ]
-        
-        for pattern in vendor_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                vendor = match.group(1).strip()
-                vendor = ' '.join(word.capitalize() for word in vendor.split())
-                break
-    
-    if not vendor:
-        vendor = 'Unknown'
-    
-    # Auto-categorize based on keywords
-    category_keywords = {
-        'Materials - Lumber': ['lumber', 'wood', 'plywood', '2x4', '2x6', 'boards'],
-        'Materials - Electrical': ['wire', 'outlet', 'breaker', 'electrical'],
-        'Materials - Plumbing': ['pipe', 'fitting', 'valve', 'plumbing'],
-        'Equipment - Fuel': ['gas', 'diesel', 'fuel'],
-        'Labor - Crew': ['lunch', 'food', 'meal', 'crew'],
-        'Labor - Subcontractors': ['subcontractor', 'sub', 'contractor']
-    }
-    
-    for cat, keywords in category_keywords.items():
-        if any(keyword in text for keyword in keywords):
-            category = cat
-            break
-    
-    return {
-        'amount': amount,
-        'vendor': vendor,
-        'category': category,
-        'job_name': job_name,
-        'description': transcript,
-        'confidence': {
-            'amount': 0.9 if amount else 0,
-            'vendor': 0.95 if vendor != 'Unknown' else 0.3,
-            'job': 0.9 if job_name else 0,
-            'category': 0.85
-        }
-    }
+    """Parse voice transcript into expense data (see services.voice_parser)"""
+    return voice_parser.parse(transcript).to_dict()
 
 
 @expense_router.post("/voice", response_model=VoiceExpenseResponse)
@@ -2,7 +2,7 @@
 from fastapi import APIRouter, HTTPException, Response, Request
 from fastapi.responses import JSONResponse
 from middleware.monitoring import get_system_health, get_metrics
-from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
+from prometheus_client import CONTENT_TYPE_LATEST
 from utils.redis_manager import redis_manager
 from datetime import datetime, timezone
 import time
@@ -11,8 +11,10 @@ from core.version import __version__
 from services.email_service import EmailService
 from core.request_id import get_request_id
 from middleware.rate_limit import limiter
-import sqlite3
-import os
+from models.base import engine
+from models.replica import replica_router
+from utils.db_pool import pool_monitor
+from utils.write_queue import write_queue
 
 health_router = APIRouter()
 
@@ -38,20 +40,18 @@ async def detailed_health_check():
         "components": {}
     }
     
-    # Database health
+    # Database health (through the shared pool, not a side connection)
     try:
-        db_path = "cora.db"
-        if os.path.exists(db_path):
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
-            cursor.execute("SELECT 1")
-            conn.close()
-            health_status["components"]["database"] = "healthy"
-        else:
-            health_status["components"]["database"] = "missing"
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        health_status["components"]["database"] = "healthy"
     except Exception as e:
         health_status["components"]["database"] = f"error: {str(e)}"
         health_status["status"] = "unhealthy"
+    health_status["components"]["db_pool"] = pool_monitor.sample()
+    health_status["components"]["write_queue"] = write_queue.status()
+    if replica_router.configured:
+        health_status["components"]["replica"] = replica_router.status()
     
     # Redis health
     try:
@@ -74,8 +74,8 @@ async def detailed_health_check():
 @limiter.exempt
 @health_router.get("/metrics", operation_id="getMetrics", summary="Prometheus metrics")
 async def metrics():
-    """Prometheus metrics endpoint"""
-    data = generate_latest()
+    """Prometheus metrics endpoint (all workers in multiprocess mode)"""
+    data = get_metrics()
     return Response(content=data, media_type=CONTENT_TYPE_LATEST)
 
 @limiter.exempt
@@ -85,9 +85,8 @@ async def readiness_check():
     # Check if all critical services are ready
     try:
         # Database check
-        db_path = "cora.db"
-        if not os.path.exists(db_path):
-            raise HTTPException(status_code=503, detail="Database not ready")
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
         
         # Redis check (optional)
         if redis_manager.redis_client:
@@ -104,7 +103,6 @@ async def readiness_check():
 async def smoke(request: Request):
     """Lightweight admin diagnostics; protected via admin token or localhost-only."""
     import os
-    from models import engine  # exported in models.__init__
 
     admin_token = os.getenv("ADMIN_TOKEN") or os.getenv("CORA_ADMIN_TOKEN")
     if admin_token:
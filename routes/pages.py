@@ -10,8 +10,10 @@ from fastapi import APIRouter, Request, HTTPException
 from fastapi.responses import HTMLResponse, RedirectResponse
 from dependencies.auth import get_current_user
 from dependencies.auth_hybrid import get_current_user_hybrid
-from models import get_db
+from models import SessionLocal
+from utils.page_cache import cached_page
 from pathlib import Path
+import os
 import sys
 sys.path.append(str(Path(__file__).parent.parent))
 
@@ -26,6 +28,7 @@ router = APIRouter(
 # Test routes removed - use /dashboard for testing
 
 @router.get("/")
+@cached_page()
 async def root_page(request: Request):
     """Serve the main landing page"""
     return request.app.state.templates.TemplateResponse("index.html", {"request": request})
@@ -36,6 +39,7 @@ async def feature_flags_admin(request: Request):
     return request.app.state.templates.TemplateResponse("admin/feature-flags.html", {"request": request})
 
 @router.get("/about")
+@cached_page()
 async def about_page(request: Request):
     """Serve about page"""
     return request.app.state.templates.TemplateResponse("about.html", {"request": request})
@@ -51,7 +55,8 @@ async def demo_redirect():
     return RedirectResponse(url="/api/intelligence/demo")
 
 @router.get("/test-routes")
-async def test_routes_page():
+@cached_page()
+async def test_routes_page(request: Request):
     """Route testing page for debugging"""
     template_path = Path(__file__).parent.parent / "web" / "templates" / "route_test.html"
     if template_path.exists():
@@ -60,7 +65,8 @@ async def test_routes_page():
     return HTMLResponse(content="<h1>Route Test - Page Not Found</h1>")
 
 @router.get("/profit-intelligence")
-async def profit_intelligence_page():
+@cached_page()
+async def profit_intelligence_page(request: Request):
     """Serve profit intelligence page"""
     template_path = Path(__file__).parent.parent / "web" / "templates" / "profit_intelligence.html"
     if template_path.exists():
@@ -69,7 +75,8 @@ async def profit_intelligence_page():
     return HTMLResponse(content="<h1>Profit Intelligence - Page Not Found</h1>")
 
 @router.get("/insights")
-async def insights_dashboard_page():
+@cached_page()
+async def insights_dashboard_page(request: Request):
     """Serve AI insights dashboard page"""
     template_path = Path(__file__).parent.parent / "web" / "templates" / "insights_dashboard.html"
     if template_path.exists():
@@ -78,7 +85,8 @@ async def insights_dashboard_page():
     return HTMLResponse(content="<h1>AI Insights Dashboard - Page Not Found</h1>")
 
 @router.get("/analytics")
-async def user_analytics_page():
+@cached_page()
+async def user_analytics_page(request: Request):
     """Serve user analytics dashboard page"""
     template_path = Path(__file__).parent.parent / "web" / "templates" / "user_analytics.html"
     if template_path.exists():
@@ -87,7 +95,8 @@ async def user_analytics_page():
     return HTMLResponse(content="<h1>User Analytics Dashboard - Page Not Found</h1>")
 
 @router.get("/cora-personality-demo")
-async def cora_personality_demo():
+@cached_page()
+async def cora_personality_demo(request: Request):
     """Serve CORA personality demo page"""
     template_path = Path(__file__).parent.parent / "web" / "templates" / "cora_personality_demo.html"
     if template_path.exists():
@@ -96,7 +105,8 @@ async def cora_personality_demo():
     return HTMLResponse(content="<h1>CORA Personality Demo - Page Not Found</h1>")
 
 @router.get("/unified-ai-demo")
-async def unified_ai_demo():
+@cached_page()
+async def unified_ai_demo(request: Request):
     """Serve unified AI intelligence demo page"""
     template_path = Path(__file__).parent.parent / "web" / "templates" / "unified_ai_demo.html"
     if template_path.exists():
@@ -105,7 +115,8 @@ async def unified_ai_demo():
     return HTMLResponse(content="<h1>Unified AI Demo - Page Not Found</h1>")
 
 @router.get("/test-demo")
-async def test_demo_page():
+@cached_page()
+async def test_demo_page(request: Request):
     """Serve test demo page for debugging"""
     template_path = Path(__file__).parent.parent / "test_demo_page.html"
     if template_path.exists():
@@ -114,7 +125,8 @@ async def test_demo_page():
     return HTMLResponse(content="<h1>Test Demo - Page Not Found</h1>")
 
 @router.get("/debug-demo")
-async def debug_demo_page():
+@cached_page()
+async def debug_demo_page(request: Request):
     """Serve debug demo page for troubleshooting"""
     template_path = Path(__file__).parent.parent / "debug_demo.html"
     if template_path.exists():
@@ -123,11 +135,19 @@ async def debug_demo_page():
     return HTMLResponse(content="<h1>Debug Demo - Page Not Found</h1>")
 
 @router.get("/contact")
+@cached_page()
 async def contact_page(request: Request):
     """Serve contact page"""
     return request.app.state.templates.TemplateResponse("contact.html", {"request": request})
 
+def _payment_links(request: Request):
+    """Pricing CTAs are read from the environment at render time"""
+    return tuple(os.getenv(name) for name in (
+        "PAYMENT_LINK", "PAYMENT_LINK_SOLO", "PAYMENT_LINK_CREW", "PAYMENT_LINK_BUSINESS"
+    ))
+
 @router.get("/pricing")
+@cached_page(vary=_payment_links)
 async def pricing_page(request: Request):
     """Serve pricing page with payment link configuration"""
     import os
@@ -158,6 +178,7 @@ async def pricing_page(request: Request):
     return request.app.state.templates.TemplateResponse("pricing.html", context)
 
 @router.get("/pricing/success")
+@cached_page()
 async def pricing_success(request: Request):
     """Handle successful payment from Stripe Payment Link"""
     return request.app.state.templates.TemplateResponse(
@@ -166,6 +187,7 @@ async def pricing_success(request: Request):
     )
 
 @router.get("/pricing/cancel")
+@cached_page()
 async def pricing_cancel(request: Request):
     """Handle cancelled payment from Stripe Payment Link"""
     return request.app.state.templates.TemplateResponse(
@@ -174,11 +196,13 @@ async def pricing_cancel(request: Request):
     )
 
 @router.get("/select-plan")
+@cached_page()
 async def select_plan_page(request: Request):
     """Plan selection page - shown after signup, before onboarding"""
     return request.app.state.templates.TemplateResponse("select-plan.html", {"request": request})
 
 @router.get("/help/knowledge-base", response_class=HTMLResponse)
+@cached_page()
 async def knowledge_base_page(request: Request):
     return request.app.state.templates.TemplateResponse("help/knowledge-base.html", {"request": request})
 
@@ -191,6 +215,7 @@ async def subscription_page(request: Request, status: str = "", session_id: str
     )
 
 @router.get("/features")
+@cached_page()
 async def features_page(request: Request):
     """Serve features page"""
     return request.app.state.templates.TemplateResponse("features.html", {"request": request})
@@ -200,7 +225,8 @@ async def referral_dashboard(request: Request):
     return request.app.state.templates.TemplateResponse("referral.html", {"request": request})
 
 @router.get("/signup-clean")
-async def signup_clean():
+@cached_page()
+async def signup_clean(request: Request):
     """Clean signup page for testing"""
     template_path = Path(__file__).parent.parent / "web" / "templates" / "signup_clean.html"
     if template_path.exists():
@@ -219,17 +245,20 @@ async def test_inheritance(request: Request):
     return request.app.state.templates.TemplateResponse("test_inheritance.html", {"request": request})
 
 @router.get("/how-it-works")
+@cached_page()
 async def how_it_works_page(request: Request):
     """Serve how it works page"""
     return request.app.state.templates.TemplateResponse("how-it-works.html", {"request": request})
 
 @router.get("/reviews")
+@cached_page()
 async def reviews_page(request: Request):
     """Serve reviews page"""
     return request.app.state.templates.TemplateResponse("reviews.html", {"request": request})
 
 @router.get("/integrations/quickbooks")
-async def quickbooks_integration_page():
+@cached_page()
+async def quickbooks_integration_page(request: Request):
     """Serve QuickBooks integration page"""
     template_path = Path(__file__).parent.parent / "web" / "templates" / "integrations" / "quickbooks.html"
     if template_path.exists():
@@ -238,7 +267,8 @@ async def quickbooks_integration_page():
     return HTMLResponse(content="<h1>QuickBooks Integration - Page Not Found</h1>")
 
 @router.get("/integrations/stripe")
-async def stripe_integration_page():
+@cached_page()
+async def stripe_integration_page(request: Request):
     """Serve Stripe integration page"""
     template_path = Path(__file__).parent.parent / "web" / "templates" / "integrations" / "stripe.html"
     if template_path.exists():
@@ -247,7 +277,8 @@ async def stripe_integration_page():
     return HTMLResponse(content="<h1>Stripe Integration - Page Not Found</h1>")
 
 @router.get("/integrations")
-async def integrations_page():
+@cached_page()
+async def integrations_page(request: Request):
     """Serve integrations overview page"""
     return HTMLResponse(content="""
     <!DOCTYPE html>
@@ -307,21 +338,25 @@ async def integrations_page():
     """)
 
 @router.get("/integrations/plaid", response_class=HTMLResponse)
+@cached_page()
 async def integrations_plaid_page(request: Request):
     """Serve the Plaid integration page"""
     return request.app.state.templates.TemplateResponse("plaid_connect.html", {"request": request})
 
 @router.get("/bank-connect", response_class=HTMLResponse)
+@cached_page()
 async def bank_connect_page(request: Request):
     """Bank connection page (Plaid) - Premium feature"""
     return request.app.state.templates.TemplateResponse("plaid_connect.html", {"request": request})
 
 @router.get("/forgot-password", response_class=HTMLResponse)
+@cached_page()
 async def forgot_password_page(request: Request):
     """Password reset page"""
     return request.app.state.templates.TemplateResponse("forgot_password.html", {"request": request})
 
 @router.get("/reset-password", response_class=HTMLResponse)
+@cached_page()
 async def reset_password_page(request: Request):
     """Password reset page with token"""
     return request.app.state.templates.TemplateResponse("forgot_password.html", {"request": request})
@@ -340,6 +375,7 @@ async def jobs_redirect():
     return RedirectResponse(url="/dashboard", status_code=301)
 
 @router.get("/waitlist", response_class=HTMLResponse)
+@cached_page()
 async def waitlist_page(request: Request):
     """Serve the contractor waitlist signup page"""
     return request.app.state.templates.TemplateResponse("waitlist.html", {"request": request})
@@ -350,7 +386,8 @@ async def dashboard(request: Request):
     try:
         # Try to get user with hybrid auth (cookie or header)
         from dependencies.auth_hybrid import get_current_user_hybrid
-        current_user = await get_current_user_hybrid(request, None, next(get_db()))
+        with SessionLocal() as db:
+            current_user = await get_current_user_hybrid(request, None, db)
         # Use the actual dashboard template that exists
         return request.app.state.templates.TemplateResponse("core_protected/dashboard.html", {
             "request": request,
@@ -379,11 +416,13 @@ async def admin_dashboard(request: Request):
     return HTMLResponse(content="<h1>Admin Dashboard - Page Not Found</h1>")
 
 @router.get("/terms")
+@cached_page()
 async def terms_page(request: Request):
     """Serve Terms of Service page"""
     return request.app.state.templates.TemplateResponse("terms.html", {"request": request})
 
 @router.get("/privacy")
+@cached_page()
 async def privacy_page(request: Request):
     """Serve Privacy Policy page"""
     return request.app.state.templates.TemplateResponse("privacy.html", {"request": request})
@@ -403,7 +442,8 @@ async def receipts_page(request: Request):
     try:
         # Try to get user with hybrid auth (cookie or header)
         from dependencies.auth_hybrid import get_current_user_hybrid
-        current_user = await get_current_user_hybrid(request, None, next(get_db()))
+        with SessionLocal() as db:
+            current_user = await get_current_user_hybrid(request, None, db)
         
         template_path = Path(__file__).parent.parent / "web" / "templates" / "receipt_upload.html"
         if template_path.exists():
@@ -421,11 +461,13 @@ async def receipts_page(request: Request):
         return RedirectResponse(url="/login", status_code=302)
 
 @router.get("/signup")
+@cached_page()
 async def signup_page(request: Request):
     """Serve the signup page"""
     return request.app.state.templates.TemplateResponse("signup.html", {"request": request})
 
 @router.get("/login")
+@cached_page()
 async def login_page(request: Request):
     """Serve the login page"""
     return request.app.state.templates.TemplateResponse("login.html", {"request": request})
@@ -463,10 +505,10 @@ async def expenses_page(request: Request):
     try:
         # Try to get current user for authenticated experience
         from dependencies.auth_hybrid import get_current_user_hybrid
-        from dependencies.database import get_db
-        
+
         try:
-            current_user = await get_current_user_hybrid(request, None, next(get_db()))
+            with SessionLocal() as db:
+                current_user = await get_current_user_hybrid(request, None, db)
         except:
             current_user = None
             
@@ -520,6 +562,7 @@ async def reports_page(request: Request):
     """)
 
 @router.get("/help")
+@cached_page()
 async def help_page(request: Request):
     """Serve help page"""
     return request.app.state.templates.TemplateResponse("help.html", {"request": request})
@@ -558,7 +601,8 @@ async def demo_page():
     """)
 
 @router.get("/careers")
-async def careers_page():
+@cached_page()
+async def careers_page(request: Request):
     """Serve careers page"""
     return HTMLResponse(content="""
     <!DOCTYPE html>
@@ -589,7 +633,8 @@ async def careers_page():
     """)
 
 @router.get("/press")
-async def press_page():
+@cached_page()
+async def press_page(request: Request):
     """Serve press page"""
     return HTMLResponse(content="""
     <!DOCTYPE html>
@@ -620,7 +665,8 @@ async def press_page():
     """)
 
 @router.get("/security")
-async def security_page():
+@cached_page()
+async def security_page(request: Request):
     """Serve security page"""
     return HTMLResponse(content="""
     <!DOCTYPE html>
@@ -651,7 +697,8 @@ async def security_page():
     """)
 
 @router.get("/forgot-password")
-async def forgot_password_page():
+@cached_page()
+async def forgot_password_page(request: Request):
     """Serve forgot password page"""
     return HTMLResponse(content="""
     <!DOCTYPE html>
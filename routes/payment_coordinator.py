@@ -22,10 +22,10 @@ from models import get_db
 from models.subscription import Subscription
 from config import config
 
-try:
-    import stripe
-except Exception as _e:
-    stripe = None
+from utils.lazy_import import lazy_import
+
+# Stripe SDK is imported on first payment call, not at worker boot
+stripe = lazy_import("stripe", optional=True)
 from dependencies.auth import get_current_user
 from models.payment import Payment
 
@@ -2,29 +2,25 @@
 """
 🧭 LOCATION: /CORA/routes/pdf_export.py
 🎯 PURPOSE: PDF export API endpoints for profit intelligence reports
-🔗 IMPORTS: FastAPI, PDF exporter, authentication
+🔗 IMPORTS: FastAPI, services.report_renderer, authentication
 📤 EXPORTS: PDF export router
+
+Report requests answer 202 with a job to poll (or 200 when the same data was
+already rendered); ReportLab runs in services.report_renderer's process pool,
+never in the request. Downloads stream the cached file.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse, JSONResponse
 from sqlalchemy.orm import Session
-from typing import Dict, Any, Optional
-import os
+from typing import Dict, Any
+import copy
 from datetime import datetime
 
 from models import get_db, User
 from dependencies.auth import get_current_user
-from utils.pdf_exporter import pdf_exporter
-from services.profit_leak_detector import ProfitLeakDetector
-from utils.error_constants import (
-    ErrorMessages, 
-    STATUS_NOT_FOUND, 
-    STATUS_FORBIDDEN, 
-    STATUS_SERVER_ERROR,
-    STATUS_BAD_REQUEST,
-    ERROR_ACCESS_DENIED
-)
+from services.report_renderer import report_renderer
+from utils.error_constants import ErrorMessages, STATUS_NOT_FOUND
 
 router = APIRouter(
     prefix="/api/pdf-export",
@@ -51,156 +47,130 @@ def calculate_intelligence_score(db: Session, user_id: int) -> int:
     
     return min(100, base_score)  # Cap at 100
 
+# DEMO DATA: sample profit intelligence used for the PDF sections
+DEMO_REPORT_DATA: Dict[str, Any] = {
+    "intelligenceScore": 87,
+    "letterGrade": "B+",
+    "forecast": {
+        "months": ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun'],
+        "actual": [45000, 52000, 48000, 55000, 58000, 62000],
+        "predicted": [None, None, None, 61000, 65000, 68000]
+    },
+    "vendors": [
+        {"name": "ABC Construction", "performance": 92, "cost": 45000, "trend": 5.2},
+        {"name": "XYZ Materials", "performance": 88, "cost": 32000, "trend": -2.1},
+        {"name": "Best Tools Co", "performance": 85, "cost": 28000, "trend": 1.8},
+        {"name": "Quality Lumber", "performance": 82, "cost": 22000, "trend": -1.5},
+        {"name": "Pro Electric", "performance": 79, "cost": 18000, "trend": 3.2}
+    ],
+    "jobs": [
+        {"name": "Kitchen Remodel - Smith", "risk": "high", "potential": 25000, "completion": 65},
+        {"name": "Bathroom Addition - Johnson", "risk": "low", "potential": 18000, "completion": 85},
+        {"name": "Deck Construction - Davis", "risk": "medium", "potential": 12000, "completion": 45}
+    ],
+    "pricing": {
+        "marketAverage": 118,
+        "yourAverage": 125,
+        "recommendations": [
+            {"service": "Kitchen Remodel", "currentPrice": 125, "suggestedPrice": 135, "confidence": 85},
+            {"service": "Bathroom Remodel", "currentPrice": 95, "suggestedPrice": 102, "confidence": 78},
+            {"service": "Deck Construction", "currentPrice": 45, "suggestedPrice": 48, "confidence": 92}
+        ]
+    },
+    "benchmarks": {
+        "profitMargin": {"your": 18.5, "industry": 15.2},
+        "completionRate": {"your": 94, "industry": 87},
+        "satisfaction": {"your": 4.2, "industry": 3.8},
+        "efficiency": {"your": 78, "industry": 72}
+    }
+}
+
+VALID_SECTIONS = ["forecasting", "vendors", "jobs", "pricing", "benchmarks"]
+
+
+def build_report_data(db: Session, user_id: int, section: str) -> Dict[str, Any]:
+    """Data for one report; its hash is the cache version, so it must not contain timestamps"""
+    data = copy.deepcopy(DEMO_REPORT_DATA)
+    if section == "full":
+        data.update({
+            "is_demo_data": True,  # IMPORTANT: This is demonstration data
+            "intelligenceScore": calculate_intelligence_score(db, user_id),  # Real calculation
+            "monthlySavingsPotential": 15420,
+            "costTrend": -12.5,
+            "vendorCount": 23,
+        })
+    return data
+
+
+def _job_response(job) -> JSONResponse:
+    return JSONResponse(status_code=202 if job.status == "pending" else 200, content=job.to_dict())
+
+
+def _submit(db: Session, user: User, section: str) -> JSONResponse:
+    try:
+        job = report_renderer.submit(user.id, section, build_report_data(db, user.id, section))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to queue {section} report: {str(e)}")
+    return _job_response(job)
+
+
 @router.post("/profit-intelligence/full-report")
 async def generate_full_profit_intelligence_report(
-    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
-) -> Dict[str, Any]:
+) -> JSONResponse:
     """
-    Generate comprehensive profit intelligence PDF report
+    Queue the comprehensive profit intelligence PDF report
     Includes all 5 sections: forecasting, vendors, jobs, pricing, benchmarks
+    202 with a job to poll, or 200 when this data was already rendered
     """
-    try:
-        # Get profit intelligence data
-        detector = ProfitLeakDetector(db, current_user.id)
-        
-        # DEMO DATA: Using sample data for PDF generation
-        data = {
-            "is_demo_data": True,  # IMPORTANT: This is demonstration data
-            "intelligenceScore": calculate_intelligence_score(db, current_user.id),  # Real calculation
-            "letterGrade": "B+",  # (DEMO)
-            "monthlySavingsPotential": 15420,
-            "costTrend": -12.5,
-            "vendorCount": 23,
-            "forecast": {
-                "months": ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun'],
-                "actual": [45000, 52000, 48000, 55000, 58000, 62000],
-                "predicted": [None, None, None, 61000, 65000, 68000]
-            },
-            "vendors": [
-                {"name": "ABC Construction", "performance": 92, "cost": 45000, "trend": 5.2},
-                {"name": "XYZ Materials", "performance": 88, "cost": 32000, "trend": -2.1},
-                {"name": "Best Tools Co", "performance": 85, "cost": 28000, "trend": 1.8},
-                {"name": "Quality Lumber", "performance": 82, "cost": 22000, "trend": -1.5},
-                {"name": "Pro Electric", "performance": 79, "cost": 18000, "trend": 3.2}
-            ],
-            "jobs": [
-                {"name": "Kitchen Remodel - Smith", "risk": "high", "potential": 25000, "completion": 65},
-                {"name": "Bathroom Addition - Johnson", "risk": "low", "potential": 18000, "completion": 85},
-                {"name": "Deck Construction - Davis", "risk": "medium", "potential": 12000, "completion": 45}
-            ],
-            "pricing": {
-                "marketAverage": 118,
-                "yourAverage": 125,
-                "recommendations": [
-                    {"service": "Kitchen Remodel", "currentPrice": 125, "suggestedPrice": 135, "confidence": 85},
-                    {"service": "Bathroom Remodel", "currentPrice": 95, "suggestedPrice": 102, "confidence": 78},
-                    {"service": "Deck Construction", "currentPrice": 45, "suggestedPrice": 48, "confidence": 92}
-                ]
-            },
-            "benchmarks": {
-                "profitMargin": {"your": 18.5, "industry": 15.2},
-                "completionRate": {"your": 94, "industry": 87},
-                "satisfaction": {"your": 4.2, "industry": 3.8},
-                "efficiency": {"your": 78, "industry": 72}
-            }
-        }
-        
-        # Generate PDF report
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"profit_intelligence_full_report_{current_user.id}_{timestamp}.pdf"
-        output_path = f"reports/{filename}"
-        
-        pdf_path = pdf_exporter.generate_profit_intelligence_report(data, output_path)
-        
-        return {
-            "status": "success",
-            "message": "Full profit intelligence report generated successfully",
-            "filename": filename,
-            "download_url": f"/api/pdf-export/download/{filename}",
-            "generated_at": datetime.now().isoformat()
-        }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to generate report: {str(e)}")
+    return _submit(db, current_user, "full")
 
 @router.post("/profit-intelligence/section/{section_name}")
 async def generate_section_report(
     section_name: str,
-    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
-) -> Dict[str, Any]:
+) -> JSONResponse:
     """
-    Generate PDF report for a specific profit intelligence section
+    Queue the PDF report for a specific profit intelligence section
     Valid sections: forecasting, vendors, jobs, pricing, benchmarks
     """
-    valid_sections = ["forecasting", "vendors", "jobs", "pricing", "benchmarks"]
-    
-    if section_name not in valid_sections:
-        raise HTTPException(status_code=400, detail=f"Invalid section. Must be one of: {valid_sections}")
-    
-    try:
-        # Get section-specific data
-        detector = ProfitLeakDetector(db, current_user.id)
-        
-        # Mock data for now - will be replaced with real data
-        data = {
-            "intelligenceScore": 87,
-            "letterGrade": "B+",
-            "forecast": {
-                "months": ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun'],
-                "actual": [45000, 52000, 48000, 55000, 58000, 62000],
-                "predicted": [None, None, None, 61000, 65000, 68000]
-            },
-            "vendors": [
-                {"name": "ABC Construction", "performance": 92, "cost": 45000, "trend": 5.2},
-                {"name": "XYZ Materials", "performance": 88, "cost": 32000, "trend": -2.1},
-                {"name": "Best Tools Co", "performance": 85, "cost": 28000, "trend": 1.8},
-                {"name": "Quality Lumber", "performance": 82, "cost": 22000, "trend": -1.5},
-                {"name": "Pro Electric", "performance": 79, "cost": 18000, "trend": 3.2}
-            ],
-            "jobs": [
-                {"name": "Kitchen Remodel - Smith", "risk": "high", "potential": 25000, "completion": 65},
-                {"name": "Bathroom Addition - Johnson", "risk": "low", "potential": 18000, "completion": 85},
-                {"name": "Deck Construction - Davis", "risk": "medium", "potential": 12000, "completion": 45}
-            ],
-            "pricing": {
-                "marketAverage": 118,
-                "yourAverage": 125,
-                "recommendations": [
-                    {"service": "Kitchen Remodel", "currentPrice": 125, "suggestedPrice": 135, "confidence": 85},
-                    {"service": "Bathroom Remodel", "currentPrice": 95, "suggestedPrice": 102, "confidence": 78},
-                    {"service": "Deck Construction", "currentPrice": 45, "suggestedPrice": 48, "confidence": 92}
-                ]
-            },
-            "benchmarks": {
-                "profitMargin": {"your": 18.5, "industry": 15.2},
-                "completionRate": {"your": 94, "industry": 87},
-                "satisfaction": {"your": 4.2, "industry": 3.8},
-                "efficiency": {"your": 78, "industry": 72}
-            }
-        }
-        
-        # Generate section-specific PDF report
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{section_name}_report_{current_user.id}_{timestamp}.pdf"
-        output_path = f"reports/{filename}"
-        
-        pdf_path = pdf_exporter.generate_section_report(section_name, data, output_path)
-        
-        return {
-            "status": "success",
-            "message": f"{section_name.title()} report generated successfully",
-            "filename": filename,
-            "download_url": f"/api/pdf-export/download/{filename}",
-            "section": section_name,
-            "generated_at": datetime.now().isoformat()
-        }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to generate {section_name} report: {str(e)}")
+    if section_name not in VALID_SECTIONS:
+        raise HTTPException(status_code=400, detail=f"Invalid section. Must be one of: {VALID_SECTIONS}")
+    return _submit(db, current_user, section_name)
+
+@router.get("/jobs/{job_id}")
+async def get_report_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user)
+) -> JSONResponse:
+    """
+    Poll a report job: 202 while rendering, 200 once ready (or failed)
+    """
+    job = report_renderer.get(job_id, current_user.id)
+    if job is None:
+        raise HTTPException(status_code=STATUS_NOT_FOUND, detail=ErrorMessages.not_found("report job"))
+    return _job_response(job)
+
+@router.get("/jobs/{job_id}/download")
+async def download_report_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user)
+) -> FileResponse:
+    """
+    Stream a rendered report
+    """
+    job = report_renderer.get(job_id, current_user.id)
+    if job is None:
+        raise HTTPException(status_code=STATUS_NOT_FOUND, detail=ErrorMessages.not_found("report job"))
+    if job.status == "pending":
+        raise HTTPException(status_code=409, detail="Report is still rendering")
+    if job.status == "failed":
+        raise HTTPException(status_code=500, detail=f"Report generation failed: {job.error}")
+    if not job.path.is_file():
+        raise HTTPException(status_code=STATUS_NOT_FOUND, detail=ErrorMessages.not_found("report file"))
+    return FileResponse(path=job.path, filename=job.filename, media_type='application/pdf')
 
 @router.get("/download/{filename}")
 async def download_pdf_report(
@@ -210,26 +180,14 @@ async def download_pdf_report(
     """
     Download a generated PDF report
     """
-    try:
-        file_path = f"reports/{filename}"
-        
-        if not os.path.exists(file_path):
-            raise HTTPException(status_code=STATUS_NOT_FOUND, detail=ErrorMessages.not_found("report file"))
-        
-        # Basic security check - ensure user can only download their own reports
-        if str(current_user.id) not in filename:
-            raise HTTPException(status_code=STATUS_FORBIDDEN, detail=ERROR_ACCESS_DENIED)
-        
-        return FileResponse(
-            path=file_path,
-            filename=filename,
-            media_type='application/pdf'
-        )
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to download report: {str(e)}")
+    file_path = report_renderer.user_file(current_user.id, filename)
+    if file_path is None:
+        raise HTTPException(status_code=STATUS_NOT_FOUND, detail=ErrorMessages.not_found("report file"))
+    return FileResponse(
+        path=file_path,
+        filename=filename,
+        media_type='application/pdf'
+    )
 
 @router.get("/reports/list")
 async def list_user_reports(
@@ -239,8 +197,8 @@ async def list_user_reports(
     List all PDF reports generated by the user
     """
     try:
-        reports_dir = "reports"
-        if not os.path.exists(reports_dir):
+        reports_dir = report_renderer.user_dir(current_user.id)
+        if not reports_dir.exists():
             return {
                 "status": "success",
                 "reports": [],
@@ -248,17 +206,14 @@ async def list_user_reports(
             }
         
         user_reports = []
-        for filename in os.listdir(reports_dir):
-            if filename.endswith('.pdf') and str(current_user.id) in filename:
-                file_path = os.path.join(reports_dir, filename)
-                file_stats = os.stat(file_path)
-                
-                user_reports.append({
-                    "filename": filename,
-                    "size_bytes": file_stats.st_size,
-                    "created_at": datetime.fromtimestamp(file_stats.st_ctime).isoformat(),
-                    "download_url": f"/api/pdf-export/download/{filename}"
-                })
+        for file_path in reports_dir.glob("*.pdf"):
+            file_stats = file_path.stat()
+            user_reports.append({
+                "filename": file_path.name,
+                "size_bytes": file_stats.st_size,
+                "created_at": datetime.fromtimestamp(file_stats.st_mtime).isoformat(),
+                "download_url": f"/api/pdf-export/download/{file_path.name}"
+            })
         
         # Sort by creation date (newest first)
         user_reports.sort(key=lambda x: x['created_at'], reverse=True)
@@ -281,16 +236,12 @@ async def delete_report(
     Delete a user's PDF report
     """
     try:
-        file_path = f"reports/{filename}"
-        
-        if not os.path.exists(file_path):
+        # Only files in the user's own report directory resolve
+        file_path = report_renderer.user_file(current_user.id, filename)
+        if file_path is None:
             raise HTTPException(status_code=STATUS_NOT_FOUND, detail=ErrorMessages.not_found("report file"))
         
-        # Security check - ensure user can only delete their own reports
-        if str(current_user.id) not in filename:
-            raise HTTPException(status_code=STATUS_FORBIDDEN, detail=ERROR_ACCESS_DENIED)
-        
-        os.remove(file_path)
+        file_path.unlink()
         
         return {
             "status": "success",
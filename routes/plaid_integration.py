@@ -6,11 +6,12 @@
 📤 EXPORTS: plaid_router
 """
 
+import asyncio
 import logging
 import traceback
 from typing import Optional, List
 from fastapi import APIRouter, HTTPException, Depends, Request, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, sessionmaker
 from pydantic import BaseModel
 import json
 from datetime import datetime
@@ -18,16 +19,16 @@ from datetime import datetime
 from models import get_db
 from models.plaid_integration import PlaidIntegration, PlaidAccount, PlaidTransaction, PlaidSyncHistory
 from dependencies.auth import get_current_user
-from services.plaid_service import PlaidService
+from services.plaid_service import (
+    PlaidService, WebhookVerificationError, plaid_sync_scheduler, plaid_webhook_verifier, sync_items
+)
 from config import config as app_config
-from plaid.model.link_token_create_request import LinkTokenCreateRequest
-from plaid.model.link_token_create_request_user import LinkTokenCreateRequestUser
-from plaid.model.products import Products
-from plaid.model.country_code import CountryCode
-from plaid.model.item_public_token_exchange_request import ItemPublicTokenExchangeRequest
-from plaid.configuration import Configuration
-from plaid.api_client import ApiClient
-from plaid.api import plaid_api
+# Plaid SDK models are imported inside the handlers that use them (heavy, rarely hit)
+
+# TRANSACTIONS webhook codes that mean the item has changes to pull
+TRANSACTION_WEBHOOK_CODES = {
+    "SYNC_UPDATES_AVAILABLE", "INITIAL_UPDATE", "HISTORICAL_UPDATE", "DEFAULT_UPDATE", "TRANSACTIONS_REMOVED"
+}
 
 # Create router
 plaid_router = APIRouter(
@@ -62,6 +63,14 @@ def create_plaid_link_token(client_user_id: str) -> str:
     """
     Create a Plaid link token
     """
+    from plaid.api import plaid_api
+    from plaid.api_client import ApiClient
+    from plaid.configuration import Configuration
+    from plaid.model.country_code import CountryCode
+    from plaid.model.link_token_create_request import LinkTokenCreateRequest
+    from plaid.model.link_token_create_request_user import LinkTokenCreateRequestUser
+    from plaid.model.products import Products
+    
     try:
         # Initialize Plaid client
         configuration = Configuration(
@@ -107,7 +116,7 @@ class PlaidAccessTokenRequest(BaseModel):
 
 class PlaidSyncRequest(BaseModel):
     """Request model for transaction sync"""
-    days_back: Optional[int] = 30
+    days_back: Optional[int] = 30  # Unused: each item syncs from its stored cursor
 
 class PlaidSyncResponse(BaseModel):
     """Response model for sync operations"""
@@ -191,6 +200,12 @@ async def exchange_public_token(
     db: Session = Depends(get_db)
 ):
     """Exchange public token for access token"""
+    from plaid.api import plaid_api
+    from plaid.api_client import ApiClient
+    from plaid.configuration import Configuration
+    from plaid.model.country_code import CountryCode
+    from plaid.model.item_public_token_exchange_request import ItemPublicTokenExchangeRequest
+    
     try:
         # Get request body
         body = await request.json()
@@ -365,39 +380,82 @@ async def sync_transactions(
     current_user: str = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Sync transactions from Plaid"""
+    """Sync new, changed and removed transactions for all of the user's connected items"""
     try:
-        # Get user's integration
-        integration = db.query(PlaidIntegration).filter(
-            PlaidIntegration.user_id == current_user,
+        # Get user's integrations
+        integration_ids = [row.id for row in db.query(PlaidIntegration.id).filter(
+            PlaidIntegration.user_email == current_user.email,
             PlaidIntegration.is_active == True
-        ).first()
+        )]
         
-        if not integration:
+        if not integration_ids:
             raise HTTPException(
                 status_code=400,
                 detail="Plaid integration not found"
             )
         
-        # Initialize Plaid service
-        plaid_service = PlaidService(integration)
-        
-        # Sync transactions
-        result = plaid_service.sync_transactions_to_cora(db, days_back=request.days_back or 30)
+        # Items sync in parallel, each in its own session
+        results = await asyncio.to_thread(
+            sync_items, integration_ids, sessionmaker(bind=db.get_bind(), autoflush=False)
+        )
         
         return PlaidSyncResponse(
-            success=result["success"],
-            synced_count=result["synced_count"],
-            errors=result["errors"],
-            sync_history=result["sync_history"]
+            success=all(result["success"] for result in results.values()),
+            synced_count=sum(result["synced_count"] for result in results.values()),
+            errors=[error for result in results.values() for error in result.get("errors", [])],
+            sync_history=[entry for result in results.values() for entry in result.get("sync_history", [])]
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Failed to sync transactions: {str(e)}"
         )
 
+@plaid_router.post("/webhook")
+async def plaid_webhook(
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    """Plaid webhook: schedule a background sync for the item whose transactions changed
+
+    Unauthenticated and CSRF-exempt, so nothing happens until the
+    Plaid-Verification JWT proves Plaid signed this exact body.
+    """
+    raw = await request.body()
+    try:
+        await plaid_webhook_verifier.verify(raw, request.headers.get("Plaid-Verification"))
+    except WebhookVerificationError as e:
+        logging.warning(f"Rejected Plaid webhook: {e}")
+        raise HTTPException(status_code=401, detail="Invalid webhook signature")
+    
+    try:
+        body = json.loads(raw)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid webhook payload")
+    if not isinstance(body, dict):
+        raise HTTPException(status_code=400, detail="Invalid webhook payload")
+    
+    webhook_type = body.get("webhook_type")
+    webhook_code = body.get("webhook_code")
+    item_id = body.get("item_id")
+    if webhook_type != "TRANSACTIONS" or webhook_code not in TRANSACTION_WEBHOOK_CODES or not item_id:
+        return {"received": True, "scheduled": False}
+    
+    known = db.query(PlaidIntegration.id).filter(
+        PlaidIntegration.item_id == item_id,
+        PlaidIntegration.is_active == True
+    ).first()
+    if not known:
+        logging.warning(f"Plaid webhook {webhook_code} for unknown item {item_id}")
+        return {"received": True, "scheduled": False}
+    
+    # Acknowledge at once; repeated webhooks for an item already syncing fold into one more run
+    queued = plaid_sync_scheduler.schedule(item_id)
+    return {"received": True, "scheduled": True, "coalesced": not queued}
+
 @plaid_router.get("/sync/history")
 async def get_sync_history(
     current_user: str = Depends(get_current_user),
@@ -10,6 +10,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import Dict, Any, Optional
 from dependencies.database import get_db
+from models.replica import get_analytics_db
 from dependencies.auth import get_current_user
 from services.profit_leak_detector import ProfitLeakDetector
 from models.user import User
@@ -19,7 +20,7 @@ router = APIRouter(prefix="/api/profit-analysis", tags=["profit-analysis"])
 @router.get("/leak-detection")
 async def analyze_profit_leaks(
     months_back: int = Query(6, ge=1, le=24, description="Number of months to analyze"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_analytics_db),
     current_user: User = Depends(get_current_user)
 ) -> Dict[str, Any]:
     """
@@ -151,7 +152,7 @@ async def get_seasonal_patterns(
 @router.get("/cost-forecast")
 async def get_cost_forecast(
     forecast_months: int = Query(3, ge=1, le=12, description="Number of months to forecast"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_analytics_db),
     current_user: User = Depends(get_current_user)
 ) -> Dict[str, Any]:
     """
@@ -217,7 +218,7 @@ async def smart_expense_categorization(
 
 @router.get("/vendor-performance")
 async def get_vendor_performance_analysis(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_analytics_db),
     current_user: User = Depends(get_current_user)
 ) -> Dict[str, Any]:
     """
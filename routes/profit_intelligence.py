@@ -12,6 +12,7 @@ from typing import Dict, Any, List, Optional
 from datetime import datetime
 
 from models import get_db, User
+from models.replica import get_analytics_db
 from services.profit_leak_detector import ProfitLeakDetector
 from features.profit_intelligence.advanced_analytics import ProfitIntelligenceEngine
 from dependencies.auth import get_current_user
@@ -26,7 +27,7 @@ router = APIRouter(
 async def get_cost_forecast(
     months: int = Query(3, ge=1, le=12, description="Number of months to forecast"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_analytics_db)
 ) -> Dict[str, Any]:
     """
     Generate AI-powered cost predictions for future months
@@ -48,7 +49,7 @@ async def get_cost_forecast(
 @router.get("/vendor-performance")
 async def analyze_vendor_performance(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_analytics_db)
 ) -> Dict[str, Any]:
     """
     Get comprehensive vendor performance analysis with scoring
@@ -223,7 +224,7 @@ async def analyze_network_effects(
 @router.get("/profit-intelligence-summary")
 async def get_profit_intelligence_summary(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_analytics_db)
 ) -> Dict[str, Any]:
     """
     Get comprehensive profit intelligence summary dashboard
@@ -213,7 +213,7 @@ async def sync_expenses(
     try:
         # Get user's integration
         integration = db.query(QuickBooksIntegration).filter(
-            QuickBooksIntegration.user_id == current_user,
+            QuickBooksIntegration.user_email == current_user.email,
             QuickBooksIntegration.is_active == True
         ).first()
         
@@ -233,7 +233,7 @@ async def sync_expenses(
                 # Update integration with new tokens
                 integration.access_token = new_tokens['access_token']
                 integration.refresh_token = new_tokens.get('refresh_token', integration.refresh_token)
-                integration.token_expiry = datetime.utcnow() + timedelta(seconds=new_tokens.get('expires_in', 3600))
+                integration.token_expires_at = datetime.utcnow() + timedelta(seconds=new_tokens.get('expires_in', 3600))
                 
                 db.commit()
                 logger.info(f"Refreshed QuickBooks token for user {current_user.email}")
@@ -250,10 +250,10 @@ async def sync_expenses(
         # Sync expenses
         if request.expense_ids:
             # Sync specific expenses
-            result = await qb_service.sync_expenses_by_ids(request.expense_ids)
+            result = await qb_service.sync_expenses_by_ids(request.expense_ids, db)
         else:
-            # Sync all unsynced expenses
-            result = await qb_service.sync_all_unsynced_expenses()
+            # Sync all new or changed expenses
+            result = await qb_service.sync_all_unsynced_expenses(db)
         
         return QuickBooksSyncResponse(
             success=result["success"],
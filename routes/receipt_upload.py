@@ -10,8 +10,6 @@ from datetime import datetime
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
 from sqlalchemy.orm import Session
-from PIL import Image
-import pytesseract
 import re
 from decimal import Decimal
 
@@ -19,6 +17,12 @@ from models.user import User
 from models.expense import Expense
 from dependencies.auth import get_current_user
 from dependencies.database import get_db
+from services.categorization_engine import receipt_matcher
+from utils.lazy_import import lazy_import
+
+# OCR stack is imported on the first upload, not at worker boot
+Image = lazy_import("PIL.Image")
+pytesseract = lazy_import("pytesseract")
 
 router = APIRouter(prefix="/api/receipts", tags=["receipts"])
 
@@ -104,24 +108,7 @@ def extract_merchant_from_text(text: str) -> Optional[str]:
 
 def categorize_expense(merchant: str, description: str) -> Optional[str]:
     """Auto-categorize expense based on merchant and description"""
-    # Simple keyword-based categorization
-    categories = {
-        'food': ['restaurant', 'cafe', 'coffee', 'pizza', 'burger', 'subway', 'mcdonalds', 'starbucks'],
-        'transportation': ['uber', 'lyft', 'taxi', 'gas', 'fuel', 'shell', 'exxon', 'chevron'],
-        'office': ['staples', 'office depot', 'amazon', 'walmart', 'target'],
-        'utilities': ['electric', 'water', 'gas', 'internet', 'phone', 'verizon', 'at&t'],
-        'entertainment': ['netflix', 'spotify', 'movie', 'theater', 'concert'],
-        'travel': ['hotel', 'airbnb', 'airline', 'delta', 'united', 'american'],
-    }
-    
-    text = f"{merchant} {description}".lower()
-    
-    for category, keywords in categories.items():
-        for keyword in keywords:
-            if keyword in text:
-                return category
-    
-    return 'other'
+    return receipt_matcher.match(f"{merchant} {description}")
 
 @router.post("/upload")
 async def upload_receipt(
@@ -4,6 +4,7 @@ Targets blue ocean opportunities and pain point keywords
 """
 from fastapi import APIRouter, Request
 from fastapi.responses import HTMLResponse
+from utils.page_cache import cached_page
 import os
 
 router = APIRouter()
@@ -11,6 +12,7 @@ router = APIRouter()
 
 # Real-Time Profit Tracking Landing Page
 @router.get("/real-time-profit-tracking", response_class=HTMLResponse)
+@cached_page()
 async def real_time_profit_tracking(request: Request):
     """Landing page for 'real time construction profit tracking' keyword"""
     return request.app.state.templates.TemplateResponse("seo/real-time-profit-tracking.html", {
@@ -22,6 +24,7 @@ async def real_time_profit_tracking(request: Request):
 
 # Voice Input Construction Software
 @router.get("/voice-input-construction", response_class=HTMLResponse)
+@cached_page()
 async def voice_input_construction(request: Request):
     """Landing page for 'voice input construction software' keyword"""
     return request.app.state.templates.TemplateResponse("seo/voice-input-construction.html", {
@@ -33,6 +36,7 @@ async def voice_input_construction(request: Request):
 
 # Lost Money on Construction Job
 @router.get("/why-construction-jobs-lose-money", response_class=HTMLResponse)
+@cached_page()
 async def why_jobs_lose_money(request: Request):
     """Landing page for 'lost money on construction job' pain point"""
     return request.app.state.templates.TemplateResponse("seo/why-jobs-lose-money.html", {
@@ -44,6 +48,7 @@ async def why_jobs_lose_money(request: Request):
 
 # Mobile Job Costing
 @router.get("/mobile-job-costing", response_class=HTMLResponse)
+@cached_page()
 async def mobile_job_costing(request: Request):
     """Landing page for 'mobile construction job costing' keyword"""
     return request.app.state.templates.TemplateResponse("seo/mobile-job-costing.html", {
@@ -55,6 +60,7 @@ async def mobile_job_costing(request: Request):
 
 # AI Budget Alerts
 @router.get("/ai-budget-alerts", response_class=HTMLResponse)
+@cached_page()
 async def ai_budget_alerts(request: Request):
     """Landing page for 'construction AI financial alerts' keyword"""
     return request.app.state.templates.TemplateResponse("seo/ai-budget-alerts.html", {
@@ -66,6 +72,7 @@ async def ai_budget_alerts(request: Request):
 
 # Location-Specific Pages
 @router.get("/texas-contractors", response_class=HTMLResponse)
+@cached_page()
 async def texas_contractors(request: Request):
     """Local SEO page for Texas contractors"""
     return request.app.state.templates.TemplateResponse("seo/location/texas-contractors.html", {
@@ -76,6 +83,7 @@ async def texas_contractors(request: Request):
     })
 
 @router.get("/florida-construction-software", response_class=HTMLResponse)
+@cached_page()
 async def florida_construction(request: Request):
     """Local SEO page for Florida contractors"""
     return request.app.state.templates.TemplateResponse("seo/location/florida-construction.html", {
@@ -86,6 +94,7 @@ async def florida_construction(request: Request):
     })
 
 @router.get("/california-contractor-tools", response_class=HTMLResponse)
+@cached_page()
 async def california_contractors(request: Request):
     """Local SEO page for California contractors"""
     return request.app.state.templates.TemplateResponse("seo/location/california-contractors.html", {
@@ -96,6 +105,7 @@ async def california_contractors(request: Request):
     })
 
 @router.get("/new-york-construction-profit-tracking", response_class=HTMLResponse)
+@cached_page()
 async def new_york_construction(request: Request):
     """Local SEO page for New York contractors"""
     return request.app.state.templates.TemplateResponse("seo/location/new-york-construction.html", {
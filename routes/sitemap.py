@@ -2,10 +2,12 @@
 XML Sitemap Generation for SEO
 Provides dynamic sitemap with all pages and priority settings
 """
-from fastapi import APIRouter, Response
+from fastapi import APIRouter, Request, Response
 from datetime import datetime, timezone
 import xml.etree.ElementTree as ET
 
+from utils.page_cache import cached_page, page_cache
+
 router = APIRouter()
 
 # Define pages with their priorities and change frequencies
@@ -45,15 +47,16 @@ PAGES = [
 ]
 
 @router.get("/sitemap.xml", response_class=Response)
-async def generate_sitemap():
-    """Generate XML sitemap for search engines"""
+@cached_page()
+async def generate_sitemap(request: Request):
+    """Generate XML sitemap for search engines (rendered once per deploy)"""
     
     # Create root element
     urlset = ET.Element("urlset")
     urlset.set("xmlns", "http://www.sitemaps.org/schemas/sitemap/0.9")
     
-    # Current timestamp
-    lastmod = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    # Pages change only on deploy, so lastmod is the newest template/asset build
+    lastmod = datetime.fromtimestamp(page_cache.last_modified, timezone.utc).strftime("%Y-%m-%d")
     
     # Add each page to sitemap
     for page in PAGES:
@@ -90,7 +93,8 @@ async def generate_sitemap():
     )
 
 @router.get("/robots.txt", response_class=Response)
-async def robots_txt():
+@cached_page()
+async def robots_txt(request: Request):
     """Generate robots.txt file"""
     content = """User-agent: *
 Allow: /
@@ -214,7 +214,7 @@ async def sync_transactions(
     try:
         # Get user's integration
         integration = db.query(StripeIntegration).filter(
-            StripeIntegration.user_id == current_user,
+            StripeIntegration.user_email == current_user.email,
             StripeIntegration.is_active == True
         ).first()
         
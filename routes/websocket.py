@@ -2,29 +2,86 @@
 """
 🧭 LOCATION: /CORA/routes/websocket.py
 🎯 PURPOSE: WebSocket endpoints for real-time updates
-🔗 IMPORTS: FastAPI WebSocket, dependencies
+🔗 IMPORTS: FastAPI WebSocket, config, services.realtime_bus
 📤 EXPORTS: WebSocket routes and connection manager
 """
 
+import asyncio
+import time
+from collections import OrderedDict
 from fastapi import WebSocket, WebSocketDisconnect
-from typing import Dict, Set, Optional
+from typing import Dict, Set, Optional, Any
+import itertools
 import json
+import logging
 from datetime import datetime
 
+from config import config
 from services.auth_service import verify_token
+from services.realtime_bus import RealtimeBus
+
+logger = logging.getLogger(__name__)
+
+
+class _Connection:
+    """Per-socket send buffer drained by its own writer task"""
+
+    __slots__ = ("websocket", "user_id", "pending", "wakeup", "writer", "last_seen", "closed")
+
+    def __init__(self, websocket: WebSocket, user_id: str):
+        self.websocket = websocket
+        self.user_id = user_id
+        # key -> message; coalescible messages use their coalesce key
+        self.pending: "OrderedDict[Any, dict]" = OrderedDict()
+        self.wakeup = asyncio.Event()
+        self.writer: Optional[asyncio.Task] = None
+        self.last_seen = time.monotonic()
+        self.closed = False
+
 
 class ConnectionManager:
-    """Manages WebSocket connections for real-time updates"""
+    """Manages WebSocket connections for real-time updates
+
+    Sends never block the caller: each connection has a bounded buffer drained
+    by its own writer task, so one slow client cannot stall the others. A
+    client whose buffer fills up (or whose send exceeds WS_SEND_TIMEOUT_SECONDS)
+    is disconnected. Messages published with a coalesce_key replace an unsent
+    message with the same key, so bursts of updates to one object collapse to
+    the latest state. Every broadcast is also published on the realtime bus so
+    clients connected to other workers receive it.
+    """
     
-    def __init__(self):
+    def __init__(self, queue_size: Optional[int] = None, send_timeout: Optional[float] = None,
+                 heartbeat_interval: Optional[float] = None, idle_timeout: Optional[float] = None,
+                 bus: Optional[RealtimeBus] = None):
         # Store active connections by user_id
         self.active_connections: Dict[str, Set[WebSocket]] = {}
         # Store connection metadata
         self.connection_info: Dict[WebSocket, Dict] = {}
+        self.queue_size = queue_size or config.WS_SEND_QUEUE_SIZE
+        self.send_timeout = send_timeout or config.WS_SEND_TIMEOUT_SECONDS
+        self.heartbeat_interval = heartbeat_interval or config.WS_HEARTBEAT_SECONDS
+        self.idle_timeout = idle_timeout or config.WS_IDLE_TIMEOUT_SECONDS
+        self.bus = bus if bus is not None else RealtimeBus(self.deliver_local)
+        self.stats = {"sent": 0, "coalesced": 0, "dropped_slow": 0, "reaped": 0}
+        self._clients: Dict[WebSocket, _Connection] = {}
+        self._seq = itertools.count()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._reaper: Optional[asyncio.Task] = None
+    
+    def _ensure_background(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._reaper = None
+            self.bus.start()
+        if self._reaper is None or self._reaper.done():
+            self._reaper = self._loop.create_task(self._reap_loop())
     
     async def connect(self, websocket: WebSocket, user_id: str):
         """Accept and register a new WebSocket connection"""
         await websocket.accept()
+        self._ensure_background()
         
         # Add to user's connection set
         if user_id not in self.active_connections:
@@ -37,8 +94,12 @@ class ConnectionManager:
             "connected_at": datetime.utcnow().isoformat()
         }
         
+        client = _Connection(websocket, user_id)
+        self._clients[websocket] = client
+        client.writer = asyncio.create_task(self._writer(client))
+        
         # Send welcome message
-        await websocket.send_json({
+        self._enqueue(client, {
             "type": "connection",
             "status": "connected",
             "message": "Connected to CORA real-time updates"
@@ -60,38 +121,130 @@ class ConnectionManager:
             
             # Remove connection info
             del self.connection_info[websocket]
+        
+        client = self._clients.pop(websocket, None)
+        if client is not None:
+            client.closed = True
+            client.pending.clear()
+            if client.writer is not None and client.writer is not asyncio.current_task():
+                client.writer.cancel()
+    
+    def touch(self, websocket: WebSocket):
+        """Record client activity (any received frame) for idle reaping
+
+        Listen-only clients stay alive by answering each heartbeat with a
+        heartbeat_ack frame (realtime_updates.js does this).
+        """
+        client = self._clients.get(websocket)
+        if client is not None:
+            client.last_seen = time.monotonic()
     
     async def send_personal_message(self, message: dict, websocket: WebSocket):
         """Send a message to a specific WebSocket connection"""
+        client = self._clients.get(websocket)
+        if client is not None:
+            self._enqueue(client, message)
+    
+    async def broadcast_to_user(self, user_id: str, message: dict, coalesce_key: Optional[str] = None):
+        """Send a message to all connections for a specific user, on every worker"""
+        self.deliver_local(user_id, message, coalesce_key)
+        await self._publish(user_id, message, coalesce_key)
+    
+    async def broadcast_to_all(self, message: dict, coalesce_key: Optional[str] = None):
+        """Broadcast a message to all connected clients, on every worker"""
+        self.deliver_local(None, message, coalesce_key)
+        await self._publish(None, message, coalesce_key)
+    
+    async def _publish(self, user_id: Optional[str], message: dict, coalesce_key: Optional[str]):
+        if not self.bus.distributed:
+            return
         try:
-            await websocket.send_json(message)
+            await asyncio.get_running_loop().run_in_executor(None, self.bus.publish, user_id, message, coalesce_key)
         except Exception as e:
-            print(f"Error sending message to WebSocket: {e}")
-    
-    async def broadcast_to_user(self, user_id: str, message: dict):
-        """Send a message to all connections for a specific user"""
-        if user_id in self.active_connections:
-            # Send to all user's connections
-            disconnected = []
-            for connection in self.active_connections[user_id]:
-                try:
-                    await connection.send_json(message)
-                except Exception:
-                    # Mark for removal if send fails
-                    disconnected.append(connection)
-            
-            # Clean up disconnected connections
-            for conn in disconnected:
-                self.disconnect(conn)
-    
-    async def broadcast_to_all(self, message: dict):
-        """Broadcast a message to all connected clients"""
-        for user_connections in self.active_connections.values():
-            for connection in user_connections:
-                try:
-                    await connection.send_json(message)
-                except Exception:
-                    pass  # Ignore failed sends in broadcast
+            logger.warning(f"Realtime publish failed: {e}")
+    
+    def deliver_local(self, user_id: Optional[str], message: dict, coalesce_key: Optional[str] = None):
+        """Queue a message for this worker's connections (thread-safe)"""
+        loop = self._loop
+        if loop is None:
+            return  # no connection has been opened in this process
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is not loop:
+            loop.call_soon_threadsafe(self.deliver_local, user_id, message, coalesce_key)
+            return
+        if user_id is None:
+            targets = list(self._clients.values())
+        else:
+            targets = [self._clients[ws] for ws in self.active_connections.get(user_id, ()) if ws in self._clients]
+        for client in targets:
+            self._enqueue(client, message, coalesce_key)
+    
+    def _enqueue(self, client: _Connection, message: dict, coalesce_key: Optional[str] = None):
+        if client.closed:
+            return
+        if coalesce_key is not None and coalesce_key in client.pending:
+            client.pending[coalesce_key] = message
+            self.stats["coalesced"] += 1
+            return
+        if len(client.pending) >= self.queue_size:
+            self.stats["dropped_slow"] += 1
+            self._drop(client, 1013, "Client too slow")
+            return
+        client.pending[coalesce_key if coalesce_key is not None else next(self._seq)] = message
+        client.wakeup.set()
+    
+    async def _writer(self, client: _Connection):
+        try:
+            while not client.closed:
+                if not client.pending:
+                    client.wakeup.clear()
+                    await client.wakeup.wait()
+                    continue
+                _, message = client.pending.popitem(last=False)
+                await asyncio.wait_for(client.websocket.send_json(message), self.send_timeout)
+                self.stats["sent"] += 1
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            self.stats["dropped_slow"] += 1
+            self._drop(client, 1013, "Client too slow")
+        except Exception:
+            # Socket already gone; the endpoint loop will see the disconnect too
+            self.disconnect(client.websocket)
+    
+    def _drop(self, client: _Connection, code: int, reason: str):
+        self.disconnect(client.websocket)
+        asyncio.ensure_future(self._close_quietly(client.websocket, code, reason))
+    
+    @staticmethod
+    async def _close_quietly(websocket: WebSocket, code: int, reason: str):
+        try:
+            await websocket.close(code=code, reason=reason)
+        except Exception:
+            pass
+    
+    async def _reap_loop(self):
+        """Heartbeat live clients and close ones that stopped responding"""
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            self.reap_idle()
+    
+    def reap_idle(self):
+        now = time.monotonic()
+        heartbeat = {"type": "heartbeat", "timestamp": datetime.utcnow().isoformat()}
+        for client in list(self._clients.values()):
+            if now - client.last_seen > self.idle_timeout:
+                self.stats["reaped"] += 1
+                self._drop(client, 1001, "Idle timeout")
+            else:
+                self._enqueue(client, heartbeat, coalesce_key="heartbeat")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats, connections=len(self._clients), users=len(self.active_connections),
+                    distributed=self.bus.distributed)
 
 # Create global connection manager
 manager = ConnectionManager()
@@ -128,6 +281,7 @@ async def websocket_endpoint(websocket: WebSocket, app):
         while True:
             # Wait for incoming messages
             data = await websocket.receive_json()
+            manager.touch(websocket)
             
             # Handle different message types
             if data.get("type") == "ping":
@@ -137,6 +291,10 @@ async def websocket_endpoint(websocket: WebSocket, app):
                     "timestamp": datetime.utcnow().isoformat()
                 }, websocket)
             
+            elif data.get("type") == "heartbeat_ack":
+                # Client answering a server heartbeat; touch() above is all it needs
+                continue
+            
             elif data.get("type") == "subscribe":
                 # Handle subscription requests (for future use)
                 channel = data.get("channel")
@@ -156,26 +314,28 @@ async def websocket_endpoint(websocket: WebSocket, app):
     except WebSocketDisconnect:
         manager.disconnect(websocket)
     except Exception as e:
-        print(f"WebSocket error: {e}")
+        logger.warning(f"WebSocket error: {e}")
         manager.disconnect(websocket)
-        await websocket.close(code=4003, reason="Internal server error")
+        await ConnectionManager._close_quietly(websocket, 4003, "Internal server error")
 
 # Helper functions for broadcasting updates
 async def broadcast_expense_update(user_id: str, expense_data: dict):
     """Broadcast expense creation/update to user"""
+    expense_id = expense_data.get("id")
     await manager.broadcast_to_user(user_id, {
         "type": "expense_update",
         "data": expense_data,
         "timestamp": datetime.utcnow().isoformat()
-    })
+    }, coalesce_key=f"expense:{expense_id}" if expense_id is not None else None)
 
 async def broadcast_job_update(user_id: str, job_data: dict):
     """Broadcast job update to user"""
+    job_id = job_data.get("id")
     await manager.broadcast_to_user(user_id, {
         "type": "job_update",
         "data": job_data,
         "timestamp": datetime.utcnow().isoformat()
-    })
+    }, coalesce_key=f"job:{job_id}" if job_id is not None else None)
 
 async def broadcast_alert(user_id: str, alert_data: dict):
     """Broadcast new alert to user"""
@@ -26,7 +26,10 @@ except Exception as e:
         @staticmethod
         def send_report(*args, **kwargs):
             return None
-from utils.pdf_exporter import PDFExporter
+
+        @staticmethod
+        def enqueue(*args, **kwargs):
+            return False
 
 logger = logging.getLogger(__name__)
 
@@ -229,41 +232,23 @@ async def send_weekly_insights_email(
         # Create email content
         email_subject = f"Your Weekly Insights Report - {report_data['period']}"
         
-        # Generate HTML email content
-        email_html = f"""
-        <html>
-        <body style="font-family: Arial, sans-serif; line-height: 1.6;">
-            <h2>Your Weekly Insights Report</h2>
-            <p>Period: {report_data['period']}</p>
-            
-            <h3>Summary</h3>
-            <ul>
-                <li>Total Spent: ${report_data['metrics']['total_spent']:.2f}</li>
-                <li>Number of Expenses: {report_data['metrics']['expense_count']}</li>
-                <li>Daily Average: ${report_data['metrics']['daily_average']:.2f}</li>
-                <li>Categories Used: {report_data['metrics']['categories_used']}</li>
-            </ul>
-            
-            <p style="margin-top: 30px; font-size: 12px; color: #666;">
-                This report was generated on {report_data['generated_at']}.<br>
-                <a href="{unsubscribe_url}" style="color: #9B6EC8;">Unsubscribe from weekly insights</a>
-            </p>
-        </body>
-        </html>
-        """
+        # Render the shared template used by the weekly batch job
+        from services.weekly_insights_batch import render_weekly_insights_email
+        email_html = render_weekly_insights_email(report_data, unsubscribe_url)
         
-        # Send email using EmailService
+        # Queue through the email outbox; at most one report email per user per day
         email_service = EmailService()
-        success = await email_service.send_email(
+        success = email_service.enqueue(
             to_email=user.email,
             subject=email_subject,
-            html_content=email_html
+            html_content=email_html,
+            dedup_key=f"weekly-insights:{user.id}:{report_data['generated_at'][:10]}"
         )
         
         if success:
-            logger.info(f"Weekly insights email sent to {user.email}")
+            logger.info(f"Weekly insights email queued for {user.email}")
         else:
-            logger.error(f"Failed to send weekly insights email to {user.email}")
+            logger.error(f"Failed to queue weekly insights email for {user.email}")
             
     except Exception as e:
         logger.error(f"Error sending weekly insights email: {str(e)}")
@@ -4,11 +4,20 @@ BI Snapshot Tool - Fetch and cache competitor evidence
 
 Reads docs/bi/registry.yml and fetches HTML content from competitor URLs,
 caching raw HTML and extracting pricing snippets when possible.
+
+By default sources are crawled concurrently (BI_CRAWL_WORKERS at a time, at
+most BI_CRAWL_HOST_CONCURRENCY requests per host). Each run records ETag,
+Last-Modified and a content hash per URL in crawl_index.json; the next run
+sends conditional requests from the latest earlier index and reuses the
+cached HTML and snippets for pages that are unchanged (304 or same hash).
+Per-source results are appended to snapshot_results.jsonl as they finish.
+Pass --serial for the one-source-at-a-time walk.
 """
 
 import os
 import sys
 import json
+import hashlib
 import yaml
 import requests
 from datetime import datetime, date
@@ -18,16 +27,26 @@ from bs4 import BeautifulSoup
 import re
 import logging
 import time
-from urllib3.util.retry import Retry
-from requests.adapters import HTTPAdapter
+from collections import Counter
+from contextlib import contextmanager
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import threading
 
+ROOT = Path(__file__).resolve().parent.parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from services.integration_http import IntegrationClient, ProviderPolicy
+
 # Configuration
 REGISTRY_PATH = Path(__file__).parent.parent.parent / "docs/bi/registry.yml"
 CACHE_BASE_PATH = Path(__file__).parent.parent.parent / "docs/bi/cache"
 REQUEST_TIMEOUT = 10  # seconds
 CAPTURE_ON_ERROR = True  # Capture HTML even on 403/404 responses
+CRAWL_WORKERS = int(os.getenv("BI_CRAWL_WORKERS", "16"))  # sources fetched at once
+CRAWL_HOST_CONCURRENCY = int(os.getenv("BI_CRAWL_HOST_CONCURRENCY", "2"))  # requests in flight per host
+CRAWL_INDEX_FILE = "crawl_index.json"
+CRAWL_RESULTS_FILE = "snapshot_results.jsonl"
 
 # Simple selectors for extracting pricing info (can be expanded)
 PRICE_SELECTORS = {
@@ -69,28 +88,14 @@ def setup_logger(log_path: Path) -> logging.Logger:
     return logger
 
 
-def make_session(retries: int = 3, backoff: float = 0.6) -> requests.Session:
-    """Create HTTP session with headers and retry logic"""
-    session = requests.Session()
-    
-    # Set default headers
-    session.headers.update({
+def make_session(retries: int = 3, backoff: float = 0.6) -> IntegrationClient:
+    """Create pooled HTTP client with browser headers, per-host limits and jittered retries"""
+    policy = ProviderPolicy.for_provider("bi_snapshot", max_retries=retries, backoff=backoff)
+    return IntegrationClient("bi_snapshot", policy, headers={
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124 Safari/537.36',
         'Accept-Language': 'en-US,en;q=0.9',
         'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8'
     })
-    
-    # Configure retries
-    retry_strategy = Retry(
-        total=retries,
-        backoff_factor=backoff,
-        status_forcelist=[429, 500, 502, 503, 504]
-    )
-    adapter = HTTPAdapter(max_retries=retry_strategy)
-    session.mount("https://", adapter)
-    session.mount("http://", adapter)
-    
-    return session
 
 
 def load_registry() -> Dict[str, Any]:
@@ -130,20 +135,32 @@ def sanitize_filename(url: str) -> str:
     return clean
 
 
-def fetch_single_url(url: str, session: requests.Session, 
-                    timeout: int, custom_headers: Dict[str, str]) -> Dict[str, Any]:
-    """Fetch a single URL with timing and error handling"""
+def fetch_single_url(url: str, session: IntegrationClient, 
+                    timeout: int, custom_headers: Dict[str, str],
+                    crawl: Optional["CrawlState"] = None) -> Dict[str, Any]:
+    """Fetch a single URL with timing and error handling (conditional GET when crawling)"""
     try:
         # Prepare headers for this request
         request_headers = {}
         if custom_headers:
             request_headers.update(custom_headers)
+        if crawl is not None:
+            request_headers.update(crawl.conditional_headers(url))
         
         # Time the request
         start_time = time.time()
-        response = session.get(url, timeout=timeout, headers=request_headers)
+        if crawl is not None:
+            with crawl.host_slot(url):
+                response = session.get(url, timeout=timeout, headers=request_headers)
+        else:
+            response = session.get(url, timeout=timeout, headers=request_headers)
         elapsed_ms = int((time.time() - start_time) * 1000)
         
+        if crawl is not None and response.status_code == 304:
+            cached = crawl.not_modified(url, response, elapsed_ms)
+            if cached is not None:
+                return cached
+        
         # Capture response regardless of status
         status_code = response.status_code
         response_content = response.text
@@ -168,7 +185,7 @@ def fetch_single_url(url: str, session: requests.Session,
         
         # Success case (2xx, 3xx)
         if status_code < 400:
-            return {
+            result = {
                 "success": True,
                 "content": response_content,
                 "http_status": status_code,
@@ -177,6 +194,10 @@ def fetch_single_url(url: str, session: requests.Session,
                 "elapsed_ms": elapsed_ms,
                 "error": None
             }
+            if crawl is not None:
+                result["etag"] = response.headers.get("ETag")
+                result["last_modified"] = response.headers.get("Last-Modified")
+            return result
         
         # If CAPTURE_ON_ERROR is False, raise the error
         response.raise_for_status()
@@ -228,9 +249,10 @@ def fetch_single_url(url: str, session: requests.Session,
         }
 
 
-def fetch_url_with_overrides(url: str, session: requests.Session, 
+def fetch_url_with_overrides(url: str, session: IntegrationClient, 
                              http_config: Dict[str, Any] = None,
-                             alt_urls: List[str] = None) -> Dict[str, Any]:
+                             alt_urls: List[str] = None,
+                             crawl: Optional["CrawlState"] = None) -> Dict[str, Any]:
     """Fetch content from URL with parallel alt URLs and per-site overrides"""
     global logger
     
@@ -256,7 +278,7 @@ def fetch_url_with_overrides(url: str, session: requests.Session,
     with ThreadPoolExecutor(max_workers=min(len(urls_to_try), 3)) as executor:
         # Submit all URLs
         future_to_url = {
-            executor.submit(fetch_single_url, u, session, timeout, custom_headers): u 
+            executor.submit(fetch_single_url, u, session, timeout, custom_headers, crawl): u 
             for u in urls_to_try
         }
         
@@ -396,7 +418,8 @@ def extract_pricing_snippets(html: str, selectors: List[str] = None) -> List[str
         return []
 
 
-def process_competitor(competitor: Dict[str, Any], cache_dir: Path, session: requests.Session) -> Dict[str, Any]:
+def process_competitor(competitor: Dict[str, Any], cache_dir: Path, session: IntegrationClient,
+                       crawl: Optional["CrawlState"] = None) -> Dict[str, Any]:
     """Process a single competitor entry with per-site overrides and manual fallback"""
     global logger
     name = competitor.get('name', 'Unknown')
@@ -425,7 +448,7 @@ def process_competitor(competitor: Dict[str, Any], cache_dir: Path, session: req
         logger.info("  Fetching: %s", url)
         
         # Fetch the URL with overrides
-        fetch_result = fetch_url_with_overrides(url, custom_session, http_config, alt_urls)
+        fetch_result = fetch_url_with_overrides(url, custom_session, http_config, alt_urls, crawl)
         
         # Create filename based on original URL
         slug = sanitize_filename(url)
@@ -445,7 +468,9 @@ def process_competitor(competitor: Dict[str, Any], cache_dir: Path, session: req
                 f.write(fetch_result['content'])
             
             # Extract pricing snippets even from error pages
-            if selectors:
+            if crawl is not None and fetch_result['success']:
+                snippets = crawl.snippets(fetch_result, selectors or PRICE_SELECTORS['default'])
+            elif selectors:
                 snippets = extract_pricing_snippets(fetch_result['content'], selectors)
             else:
                 snippets = extract_pricing_snippets(fetch_result['content'], PRICE_SELECTORS['default'])
@@ -474,6 +499,8 @@ def process_competitor(competitor: Dict[str, Any], cache_dir: Path, session: req
             
             # Update results
             if fetch_result['success']:
+                if crawl is not None:
+                    crawl.record(fetch_result, snippets, html_path)
                 results["urls_processed"].append({
                     "url": url,
                     "status": "success",
@@ -481,6 +508,8 @@ def process_competitor(competitor: Dict[str, Any], cache_dir: Path, session: req
                     "elapsed_ms": fetch_result.get('elapsed_ms'),
                     "snippets_found": len(snippets)
                 })
+                if fetch_result.get('unchanged'):
+                    results["urls_processed"][-1]["unchanged"] = True
                 
                 logger.info("    %s: [OK] cached HTML; snippets=%d status=%s elapsed=%dms", 
                            name, len(snippets), fetch_result.get('http_status'), fetch_result.get('elapsed_ms'))
@@ -593,7 +622,148 @@ def process_competitor(competitor: Dict[str, Any], cache_dir: Path, session: req
     return results
 
 
-def main(dry_run: bool = False) -> None:
+class CrawlState:
+    """Validators, hashes and snippets from the baseline snapshot; collects today's for the next run"""
+
+    def __init__(self, cache_dir: Path, baseline_dir: Optional[Path] = None,
+                 host_concurrency: int = CRAWL_HOST_CONCURRENCY):
+        self.cache_dir = cache_dir
+        self.baseline_dir = baseline_dir
+        self.host_concurrency = host_concurrency
+        self.previous: Dict[str, Dict[str, Any]] = {}
+        if baseline_dir is not None:
+            with open(baseline_dir / CRAWL_INDEX_FILE, 'r', encoding='utf-8') as f:
+                self.previous = json.load(f)
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.stats = Counter()
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def find_baseline(cache_dir: Path) -> Optional[Path]:
+        """Latest dated cache directory up to cache_dir's date that has a crawl index"""
+        candidates = [d for d in cache_dir.parent.iterdir()
+                      if d.is_dir() and d.name <= cache_dir.name and (d / CRAWL_INDEX_FILE).exists()]
+        return max(candidates, key=lambda d: d.name) if candidates else None
+
+    def _cached_html(self, url: str) -> Optional[str]:
+        entry = self.previous.get(url)
+        if not entry or not entry.get("html_file") or self.baseline_dir is None:
+            return None
+        path = self.baseline_dir / entry["html_file"]
+        return path.read_text(encoding='utf-8') if path.exists() else None
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        entry = self.previous.get(url)
+        if not entry or self.baseline_dir is None or not (self.baseline_dir / entry.get("html_file", "")).is_file():
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    @contextmanager
+    def host_slot(self, url: str):
+        host = re.sub(r'^https?://', '', url).split('/', 1)[0]
+        with self._lock:
+            slot = self._slots.setdefault(host, threading.BoundedSemaphore(self.host_concurrency))
+        with slot:
+            yield
+
+    def not_modified(self, url: str, response, elapsed_ms: int) -> Optional[Dict[str, Any]]:
+        """Success result built from the baseline HTML for a 304 answer"""
+        content = self._cached_html(url)
+        if content is None:
+            return None
+        entry = self.previous[url]
+        with self._lock:
+            self.stats["not_modified"] += 1
+        return {
+            "success": True,
+            "content": content,
+            "http_status": 304,
+            "url": url,
+            "final_url": entry.get("final_url") or url,
+            "elapsed_ms": elapsed_ms,
+            "error": None,
+            "etag": response.headers.get("ETag") or entry.get("etag"),
+            "last_modified": response.headers.get("Last-Modified") or entry.get("last_modified"),
+        }
+
+    def snippets(self, fetch_result: Dict[str, Any], selectors: List[str]) -> List[str]:
+        """Baseline snippets when the page hash is unchanged, otherwise a fresh extraction"""
+        digest = hashlib.sha256(fetch_result['content'].encode('utf-8')).hexdigest()
+        fetch_result["sha256"] = digest
+        entry = self.previous.get(fetch_result['url'])
+        if entry and entry.get("sha256") == digest and entry.get("snippets") is not None:
+            fetch_result["unchanged"] = True
+            with self._lock:
+                self.stats["unchanged"] += 1
+            return list(entry["snippets"])
+        with self._lock:
+            self.stats["extracted"] += 1
+        return extract_pricing_snippets(fetch_result['content'], selectors)
+
+    def record(self, fetch_result: Dict[str, Any], snippets: List[str], html_path: Path) -> None:
+        with self._lock:
+            self.entries[fetch_result['url']] = {
+                "etag": fetch_result.get("etag"),
+                "last_modified": fetch_result.get("last_modified"),
+                "sha256": fetch_result.get("sha256"),
+                "final_url": fetch_result.get("final_url"),
+                "html_file": html_path.name,
+                "snippets": snippets,
+            }
+
+    def save(self) -> None:
+        """Write today's index; the next run's conditional requests start from it"""
+        with open(self.cache_dir / CRAWL_INDEX_FILE, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, indent=2, ensure_ascii=False)
+
+
+def crawl_sources(sources: List[Dict[str, Any]], cache_dir: Path, session: Optional[IntegrationClient] = None,
+                  workers: int = CRAWL_WORKERS, host_concurrency: int = CRAWL_HOST_CONCURRENCY,
+                  baseline_dir: Optional[Path] = None) -> Tuple[List[Dict[str, Any]], "CrawlState"]:
+    """Process sources concurrently with conditional requests against the baseline snapshot
+
+    Each source's result is appended to snapshot_results.jsonl as soon as it
+    finishes; the crawl index is written at the end. Results keep registry order.
+    """
+    global logger
+    if logger is None:
+        logger = logging.getLogger('bi_snapshot')
+    session = session or make_session()
+    if baseline_dir is None:
+        baseline_dir = CrawlState.find_baseline(cache_dir)
+    crawl = CrawlState(cache_dir, baseline_dir, host_concurrency)
+    if baseline_dir is not None:
+        logger.info("Baseline snapshot: %s (%d URLs)", baseline_dir, len(crawl.previous))
+
+    results: List[Optional[Dict[str, Any]]] = [None] * len(sources)
+    with open(cache_dir / CRAWL_RESULTS_FILE, 'w', encoding='utf-8') as out, \
+            ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {executor.submit(process_competitor, source, cache_dir, session, crawl): i
+                   for i, source in enumerate(sources)}
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                results[i] = future.result()
+            except Exception as e:
+                name = sources[i].get('name', 'Unknown')
+                logger.error("%s: [ERR] crawl failed: %s", name, str(e)[:200])
+                results[i] = {"vendor": name, "captured_at": datetime.now().isoformat(),
+                              "urls_processed": [], "error": str(e)[:200]}
+            out.write(json.dumps(results[i], ensure_ascii=False) + "\n")
+            out.flush()
+    crawl.save()
+    logger.info("Crawl: %d sources, %d not modified, %d unchanged, %d extracted",
+                len(sources), crawl.stats["not_modified"], crawl.stats["unchanged"], crawl.stats["extracted"])
+    return results, crawl
+
+
+def main(dry_run: bool = False, serial: bool = False) -> None:
     """Main execution function"""
     global logger
     
@@ -628,27 +798,33 @@ def main(dry_run: bool = False) -> None:
     
     all_results = []
     
-    logger.info("Processing %d competitors...", len(competitors))
-    for competitor in competitors:
+    if not serial and not dry_run:
+        logger.info("Crawling %d competitors and %d regulation sources...", len(competitors), len(regulations))
+        started = time.time()
+        all_results, _ = crawl_sources(competitors + regulations, cache_dir, session)
+        logger.info("Crawl finished in %.1fs", time.time() - started)
+    else:
+        logger.info("Processing %d competitors...", len(competitors))
+        for competitor in competitors:
+            logger.info("")
+            logger.info("%s:", competitor.get('name', 'Unknown'))
+            if dry_run:
+                logger.info("  [DRY RUN - skipping fetch]")
+                continue
+            result = process_competitor(competitor, cache_dir, session)
+            all_results.append(result)
+        
         logger.info("")
-        logger.info("%s:", competitor.get('name', 'Unknown'))
-        if dry_run:
-            logger.info("  [DRY RUN - skipping fetch]")
-            continue
-        result = process_competitor(competitor, cache_dir, session)
-        all_results.append(result)
-    
-    logger.info("")
-    logger.info("")
-    logger.info("Processing %d regulation sources...", len(regulations))
-    for regulation in regulations:
         logger.info("")
-        logger.info("%s:", regulation.get('name', 'Unknown'))
-        if dry_run:
-            logger.info("  [DRY RUN - skipping fetch]")
-            continue
-        result = process_competitor(regulation, cache_dir, session)
-        all_results.append(result)
+        logger.info("Processing %d regulation sources...", len(regulations))
+        for regulation in regulations:
+            logger.info("")
+            logger.info("%s:", regulation.get('name', 'Unknown'))
+            if dry_run:
+                logger.info("  [DRY RUN - skipping fetch]")
+                continue
+            result = process_competitor(regulation, cache_dir, session)
+            all_results.append(result)
     
     # Save summary
     if not dry_run:
@@ -684,4 +860,4 @@ def main(dry_run: bool = False) -> None:
 if __name__ == "__main__":
     # Check for dry-run flag
     dry_run = "--dry-run" in sys.argv
-    main(dry_run=dry_run)
\ No newline at end of file
+    main(dry_run=dry_run, serial="--serial" in sys.argv)
\ No newline at end of file
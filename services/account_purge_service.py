@@ -1,16 +1,49 @@
-# !/usr/bin/env python3
+#!/usr/bin/env python3
 """
 🧭 LOCATION: /CORA/services/account_purge_service.py
-🎯 PURPOSE: 30-day purge skeleton for soft-deleted accounts (service + CLI use)
-🔗 IMPORTS: sqlite3, datetime, typing
-📤 EXPORTS: AccountPurgeService
+🎯 PURPOSE: Set-based purge of soft-deleted accounts and their full data graph (service + CLI use)
+🔗 IMPORTS: SQLAlchemy, models (metadata), utils.write_queue, config
+📤 EXPORTS: AccountPurgeService, PurgePlan, PurgeResult
+🔄 PATTERN: due users → chunks of ids → one transaction per chunk: DELETE ... WHERE <fk> IN (subquery), children first → files
+
+A user's data is every table that points at users (by id or email), plus
+every table that points at those tables (plaid_accounts → plaid_transactions,
+jobs → job_notes, ...). PurgePlan derives that graph from the model
+metadata, keeps only the tables and link columns the database actually has,
+and orders it so rows are deleted before the rows they reference. Each
+table is then cleared with a single DELETE whose WHERE clause is a nested
+IN (SELECT ...) back to the chunk's user ids, so a chunk costs one statement
+per table however many rows the users own.
+
+Chunks of ACCOUNT_PURGE_CHUNK_SIZE users commit separately through the
+SQLite write queue, with ACCOUNT_PURGE_CHUNK_PAUSE_MS between them, so live
+writes are never locked out for longer than one chunk. Receipt files
+(inside UPLOAD_DIR) and rendered reports are removed after their chunk
+commits. A dry run reports the rows each table would lose.
 """
 
-import sqlite3
-from dataclasses import dataclass
-from datetime import datetime, timedelta
+import logging
+import shutil
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import Table, bindparam, false, func, inspect, or_, select, text
+from sqlalchemy.orm import sessionmaker
+
+from config import config
+
+logger = logging.getLogger(__name__)
+
+USERS_TABLE = "users"
+
+# User-owned tables that name their owner without a foreign key: {table: (column, users column)}
+EXTRA_OWNER_COLUMNS = {
+    "feedback": ("user_email", "email"),
+    "email_outbox": ("to_email", "email"),
+}
 
 
 @dataclass
@@ -20,33 +53,127 @@ class PurgeResult:
     to_purge_count: int
     skipped_active_count: int
     details: List[Dict[str, Any]]
+    purged_count: int = 0
+    row_counts: Dict[str, int] = field(default_factory=dict)  # rows deleted (or that would be) per table
+    files_removed: int = 0
+    chunks: int = 0
+    seconds: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class PurgePlan:
+    """The user-owned tables present in a database, in delete order, with their link columns"""
+
+    def __init__(self, bind, metadata=None):
+        if metadata is None:
+            from models import Base
+            metadata = Base.metadata
+        inspector = inspect(bind)
+        present = set(inspector.get_table_names())
+        columns = {name: {c["name"] for c in inspector.get_columns(name)} for name in present}
+        self.users: Table = metadata.tables[USERS_TABLE]
+        self.user_columns: Set[str] = columns.get(USERS_TABLE, set())
+
+        # {table: [(column, parent table, parent column)]}, grown until no new table links in
+        self.links: Dict[str, List[Tuple[str, str, str]]] = {}
+        owned = {USERS_TABLE}
+        changed = True
+        while changed:
+            changed = False
+            for table in metadata.sorted_tables:
+                if table.name == USERS_TABLE or table.name not in present:
+                    continue
+                found = [(fk.parent.name, fk.column.table.name, fk.column.name) for fk in table.foreign_keys
+                         if fk.column.table.name in owned and fk.column.table.name != table.name]
+                extra = EXTRA_OWNER_COLUMNS.get(table.name)
+                if extra:
+                    found.append((extra[0], USERS_TABLE, extra[1]))
+                found = [link for link in found
+                         if link[0] in columns[table.name] and link[2] in columns.get(link[1], ())]
+                if found and found != self.links.get(table.name):
+                    self.links[table.name] = found
+                    owned.add(table.name)
+                    changed = True
+
+        # sorted_tables lists referenced tables first; delete in the reverse order, users last
+        self.tables: List[Table] = [t for t in reversed(metadata.sorted_tables) if t.name in self.links]
+        self._by_name = {t.name: t for t in self.tables}
+        self._by_name[USERS_TABLE] = self.users
+        self.receipts = ("expenses" in self.links and "receipt_path" in columns.get("expenses", set()))
+
+    def condition(self, name: str, user_ids: List[int]):
+        """WHERE clause selecting the rows of `name` owned by `user_ids` (nested IN subqueries)"""
+        if name == USERS_TABLE:
+            return self.users.c.id.in_(user_ids)
+        table = self._by_name[name]
+        clauses = []
+        for column, parent, parent_column in self.links[name]:
+            parent_table = self._by_name[parent]
+            owned = select(parent_table.c[parent_column]).where(self.condition(parent, user_ids))
+            clauses.append(table.c[column].in_(owned))
+        return or_(*clauses) if clauses else false()
+
+    def receipt_paths(self, db, user_ids: List[int]) -> List[str]:
+        if not self.receipts:
+            return []
+        expenses = self._by_name["expenses"]
+        query = select(expenses.c.receipt_path).where(self.condition("expenses", user_ids),
+                                                      expenses.c.receipt_path.isnot(None))
+        return [row[0] for row in db.execute(query)]
+
+    def count(self, db, user_ids: List[int]) -> Dict[str, int]:
+        counts = {}
+        for table in self.tables + [self.users]:
+            counts[table.name] = db.execute(
+                select(func.count()).select_from(table).where(self.condition(table.name, user_ids))).scalar()
+        return counts
+
+    def delete(self, db, user_ids: List[int]) -> Dict[str, int]:
+        counts = {}
+        for table in self.tables:
+            counts[table.name] = db.execute(table.delete().where(self.condition(table.name, user_ids))).rowcount
+        counts[USERS_TABLE] = db.execute(self.users.delete().where(self.users.c.id.in_(user_ids))).rowcount
+        return counts
 
 
 class AccountPurgeService:
-    """Minimal purge logic without schema edits.
+    """Purges accounts whose deletion was scheduled more than the retention period ago.
 
     Contract:
-    - Users with a column `deletion_scheduled` older than 30 days are purge candidates
-    - Users still active (is_active truthy) are skipped
-    - When dry_run=True, no deletes are executed; returns counts only
-    - SQLite-compatible; uses column presence checks
+    - Users with a column `deletion_scheduled` older than the retention period are purge candidates
+    - Users still active (is_active truthy) are skipped, and re-checked inside each chunk's transaction
+    - When dry_run=True, no deletes are executed; returns candidate and per-table row counts
+    - Works against whatever subset of the schema the database has (column presence checks)
     """
 
-    def __init__(self, db_path: str = "cora.db") -> None:
-        self.db_path = db_path
+    def __init__(self, db_path: Optional[str] = None, engine=None, chunk_size: Optional[int] = None,
+                 pause_seconds: Optional[float] = None, retention_days: Optional[int] = None,
+                 upload_dir: Optional[str] = None, reports_dir: Optional[str] = None) -> None:
+        from utils.write_queue import WriteQueue, write_queue
 
-    def _connect(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+        self.db_path = db_path
+        if engine is None and db_path is not None:
+            from models.base import build_engine
+            engine = build_engine(f"sqlite:///{db_path}", name="purge")
+        if engine is None:
+            from models.base import engine as app_engine
+            self.engine, self._writer = app_engine, write_queue
+        else:
+            # A database other than the app's: run chunks inline on its own sessions
+            self.engine = engine
+            self._writer = WriteQueue(session_factory=sessionmaker(bind=engine), enabled=False)
+        self.chunk_size = max(1, chunk_size or config.ACCOUNT_PURGE_CHUNK_SIZE)
+        self.pause_seconds = (pause_seconds if pause_seconds is not None
+                              else config.ACCOUNT_PURGE_CHUNK_PAUSE_MS / 1000)
+        self.retention_days = retention_days if retention_days is not None else config.ACCOUNT_PURGE_RETENTION_DAYS
+        self.upload_dir = Path(upload_dir or config.UPLOAD_DIR).resolve()
+        self.reports_dir = Path(reports_dir or config.REPORTS_DIR)
 
     @staticmethod
-    def _has_column(conn: sqlite3.Connection, table: str, column: str) -> bool:
-        cur = conn.execute(f"PRAGMA table_info({table})")
-        for row in cur.fetchall():
-            if row[1] == column:
-                return True
-        return False
+    def _has_column(conn, table: str, column: str) -> bool:
+        return any(c["name"] == column for c in inspect(conn).get_columns(table))
 
     @staticmethod
     def _is_truthy(val: Any) -> bool:
@@ -55,67 +182,128 @@ class AccountPurgeService:
         s = str(val).strip().lower()
         return s in {"1", "true", "yes", "on"}
 
-    def find_candidates(self, now: Optional[datetime] = None) -> Tuple[List[sqlite3.Row], List[str]]:
+    @staticmethod
+    def _parse_scheduled(raw: Any) -> datetime:
+        if isinstance(raw, datetime):
+            ds = raw
+        else:
+            # Accept ISO or the common SQLite text format
+            try:
+                ds = datetime.fromisoformat(str(raw))
+            except ValueError:
+                ds = datetime.strptime(str(raw), "%Y-%m-%d %H:%M:%S")
+        if ds.tzinfo is not None:
+            ds = ds.astimezone(timezone.utc).replace(tzinfo=None)
+        return ds
+
+    def find_candidates(self, now: Optional[datetime] = None) -> Tuple[List[Dict[str, Any]], List[str]]:
         now = now or datetime.utcnow()
         issues: List[str] = []
-        with self._connect() as conn:
-            # Verify schema presence
-            if not self._has_column(conn, "users", "deletion_scheduled"):
+        with self.engine.connect() as conn:
+            if not self._has_column(conn, USERS_TABLE, "deletion_scheduled"):
                 issues.append("users.deletion_scheduled column not found; nothing to purge")
                 return [], issues
+            active = "is_active" if self._has_column(conn, USERS_TABLE, "is_active") else "NULL"
+            rows = conn.execute(text(
+                f"SELECT id, email, {active} AS is_active, deletion_scheduled "
+                "FROM users WHERE deletion_scheduled IS NOT NULL"
+            )).mappings().all()
 
-            rows = conn.execute(
-                """
-                SELECT id, email, is_active, deletion_scheduled
-                FROM users
-                WHERE deletion_scheduled IS NOT NULL
-                """
-            ).fetchall()
-
-            candidates: List[sqlite3.Row] = []
-            for r in rows:
-                try:
-                    # Support multiple datetime storage formats
-                    ds_raw = r["deletion_scheduled"]
-                    # Accept ISO or naive; attempt parse
-                    try:
-                        ds = datetime.fromisoformat(str(ds_raw))
-                    except Exception:
-                        # fallback: common format
-                        ds = datetime.strptime(str(ds_raw), "%Y-%m-%d %H:%M:%S")
-                    if ds <= now - timedelta(days=30):
-                        candidates.append(r)
-                except Exception:
-                    continue
+        cutoff = now - timedelta(days=self.retention_days)
+        candidates: List[Dict[str, Any]] = []
+        for r in rows:
+            try:
+                if self._parse_scheduled(r["deletion_scheduled"]) <= cutoff:
+                    candidates.append(dict(r))
+            except (TypeError, ValueError):
+                issues.append(f"user {r['id']}: unreadable deletion_scheduled {r['deletion_scheduled']!r}")
         return candidates, issues
 
+    # ------------------------------------------------------------------ chunks
+    def _eligible(self, db, plan: PurgePlan, user_ids: List[int]) -> List[int]:
+        """The ids still scheduled and inactive at delete time (a user may have come back)"""
+        active = "is_active" if "is_active" in plan.user_columns else "NULL"
+        query = text(f"SELECT id, {active} FROM users WHERE deletion_scheduled IS NOT NULL AND id IN :ids")
+        rows = db.execute(query.bindparams(bindparam("ids", expanding=True)), {"ids": user_ids}).all()
+        return [row[0] for row in rows if not self._is_truthy(row[1])]
+
+    def _delete_chunk(self, db, plan: PurgePlan, user_ids: List[int]) -> Tuple[List[int], Dict[str, int], List[str]]:
+        """Write-queue job: one transaction deleting the chunk's users and everything they own"""
+        user_ids = self._eligible(db, plan, user_ids)
+        if not user_ids:
+            return [], {}, []
+        receipts = plan.receipt_paths(db, user_ids)
+        return user_ids, plan.delete(db, user_ids), receipts
+
+    def _receipt_file(self, raw: str) -> Optional[Path]:
+        """The receipt as a file under the upload root, else None (receipt_path comes from the database)"""
+        path = Path(raw).resolve()
+        return path if self.upload_dir in path.parents and path.is_file() else None
+
+    def _remove_files(self, user_ids: List[int], receipts: List[str]) -> int:
+        removed = 0
+        for raw in receipts:
+            path = self._receipt_file(raw)
+            if path is None:
+                continue
+            try:
+                path.unlink()
+                removed += 1
+            except OSError as e:
+                logger.warning(f"Could not remove receipt {path}: {e}")
+        for user_id in user_ids:
+            reports = self.reports_dir / str(int(user_id))
+            if reports.is_dir():
+                removed += sum(1 for p in reports.rglob("*") if p.is_file())
+                shutil.rmtree(reports, ignore_errors=True)
+        return removed
+
+    # ------------------------------------------------------------------ purge
     def purge(self, dry_run: bool = True, now: Optional[datetime] = None) -> PurgeResult:
         now = now or datetime.utcnow()
+        started = time.perf_counter()
         candidates, issues = self.find_candidates(now)
+        for issue in issues:
+            logger.warning(f"Account purge: {issue}")
         details: List[Dict[str, Any]] = []
+        purge_ids: List[int] = []
         skipped_active = 0
-        purged = 0
-        with self._connect() as conn:
-            for r in candidates:
-                uid = r["id"]
-                email = r["email"]
-                is_active = self._is_truthy(r["is_active"]) if "is_active" in r.keys() else False
-                if is_active:
-                    skipped_active += 1
-                    details.append({"id": uid, "email": email, "status": "skipped_active"})
-                    continue
-                details.append({"id": uid, "email": email, "status": "purge_candidate"})
+        for r in candidates:
+            if self._is_truthy(r["is_active"]):
+                skipped_active += 1
+                details.append({"id": r["id"], "email": r["email"], "status": "skipped_active"})
+                continue
+            details.append({"id": r["id"], "email": r["email"], "status": "purge_candidate"})
+            purge_ids.append(r["id"])
+
+        result = PurgeResult(dry_run=dry_run, now=now.isoformat(), to_purge_count=len(candidates),
+                             skipped_active_count=skipped_active, details=details)
+        if purge_ids:
+            plan = PurgePlan(self.engine)
+            chunks = [purge_ids[i:i + self.chunk_size] for i in range(0, len(purge_ids), self.chunk_size)]
+            for n, chunk in enumerate(chunks):
                 if dry_run:
-                    continue
-                # Hard-delete user row (cascades depend on schema; this is minimal)
-                conn.execute("DELETE FROM users WHERE id = ?", (uid,))
-                purged += 1
-            if not dry_run:
-                conn.commit()
-        return PurgeResult(
-            dry_run=dry_run,
-            now=now.isoformat(),
-            to_purge_count=len(candidates),
-            skipped_active_count=skipped_active,
-            details=details,
-        )
+                    with self.engine.connect() as conn:
+                        counts = plan.count(conn, chunk)
+                        receipts = plan.receipt_paths(conn, chunk)
+                    result.files_removed += sum(1 for raw in receipts if self._receipt_file(raw) is not None)
+                    result.purged_count += len(chunk)
+                else:
+                    deleted_ids, counts, receipts = self._writer.run(self._delete_chunk, plan, chunk)
+                    result.files_removed += self._remove_files(deleted_ids, receipts)
+                    result.purged_count += len(deleted_ids)
+                    deleted = set(deleted_ids)
+                    for item in details:
+                        if item["id"] in deleted:
+                            item["status"] = "purged"
+                    if self.pause_seconds and n + 1 < len(chunks):
+                        time.sleep(self.pause_seconds)  # let queued live writes take the lock
+                for name, count in counts.items():
+                    result.row_counts[name] = result.row_counts.get(name, 0) + count
+                result.chunks += 1
+        result.seconds = time.perf_counter() - started
+        if not dry_run:
+            logger.info(f"Account purge removed {result.purged_count} users in {result.chunks} chunks "
+                        f"({sum(result.row_counts.values())} rows, {result.files_removed} files) "
+                        f"in {result.seconds:.2f}s")
+        return result
@@ -9,10 +9,12 @@
 from datetime import datetime
 from typing import Optional
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy.exc import SQLAlchemyError
 import logging
 
 from models import User, PasswordResetToken
+from utils.write_queue import write_queue
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -50,6 +52,10 @@ def get_user_by_email(db: Session, email: str) -> Optional[User]:
         return None
 
 
+def _record_login(db: Session, user_id: int, when: datetime) -> None:
+    db.query(User).filter(User.id == user_id).update({"last_login": when}, synchronize_session=False)
+
+
 def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
     """Authenticate user with email and password"""
     try:
@@ -75,14 +81,11 @@ def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
             logger.warning(f"Authentication failed - inactive user: {email}")
             return None
         
-        # Update last login
-        try:
-            user.last_login = datetime.utcnow()
-            db.commit()
-        except SQLAlchemyError as e:
-            # Don't fail authentication if we can't update last login
-            logger.error(f"Failed to update last login for {email}: {str(e)}")
-            db.rollback()
+        # Update last login off the request's transaction (group-committed on SQLite);
+        # a failure is logged by the queue and never fails authentication
+        now = datetime.utcnow()
+        write_queue.enqueue(_record_login, user.id, now)
+        set_committed_value(user, "last_login", now)
         
         logger.info(f"Authentication successful for user: {email}")
         return user
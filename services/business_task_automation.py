@@ -11,6 +11,7 @@ from sqlalchemy.orm import Session
 import logging
 
 from models import User, Expense
+from services.categorization_engine import automation_matcher
 
 logger = logging.getLogger(__name__)
 
@@ -36,10 +37,14 @@ class TaskStatus(Enum):
 class BusinessTaskAutomation:
     """Manages automated business tasks for contractors"""
     
-    def __init__(self, user: User, db: Session):
+    def __init__(self, user: User, db: Session, templates: Optional[Dict[str, Any]] = None):
         self.user = user
         self.db = db
-        self.load_templates()
+        if templates is not None:
+            # Fleet runs share one parsed copy instead of re-reading the file per user
+            self.templates = templates
+        else:
+            self.load_templates()
         self.active_tasks = {}
         
     def load_templates(self):
@@ -232,17 +237,9 @@ class BusinessTaskAutomation:
             ).limit(50).all()
             
             categorized_count = 0
-            for expense in uncategorized:
-                # Mock categorization - would use AI
-                if "gas" in (expense.description or "").lower():
-                    expense.category = "Fuel"
-                elif "tool" in (expense.description or "").lower():
-                    expense.category = "Tools & Equipment"
-                elif "material" in (expense.description or "").lower():
-                    expense.category = "Materials"
-                else:
-                    expense.category = "Other"
-                
+            categories = automation_matcher.match_many((expense.description,) for expense in uncategorized)
+            for expense, category in zip(uncategorized, categories):
+                expense.category = category
                 categorized_count += 1
             
             if categorized_count > 0:
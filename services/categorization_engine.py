@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/services/categorization_engine.py
+🎯 PURPOSE: One compiled keyword engine behind every expense-categorization path
+🔗 IMPORTS: collections (stdlib only)
+📤 EXPORTS: KeywordAutomaton, RuleMatcher, ExpenseCategorizer, CATEGORY_PATTERNS, expense_categorizer,
+            receipt_matcher, receipt_item_matcher, receipt_vendor_matcher, plaid_merchant_matcher,
+            stripe_description_matcher, automation_matcher, PLAID_CATEGORY_MAP
+🔄 PATTERN: rule table → Aho-Corasick automaton built once at import → one pass over each text
+
+Manual entry, receipt upload, smart receipts, Plaid, Stripe and the task
+automation all categorize by looking for vendor names and keywords in free
+text. Each rule table below is compiled into a single automaton whose
+states are a full transition table, so finding every rule keyword in a text
+costs one dict lookup per character however many categories and keywords
+there are. Matching keeps the substring semantics the call sites always had
+("gas" still matches "gasoline").
+
+Two kinds of tables sit on top of it:
+- RuleMatcher: ordered {category: keywords}; the first category (in table
+  order) with any hit wins, otherwise `default`.
+- ExpenseCategorizer: the scored CATEGORY_PATTERNS model used for manual
+  and voice expenses (vendor +50, keyword in description +20, keyword in
+  vendor +15, amount hints +10; confidence capped at 95).
+
+Both have a `*_many()` batch form for imports, which scores each distinct
+input once; bank and card feeds repeat the same merchants constantly.
+"""
+
+from collections import deque
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton over lower-cased patterns; find() returns the ids of patterns present"""
+
+    def __init__(self, patterns: Sequence[str]):
+        self.patterns = [p.lower() for p in patterns]
+        goto: List[Dict[str, int]] = [{}]
+        out: List[List[int]] = [[]]
+        for pattern_id, pattern in enumerate(self.patterns):
+            state = 0
+            for ch in pattern:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    out.append([])
+                state = nxt
+            out[state].append(pattern_id)
+
+        # Breadth-first: a state's failure target is always finished before the state itself,
+        # so each state's full transition table is its failure target's table plus its own edges
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [dict(goto[0])] + [{} for _ in goto[1:]]
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            delta[state] = {**delta[fail[state]], **goto[state]}
+            out[state] = out[state] + out[fail[state]]
+            for ch, child in goto[state].items():
+                fail[child] = delta[fail[state]].get(ch, 0)
+                queue.append(child)
+
+        self._delta = delta
+        self._out: List[Tuple[int, ...]] = [tuple(ids) for ids in out]
+
+    def find(self, text: Optional[str]) -> Set[int]:
+        """Ids of every pattern occurring in `text` (case-insensitive), in one pass"""
+        hits: Set[int] = set()
+        if not text:
+            return hits
+        delta, out = self._delta, self._out
+        state = 0
+        for ch in text.lower():
+            state = delta[state].get(ch, 0)
+            if out[state]:
+                hits.update(out[state])
+        return hits
+
+
+class RuleMatcher:
+    """First-match categorization over an ordered {category: keywords} table"""
+
+    def __init__(self, rules: Mapping[str, Iterable[str]], default: Optional[str] = None):
+        self.categories = list(rules)
+        self.default = default
+        patterns: Dict[str, int] = {}
+        for rank, keywords in enumerate(rules.values()):
+            for keyword in keywords:
+                keyword = keyword.lower()
+                # A keyword listed under several categories resolves to the earliest one
+                patterns.setdefault(keyword, rank)
+        self._automaton = KeywordAutomaton(list(patterns))
+        self._rank = list(patterns.values())
+
+    def ranks(self, *texts: Optional[str]) -> Set[int]:
+        """Table positions of every category with a keyword in any of `texts`"""
+        return {self._rank[pattern_id] for text in texts for pattern_id in self._automaton.find(text)}
+
+    def match(self, *texts: Optional[str]) -> Optional[str]:
+        """The first category (in table order) with a keyword in any of `texts`, else the default"""
+        ranks = self.ranks(*texts)
+        return self.categories[min(ranks)] if ranks else self.default
+
+    def match_many(self, rows: Iterable[Sequence[Optional[str]]]) -> List[Optional[str]]:
+        """match(*row) for each row; repeated rows are matched once"""
+        seen: Dict[Tuple, Optional[str]] = {}
+        results = []
+        for row in rows:
+            key = tuple(row)
+            if key not in seen:
+                seen[key] = self.match(*key)
+            results.append(seen[key])
+        return results
+
+
+# ------------------------------------------------------------------ scored expense model
+# AI Categorization mappings (manual and voice expenses)
+CATEGORY_PATTERNS = {
+    # Construction categories
+    "Materials - Lumber": {
+        "vendors": ["home depot", "lowes", "lumber", "wood"],
+        "keywords": ["lumber", "wood", "plywood", "2x4", "2x6", "framing", "studs", "boards"],
+        "weight": 1.2
+    },
+    "Materials - Electrical": {
+        "vendors": ["home depot", "lowes", "electrical supply", "graybar"],
+        "keywords": ["wire", "outlet", "switch", "breaker", "panel", "electrical", "conduit"],
+        "weight": 1.2
+    },
+    "Materials - Plumbing": {
+        "vendors": ["home depot", "lowes", "ferguson", "plumbing"],
+        "keywords": ["pipe", "fitting", "valve", "faucet", "plumbing", "pvc", "copper", "pex"],
+        "weight": 1.2
+    },
+    "Materials - Hardware": {
+        "vendors": ["home depot", "lowes", "ace hardware", "true value"],
+        "keywords": ["screws", "nails", "bolts", "fasteners", "hardware", "brackets", "hinges"],
+        "weight": 1.1
+    },
+    "Equipment - Fuel": {
+        "vendors": ["shell", "chevron", "exxon", "gas station", "fuel"],
+        "keywords": ["gas", "diesel", "fuel", "gasoline"],
+        "weight": 1.1
+    },
+    "Labor - Subcontractors": {
+        "vendors": [],
+        "keywords": ["subcontractor", "sub", "contractor", "labor", "crew", "helper"],
+        "weight": 1.0
+    },
+    # Original categories
+    "Office Supplies": {
+        "vendors": ["staples", "office depot", "amazon"],
+        "keywords": ["supplies", "printer", "ink", "paper", "desk", "chair", "stationery"],
+        "weight": 1.0
+    },
+    "Meals & Entertainment": {
+        "vendors": ["chipotle", "starbucks", "mcdonalds", "subway", "olive garden", "restaurant"],
+        "keywords": ["lunch", "dinner", "breakfast", "coffee", "meal", "food", "client lunch", "networking"],
+        "weight": 1.0
+    },
+    "Transportation": {
+        "vendors": ["uber", "lyft", "taxi", "parking"],
+        "keywords": ["ride", "transport", "parking", "gas", "fuel", "mileage"],
+        "weight": 1.0
+    },
+    "Software & Subscriptions": {
+        "vendors": ["adobe", "microsoft", "google", "dropbox", "slack", "zoom"],
+        "keywords": ["software", "subscription", "saas", "license", "cloud", "app"],
+        "weight": 1.0
+    },
+    "Marketing & Advertising": {
+        "vendors": ["facebook", "google ads", "mailchimp", "godaddy"],
+        "keywords": ["marketing", "advertising", "promotion", "domain", "hosting", "seo", "ads"],
+        "weight": 1.0
+    },
+    "Shipping & Postage": {
+        "vendors": ["usps", "fedex", "ups", "dhl"],
+        "keywords": ["shipping", "postage", "mail", "package", "delivery"],
+        "weight": 1.0
+    },
+    "Professional Development": {
+        "vendors": ["udemy", "coursera", "conference"],
+        "keywords": ["training", "course", "conference", "workshop", "seminar", "education"],
+        "weight": 1.0
+    },
+    "Travel": {
+        "vendors": ["hotel", "airline", "airbnb", "booking.com"],
+        "keywords": ["flight", "hotel", "travel", "accommodation", "lodging"],
+        "weight": 1.0
+    },
+    "Utilities": {
+        "vendors": ["electric", "water", "internet", "phone"],
+        "keywords": ["utility", "electric", "water", "internet", "phone", "telecom"],
+        "weight": 1.0
+    },
+    "Insurance": {
+        "vendors": ["state farm", "geico", "allstate"],
+        "keywords": ["insurance", "premium", "coverage", "liability"],
+        "weight": 1.0
+    }
+}
+
+VENDOR_SCORE = 50
+DESCRIPTION_KEYWORD_SCORE = 20
+VENDOR_KEYWORD_SCORE = 15
+AMOUNT_HINT_SCORE = 10
+MAX_CONFIDENCE = 95
+
+# Amount ranges (cents, inclusive; None = unbounded) that nudge a category
+AMOUNT_HINTS = {
+    "Meals & Entertainment": (500, 15000),
+    "Transportation": (1000, 10000),
+    "Professional Development": (50001, None),
+}
+
+
+class ExpenseCategorizer:
+    """Scored vendor/keyword model over CATEGORY_PATTERNS, compiled into one automaton"""
+
+    def __init__(self, patterns: Mapping[str, Mapping] = CATEGORY_PATTERNS,
+                 amount_hints: Mapping[str, Tuple[int, Optional[int]]] = AMOUNT_HINTS,
+                 fallback: str = "Other"):
+        self.categories = list(patterns)
+        self.fallback = fallback
+        texts: Dict[str, int] = {}
+        vendor_of: List[List[int]] = []
+        keyword_of: List[List[int]] = []
+
+        def pattern_id(text: str) -> int:
+            text = text.lower()
+            if text not in texts:
+                texts[text] = len(texts)
+                vendor_of.append([])
+                keyword_of.append([])
+            return texts[text]
+
+        for rank, rules in enumerate(patterns.values()):
+            for vendor in rules.get("vendors", ()):
+                vendor_of[pattern_id(vendor)].append(rank)
+            for keyword in rules.get("keywords", ()):
+                keyword_of[pattern_id(keyword)].append(rank)
+
+        self._automaton = KeywordAutomaton(list(texts))
+        self._vendor_of = [tuple(ranks) for ranks in vendor_of]
+        self._keyword_of = [tuple(ranks) for ranks in keyword_of]
+        self._amount_hints = [(self.categories.index(name), low, high)
+                              for name, (low, high) in amount_hints.items() if name in patterns]
+
+    def scores(self, description: Optional[str], vendor: Optional[str] = None,
+               amount_cents: Optional[int] = None) -> List[int]:
+        """Score per category (table order)"""
+        scores = [0] * len(self.categories)
+        description_hits = self._automaton.find(description)
+        vendor_hits = self._automaton.find(vendor)
+
+        vendor_matched = {rank for pattern_id in vendor_hits for rank in self._vendor_of[pattern_id]}
+        for rank in vendor_matched:  # one vendor match per category
+            scores[rank] += VENDOR_SCORE
+        for pattern_id in description_hits:
+            for rank in self._keyword_of[pattern_id]:
+                scores[rank] += DESCRIPTION_KEYWORD_SCORE
+        for pattern_id in vendor_hits:
+            for rank in self._keyword_of[pattern_id]:
+                scores[rank] += VENDOR_KEYWORD_SCORE
+
+        if amount_cents:
+            for rank, low, high in self._amount_hints:
+                if amount_cents >= low and (high is None or amount_cents <= high):
+                    scores[rank] += AMOUNT_HINT_SCORE
+        return scores
+
+    def categorize(self, description: Optional[str], vendor: Optional[str] = None,
+                   amount_cents: Optional[int] = None) -> Tuple[str, int]:
+        """(category_name, confidence 0-95); the earliest category wins ties"""
+        scores = self.scores(description, vendor, amount_cents)
+        best = max(range(len(scores)), key=scores.__getitem__, default=None)
+        if best is None or scores[best] <= 0:
+            return self.fallback, 0
+        return self.categories[best], min(scores[best], MAX_CONFIDENCE)
+
+    def categorize_many(self, rows: Iterable[Sequence]) -> List[Tuple[str, int]]:
+        """categorize(*row) for (description, vendor, amount_cents) rows; repeated rows are scored once"""
+        seen: Dict[Tuple, Tuple[str, int]] = {}
+        results = []
+        for row in rows:
+            key = tuple(row)
+            if key not in seen:
+                seen[key] = self.categorize(*key)
+            results.append(seen[key])
+        return results
+
+
+# ------------------------------------------------------------------ first-match tables
+# Receipt upload (merchant + OCR text)
+RECEIPT_CATEGORIES = {
+    'food': ['restaurant', 'cafe', 'coffee', 'pizza', 'burger', 'subway', 'mcdonalds', 'starbucks'],
+    'transportation': ['uber', 'lyft', 'taxi', 'gas', 'fuel', 'shell', 'exxon', 'chevron'],
+    'office': ['staples', 'office depot', 'amazon', 'walmart', 'target'],
+    'utilities': ['electric', 'water', 'gas', 'internet', 'phone', 'verizon', 'at&t'],
+    'entertainment': ['netflix', 'spotify', 'movie', 'theater', 'concert'],
+    'travel': ['hotel', 'airbnb', 'airline', 'delta', 'united', 'american'],
+}
+
+# Smart receipts: line items, then the vendor
+RECEIPT_ITEM_CATEGORIES = {
+    'materials': ['lumber', 'concrete', 'drywall', 'paint', 'nails', 'screws', 'pipe', 'wire'],
+    'tools': ['drill', 'saw', 'hammer', 'level', 'measure', 'tool', 'equipment'],
+    'vehicle': ['gas', 'fuel', 'diesel', 'oil', 'tire', 'maintenance'],
+    'safety': ['helmet', 'gloves', 'boots', 'harness', 'vest', 'goggles'],
+    'office': ['paper', 'ink', 'computer', 'software', 'phone'],
+    'subcontractor': ['labor', 'service', 'installation', 'repair']
+}
+RECEIPT_VENDOR_CATEGORIES = {
+    'materials': ['home depot', 'lowes', 'menards'],
+    'vehicle': ['shell', 'exxon', 'chevron', 'gas'],
+    'tools': ['harbor freight', 'grainger'],
+}
+
+# Plaid: the bank's own category first, then merchant/name keywords
+PLAID_CATEGORY_MAP = {
+    "food and drink": "Meals & Entertainment",
+    "shopping": "Office Supplies",
+    "transportation": "Transportation",
+    "travel": "Travel",
+    "bills and utilities": "Utilities",
+    "entertainment": "Meals & Entertainment",
+    "health and fitness": "Professional Development",
+    "professional services": "Professional Services",
+    "education": "Professional Development",
+    "personal care": "Office Supplies",
+    "insurance": "Insurance",
+    "financial services": "Banking & Finance",
+    "government services": "Taxes & Fees",
+    "income": "Income",
+    "transfer": "Transfer",
+    "payment": "Payment"
+}
+PLAID_MERCHANT_CATEGORIES = {
+    "Office Supplies": ["office", "staples", "supplies", "paper", "ink"],
+    "Meals & Entertainment": ["restaurant", "coffee", "starbucks", "mcdonalds", "uber eats"],
+    "Transportation": ["uber", "lyft", "taxi", "gas", "shell", "exxon"],
+    "Software & Subscriptions": ["amazon", "software", "subscription", "saas"],
+    "Marketing & Advertising": ["facebook", "google", "advertising", "marketing"],
+    "Travel": ["hotel", "airbnb", "flight", "airline"],
+    "Utilities": ["electricity", "water", "internet", "phone", "verizon", "at&t"],
+}
+
+# Stripe charge descriptions
+STRIPE_DESCRIPTION_CATEGORIES = {
+    "Office Supplies": ["office", "supplies", "paper", "ink"],
+    "Meals & Entertainment": ["food", "lunch", "dinner", "restaurant", "coffee"],
+    "Transportation": ["uber", "lyft", "taxi", "gas", "fuel"],
+    "Software & Subscriptions": ["software", "subscription", "saas", "app"],
+    "Marketing & Advertising": ["advertising", "marketing", "facebook", "google"],
+    "Shipping & Postage": ["shipping", "postage", "delivery"],
+    "Professional Development": ["course", "training", "education", "book"],
+    "Travel": ["hotel", "flight", "travel", "airbnb"],
+    "Utilities": ["electricity", "water", "internet", "phone"],
+    "Insurance": ["insurance", "premium"],
+}
+
+# Business task automation sweep over uncategorized expenses
+AUTOMATION_CATEGORIES = {
+    "Fuel": ["gas"],
+    "Tools & Equipment": ["tool"],
+    "Materials": ["material"],
+}
+
+# Compiled once at import; shared by every request and import job
+expense_categorizer = ExpenseCategorizer()
+receipt_matcher = RuleMatcher(RECEIPT_CATEGORIES, default='other')
+receipt_item_matcher = RuleMatcher(RECEIPT_ITEM_CATEGORIES, default='materials')
+receipt_vendor_matcher = RuleMatcher(RECEIPT_VENDOR_CATEGORIES)
+plaid_merchant_matcher = RuleMatcher(PLAID_MERCHANT_CATEGORIES, default="Office Supplies")
+stripe_description_matcher = RuleMatcher(STRIPE_DESCRIPTION_CATEGORIES, default="Office Supplies")
+automation_matcher = RuleMatcher(AUTOMATION_CATEGORIES, default="Other")
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/services/category_model.py
+🎯 PURPOSE: Per-user categorization model served from an LRU cache over the persisted feature counts
+🔗 IMPORTS: threading, SQLAlchemy, config, models.category_model
+📤 EXPORTS: UserCategoryModel, CategoryModelStore, category_models
+🔄 PATTERN: suggest() → cached model (one indexed query on miss) → score; commits stream deltas into cached models
+
+category_feature_counts is maintained incrementally by the flush hook in
+models.category_model, so a suggestion never rescans a user's expenses.
+Models stay cached for CATEGORY_MODEL_TTL_SECONDS; writes committed in this
+process are applied to cached models immediately, writes from other workers
+show up once the entry expires. rebuild() recomputes the counts from the
+expenses table for existing data or after a bulk import that bypassed the ORM.
+"""
+
+import logging
+import threading
+import time
+from collections import Counter, OrderedDict, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, distinct, insert, select
+from sqlalchemy.orm import Session
+
+from config import config
+from models.category_model import (
+    CategoryFeatureCount, amount_bucket, ensure_table, expense_features, on_category_deltas
+)
+from models.expense import Expense
+from models.expense_category import ExpenseCategory
+
+logger = logging.getLogger(__name__)
+
+
+class UserCategoryModel:
+    """Feature → category counts for one user"""
+
+    __slots__ = ("user_id", "counts", "names", "loaded_at")
+
+    def __init__(self, user_id: int):
+        self.user_id = user_id
+        self.counts: Dict[Tuple[str, str], Dict[int, int]] = defaultdict(dict)
+        self.names: Dict[int, str] = {}
+        self.loaded_at = time.monotonic()
+
+    def __bool__(self):
+        return bool(self.counts)
+
+    def add(self, category_id: int, features: Dict[Tuple[str, str], int]) -> None:
+        for feature, n in features.items():
+            by_category = self.counts[feature]
+            total = by_category.get(category_id, 0) + n
+            if total > 0:
+                by_category[category_id] = total
+            else:
+                by_category.pop(category_id, None)
+                if not by_category:
+                    del self.counts[feature]
+
+    def _count(self, kind: str, feature: str) -> Dict[int, int]:
+        return self.counts.get((kind, feature), {})
+
+    def scores(self, description: str, vendor: Optional[str], amount_cents: Optional[int]) -> Dict[str, int]:
+        """Category name → score: word matches + 2x vendor matches + amount range matches"""
+        scores: Dict[str, int] = Counter()
+        for word in (description or "").lower().split():
+            for category_id, n in self._count("token", word).items():
+                scores[self.names[category_id]] += n
+        if vendor:
+            for category_id, n in self._count("vendor", vendor.lower()).items():
+                scores[self.names[category_id]] += n * 2  # Vendor is strong signal
+        for category_id, n in self._count("amount", amount_bucket(amount_cents)).items():
+            scores[self.names[category_id]] += n
+        return dict(scores)
+
+
+class CategoryModelStore:
+    """LRU of UserCategoryModel, kept current by committed expense writes"""
+
+    def __init__(self, max_users: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        self.max_users = max_users or config.CATEGORY_MODEL_CACHE_USERS
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else config.CATEGORY_MODEL_TTL_SECONDS
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "deltas_applied": 0, "backfills": 0}
+        self._models: "OrderedDict[int, UserCategoryModel]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def model(self, db: Session, user_id: int) -> UserCategoryModel:
+        """Cached model for `user_id`, loading it with one query on a miss"""
+        with self._lock:
+            cached = self._models.get(user_id)
+            if cached is not None and time.monotonic() - cached.loaded_at < self.ttl_seconds:
+                self._models.move_to_end(user_id)
+                self.stats["hits"] += 1
+                return cached
+            self.stats["expired" if cached is not None else "misses"] += 1
+
+        model = self._load(db, user_id)
+        if not model and self._has_categorized_expenses(db, user_id):
+            # Expenses written before the counts existed: build them once
+            self.stats["backfills"] += 1
+            with Session(bind=db.get_bind()) as backfill:
+                self.rebuild(backfill, [user_id])
+            model = self._load(db, user_id)
+
+        with self._lock:
+            self._models[user_id] = model
+            self._models.move_to_end(user_id)
+            while len(self._models) > self.max_users:
+                self._models.popitem(last=False)
+                self.stats["evictions"] += 1
+        return model
+
+    def _load(self, db: Session, user_id: int) -> UserCategoryModel:
+        ensure_table(db.connection(), db)
+        model = UserCategoryModel(user_id)
+        rows = db.execute(
+            select(CategoryFeatureCount.kind, CategoryFeatureCount.feature, CategoryFeatureCount.category_id,
+                   CategoryFeatureCount.count, ExpenseCategory.name)
+            .join(ExpenseCategory, ExpenseCategory.id == CategoryFeatureCount.category_id)
+            .where(CategoryFeatureCount.user_id == user_id, CategoryFeatureCount.count > 0)
+        )
+        for kind, feature, category_id, count, name in rows:
+            model.counts[(kind, feature)][category_id] = count
+            model.names[category_id] = name
+        return model
+
+    @staticmethod
+    def _has_categorized_expenses(db: Session, user_id: int) -> bool:
+        return db.execute(
+            select(Expense.id).where(Expense.user_id == user_id, Expense.category_id.isnot(None)).limit(1)
+        ).first() is not None
+
+    def suggest(self, db: Session, user_id: int, description: str, vendor: Optional[str] = None,
+                amount_cents: Optional[int] = None) -> List[Tuple[str, int]]:
+        """(category name, score) pairs, best first; empty when the user's history has no match"""
+        scores = self.model(db, user_id).scores(description, vendor, amount_cents)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+    def apply_deltas(self, deltas: Dict[Tuple[int, int], Dict]) -> None:
+        """Fold committed count changes into cached models (listener for models.category_model)"""
+        with self._lock:
+            for (user_id, category_id), features in deltas.items():
+                model = self._models.get(user_id)
+                if model is None:
+                    continue
+                if category_id not in model.names:
+                    # Category name unknown to this model: reload on next use
+                    del self._models[user_id]
+                    continue
+                model.add(category_id, features)
+                self.stats["deltas_applied"] += 1
+
+    def invalidate(self, user_ids: Optional[Iterable[int]] = None) -> None:
+        with self._lock:
+            if user_ids is None:
+                self._models.clear()
+                return
+            for user_id in user_ids:
+                self._models.pop(user_id, None)
+
+    def rebuild(self, db: Session, user_ids: Optional[Iterable[int]] = None,
+                batch_size: int = 500) -> Dict[str, int]:
+        """Recompute the counts from the expenses table (all users by default) and commit"""
+        ensure_table(db.connection(), db)
+        table = CategoryFeatureCount.__table__
+        if user_ids is None:
+            db.execute(delete(table))
+            user_ids = db.scalars(
+                select(distinct(Expense.user_id)).where(Expense.category_id.isnot(None))
+            ).all()
+        user_ids = sorted(set(user_ids))
+
+        totals = {"users": len(user_ids), "expenses": 0, "rows": 0}
+        for start in range(0, len(user_ids), batch_size):
+            batch = user_ids[start:start + batch_size]
+            db.execute(delete(table).where(table.c.user_id.in_(batch)))
+            counts: Counter = Counter()
+            expenses = db.execute(
+                select(Expense.user_id, Expense.category_id, Expense.description, Expense.vendor,
+                       Expense.amount_cents)
+                .where(Expense.user_id.in_(batch), Expense.category_id.isnot(None))
+                .execution_options(yield_per=5000)
+            )
+            for user_id, category_id, description, vendor, amount_cents in expenses:
+                totals["expenses"] += 1
+                for (kind, feature), n in expense_features(description, vendor, amount_cents).items():
+                    counts[(user_id, kind, feature, category_id)] += n
+            if counts:
+                db.execute(insert(table), [
+                    {"user_id": user_id, "kind": kind, "feature": feature, "category_id": category_id, "count": n}
+                    for (user_id, kind, feature, category_id), n in counts.items()
+                ])
+            totals["rows"] += len(counts)
+            db.commit()
+            self.invalidate(batch)
+        logger.info("Rebuilt category models: %s", totals)
+        return totals
+
+    def get_stats(self) -> Dict[str, int]:
+        return dict(self.stats, users=len(self._models), max_users=self.max_users)
+
+
+category_models = CategoryModelStore()
+on_category_deltas(category_models.apply_deltas)
@@ -7,21 +7,24 @@ import os
 import json
 from typing import Dict, List, Optional, Any
 from datetime import datetime
-import openai
-from openai import AsyncOpenAI
 from pathlib import Path
 from typing import Any as _Any
 from config import config
+from utils.lazy_import import lazy_import
+
+# Imported on first AI call, not at worker boot
+openai = lazy_import("openai")
 
 class CORAAIService:
     def __init__(self):
         # Initialize OpenAI client only if API key is available
         api_key = os.getenv('OPENAI_API_KEY')
+        self._client = None
         if api_key and api_key != 'your-openai-api-key-here':
-            self.client = AsyncOpenAI(api_key=api_key)
+            self._api_key = api_key
             self.ai_enabled = True
         else:
-            self.client = None
+            self._api_key = None
             self.ai_enabled = False
             print("⚠️  OpenAI API key not configured. CORA will use fallback responses.")
         
@@ -38,6 +41,13 @@ class CORAAIService:
             "communication_style": "conversational, helpful, encouraging, with occasional humor"
         }
     
+    @property
+    def client(self):
+        """AsyncOpenAI client, created (and openai imported) on first use"""
+        if self._client is None and self._api_key:
+            self._client = openai.AsyncOpenAI(api_key=self._api_key)
+        return self._client
+    
     def _load_conversation_implementation(self) -> Dict:
         """Load the comprehensive conversation implementation rules"""
         try:
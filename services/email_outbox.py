@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/services/email_outbox.py
+🎯 PURPOSE: Durable email outbox: enqueue from request handlers, deliver in the background
+🔗 IMPORTS: threading, SQLAlchemy, config, services.email_service
+📤 EXPORTS: EmailOutbox, email_outbox, queue_email, start_email_outbox, stop_email_outbox
+🔄 PATTERN: enqueue → email_outbox row (committed) → pooled, rate-limited senders
+
+enqueue() commits the message's row before returning, so an accepted email
+survives a crash or restart; callers wait on one small insert but never on
+SendGrid. The dispatcher thread claims due rows and sends them concurrently
+through services.email_service.post_mail (keep-alive pool + shared rate
+limiter). Transient failures (network errors, 429, 5xx) are retried with
+exponential backoff; other provider errors, and rows whose payload cannot be
+built, mark the row dead. Rows with a dedup_key are inserted at most once.
+"""
+
+import logging
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, func, or_
+from sqlalchemy.exc import IntegrityError
+
+from config import config
+from models import EmailOutboxMessage, engine, session_scope
+from services import email_service
+from services.email_service import build_payload, post_mail, EMAIL_SEND_CONCURRENCY
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS = {408, 429}
+
+
+class EmailOutbox:
+    """Background delivery of queued emails with retry and dedup"""
+
+    def __init__(self, concurrency: Optional[int] = None, max_attempts: Optional[int] = None,
+                 retry_backoff: Optional[float] = None, poll_interval: Optional[float] = None,
+                 claim_timeout: Optional[int] = None,
+                 transport: Optional[Callable[[Dict], Tuple[int, str]]] = None):
+        self.concurrency = concurrency or EMAIL_SEND_CONCURRENCY
+        self.max_attempts = max_attempts or config.EMAIL_OUTBOX_MAX_ATTEMPTS
+        self.retry_backoff = retry_backoff if retry_backoff is not None else config.EMAIL_OUTBOX_RETRY_BACKOFF_SECONDS
+        self.poll_interval = poll_interval if poll_interval is not None else config.EMAIL_OUTBOX_POLL_SECONDS
+        self.claim_timeout = claim_timeout if claim_timeout is not None else config.EMAIL_OUTBOX_CLAIM_TIMEOUT_SECONDS
+        self.transport = transport
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._start_lock = threading.Lock()
+        self._table_ready = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.transport is not None or bool(email_service.SENDGRID_API_KEY)
+
+    # ------------------------------------------------------------------ producer
+    def enqueue(self, to_email: str, subject: str, body: str = "", html_body: Optional[str] = None, *,
+                from_name: Optional[str] = None, attachment_path: Optional[str] = None,
+                dedup_key: Optional[str] = None) -> bool:
+        """Store an email for delivery; returns False when email is not configured
+
+        The row is committed before this returns (a repeated dedup_key is
+        accepted but not stored twice), so the dispatcher, or the next process
+        to start, delivers it even if this one dies first.
+        """
+        if not self.enabled or not to_email:
+            return False
+        self._ensure_table()
+        self._insert({
+            "to_email": to_email, "subject": subject, "body": body, "html_body": html_body,
+            "from_name": from_name, "attachment_path": attachment_path, "dedup_key": dedup_key,
+        })
+        self.start()
+        self._wake.set()
+        return True
+
+    def _insert(self, item: Dict[str, Any]) -> bool:
+        """Insert and commit one row; False when its dedup_key is already stored"""
+        now = datetime.utcnow()
+        try:
+            with session_scope() as db:
+                key = item["dedup_key"]
+                if key and db.query(EmailOutboxMessage.id).filter(EmailOutboxMessage.dedup_key == key).first():
+                    return False
+                db.add(EmailOutboxMessage(**item, status="pending", attempts=0, next_attempt_at=now,
+                                          created_at=now))
+            return True
+        except IntegrityError:
+            return False  # another process inserted the same dedup_key concurrently
+
+    # ------------------------------------------------------------------ dispatcher
+    def _ensure_table(self):
+        if not self._table_ready:
+            EmailOutboxMessage.__table__.create(bind=engine, checkfirst=True)
+            self._table_ready = True
+
+    def start(self):
+        """Start the dispatcher thread if it is not running"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping.clear()
+            self._pool = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="cora-email")
+            self._thread = threading.Thread(target=self._run, name="cora-email-outbox", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 10):
+        """Stop the dispatcher; undelivered rows stay in the table for the next start"""
+        self._stopping.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                if self.process_due():
+                    continue
+            except Exception as e:
+                logger.error(f"Email outbox dispatcher error: {e}")
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def _due_filter(self, now: datetime):
+        stale = now - timedelta(seconds=self.claim_timeout)
+        return or_(
+            and_(EmailOutboxMessage.status == "pending", EmailOutboxMessage.next_attempt_at <= now),
+            and_(EmailOutboxMessage.status == "sending", EmailOutboxMessage.claimed_at < stale),
+        )
+
+    def _claim_due(self, limit: int) -> List[int]:
+        """Mark due rows as sending; safe when several processes share the table"""
+        now = datetime.utcnow()
+        claimed = []
+        with session_scope() as db:
+            ids = [row_id for (row_id,) in db.query(EmailOutboxMessage.id).filter(
+                self._due_filter(now)).order_by(EmailOutboxMessage.id).limit(limit)]
+            for row_id in ids:
+                updated = db.query(EmailOutboxMessage).filter(
+                    EmailOutboxMessage.id == row_id, self._due_filter(now)
+                ).update({
+                    "status": "sending",
+                    "claimed_at": now,
+                    "attempts": EmailOutboxMessage.attempts + 1,
+                }, synchronize_session=False)
+                if updated:
+                    claimed.append(row_id)
+        return claimed
+
+    def process_due(self) -> int:
+        """Claim and deliver one round of due messages; returns how many were attempted"""
+        self._ensure_table()
+        claimed = self._claim_due(self.concurrency * 4)
+        if not claimed:
+            return 0
+        if self._pool is not None:
+            list(self._pool.map(self._deliver, claimed))
+        else:
+            for row_id in claimed:
+                self._deliver(row_id)
+        return len(claimed)
+
+    def _deliver(self, row_id: int):
+        status_code, error, retryable = None, None, True
+        with session_scope() as db:
+            msg = db.get(EmailOutboxMessage, row_id)
+            if msg is None:
+                return
+            attempts = msg.attempts or 1
+            try:
+                payload = build_payload(msg.to_email, msg.subject, msg.body or "", msg.html_body,
+                                        msg.attachment_path, msg.from_name)
+            except Exception as e:
+                # A row whose message cannot be built fails the same way on every attempt
+                payload, error, retryable = None, f"could not build message: {e}", False
+
+        if payload is not None:
+            try:
+                status_code, text = (self.transport or post_mail)(payload)
+                if not 200 <= status_code < 300:
+                    error = text[:1000]
+            except Exception as e:
+                status_code, error = None, str(e) or type(e).__name__
+            retryable = status_code is None or status_code in RETRYABLE_STATUS or status_code >= 500
+
+        now = datetime.utcnow()
+        with session_scope() as db:
+            msg = db.get(EmailOutboxMessage, row_id)
+            msg.last_status = status_code
+            msg.last_error = error
+            msg.claimed_at = None
+            if error is None:
+                msg.status = "sent"
+                msg.sent_at = now
+            elif retryable and attempts < self.max_attempts:
+                delay = self.retry_backoff * (2 ** (attempts - 1)) * random.uniform(0.8, 1.2)
+                msg.status = "pending"
+                msg.next_attempt_at = now + timedelta(seconds=delay)
+                logger.warning(f"Email {row_id} to {msg.to_email} failed ({status_code}); retry {attempts}/{self.max_attempts}")
+            else:
+                msg.status = "dead"
+                logger.error(f"Email {row_id} to {msg.to_email} dead after {attempts} attempts: {status_code} {error}")
+
+    def stats(self) -> Dict[str, int]:
+        """Row counts by status"""
+        self._ensure_table()
+        with session_scope() as db:
+            rows = db.query(EmailOutboxMessage.status, func.count(EmailOutboxMessage.id)).group_by(
+                EmailOutboxMessage.status)
+            return {status: count for status, count in rows}
+
+
+# Global outbox instance
+email_outbox = EmailOutbox()
+
+
+def queue_email(to_email: str, subject: str, body: str = "", html_body: Optional[str] = None, *,
+                from_name: Optional[str] = None, attachment_path: Optional[str] = None,
+                dedup_key: Optional[str] = None) -> bool:
+    """Queue an email through the global outbox"""
+    return email_outbox.enqueue(to_email, subject, body, html_body, from_name=from_name,
+                                attachment_path=attachment_path, dedup_key=dedup_key)
+
+
+def start_email_outbox():
+    if email_outbox.enabled:
+        email_outbox.start()
+
+
+def stop_email_outbox():
+    email_outbox.stop()
@@ -2,17 +2,23 @@
 """
 🧭 LOCATION: /CORA/services/email_service.py
 🎯 PURPOSE: Email service using SendGrid for password reset and notifications
-🔗 IMPORTS: requests, os
-📤 EXPORTS: send_email, send_password_reset_email, send_welcome_email
+🔗 IMPORTS: requests, httpx, os, services.integration_http
+📤 EXPORTS: send_email, queue_email, post_mail, post_mail_async, send_personalized_batch, send_password_reset_email, send_welcome_email
 """
 
+import httpx
 import requests
 import os
 import asyncio
+import base64
 import logging
-from typing import Optional, Iterable, List
+import threading
+import time
+from typing import Optional, Iterable, List, Dict, Tuple
 from dotenv import load_dotenv
 
+from services.integration_http import async_integration_client, integration_client
+
 # Load environment variables
 load_dotenv()
 
@@ -21,6 +27,117 @@ logger = logging.getLogger(__name__)
 # SendGrid API key - Get from environment variable
 SENDGRID_API_KEY = os.getenv("SENDGRID_API_KEY", "")
 FROM_EMAIL = os.getenv("FROM_EMAIL", "noreply@coraai.tech")
+SENDGRID_SEND_URL = os.getenv("SENDGRID_API_URL", "https://api.sendgrid.com/v3/mail/send")
+
+# SendGrid accepts at most 1000 personalizations per mail/send request
+MAX_PERSONALIZATIONS = 1000
+
+# Shared by every sender in the process; keep below the account's mail/send quota
+EMAIL_RATE_PER_SECOND = float(os.getenv("EMAIL_RATE_PER_SECOND", "10"))
+EMAIL_SEND_CONCURRENCY = int(os.getenv("EMAIL_SEND_CONCURRENCY", "8"))
+
+class RateLimiter:
+    """Token bucket; acquire() blocks until a send is allowed"""
+
+    def __init__(self, rate_per_second: float, burst: Optional[int] = None) -> None:
+        self.rate = rate_per_second
+        self.capacity = float(burst or max(1, int(rate_per_second)))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        """acquire() for event-loop callers: waits with asyncio.sleep instead of blocking the loop"""
+        if self.rate <= 0:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            await asyncio.sleep(wait)
+
+
+send_limiter = RateLimiter(EMAIL_RATE_PER_SECOND)
+
+
+def post_mail(payload: Dict, timeout: float = 10, url: Optional[str] = None) -> Tuple[int, str]:
+    """POST one mail/send payload over the shared SendGrid client, honoring the rate limit
+
+    Returns (status_code, response_text). Network errors (and an open circuit)
+    raise requests.RequestException.
+    """
+    response = integration_client("sendgrid").post(
+        url or SENDGRID_SEND_URL,
+        headers={"Authorization": f"Bearer {SENDGRID_API_KEY}"},
+        json=payload,
+        timeout=timeout,
+        limiter=send_limiter,
+    )
+    return response.status_code, response.text
+
+
+async def post_mail_async(payload: Dict, timeout: float = 10, url: Optional[str] = None) -> Tuple[int, str]:
+    """post_mail() on the event loop's pooled async client; network errors raise httpx.HTTPError"""
+    response = await async_integration_client("sendgrid").post(
+        url or SENDGRID_SEND_URL,
+        headers={"Authorization": f"Bearer {SENDGRID_API_KEY}"},
+        json=payload,
+        timeout=timeout,
+        limiter=send_limiter,
+    )
+    return response.status_code, response.text
+
+
+def build_payload(to_email: str, subject: str, body: str, html_body: Optional[str] = None,
+                  attachment_path: Optional[str] = None, from_name: Optional[str] = None) -> Dict:
+    """SendGrid v3 mail/send payload for a single recipient"""
+    sender = {"email": FROM_EMAIL, "name": from_name or "CORA Support"}
+    payload = {
+        "personalizations": [{"to": [{"email": to_email}]}],
+        "from": sender,
+        "reply_to": sender,
+        "subject": subject,
+        "content": [{"type": "text/plain", "value": body or " "}]
+    }
+
+    if html_body:
+        payload["content"].append({"type": "text/html", "value": html_body})
+
+    # Add PDF attachment if provided
+    if attachment_path and os.path.exists(attachment_path):
+        try:
+            with open(attachment_path, 'rb') as f:
+                encoded_content = base64.b64encode(f.read()).decode('utf-8')
+            payload["attachments"] = [{
+                "content": encoded_content,
+                "type": "application/pdf",
+                "filename": os.path.basename(attachment_path),
+                "disposition": "attachment"
+            }]
+        except Exception as e:
+            # Continue without attachment rather than failing the email
+            logger.warning(f"Failed to add attachment: {str(e)}")
+
+    return payload
 
 
 class NullEmailService:
@@ -32,6 +149,9 @@ class NullEmailService:
     async def send_bulk(self, messages: Iterable[dict]) -> List[bool]:
         return [False for _ in messages]
 
+    def enqueue(self, **kwargs) -> bool:
+        return False
+
     def health(self) -> bool:
         return False
 
@@ -46,25 +166,38 @@ class RealEmailService:
         return bool(self.api_key)
 
     async def send_email(self, *, to_email: str, subject: str, html_content: str = "", body: Optional[str] = None, attachment_path: Optional[str] = None) -> bool:
-        loop = asyncio.get_running_loop()
-        # Reuse module function to preserve current behavior
-        return await loop.run_in_executor(
-            None,
-            lambda: send_email(to_email, subject, body or "", html_body=html_content, attachment_path=attachment_path),
-        )
+        if not self.api_key:
+            return False
+        payload = build_payload(to_email, subject, body or "", html_content or None, attachment_path)
+        try:
+            status_code, response_text = await post_mail_async(payload)
+        except (requests.RequestException, httpx.HTTPError) as e:
+            logger.warning(f"Email to {to_email} failed: {e}")
+            return False
+        if status_code != 202:
+            logger.warning(f"SendGrid returned {status_code} for {to_email}: {response_text[:200]}")
+        return status_code == 202
 
     async def send_bulk(self, messages: Iterable[dict]) -> List[bool]:
-        results: List[bool] = []
-        for m in messages:
-            ok = await self.send_email(
-                to_email=m.get("to_email", ""),
-                subject=m.get("subject", ""),
-                html_content=m.get("html_content", ""),
-                body=m.get("body"),
-                attachment_path=m.get("attachment_path"),
-            )
-            results.append(ok)
-        return results
+        """Send concurrently over the pooled async client; send_limiter paces the requests"""
+        gate = asyncio.Semaphore(EMAIL_SEND_CONCURRENCY)
+
+        async def send_one(m: dict) -> bool:
+            async with gate:
+                return await self.send_email(
+                    to_email=m.get("to_email", ""),
+                    subject=m.get("subject", ""),
+                    html_content=m.get("html_content", ""),
+                    body=m.get("body"),
+                    attachment_path=m.get("attachment_path"),
+                )
+
+        return list(await asyncio.gather(*(send_one(m) for m in messages)))
+
+    def enqueue(self, *, to_email: str, subject: str, html_content: str = "", body: Optional[str] = None,
+                dedup_key: Optional[str] = None) -> bool:
+        """Hand the message to the durable outbox and return immediately"""
+        return queue_email(to_email, subject, body or "", html_content or None, dedup_key=dedup_key)
 
 def send_email(to_email: str, subject: str, body: str, html_body: Optional[str] = None, attachment_path: Optional[str] = None) -> bool:
     """Send email using SendGrid API with optional PDF attachment"""
@@ -75,60 +208,15 @@ def send_email(to_email: str, subject: str, body: str, html_body: Optional[str]
             # Quiet failure in dev when creds missing; real service gated below
             return False
         print(f"[SEND_EMAIL] API key present: {SENDGRID_API_KEY[:10]}...")
-            
-        payload = {
-            "personalizations": [{"to": [{"email": to_email}]}],
-            "from": {
-                "email": FROM_EMAIL,
-                "name": "CORA Support"  # Add sender name for better reputation
-            },
-            "reply_to": {
-                "email": FROM_EMAIL,
-                "name": "CORA Support"
-            },
-            "subject": subject,
-            "content": [{"type": "text/plain", "value": body}]
-        }
-        
-        if html_body:
-            payload["content"].append({"type": "text/html", "value": html_body})
-        
-        # Add PDF attachment if provided
-        if attachment_path and os.path.exists(attachment_path):
-            try:
-                with open(attachment_path, 'rb') as f:
-                    attachment_content = f.read()
-                    import base64
-                    encoded_content = base64.b64encode(attachment_content).decode('utf-8')
-                    
-                    attachment = {
-                        "content": encoded_content,
-                        "type": "application/pdf",
-                        "filename": os.path.basename(attachment_path),
-                        "disposition": "attachment"
-                    }
-                    
-                    payload["attachments"] = [attachment]
-                    print(f"Added PDF attachment: {os.path.basename(attachment_path)}")
-            except Exception as e:
-                print(f"Failed to add attachment: {str(e)}")
-                # Continue without attachment rather than failing the email
+        payload = build_payload(to_email, subject, body, html_body, attachment_path)
         
         print(f"[SEND_EMAIL] Sending request to SendGrid...")
-        response = requests.post(
-            "https://api.sendgrid.com/v3/mail/send",
-            headers={
-                "Authorization": f"Bearer {SENDGRID_API_KEY}",
-                "Content-Type": "application/json"
-            },
-            json=payload,
-            timeout=10
-        )
+        status_code, response_text = post_mail(payload)
         
-        success = response.status_code == 202
-        print(f"[SEND_EMAIL] SendGrid response: {response.status_code}")
+        success = status_code == 202
+        print(f"[SEND_EMAIL] SendGrid response: {status_code}")
         if not success:
-            print(f"[SEND_EMAIL] ERROR: SendGrid returned status {response.status_code}: {response.text}")
+            print(f"[SEND_EMAIL] ERROR: SendGrid returned status {status_code}: {response_text}")
         else:
             print(f"[SEND_EMAIL] SUCCESS: Email queued for delivery to {to_email}")
         return success
@@ -136,6 +224,48 @@ def send_email(to_email: str, subject: str, body: str, html_body: Optional[str]
         print(f"Email sending failed: {str(e)}")
         return False
 
+def send_personalized_batch(
+    subject: str,
+    html_body: str,
+    recipients: List[Tuple[str, Dict[str, str]]],
+    text_body: Optional[str] = None,
+) -> bool:
+    """Send one rendered email to many recipients in a single SendGrid request
+
+    The body is rendered once with substitution tokens (e.g. ``-total_spent-``);
+    each recipient carries its own values in ``personalizations[].substitutions``.
+    Returns True when SendGrid accepted the whole batch.
+    """
+    if not SENDGRID_API_KEY or not recipients:
+        return False
+    if len(recipients) > MAX_PERSONALIZATIONS:
+        raise ValueError(f"SendGrid batches are limited to {MAX_PERSONALIZATIONS} recipients")
+    
+    payload = {
+        "personalizations": [
+            {"to": [{"email": email}], "substitutions": substitutions}
+            for email, substitutions in recipients
+        ],
+        "from": {"email": FROM_EMAIL, "name": "CORA Support"},
+        "reply_to": {"email": FROM_EMAIL, "name": "CORA Support"},
+        "subject": subject,
+        "content": [{"type": "text/plain", "value": text_body or " "}, {"type": "text/html", "value": html_body}],
+    }
+    try:
+        status_code, response_text = post_mail(payload, timeout=30)
+    except requests.RequestException as e:
+        logger.error(f"SendGrid batch of {len(recipients)} failed: {e}")
+        return False
+    if status_code != 202:
+        logger.error(f"SendGrid batch rejected ({status_code}): {response_text[:500]}")
+        return False
+    return True
+
+def queue_email(to_email: str, subject: str, body: str, html_body: Optional[str] = None, **kwargs) -> bool:
+    """Hand an email to the durable outbox (services.email_outbox); returns once its row is committed"""
+    from services.email_outbox import queue_email as outbox_queue_email
+    return outbox_queue_email(to_email, subject, body, html_body, **kwargs)
+
 def send_password_reset_email(to_email: str, reset_token: str, reset_url: str) -> bool:
     """Send password reset email"""
     subject = "Reset Your CORA Password"
@@ -169,7 +299,7 @@ The CORA Team
     </html>
     """
     
-    return send_email(to_email, subject, body, html_body)
+    return queue_email(to_email, subject, body, html_body)
 
 def send_email_verification(to_email: str, verification_token: str, user_name: str = None) -> bool:
     """Send email verification email to new users"""
@@ -309,8 +439,8 @@ The CORA Team
     </html>
     """
     
-    result = send_email(to_email, subject, body, html_body)
-    print(f"[EMAIL SERVICE] send_email_verification result: {result}")
+    result = queue_email(to_email, subject, body, html_body)
+    print(f"[EMAIL SERVICE] send_email_verification queued: {result}")
     return result
 
 def send_welcome_email(to_email: str, user_name: str = None) -> bool:
@@ -365,7 +495,7 @@ The CORA Team
     </html>
     """
     
-    return send_email(to_email, subject, body, html_body)
+    return queue_email(to_email, subject, body, html_body)
 
 def send_feedback_confirmation(to_email: str, feedback_id: int) -> bool:
     """Send confirmation email when user submits feedback"""
@@ -381,7 +511,7 @@ Best regards,
 The CORA Team
 """
     
-    return send_email(to_email, subject, body)
+    return queue_email(to_email, subject, body, dedup_key=f"feedback-confirmation:{feedback_id}")
 
 def send_feedback_notification(feedback, user_email: str) -> bool:
     """Send notification to admin when user submits feedback"""
@@ -407,7 +537,7 @@ CORA System
     # Send to admin email (you can configure this)
     admin_email = os.getenv("ADMIN_EMAIL", "admin@coraai.tech")
     
-    return send_email(admin_email, subject, body) 
+    return queue_email(admin_email, subject, body, dedup_key=f"feedback-notification:{feedback.id}")
 
 
 # Export a single class name for callers
@@ -19,10 +19,12 @@ from typing import List, Dict, Any, Optional, Tuple
 from enum import Enum
 from dataclasses import dataclass
 from sqlalchemy.orm import Session
-import numpy as np
 from collections import defaultdict
 
 from models import User, Expense
+from utils.lazy_import import lazy_import
+
+np = lazy_import("numpy")
 
 
 class EmotionalState(Enum):
@@ -0,0 +1,508 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/services/integration_http.py
+🎯 PURPOSE: Shared HTTP layer for third-party integrations: pooled sessions, per-host limits, retries, circuit breakers, metrics
+🔗 IMPORTS: requests, httpx, prometheus_client, config
+📤 EXPORTS: ProviderPolicy, CircuitBreaker, CircuitOpenError, HostBusyError, IntegrationClient, AsyncIntegrationClient,
+            integration_client, async_integration_client, close_async_clients, provider_stats, reset_clients
+🔄 PATTERN: provider client → host slot → host breaker → request → latency/outcome metrics → jittered retry (Retry-After)
+
+Every outbound call to QuickBooks, SendGrid, Stripe, Plaid and the BI
+crawler goes through one client per provider: a keep-alive pool (requests
+for sync callers, httpx for async ones), at most `host_concurrency` requests
+in flight per host (counted separately for the sync and async clients), and
+retries with jittered exponential backoff that honor Retry-After. 429 is
+always retried; 5xx and network errors only for idempotent requests. A
+per-host circuit breaker, shared by both clients, opens after
+`breaker_failures` consecutive 5xx/network failures and fails calls fast
+until a trial request succeeds `breaker_reset` seconds later, so a degraded
+provider cannot tie up worker threads. Timed-out slot waits and 429s
+neither trip nor reset it. Outcomes and latency are exported as
+integration_http_* Prometheus series labelled by provider.
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections import Counter as Tally, deque
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urlsplit
+from weakref import WeakKeyDictionary
+
+import httpx
+import requests
+from prometheus_client import Counter, Histogram
+from requests.adapters import HTTPAdapter
+
+from config import config
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+LATENCY_SAMPLES = 1000
+_sleep = time.sleep  # retry waits (patched in tests)
+
+HTTP_REQUESTS = Counter("integration_http_requests_total", "Outbound integration requests by outcome",
+                        ["provider", "outcome"])
+HTTP_LATENCY = Histogram("integration_http_request_duration_seconds", "Outbound integration request latency",
+                         ["provider"], buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0))
+HTTP_RETRIES = Counter("integration_http_retries_total", "Outbound integration requests retried", ["provider"])
+CIRCUIT_OPENED = Counter("integration_circuit_opened_total", "Circuit breaker trips", ["provider"])
+
+
+class CircuitOpenError(requests.RequestException):
+    """The provider host failed repeatedly; calls fail fast until the breaker lets a trial through"""
+
+
+class HostBusyError(requests.RequestException):
+    """No request slot for the host freed up within the timeout"""
+
+
+@dataclass
+class ProviderPolicy:
+    """Client settings for one provider (defaults from config, then PROVIDER_OVERRIDES)"""
+    timeout: float
+    max_retries: int
+    backoff: float
+    max_retry_wait: float
+    host_concurrency: int
+    breaker_failures: int
+    breaker_reset: float
+
+    @classmethod
+    def for_provider(cls, provider: str, **overrides) -> "ProviderPolicy":
+        policy = cls(
+            timeout=config.INTEGRATION_HTTP_TIMEOUT_SECONDS,
+            max_retries=config.INTEGRATION_HTTP_MAX_RETRIES,
+            backoff=config.INTEGRATION_HTTP_BACKOFF_SECONDS,
+            max_retry_wait=config.INTEGRATION_HTTP_MAX_RETRY_WAIT_SECONDS,
+            host_concurrency=config.INTEGRATION_HTTP_HOST_CONCURRENCY,
+            breaker_failures=config.INTEGRATION_BREAKER_FAILURES,
+            breaker_reset=config.INTEGRATION_BREAKER_RESET_SECONDS,
+        )
+        provider_defaults = PROVIDER_OVERRIDES.get(provider)
+        if provider_defaults:
+            policy = replace(policy, **provider_defaults())
+        return replace(policy, **overrides)
+
+
+PROVIDER_OVERRIDES: Dict[str, Callable[[], Dict[str, Any]]] = {
+    # QBO allows 10 concurrent requests per realm; callers opt into retries per request
+    "quickbooks": lambda: {"host_concurrency": 10, "backoff": 1.0,
+                           "max_retry_wait": config.QUICKBOOKS_MAX_RETRY_WAIT_SECONDS},
+    # The email outbox owns retries (with its own backoff and attempt budget)
+    "sendgrid": lambda: {"max_retries": 0},
+    # The Stripe SDK owns retries (stripe.max_network_retries)
+    "stripe": lambda: {"max_retries": 0, "timeout": 80},
+    "plaid": lambda: {"host_concurrency": max(config.PLAID_SYNC_CONCURRENCY * 2, 8)},
+}
+
+
+class CircuitBreaker:
+    """closed → open after `failures` consecutive failures → one trial request after `reset_seconds`"""
+
+    def __init__(self, failures: int, reset_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.failures = failures
+        self.reset_seconds = reset_seconds
+        self.clock = clock
+        self.consecutive = 0
+        self.opened_at: Optional[float] = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if self._trial or self.clock() - self.opened_at >= self.reset_seconds else "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if not self._trial and self.clock() - self.opened_at >= self.reset_seconds:
+                self._trial = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.consecutive = 0
+            self.opened_at = None
+            self._trial = False
+
+    def release_trial(self) -> None:
+        """End a trial request without a verdict (e.g. throttled); the next call may try again"""
+        with self._lock:
+            self._trial = False
+
+    def record_failure(self) -> bool:
+        """Count a failure; True when this one opened (or re-opened) the circuit"""
+        with self._lock:
+            self.consecutive += 1
+            if self._trial or (self.opened_at is None and self.consecutive >= self.failures):
+                self.opened_at = self.clock()
+                self._trial = False
+                return True
+            return False
+
+
+class _Provider:
+    """Breakers and stats shared by a provider's sync and async clients, plus the sync clients' host slots
+
+    Async clients cap in-flight requests with their own asyncio.Semaphore per
+    host, so a host can see up to host_concurrency requests from each kind.
+    """
+
+    def __init__(self, name: str, policy: ProviderPolicy):
+        self.name = name
+        self.policy = policy
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.slots: Dict[str, threading.BoundedSemaphore] = {}
+        self.stats: Tally = Tally()
+        self.latencies: deque = deque(maxlen=LATENCY_SAMPLES)
+        self._lock = threading.Lock()
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self.breakers.get(host)
+            if breaker is None:
+                breaker = self.breakers[host] = CircuitBreaker(self.policy.breaker_failures, self.policy.breaker_reset)
+            return breaker
+
+    def slot(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            slot = self.slots.get(host)
+            if slot is None:
+                slot = self.slots[host] = threading.BoundedSemaphore(self.policy.host_concurrency)
+            return slot
+
+    def record(self, host: str, outcome: str, seconds: Optional[float] = None) -> None:
+        HTTP_REQUESTS.labels(self.name, outcome).inc()
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats[outcome] += 1
+            if seconds is not None:
+                self.latencies.append(seconds)
+        if seconds is not None:
+            HTTP_LATENCY.labels(self.name).observe(seconds)
+        if outcome in ("server_error", "network_error"):
+            if self.breaker(host).record_failure():
+                self._count("circuit_opened")
+                CIRCUIT_OPENED.labels(self.name).inc()
+                logger.warning(f"{self.name}: circuit opened for {host}")
+        elif outcome in ("ok", "client_error"):
+            self.breaker(host).record_success()
+        elif outcome == "throttled":
+            # The host answered, but a 429 says nothing about its health either way
+            self.breaker(host).release_trial()
+        # "busy" (our own wait for a slot timed out) and "circuit_open" leave the breaker alone:
+        # with a hung provider the slot waits time out, and they must not keep the circuit closed
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def retried(self) -> None:
+        self._count("retries")
+        HTTP_RETRIES.labels(self.name).inc()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            latencies = sorted(self.latencies)
+            stats = dict(self.stats)
+            circuits = {host: breaker.state for host, breaker in self.breakers.items()}
+
+        def percentile(p: float) -> Optional[float]:
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] if latencies else None
+
+        return dict(stats, circuits=circuits, p50_seconds=percentile(0.5), p95_seconds=percentile(0.95))
+
+
+def _outcome(status: Optional[int]) -> str:
+    if status is None:
+        return "network_error"
+    if status == 429:
+        return "throttled"
+    if status >= 500:
+        return "server_error"
+    if status >= 400:
+        return "client_error"
+    return "ok"
+
+
+def _retry_after(headers) -> Optional[float]:
+    value = (headers or {}).get("Retry-After")
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return float(value)
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class _RetryPolicyMixin:
+    provider: str
+    policy: ProviderPolicy
+
+    def _should_retry(self, attempt: int, retries: int, idempotent: bool, status: Optional[int],
+                      connect_failed: bool) -> bool:
+        if attempt >= retries:
+            return False
+        if status == 429:
+            return True  # rejected before any work was done
+        if status is None:
+            return idempotent or connect_failed
+        return idempotent and status in RETRY_STATUSES
+
+    def _backoff(self, attempt: int, headers) -> float:
+        """Equal-jitter exponential backoff, at least Retry-After, capped at max_retry_wait"""
+        ceiling = self.policy.backoff * (2 ** attempt)
+        wait = ceiling / 2 + random.uniform(0, ceiling / 2)
+        retry_after = _retry_after(headers)
+        if retry_after is not None:
+            wait = max(wait, retry_after)
+        return min(wait, self.policy.max_retry_wait)
+
+
+class IntegrationClient(_RetryPolicyMixin):
+    """requests.Session-compatible client for one provider: get/post/request(...) → requests.Response
+
+    Extra keyword arguments on every call: `retries` (default policy.max_retries),
+    `idempotent` (default by method), and `limiter` (anything with acquire(),
+    called before each attempt, e.g. a per-account token bucket).
+    """
+
+    def __init__(self, provider: str, policy: Optional[ProviderPolicy] = None,
+                 headers: Optional[Dict[str, str]] = None):
+        self.provider = provider
+        self.policy = policy or ProviderPolicy.for_provider(provider)
+        self.state = _provider(provider, self.policy)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.policy.host_concurrency)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        if headers:
+            self.session.headers.update(headers)
+
+    @property
+    def headers(self):
+        return self.session.headers
+
+    def request(self, method: str, url: str, *, retries: Optional[int] = None, idempotent: Optional[bool] = None,
+                limiter=None, **kwargs) -> requests.Response:
+        method = method.upper()
+        retries = self.policy.max_retries if retries is None else retries
+        idempotent = method in IDEMPOTENT_METHODS if idempotent is None else idempotent
+        kwargs.setdefault("timeout", self.policy.timeout)
+        host = urlsplit(url).netloc
+        attempt = 0
+        while True:
+            if limiter is not None:
+                limiter.acquire()
+            with self._slot(host):
+                started = time.perf_counter()
+                response, error = None, None
+                try:
+                    response = self.session.request(method, url, **kwargs)
+                except requests.RequestException as e:
+                    error = e
+                elapsed = time.perf_counter() - started
+            status = response.status_code if response is not None else None
+            self.state.record(host, _outcome(status), elapsed)
+            if not self._should_retry(attempt, retries, idempotent, status,
+                                      isinstance(error, requests.ConnectTimeout)):
+                if error is not None:
+                    raise error
+                return response
+            wait = self._backoff(attempt, response.headers if response is not None else None)
+            attempt += 1
+            self.state.retried()
+            _sleep(wait)
+
+    @contextmanager
+    def _slot(self, host: str):
+        slot = self.state.slot(host)
+        if not slot.acquire(timeout=self.policy.timeout):
+            self.state.record(host, "busy")
+            raise HostBusyError(f"{self.provider}: no free request slot for {host}")
+        try:
+            if not self.state.breaker(host).allow():
+                self.state.record(host, "circuit_open")
+                raise CircuitOpenError(f"{self.provider}: circuit open for {host}")
+            yield
+        finally:
+            slot.release()
+
+    @contextmanager
+    def observe(self, host: str):
+        """Slot, breaker and metrics around a call an SDK makes over its own transport
+
+        Exceptions with a `status` below 500 (API errors) do not count against the breaker.
+        """
+        with self._slot(host):
+            started = time.perf_counter()
+            try:
+                yield
+            except Exception as e:
+                status = getattr(e, "status", None)
+                self.state.record(host, _outcome(status if isinstance(status, int) else None),
+                                  time.perf_counter() - started)
+                raise
+            self.state.record(host, "ok", time.perf_counter() - started)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url: str, **kwargs) -> requests.Response:
+        return self.request("PUT", url, **kwargs)
+
+    def patch(self, url: str, **kwargs) -> requests.Response:
+        return self.request("PATCH", url, **kwargs)
+
+    def delete(self, url: str, **kwargs) -> requests.Response:
+        return self.request("DELETE", url, **kwargs)
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class AsyncIntegrationClient(_RetryPolicyMixin):
+    """httpx.AsyncClient for one provider on one event loop; same policy, breakers and stats as the sync client"""
+
+    def __init__(self, provider: str, policy: Optional[ProviderPolicy] = None,
+                 headers: Optional[Dict[str, str]] = None):
+        self.provider = provider
+        self.policy = policy or ProviderPolicy.for_provider(provider)
+        self.state = _provider(provider, self.policy)
+        self.client = httpx.AsyncClient(
+            headers=headers, timeout=self.policy.timeout,
+            limits=httpx.Limits(max_connections=self.policy.host_concurrency * 4,
+                                max_keepalive_connections=self.policy.host_concurrency),
+        )
+        self._slots: Dict[str, asyncio.Semaphore] = {}
+
+    async def request(self, method: str, url: str, *, retries: Optional[int] = None,
+                      idempotent: Optional[bool] = None, limiter=None, **kwargs) -> httpx.Response:
+        method = method.upper()
+        retries = self.policy.max_retries if retries is None else retries
+        idempotent = method in IDEMPOTENT_METHODS if idempotent is None else idempotent
+        host = urlsplit(url).netloc
+        slot = self._slots.setdefault(host, asyncio.Semaphore(self.policy.host_concurrency))
+        attempt = 0
+        while True:
+            if limiter is not None:
+                await limiter.acquire_async()
+            try:
+                await asyncio.wait_for(slot.acquire(), self.policy.timeout)
+            except asyncio.TimeoutError:
+                self.state.record(host, "busy")
+                raise HostBusyError(f"{self.provider}: no free request slot for {host}")
+            try:
+                if not self.state.breaker(host).allow():
+                    self.state.record(host, "circuit_open")
+                    raise CircuitOpenError(f"{self.provider}: circuit open for {host}")
+                started = time.perf_counter()
+                response, error = None, None
+                try:
+                    response = await self.client.request(method, url, **kwargs)
+                except httpx.TransportError as e:
+                    error = e
+                elapsed = time.perf_counter() - started
+            finally:
+                slot.release()
+            status = response.status_code if response is not None else None
+            self.state.record(host, _outcome(status), elapsed)
+            if not self._should_retry(attempt, retries, idempotent, status, isinstance(error, httpx.ConnectTimeout)):
+                if error is not None:
+                    raise error
+                return response
+            wait = self._backoff(attempt, response.headers if response is not None else None)
+            attempt += 1
+            self.state.retried()
+            await asyncio.sleep(wait)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+# ------------------------------------------------------------------ registry
+_providers: Dict[str, _Provider] = {}
+_clients: Dict[str, IntegrationClient] = {}
+_async_clients: "WeakKeyDictionary" = WeakKeyDictionary()  # event loop → {provider: AsyncIntegrationClient}
+_registry_lock = threading.Lock()
+
+
+def _provider(name: str, policy: ProviderPolicy) -> _Provider:
+    with _registry_lock:
+        provider = _providers.get(name)
+        if provider is None:
+            provider = _providers[name] = _Provider(name, policy)
+        return provider
+
+
+def integration_client(provider: str) -> IntegrationClient:
+    """The process-wide sync client for `provider`"""
+    client = _clients.get(provider)
+    if client is None:
+        with _registry_lock:
+            client = _clients.get(provider)
+        if client is None:
+            client = IntegrationClient(provider)
+            with _registry_lock:
+                client = _clients.setdefault(provider, client)
+    return client
+
+
+def async_integration_client(provider: str) -> AsyncIntegrationClient:
+    """The async client for `provider` on the running event loop"""
+    loop = asyncio.get_running_loop()
+    with _registry_lock:
+        clients = _async_clients.setdefault(loop, {})
+    client = clients.get(provider)
+    if client is None:
+        client = clients[provider] = AsyncIntegrationClient(provider)
+    return client
+
+
+async def close_async_clients() -> None:
+    """Close the running loop's async clients (app shutdown)"""
+    with _registry_lock:
+        clients = _async_clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        await client.aclose()
+
+
+def provider_stats() -> Dict[str, Dict[str, Any]]:
+    """Per-provider request outcomes, retries, latency percentiles and circuit states"""
+    with _registry_lock:
+        providers = list(_providers.values())
+    return {provider.name: provider.snapshot() for provider in providers}
+
+
+def reset_clients() -> None:
+    """Drop every client, breaker and stat (tests, or after changing the INTEGRATION_* settings)"""
+    with _registry_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+        _providers.clear()
+        _async_clients.clear()
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/services/knowledge_index.py
+🎯 PURPOSE: Compiled keyword index over the CORA chat knowledge JSON files
+🔗 IMPORTS: json, re, threading, utils.redis_manager
+📤 EXPORTS: KnowledgeIndex, KnowledgeSnippet, knowledge_index
+🔄 PATTERN: Immutable snapshot + atomic swap, mtime/version triggered reload
+
+💡 AI HINT: Chat routes should call knowledge_index.relevant_context(message)
+   instead of dumping the whole knowledge base into the system prompt.
+"""
+
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterable, List, Mapping, Optional, Tuple
+
+from utils.redis_manager import redis_manager
+
+logger = logging.getLogger(__name__)
+
+DATA_PATH = Path(__file__).parent.parent / "data"
+
+DEFAULT_SOURCES: Dict[str, Path] = {
+    "knowledge": DATA_PATH / "cora_knowledge_base.json",
+    "personality": DATA_PATH / "cora_contractor_personality.json",
+    "implementation": DATA_PATH / "cora_conversation_implementation.json",
+}
+
+# Shared key bumped on explicit reloads so every worker picks up the change
+VERSION_KEY = "cora:knowledge:version"
+
+# Snippets larger than this are split into their children when indexed
+MAX_SNIPPET_CHARS = 600
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be but by can do does for from has have how i in is it "
+    "its me my of on or so that the this to was we what when where which who "
+    "why will with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with stopwords dropped and plurals folded."""
+    tokens = []
+    for tok in _TOKEN_RE.findall(text.lower()):
+        if tok in _STOPWORDS or len(tok) < 2:
+            continue
+        if len(tok) > 3 and tok.endswith("s") and not tok.endswith("ss"):
+            tok = tok[:-1]
+        tokens.append(tok)
+    return tokens
+
+
+@dataclass(frozen=True)
+class KnowledgeSnippet:
+    """One indexable chunk of a knowledge file (e.g. a pricing tier)."""
+    source: str
+    path: str
+    text: str
+    value: Any
+
+
+class _Snapshot:
+    """Immutable compiled view of the knowledge files at one version."""
+
+    def __init__(self, data: Dict[str, Dict[str, Any]], version: str):
+        self.data = data
+        self.version = version
+        self.snippets: List[KnowledgeSnippet] = []
+        postings: Dict[str, set] = defaultdict(set)
+        key_tokens: Dict[str, set] = defaultdict(set)
+
+        for source, blob in data.items():
+            for path, value in _flatten(blob, ""):
+                text = _compact(value)
+                idx = len(self.snippets)
+                self.snippets.append(KnowledgeSnippet(source, path, text, value))
+                for tok in set(tokenize(path)):
+                    key_tokens[tok].add(idx)
+                    postings[tok].add(idx)
+                for tok in set(tokenize(text)):
+                    postings[tok].add(idx)
+
+        self.postings: Dict[str, FrozenSet[int]] = {k: frozenset(v) for k, v in postings.items()}
+        self.key_tokens: Dict[str, FrozenSet[int]] = {k: frozenset(v) for k, v in key_tokens.items()}
+        total = max(len(self.snippets), 1)
+        self.idf: Dict[str, float] = {
+            tok: math.log(1 + total / len(ids)) for tok, ids in self.postings.items()
+        }
+
+        knowledge = data.get("knowledge", {})
+        self.tiers: Dict[str, Dict[str, Any]] = {
+            str(t.get("name", "")).lower(): t
+            for t in knowledge.get("pricing", {}).get("tiers", [])
+            if isinstance(t, dict)
+        }
+        self.features: List[Tuple[str, str, Any]] = [
+            (key.lower(), str(feature).lower(), feature)
+            for category in knowledge.get("features", {}).values()
+            if isinstance(category, dict)
+            for key, feature in category.items()
+        ]
+        self.integrations: List[Tuple[str, str, Any]] = [
+            (key.lower(), str(integ.get("name", "")).lower() if isinstance(integ, dict) else "", integ)
+            for key, integ in knowledge.get("integrations_guide", {}).items()
+        ]
+        self.comparisons: List[Tuple[str, Any]] = [
+            (key.lower(), comp) for key, comp in knowledge.get("comparisons", {}).items()
+        ]
+
+    def search(self, query: str, limit: int, sources: Optional[Iterable[str]] = None) -> List[KnowledgeSnippet]:
+        wanted = set(sources) if sources else None
+        scores: Dict[int, float] = defaultdict(float)
+        for tok in set(tokenize(query)):
+            ids = self.postings.get(tok)
+            if not ids:
+                continue
+            weight = self.idf[tok]
+            keyed = self.key_tokens.get(tok, frozenset())
+            for idx in ids:
+                # Matches on the snippet's own key path count double
+                scores[idx] += weight * (2.0 if idx in keyed else 1.0)
+        if wanted is not None:
+            scores = {i: s for i, s in scores.items() if self.snippets[i].source in wanted}
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [self.snippets[i] for i, _ in ranked]
+
+
+def _compact(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def _flatten(value: Any, path: str) -> Iterable[Tuple[str, Any]]:
+    """Split a JSON blob into chunks no larger than MAX_SNIPPET_CHARS where possible."""
+    if isinstance(value, dict) and value and (not path or len(_compact(value)) > MAX_SNIPPET_CHARS):
+        for key, child in value.items():
+            yield from _flatten(child, f"{path}.{key}" if path else str(key))
+    elif isinstance(value, list) and value and len(_compact(value)) > MAX_SNIPPET_CHARS:
+        for i, child in enumerate(value):
+            yield from _flatten(child, f"{path}[{i}]")
+    elif path:
+        yield path, value
+
+
+class KnowledgeIndex:
+    """Keyword/inverted-index lookup over the chat knowledge files.
+
+    Reads go through an immutable snapshot that is rebuilt off to the side
+    and swapped in one assignment, so concurrent requests never see a
+    half-loaded knowledge base. A reload is triggered when any source file
+    changes on disk (mtime/size) or when another worker bumps the shared
+    version key in Redis; both checks are throttled to ``check_interval``.
+    """
+
+    def __init__(self, sources: Optional[Mapping[str, Path]] = None, check_interval: Optional[float] = None):
+        self.sources: Dict[str, Path] = dict(sources or DEFAULT_SOURCES)
+        if check_interval is None:
+            check_interval = float(os.getenv("KNOWLEDGE_RELOAD_CHECK_SECONDS", "5"))
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._snapshot: Optional[_Snapshot] = None
+        self._stamps: Dict[str, Tuple[int, int]] = {}
+        self._shared_version: Optional[str] = None
+        self._next_check = 0.0
+
+    # ------------------------------------------------------------------ loading
+    def _stat(self) -> Dict[str, Tuple[int, int]]:
+        stamps = {}
+        for name, path in self.sources.items():
+            try:
+                st = path.stat()
+                stamps[name] = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                stamps[name] = (0, 0)
+        return stamps
+
+    @staticmethod
+    def _load_json(path: Path) -> Dict[str, Any]:
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            logger.warning(f"Knowledge file not found: {path}")
+        except json.JSONDecodeError as e:
+            logger.error(f"Invalid JSON in {path}: {e}")
+        return {}
+
+    def reload(self, broadcast: bool = False) -> _Snapshot:
+        """Rebuild the index from disk and swap it in.
+
+        With ``broadcast=True`` the new version is published to Redis so that
+        other workers reload on their next lookup even if the files are on a
+        volume whose mtime they cannot observe.
+        """
+        with self._lock:
+            stamps = self._stat()
+            data = {name: self._load_json(path) for name, path in self.sources.items()}
+            version = "-".join(f"{m:x}.{s:x}" for m, s in stamps.values())
+            if broadcast:
+                version = f"{version}@{time.time_ns():x}"
+                redis_manager.set(VERSION_KEY, version, expire=30 * 24 * 3600)
+                self._shared_version = version
+            snapshot = _Snapshot(data, version)
+            self._stamps = stamps
+            self._snapshot = snapshot
+            self._next_check = time.monotonic() + self.check_interval
+        logger.info(f"Knowledge index loaded: {len(snapshot.snippets)} snippets (version {version})")
+        return snapshot
+
+    def _is_stale(self) -> bool:
+        if self._stat() != self._stamps:
+            return True
+        shared = redis_manager.get(VERSION_KEY)
+        if shared and shared != self._shared_version:
+            self._shared_version = shared
+            return True
+        return False
+
+    def snapshot(self) -> _Snapshot:
+        """Current snapshot, reloading first if the sources changed."""
+        snap = self._snapshot
+        if snap is None:
+            self._shared_version = redis_manager.get(VERSION_KEY)
+            return self.reload()
+        now = time.monotonic()
+        if now >= self._next_check:
+            self._next_check = now + self.check_interval
+            if self._is_stale():
+                return self.reload()
+        return snap
+
+    @property
+    def version(self) -> str:
+        return self.snapshot().version
+
+    def data(self, source: str) -> Dict[str, Any]:
+        """Raw parsed JSON for one source (treat as read-only)."""
+        return self.snapshot().data.get(source, {})
+
+    # ------------------------------------------------------------------ lookups
+    def search(self, query: str, limit: int = 5, sources: Optional[Iterable[str]] = None) -> List[KnowledgeSnippet]:
+        """Rank snippets by IDF-weighted keyword overlap with ``query``."""
+        return self.snapshot().search(query, limit, sources)
+
+    def relevant_context(self, query: str, limit: int = 6, max_chars: int = 2500,
+                         sources: Iterable[str] = ("knowledge",)) -> str:
+        """Render the best matching snippets as prompt-ready text."""
+        lines: List[str] = []
+        used = 0
+        for snip in self.search(query, limit=limit, sources=sources):
+            line = f"- {snip.path}: {snip.text}"
+            if used + len(line) > max_chars:
+                break
+            lines.append(line)
+            used += len(line)
+        return "\n".join(lines)
+
+    def pricing_tier(self, tier_name: str) -> Dict[str, Any]:
+        return self.snapshot().tiers.get(tier_name.lower(), {})
+
+    def feature(self, feature_name: str) -> Dict[str, Any]:
+        needle = feature_name.lower()
+        snap = self.snapshot()
+        for key, text, feature in snap.features:
+            if needle in key or needle in text:
+                return feature
+        return {}
+
+    def integration(self, integration_name: str) -> Dict[str, Any]:
+        needle = integration_name.lower()
+        for key, name, integration in self.snapshot().integrations:
+            if needle in key or needle in name:
+                return integration
+        return {}
+
+    def comparison(self, competitor: str) -> Dict[str, Any]:
+        needle = competitor.lower()
+        for key, comparison in self.snapshot().comparisons:
+            if needle in key:
+                return comparison
+        return {}
+
+    def summary(self) -> Dict[str, Any]:
+        snap = self.snapshot()
+        return {
+            "version": snap.version,
+            "snippets": len(snap.snippets),
+            "terms": len(snap.postings),
+            "sources": {name: len(blob) for name, blob in snap.data.items()},
+        }
+
+
+# Global index shared by the chat routers
+knowledge_index = KnowledgeIndex()
@@ -2,23 +2,15 @@
 """
 🧭 LOCATION: /CORA/services/notification_service.py
 🎯 PURPOSE: Email and SMS notifications for job alerts
-🔗 IMPORTS: SendGrid, Twilio, models
+🔗 IMPORTS: services.email_outbox, Twilio, models
 📤 EXPORTS: NotificationService
 """
 
 import os
+from datetime import datetime
 from typing import Optional, Dict, List
 import logging
 
-# Email imports
-try:
-    from sendgrid import SendGridAPIClient
-    from sendgrid.helpers.mail import Mail, Email, To, Content
-    SENDGRID_AVAILABLE = True
-except ImportError:
-    SENDGRID_AVAILABLE = False
-    logging.warning("SendGrid not installed. Email notifications disabled.")
-
 # SMS imports
 try:
     from twilio.rest import Client as TwilioClient
@@ -29,6 +21,7 @@ except ImportError:
 
 from sqlalchemy.orm import Session
 from models import User, UserPreference
+from services.email_outbox import email_outbox, queue_email
 
 logger = logging.getLogger(__name__)
 
@@ -38,13 +31,8 @@ class NotificationService:
     def __init__(self, db: Session):
         self.db = db
         
-        # Email configuration
-        self.sendgrid_api_key = os.getenv('SENDGRID_API_KEY')
-        self.from_email = os.getenv('FROM_EMAIL', 'alerts@cora.ai')
-        self.sendgrid_client = None
-        
-        if SENDGRID_AVAILABLE and self.sendgrid_api_key:
-            self.sendgrid_client = SendGridAPIClient(self.sendgrid_api_key)
+        # Email goes through the shared outbox (pooled, rate-limited, retried)
+        self.email_enabled = email_outbox.enabled
         
         # SMS configuration
         self.twilio_account_sid = os.getenv('TWILIO_ACCOUNT_SID')
@@ -118,10 +106,10 @@ class NotificationService:
         job_data: Dict,
         message: str
     ) -> bool:
-        """Send email alert using SendGrid"""
+        """Queue email alert through the email outbox"""
         
-        if not self.sendgrid_client:
-            logger.warning("SendGrid not configured. Skipping email.")
+        if not self.email_enabled:
+            logger.warning("Email not configured. Skipping email.")
             return False
         
         # Determine subject based on severity
@@ -190,21 +178,15 @@ class NotificationService:
         </div>
         """
         
-        try:
-            message = Mail(
-                from_email=Email(self.from_email, "CORA Alerts"),
-                to_emails=To(to_email),
-                subject=subject,
-                html_content=Content("text/html", html_content)
-            )
-            
-            response = self.sendgrid_client.send(message)
-            logger.info(f"Email sent to {to_email}. Status: {response.status_code}")
-            return response.status_code in [200, 201, 202]
-            
-        except Exception as e:
-            logger.error(f"Failed to send email to {to_email}: {str(e)}")
-            return False
+        # One email per job, alert type and day even if the alert fires repeatedly
+        dedup_key = None
+        if job_data.get('id'):
+            dedup_key = f"job-alert:{job_data['id']}:{alert_type}:{datetime.utcnow().date().isoformat()}"
+        
+        queued = queue_email(to_email, subject, html_body=html_content, from_name="CORA Alerts", dedup_key=dedup_key)
+        if queued:
+            logger.info(f"Email alert queued for {to_email}")
+        return queued
     
     def _send_sms_alert(
         self,
@@ -246,7 +228,7 @@ class NotificationService:
     def send_welcome_email(self, user_email: str, user_name: Optional[str] = None) -> bool:
         """Send welcome email to new contractor"""
         
-        if not self.sendgrid_client:
+        if not self.email_enabled:
             return False
         
         subject = "🚧 Welcome to CORA - Your Construction Financial Assistant"
@@ -311,20 +293,7 @@ class NotificationService:
         </div>
         """
         
-        try:
-            message = Mail(
-                from_email=Email(self.from_email, "Tyler from CORA"),
-                to_emails=To(user_email),
-                subject=subject,
-                html_content=Content("text/html", html_content)
-            )
-            
-            response = self.sendgrid_client.send(message)
-            return response.status_code in [200, 201, 202]
-            
-        except Exception as e:
-            logger.error(f"Failed to send welcome email: {str(e)}")
-            return False
+        return queue_email(user_email, subject, html_body=html_content, from_name="Tyler from CORA")
     
     @staticmethod
     def send_waitlist_welcome(
@@ -336,11 +305,11 @@ class NotificationService:
         """Send welcome email to waitlist signup"""
         
         # Create a temporary notification service
-        from database import SessionLocal
+        from models.base import SessionLocal
         db = SessionLocal()
         service = NotificationService(db)
         
-        if not service.sendgrid_client:
+        if not service.email_enabled:
             db.close()
             return False
         
@@ -401,32 +370,18 @@ class NotificationService:
         </div>
         """
         
-        try:
-            message = Mail(
-                from_email=Email(service.from_email, "Tyler from CORA"),
-                to_emails=To(email),
-                subject=subject,
-                html_content=Content("text/html", html_content)
-            )
-            
-            response = service.sendgrid_client.send(message)
-            db.close()
-            return response.status_code in [200, 201, 202]
-            
-        except Exception as e:
-            logger.error(f"Failed to send waitlist welcome: {str(e)}")
-            db.close()
-            return False
+        db.close()
+        return queue_email(email, subject, html_body=html_content, from_name="Tyler from CORA")
     
     @staticmethod
     def send_beta_invitation(email: str, name: str) -> bool:
         """Send beta invitation email"""
         
-        from database import SessionLocal
+        from models.base import SessionLocal
         db = SessionLocal()
         service = NotificationService(db)
         
-        if not service.sendgrid_client:
+        if not service.email_enabled:
             db.close()
             return False
         
@@ -491,19 +446,5 @@ class NotificationService:
         </div>
         """
         
-        try:
-            message = Mail(
-                from_email=Email(service.from_email, "Tyler from CORA"),
-                to_emails=To(email),
-                subject=subject,
-                html_content=Content("text/html", html_content)
-            )
-            
-            response = service.sendgrid_client.send(message)
-            db.close()
-            return response.status_code in [200, 201, 202]
-            
-        except Exception as e:
-            logger.error(f"Failed to send beta invitation: {str(e)}")
-            db.close()
-            return False
\ No newline at end of file
+        db.close()
+        return queue_email(email, subject, html_body=html_content, from_name="Tyler from CORA")
\ No newline at end of file
@@ -13,7 +13,10 @@ from typing import Dict, Any, Optional
 import logging
 
 from services.email_service import send_email
-from utils.pdf_exporter import pdf_exporter
+from utils.lazy_import import lazy_import
+
+# reportlab is imported on the first report, not at worker boot
+pdf_exporter = lazy_import("utils.pdf_exporter", "pdf_exporter")
 
 logger = logging.getLogger(__name__)
 
@@ -2,95 +2,185 @@
 """
 🧭 LOCATION: /CORA/services/plaid_service.py
 🎯 PURPOSE: Plaid service for bank account connection and transaction synchronization
-🔗 IMPORTS: Plaid SDK, SQLAlchemy
-📤 EXPORTS: PlaidService class
+🔗 IMPORTS: Plaid SDK, SQLAlchemy, services.integration_http
+📤 EXPORTS: PlaidService class, sync_items, ItemSyncScheduler, plaid_sync_scheduler,
+            PlaidWebhookVerifier, WebhookVerificationError, plaid_webhook_verifier
+🔄 PATTERN: per-item cursor → /transactions/sync pages → one lookup query per page → bulk insert/update/delete → commit page + cursor
+
+sync_transactions() asks Plaid only for what changed on the item since the
+stored cursor: added, modified and removed transactions. Each page is applied
+in one transaction together with the cursor, so an interrupted run resumes
+after the last committed page, and a caught-up item costs a single API call
+and no writes. Items are synced in parallel on a bounded pool (sync_items),
+and the TRANSACTIONS webhook schedules a sync for just the item that changed
+(plaid_sync_scheduler) once PlaidWebhookVerifier has checked the request's
+Plaid-Verification JWT. Sync calls run under the "plaid" integration client's
+per-host slots and circuit breaker, and report its latency/error metrics.
 """
 
-import plaid
-from plaid.api import plaid_api
-from plaid.model import *
+import hashlib
+import hmac
+import json
 import logging
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Any
-from sqlalchemy.orm import Session
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time, timezone
+from typing import Callable, List, Dict, Iterable, Optional, Any
+from urllib.parse import urlsplit
+from weakref import WeakSet
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload
 
-from models.plaid_integration import PlaidIntegration, PlaidAccount, PlaidTransaction, PlaidSyncHistory
+from config import config as app_config
+from models.base import SessionLocal
 from models.expense import Expense
+from models.expense_category import ExpenseCategory
+from models.plaid_integration import PlaidIntegration, PlaidAccount, PlaidTransaction, PlaidSyncHistory, PlaidSyncCursor
+from models.user import User
+from services.categorization_engine import PLAID_CATEGORY_MAP, plaid_merchant_matcher
+from services.integration_http import async_integration_client, integration_client
+from utils.lazy_import import lazy_import
+
+# Plaid SDK is imported when the first PlaidService is created, not at worker boot
+plaid = lazy_import("plaid")
+plaid_api = lazy_import("plaid.api.plaid_api")
 
 logger = logging.getLogger(__name__)
 
+PLAID_CONFIDENCE = 90  # High confidence for bank data
+SYNC_PAGE_MAX = 500  # /transactions/sync `count` limit
+MUTATION_DURING_PAGINATION = "TRANSACTIONS_SYNC_MUTATION_DURING_PAGINATION"
+
+WEBHOOK_JWT_ALGORITHM = "ES256"
+WEBHOOK_KEY_MISS_SECONDS = 300  # an unknown key id is not looked up again for this long
+WEBHOOK_KEY_MISS_MAX = 1024  # remembered unknown key ids (least recently seen dropped first)
+
+_cursor_tables_ready: "WeakSet" = WeakSet()
+_clients: Dict[tuple, Any] = {}
+_clients_lock = threading.Lock()
+
+
+def _plaid_host() -> str:
+    if app_config.PLAID_API_URL:
+        return app_config.PLAID_API_URL
+    return plaid.Environment.Sandbox if app_config.PLAID_ENV == "sandbox" else plaid.Environment.Production
+
+
+def _plaid_client():
+    """PlaidApi shared per host and credentials, so syncs reuse one connection pool"""
+    host = _plaid_host()
+    key = (host, app_config.PLAID_CLIENT_ID, app_config.PLAID_SECRET)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            configuration = plaid.Configuration(
+                host=host,
+                api_key={
+                    'clientId': app_config.PLAID_CLIENT_ID,
+                    'secret': app_config.PLAID_SECRET,
+                }
+            )
+            configuration.connection_pool_maxsize = max(app_config.PLAID_SYNC_CONCURRENCY, 4)
+            client = _clients[key] = plaid_api.PlaidApi(plaid.ApiClient(configuration))
+        return client
+
+
+def _plaid_error_code(error: Exception) -> Optional[str]:
+    try:
+        return json.loads(error.body).get("error_code")
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def _transaction_data(transaction) -> Dict[str, Any]:
+    """Plaid SDK Transaction → the dict shape the sync works with"""
+    t = transaction.to_dict()
+    location = t.get("location") or {}
+    return {
+        "id": t["transaction_id"],
+        "account_id": t["account_id"],
+        "amount": t["amount"],
+        "currency": t.get("iso_currency_code"),
+        "date": datetime.combine(t["date"], time()),
+        "name": t["name"],
+        "merchant_name": t.get("merchant_name"),
+        "payment_channel": t.get("payment_channel"),
+        "pending": t.get("pending", False),
+        "address": location.get("address"),
+        "city": location.get("city"),
+        "state": location.get("region"),
+        "zip_code": location.get("postal_code"),
+        "country": location.get("country"),
+        "lat": location.get("lat"),
+        "lon": location.get("lon"),
+        "category": t.get("category"),
+        "category_id": t.get("category_id"),
+        "check_number": t.get("check_number"),
+        "payment_meta": t.get("payment_meta"),
+        "pending_transaction_id": t.get("pending_transaction_id")
+    }
+
+
+def _row_values(transaction: Dict[str, Any]) -> Dict[str, Any]:
+    """PlaidTransaction column values for a transaction dict"""
+    return {
+        "amount": transaction["amount"],
+        "currency": transaction["currency"] or "USD",
+        "date": transaction["date"],
+        "name": transaction["name"],
+        "pending_transaction_id": transaction.get("pending_transaction_id"),
+        **{field: transaction.get(field) for field in (
+            "merchant_name", "payment_channel", "pending", "address", "city", "state", "zip_code", "country",
+            "lat", "lon", "category", "category_id", "check_number", "payment_meta")}
+    }
+
+
+def _assign(obj, **values) -> None:
+    """Set only the attributes that changed, so unchanged rows stay out of the UPDATE"""
+    for field, value in values.items():
+        if getattr(obj, field) != value:
+            setattr(obj, field, value)
+
+
 class PlaidService:
     """Service for Plaid API interactions and bank transaction synchronization"""
     
     def __init__(self, integration: PlaidIntegration):
         self.integration = integration
-        
-        # Import centralized config
-        from config import config as app_config
-        
-        # Initialize Plaid client
-        configuration = plaid.Configuration(
-            host=plaid.Environment.Sandbox if app_config.PLAID_ENV == "sandbox" else plaid.Environment.Production,
-            api_key={
-                'clientId': app_config.PLAID_CLIENT_ID,
-                'secret': app_config.PLAID_SECRET,
-            }
-        )
-        
-        api_client = plaid.ApiClient(configuration)
-        self.client = plaid_api.PlaidApi(api_client)
+        self.client = _plaid_client()
     
     def _map_plaid_to_cora_category(self, transaction: Dict[str, Any]) -> str:
         """Map Plaid transaction to CORA category"""
         # Use Plaid's category if available
         if transaction.get("category") and len(transaction["category"]) > 0:
             primary_category = transaction["category"][0].lower()
-            
-            # Map Plaid categories to CORA categories
-            category_mapping = {
-                "food and drink": "Meals & Entertainment",
-                "shopping": "Office Supplies",
-                "transportation": "Transportation",
-                "travel": "Travel",
-                "bills and utilities": "Utilities",
-                "entertainment": "Meals & Entertainment",
-                "health and fitness": "Professional Development",
-                "professional services": "Professional Services",
-                "education": "Professional Development",
-                "personal care": "Office Supplies",
-                "insurance": "Insurance",
-                "financial services": "Banking & Finance",
-                "government services": "Taxes & Fees",
-                "income": "Income",
-                "transfer": "Transfer",
-                "payment": "Payment"
-            }
-            
-            return category_mapping.get(primary_category, "Office Supplies")
-        
-        # Fallback to merchant name analysis
-        merchant_name = transaction.get("merchant_name", "").lower()
-        transaction_name = transaction.get("name", "").lower()
+            return PLAID_CATEGORY_MAP.get(primary_category, "Office Supplies")
         
-        if any(word in merchant_name or word in transaction_name for word in ["office", "staples", "supplies", "paper", "ink"]):
-            return "Office Supplies"
-        elif any(word in merchant_name or word in transaction_name for word in ["restaurant", "coffee", "starbucks", "mcdonalds", "uber eats"]):
-            return "Meals & Entertainment"
-        elif any(word in merchant_name or word in transaction_name for word in ["uber", "lyft", "taxi", "gas", "shell", "exxon"]):
-            return "Transportation"
-        elif any(word in merchant_name or word in transaction_name for word in ["amazon", "software", "subscription", "saas"]):
-            return "Software & Subscriptions"
-        elif any(word in merchant_name or word in transaction_name for word in ["facebook", "google", "advertising", "marketing"]):
-            return "Marketing & Advertising"
-        elif any(word in merchant_name or word in transaction_name for word in ["hotel", "airbnb", "flight", "airline"]):
-            return "Travel"
-        elif any(word in merchant_name or word in transaction_name for word in ["electricity", "water", "internet", "phone", "verizon", "at&t"]):
-            return "Utilities"
-        else:
-            return "Office Supplies"  # Default fallback
+        # Fallback to merchant name analysis (default: Office Supplies)
+        return plaid_merchant_matcher.match(transaction.get("merchant_name"), transaction.get("name"))
+    
+    def _map_plaid_categories(self, transactions: List[Dict[str, Any]]) -> List[str]:
+        """_map_plaid_to_cora_category for a whole page; repeated merchants are matched once"""
+        categories: List[Optional[str]] = [None] * len(transactions)
+        unmapped = []
+        for i, transaction in enumerate(transactions):
+            if transaction.get("category") and len(transaction["category"]) > 0:
+                categories[i] = self._map_plaid_to_cora_category(transaction)
+            else:
+                unmapped.append(i)
+        matched = plaid_merchant_matcher.match_many(
+            (transactions[i].get("merchant_name"), transactions[i].get("name")) for i in unmapped
+        )
+        for i, category in zip(unmapped, matched):
+            categories[i] = category
+        return categories
     
     def get_accounts(self) -> List[Dict[str, Any]]:
         """Get all accounts for the connected item"""
+        from plaid.model.accounts_get_request import AccountsGetRequest
+        
         try:
             request = AccountsGetRequest(
                 access_token=self.integration.access_token
@@ -123,6 +213,9 @@ class PlaidService:
     
     def get_transactions(self, account_id: str, start_date: str, end_date: str, count: int = 100) -> List[Dict[str, Any]]:
         """Get transactions for a specific account"""
+        from plaid.model.transactions_get_request import TransactionsGetRequest
+        from plaid.model.transactions_get_request_options import TransactionsGetRequestOptions
+        
         try:
             request = TransactionsGetRequest(
                 access_token=self.integration.access_token,
@@ -135,35 +228,7 @@ class PlaidService:
             )
             
             response = self.client.transactions_get(request)
-            
-            transactions = []
-            for transaction in response.transactions:
-                transaction_data = {
-                    "id": transaction.transaction_id,
-                    "account_id": transaction.account_id,
-                    "amount": transaction.amount,
-                    "currency": transaction.iso_currency_code,
-                    "date": transaction.date,
-                    "name": transaction.name,
-                    "merchant_name": transaction.merchant_name,
-                    "payment_channel": transaction.payment_channel.value if transaction.payment_channel else None,
-                    "pending": transaction.pending,
-                    "address": transaction.location.address if transaction.location else None,
-                    "city": transaction.location.city if transaction.location else None,
-                    "state": transaction.location.state if transaction.location else None,
-                    "zip_code": transaction.location.zip if transaction.location else None,
-                    "country": transaction.location.country if transaction.location else None,
-                    "lat": transaction.location.lat if transaction.location else None,
-                    "lon": transaction.location.lon if transaction.location else None,
-                    "category": transaction.category,
-                    "category_id": transaction.category_id,
-                    "check_number": transaction.check_number,
-                    "payment_meta": transaction.payment_meta.to_dict() if transaction.payment_meta else None,
-                    "pending_transaction_id": transaction.pending_transaction_id
-                }
-                transactions.append(transaction_data)
-            
-            return transactions
+            return [_transaction_data(transaction) for transaction in response.transactions]
             
         except Exception as e:
             print(f"Failed to get transactions: {e}")
@@ -252,201 +317,221 @@ class PlaidService:
                 "synced_count": 0
             }
     
-    def sync_transactions_to_cora(self, db: Session, days_back: int = 30) -> Dict[str, Any]:
-        """Sync Plaid transactions to CORA"""
-        start_time = datetime.utcnow()
+    def _user_id(self, db: Session) -> Optional[int]:
+        return db.scalar(select(User.id).where(User.email == self.integration.user_email))
+    
+    @staticmethod
+    def _category_ids(db: Session) -> Dict[str, int]:
+        return {name: category_id for name, category_id in db.execute(select(ExpenseCategory.name, ExpenseCategory.id))}
+    
+    def _cursor(self, db: Session) -> PlaidSyncCursor:
+        bind = db.get_bind()
+        if bind not in _cursor_tables_ready:
+            PlaidSyncCursor.__table__.create(bind=bind, checkfirst=True)
+            _cursor_tables_ready.add(bind)
+        cursor = db.get(PlaidSyncCursor, self.integration.id)
+        if cursor is None:
+            cursor = PlaidSyncCursor(integration_id=self.integration.id)
+            db.add(cursor)
+        return cursor
+    
+    def fetch_changes(self, cursor: Optional[str], count: Optional[int] = None) -> Dict[str, Any]:
+        """One /transactions/sync page: added, modified, removed (ids), next_cursor, has_more"""
+        from plaid.model.transactions_sync_request import TransactionsSyncRequest
         
-        try:
-            # Get date range
-            end_date = datetime.now().date()
-            start_date = end_date - timedelta(days=days_back)
-            
-            # Get all accounts for this integration
-            accounts = db.query(PlaidAccount).filter(
-                PlaidAccount.integration_id == self.integration.id,
-                PlaidAccount.is_sync_enabled == True
-            ).all()
-            
-            results = {
-                "success": True,
-                "synced_count": 0,
-                "errors": [],
-                "sync_history": []
-            }
-            
-            for account in accounts:
-                try:
-                    # Get transactions for this account
-                    transactions = self.get_transactions(
-                        account.plaid_account_id,
-                        start_date.strftime("%Y-%m-%d"),
-                        end_date.strftime("%Y-%m-%d")
-                    )
-                    
-                    for transaction in transactions:
-                        result = self._sync_single_transaction(transaction, account, db)
-                        
-                        if result["success"]:
-                            results["synced_count"] += 1
-                        else:
-                            results["errors"].append(f"Transaction {transaction['id']}: {result['error']}")
-                            results["success"] = False
-                        
-                        results["sync_history"].append(result)
-                        
-                except Exception as e:
-                    results["errors"].append(f"Account {account.display_name}: {str(e)}")
-                    results["success"] = False
-            
-            # Update integration stats
-            self.integration.last_sync_at = datetime.utcnow()
-            self.integration.last_sync_error = None
-            
-            db.commit()
-            
+        request = {"access_token": self.integration.access_token,
+                   "count": min(count or app_config.PLAID_SYNC_PAGE_SIZE, SYNC_PAGE_MAX)}
+        if cursor:
+            request["cursor"] = cursor
+        host = urlsplit(self.client.api_client.configuration.host).netloc
+        with integration_client("plaid").observe(host):
+            response = self.client.transactions_sync(TransactionsSyncRequest(**request))
+        return {
+            "added": [_transaction_data(t) for t in response.added],
+            "modified": [_transaction_data(t) for t in response.modified],
+            "removed": [r.transaction_id for r in response.removed],
+            "next_cursor": response.next_cursor,
+            "has_more": response.has_more,
+        }
+    
+    def sync_transactions(self, db: Session, page_size: Optional[int] = None,
+                          max_pages: Optional[int] = None) -> Dict[str, Any]:
+        """Apply the item's changes since the last run, committing page by page with the cursor"""
+        results = {"success": True, "synced_count": 0, "modified_count": 0, "removed_count": 0,
+                   "skipped_count": 0, "pages": 0, "errors": [], "sync_history": []}
+        user_id = self._user_id(db)
+        if user_id is None:
+            results.update(success=False, errors=[f"No CORA user for {self.integration.user_email}"])
             return results
-            
-        except Exception as e:
-            # Record error
-            self.integration.last_sync_error = str(e)
-            db.commit()
-            
-            return {
-                "success": False,
-                "error": str(e),
-                "synced_count": 0
-            }
+        accounts = {a.plaid_account_id: a for a in db.scalars(
+            select(PlaidAccount).where(PlaidAccount.integration_id == self.integration.id)
+        )}
+        category_ids = self._category_ids(db)
+        
+        for attempt in range(2):
+            cursor = self._cursor(db)
+            try:
+                next_cursor = cursor.pending_cursor or cursor.cursor
+                while True:
+                    page = self.fetch_changes(next_cursor, page_size)
+                    self._apply_changes(db, page, accounts, user_id, category_ids, results)
+                    next_cursor = page["next_cursor"]
+                    if page["has_more"]:
+                        cursor.pending_cursor = next_cursor
+                    else:
+                        # Caught up: the next run starts from here
+                        cursor.cursor = next_cursor
+                        cursor.pending_cursor = None
+                        cursor.last_completed_at = datetime.utcnow()
+                    self.integration.last_sync_at = datetime.utcnow()
+                    self.integration.last_sync_error = None
+                    db.commit()
+                    results["pages"] += 1
+                    if not page["has_more"] or (max_pages and results["pages"] >= max_pages):
+                        return results
+            except Exception as e:
+                db.rollback()
+                if attempt == 0 and _plaid_error_code(e) == MUTATION_DURING_PAGINATION:
+                    # Plaid requires restarting the pagination loop from the cursor it began with;
+                    # re-applying the pages already committed is a no-op
+                    logger.info(f"Plaid item {self.integration.item_id} changed mid-sync; restarting")
+                    cursor = self._cursor(db)
+                    cursor.pending_cursor = None
+                    db.commit()
+                    continue
+                logger.error(f"Plaid sync for item {self.integration.item_id} stopped after "
+                             f"{results['pages']} pages: {e}")
+                self.integration.last_sync_error = str(e)
+                db.commit()
+                results["success"] = False
+                results["errors"].append(str(e))
+                return results
+        return results
     
-    def _sync_single_transaction(self, transaction: Dict[str, Any], account: PlaidAccount, db: Session) -> Dict[str, Any]:
-        """Sync a single transaction to CORA"""
-        start_time = datetime.utcnow()
+    def sync_transactions_to_cora(self, db: Session, days_back: Optional[int] = None) -> Dict[str, Any]:
+        """Sync Plaid transactions to CORA (`days_back` is ignored: the item's cursor decides what is new)"""
+        return self.sync_transactions(db)
+    
+    def _apply_changes(self, db: Session, page: Dict[str, Any], accounts: Dict[str, PlaidAccount], user_id: int,
+                       category_ids: Dict[str, int], results: Dict[str, Any]) -> None:
+        """Insert, update and delete the page's transactions and their expenses (not committed)"""
+        upserts = [t for t in page["added"] + page["modified"] if t["amount"] < 0]  # Only sync expenses
+        results["skipped_count"] += len(page["added"]) + len(page["modified"]) - len(upserts)
+        removed = set(page["removed"])
+        lookup = {t["id"] for t in upserts} | {t["pending_transaction_id"] for t in upserts
+                                                if t.get("pending_transaction_id")} | removed
+        if not lookup:
+            return
+        existing = {row.plaid_transaction_id: row for row in db.scalars(
+            select(PlaidTransaction).where(PlaidTransaction.plaid_transaction_id.in_(lookup))
+            .options(selectinload(PlaidTransaction.expense))
+        )}
         
-        try:
-            # Check if transaction already exists
-            existing_transaction = db.query(PlaidTransaction).filter(
-                PlaidTransaction.plaid_transaction_id == transaction["id"]
-            ).first()
-            
-            if existing_transaction:
-                return {
-                    "success": True,
-                    "message": "Transaction already synced",
-                    "expense_id": existing_transaction.expense_id
-                }
-            
-            # Only sync expenses (negative amounts)
-            if transaction["amount"] >= 0:
-                return {
-                    "success": True,
-                    "message": "Skipped income transaction",
-                    "expense_id": None
-                }
-            
-            # Create Plaid transaction record
-            plaid_transaction = PlaidTransaction(
-                account_id=account.id,
-                plaid_transaction_id=transaction["id"],
-                amount=transaction["amount"],
-                currency=transaction["currency"],
-                date=datetime.strptime(transaction["date"], "%Y-%m-%d"),
-                name=transaction["name"],
-                merchant_name=transaction.get("merchant_name"),
-                payment_channel=transaction.get("payment_channel"),
-                pending=transaction["pending"],
-                address=transaction.get("address"),
-                city=transaction.get("city"),
-                state=transaction.get("state"),
-                zip_code=transaction.get("zip_code"),
-                country=transaction.get("country"),
-                lat=transaction.get("lat"),
-                lon=transaction.get("lon"),
-                category=transaction.get("category"),
-                category_id=transaction.get("category_id"),
-                check_number=transaction.get("check_number"),
-                payment_meta=transaction.get("payment_meta")
-            )
-            
-            db.add(plaid_transaction)
-            db.flush()  # Get the ID
-            
-            # Map to CORA category
-            category = self._map_plaid_to_cora_category(transaction)
-            
-            # Create CORA expense
-            expense = Expense(
-                user_id=self.integration.user_id,
-                amount=abs(transaction["amount"]),  # Convert to positive for expense
-                description=transaction["name"],
-                category=category,
-                vendor=transaction.get("merchant_name", "Bank Transaction"),
-                date=datetime.strptime(transaction["date"], "%Y-%m-%d").date(),
-                payment_method=f"Bank - {account.display_name}",
-                auto_categorized=True,
-                confidence_score=90.0  # High confidence for bank data
-            )
-            
-            db.add(expense)
-            db.flush()  # Get the expense ID
-            
-            # Link transaction to expense
-            plaid_transaction.expense_id = expense.id
-            plaid_transaction.is_synced_to_cora = True
-            plaid_transaction.auto_categorized = True
-            plaid_transaction.confidence_score = 90.0
-            
-            # Record sync history
-            sync_duration = int((datetime.utcnow() - start_time).total_seconds() * 1000)
-            sync_history = PlaidSyncHistory(
-                integration_id=self.integration.id,
-                sync_type="transaction_sync",
-                account_id=account.id,
-                plaid_transaction_id=transaction["id"],
-                expense_id=expense.id,
-                sync_status="success",
-                sync_duration=sync_duration,
-                amount=abs(transaction["amount"]),
-                currency=transaction["currency"],
-                description=transaction["name"],
-                category=category
-            )
-            
-            db.add(sync_history)
-            
-            # Update integration stats
-            self.integration.total_transactions_synced += 1
-            self.integration.total_amount_synced += abs(transaction["amount"])
-            
-            return {
-                "success": True,
-                "expense_id": expense.id,
-                "sync_duration": sync_duration,
-                "category": category
-            }
-            
-        except Exception as e:
-            # Record error
-            sync_duration = int((datetime.utcnow() - start_time).total_seconds() * 1000)
-            
-            sync_history = PlaidSyncHistory(
-                integration_id=self.integration.id,
-                sync_type="transaction_sync",
-                account_id=account.id,
-                plaid_transaction_id=transaction["id"],
-                sync_status="error",
-                sync_duration=sync_duration,
-                error_message=str(e),
-                amount=abs(transaction.get("amount", 0)),
-                currency=transaction.get("currency", "USD"),
-                description=transaction.get("name", "")
-            )
-            
-            db.add(sync_history)
-            
-            return {
-                "success": False,
-                "error": str(e),
-                "sync_duration": sync_duration
-            }
+        started = datetime.utcnow()
+        new, history = [], []
+        for t in upserts:
+            row = existing.get(t["id"])
+            if row is None and t.get("pending_transaction_id") in existing:
+                # Pending → posted: Plaid removes the pending id and adds the posted one; keep the expense
+                row = existing.pop(t["pending_transaction_id"])
+                removed.discard(t["pending_transaction_id"])
+                row.plaid_transaction_id = t["id"]
+                existing[t["id"]] = row
+            if row is not None:
+                self._update_transaction(row, t)
+                history.append(self._history(t, "transaction_modified", row.account_id, row.expense_id))
+                results["modified_count"] += 1
+            elif t["account_id"] in accounts:
+                new.append(t)
+            else:
+                results["skipped_count"] += 1  # account not synced to CORA yet
+        
+        if new:
+            categories = self._map_plaid_categories(new)
+            enabled = [(t, c) for t, c in zip(new, categories) if accounts[t["account_id"]].is_sync_enabled]
+            expenses = [
+                Expense(
+                    user_id=user_id,
+                    amount_cents=round(abs(t["amount"]) * 100),  # Convert to positive for expense
+                    currency=(t.get("currency") or "USD").upper()[:3],
+                    description=t["name"],
+                    category_id=category_ids.get(category),
+                    vendor=t.get("merchant_name") or "Bank Transaction",
+                    expense_date=t["date"],
+                    payment_method=f"Bank - {accounts[t['account_id']].display_name}"[:50],
+                    auto_categorized=True,
+                    confidence_score=PLAID_CONFIDENCE
+                )
+                for t, category in enabled
+            ]
+            db.add_all(expenses)
+            db.flush()  # one multi-row INSERT; assigns the expense ids
+            expense_ids = {t["id"]: expense.id for (t, _), expense in zip(enabled, expenses)}
+            
+            rows = []
+            for t, category in zip(new, categories):
+                account = accounts[t["account_id"]]
+                expense_id = expense_ids.get(t["id"])
+                rows.append(PlaidTransaction(
+                    account_id=account.id, plaid_transaction_id=t["id"], expense_id=expense_id,
+                    is_synced_to_cora=expense_id is not None, auto_categorized=expense_id is not None,
+                    confidence_score=PLAID_CONFIDENCE if expense_id else None, **_row_values(t)
+                ))
+                if expense_id is not None:
+                    history.append(self._history(t, "transaction_sync", account.id, expense_id, category))
+                    results["sync_history"].append({"success": True, "plaid_transaction_id": t["id"],
+                                                    "expense_id": expense_id, "category": category})
+            db.add_all(rows)
+            results["synced_count"] += len(expenses)
+            self.integration.total_transactions_synced = (self.integration.total_transactions_synced or 0) + len(expenses)
+            self.integration.total_amount_synced = ((self.integration.total_amount_synced or 0)
+                                                    + sum(abs(t["amount"]) for t, _ in enabled))
+        
+        gone = [existing[i] for i in removed if i in existing]
+        if gone:
+            expense_ids = [row.expense_id for row in gone if row.expense_id]
+            if expense_ids:
+                # Load what references the expenses in one go so deleting them doesn't lazy-load per row
+                for expense in db.scalars(select(Expense).where(Expense.id.in_(expense_ids)).options(
+                        selectinload(Expense.plaid_transactions), selectinload(Expense.plaid_sync_history),
+                        selectinload(Expense.stripe_transactions), selectinload(Expense.stripe_sync_history))):
+                    db.delete(expense)
+            for row in gone:
+                history.append(PlaidSyncHistory(
+                    integration_id=self.integration.id, sync_type="transaction_removed", account_id=row.account_id,
+                    plaid_transaction_id=row.plaid_transaction_id, sync_status="success",
+                    amount=abs(row.amount), currency=row.currency, description=row.name
+                ))
+                db.delete(row)
+            results["removed_count"] += len(gone)
+        
+        sync_duration = int((datetime.utcnow() - started).total_seconds() * 1000)
+        for entry in history:
+            entry.sync_duration = sync_duration
+        db.add_all(history)
+        db.flush()
+    
+    @staticmethod
+    def _update_transaction(row: PlaidTransaction, transaction: Dict[str, Any]) -> None:
+        _assign(row, **_row_values(transaction))
+        if row.expense is not None:
+            _assign(row.expense, amount_cents=round(abs(transaction["amount"]) * 100), expense_date=transaction["date"],
+                    description=transaction["name"], vendor=transaction.get("merchant_name") or "Bank Transaction")
+    
+    def _history(self, transaction: Dict[str, Any], sync_type: str, account_id: int,
+                 expense_id: Optional[int], category: Optional[str] = None) -> PlaidSyncHistory:
+        return PlaidSyncHistory(
+            integration_id=self.integration.id,
+            sync_type=sync_type,
+            account_id=account_id,
+            plaid_transaction_id=transaction["id"],
+            expense_id=expense_id,
+            sync_status="success",
+            amount=abs(transaction["amount"]),
+            currency=transaction["currency"] or "USD",
+            description=transaction["name"],
+            category=category
+        )
     
     def test_connection(self) -> bool:
         """Test Plaid connection"""
@@ -460,4 +545,201 @@ class PlaidService:
             return False
         except Exception as e:
             logger.error(f"Plaid connection test failed - Unexpected error: {str(e)}")
-            return False 
\ No newline at end of file
+            return False 
+
+
+def sync_item(integration_id: int, session_factory: Callable[[], Session] = SessionLocal) -> Dict[str, Any]:
+    """sync_transactions for one integration in its own session"""
+    with session_factory() as db:
+        integration = db.get(PlaidIntegration, integration_id)
+        if integration is None or not integration.is_active:
+            return {"success": False, "errors": [f"Plaid integration {integration_id} is not active"],
+                    "synced_count": 0}
+        return PlaidService(integration).sync_transactions(db)
+
+
+def sync_items(integration_ids: Iterable[int], session_factory: Callable[[], Session] = SessionLocal,
+               concurrency: Optional[int] = None) -> Dict[int, Dict[str, Any]]:
+    """Sync several items in parallel on a bounded pool → {integration_id: result}"""
+    integration_ids = list(dict.fromkeys(integration_ids))
+    if not integration_ids:
+        return {}
+    workers = min(concurrency or app_config.PLAID_SYNC_CONCURRENCY, len(integration_ids))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="plaid-sync") as pool:
+        futures = {i: pool.submit(sync_item, i, session_factory) for i in integration_ids}
+    results = {}
+    for integration_id, future in futures.items():
+        try:
+            results[integration_id] = future.result()
+        except Exception as e:
+            logger.error(f"Plaid sync for integration {integration_id} failed: {e}")
+            results[integration_id] = {"success": False, "errors": [str(e)], "synced_count": 0}
+    return results
+
+
+class ItemSyncScheduler:
+    """Background syncs keyed by Plaid item_id, coalescing repeated webhooks for the same item"""
+    
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal, concurrency: Optional[int] = None):
+        self.session_factory = session_factory
+        self.concurrency = concurrency
+        self.stats = {"scheduled": 0, "coalesced": 0, "runs": 0, "failures": 0}
+        self._rerun: Dict[str, bool] = {}  # item_id → another webhook arrived while syncing
+        self._idle = threading.Condition()
+        self._pool: Optional[ThreadPoolExecutor] = None
+    
+    def schedule(self, item_id: str) -> bool:
+        """Queue a sync for `item_id`; False if one is already queued or running (it will run again)"""
+        with self._idle:
+            if item_id in self._rerun:
+                self._rerun[item_id] = True
+                self.stats["coalesced"] += 1
+                return False
+            self._rerun[item_id] = False
+            self.stats["scheduled"] += 1
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.concurrency or app_config.PLAID_SYNC_CONCURRENCY,
+                                                thread_name_prefix="plaid-webhook")
+        self._pool.submit(self._run, item_id)
+        return True
+    
+    def _run(self, item_id: str) -> None:
+        while True:
+            try:
+                with self.session_factory() as db:
+                    integration_id = db.scalar(select(PlaidIntegration.id).where(
+                        PlaidIntegration.item_id == item_id, PlaidIntegration.is_active == True
+                    ))
+                if integration_id is not None:
+                    result = sync_item(integration_id, self.session_factory)
+                    self.stats["runs"] += 1
+                    if not result["success"]:
+                        self.stats["failures"] += 1
+            except Exception as e:
+                self.stats["failures"] += 1
+                logger.error(f"Plaid webhook sync for item {item_id} failed: {e}")
+            with self._idle:
+                if self._rerun.get(item_id):
+                    self._rerun[item_id] = False
+                    continue
+                del self._rerun[item_id]
+                self._idle.notify_all()
+                return
+    
+    def pending(self) -> List[str]:
+        with self._idle:
+            return list(self._rerun)
+    
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Block until no sync is queued or running"""
+        with self._idle:
+            return self._idle.wait_for(lambda: not self._rerun, timeout)
+
+
+class WebhookVerificationError(Exception):
+    """The webhook's Plaid-Verification JWT is missing, forged, stale or for a different body"""
+
+
+class PlaidWebhookVerifier:
+    """Checks the Plaid-Verification JWT that Plaid signs every webhook with
+
+    The JWT header names the signing key (kid); the key comes from
+    /webhook_verification_key/get and is cached by kid. A webhook is accepted
+    only if the ES256 signature verifies, `iat` is at most
+    PLAID_WEBHOOK_MAX_AGE_SECONDS old, and `request_body_sha256` matches the
+    raw body.
+    
+    The claims are checked once before the key lookup, but they are not
+    verified yet and anyone can forge them: that pass only drops malformed
+    tokens cheaply. What bounds the calls to Plaid is the lookup itself. Key
+    ids Plaid did not know are remembered for WEBHOOK_KEY_MISS_SECONDS (at
+    most WEBHOOK_KEY_MISS_MAX of them), and lookups for uncached key ids are
+    capped at PLAID_WEBHOOK_KEY_LOOKUPS_PER_MINUTE per process. Past the cap,
+    webhooks signed with an uncached key are rejected until the window frees
+    up. Plaid retries them.
+    """
+    
+    def __init__(self, max_age_seconds: Optional[float] = None, lookups_per_minute: Optional[int] = None,
+                 clock: Callable[[], float] = lambda: datetime.now(timezone.utc).timestamp()):
+        self.max_age_seconds = max_age_seconds or app_config.PLAID_WEBHOOK_MAX_AGE_SECONDS
+        self.lookups_per_minute = lookups_per_minute or app_config.PLAID_WEBHOOK_KEY_LOOKUPS_PER_MINUTE
+        self.clock = clock
+        self._keys: Dict[str, Dict[str, Any]] = {}
+        self._misses: "OrderedDict[str, float]" = OrderedDict()  # kid → when Plaid last did not know it
+        self._lookups: deque = deque()  # when each key lookup in the last minute started
+    
+    async def verify(self, body: bytes, token: Optional[str]) -> Dict[str, Any]:
+        """Claims of a valid token for `body`; raises WebhookVerificationError otherwise"""
+        from jose import jwt, JWTError
+        
+        if not token:
+            raise WebhookVerificationError("missing Plaid-Verification header")
+        try:
+            header = jwt.get_unverified_header(token)
+            unverified = jwt.get_unverified_claims(token)
+        except JWTError as e:
+            raise WebhookVerificationError(f"malformed token: {e}")
+        if header.get("alg") != WEBHOOK_JWT_ALGORITHM or not header.get("kid"):
+            raise WebhookVerificationError(f"unexpected token header {header}")
+        self._check_claims(unverified, body)
+        
+        key = await self._key(header["kid"])
+        try:
+            claims = jwt.decode(token, key, algorithms=[WEBHOOK_JWT_ALGORITHM])
+        except JWTError as e:
+            raise WebhookVerificationError(f"bad signature: {e}")
+        self._check_claims(claims, body)
+        return claims
+    
+    def _check_claims(self, claims: Dict[str, Any], body: bytes) -> None:
+        iat = claims.get("iat")
+        if not isinstance(iat, (int, float)) or self.clock() - iat > self.max_age_seconds:
+            raise WebhookVerificationError("token is stale")
+        expected = hashlib.sha256(body).hexdigest()
+        if not hmac.compare_digest(str(claims.get("request_body_sha256", "")), expected):
+            raise WebhookVerificationError("body does not match request_body_sha256")
+    
+    async def _key(self, kid: str) -> Dict[str, Any]:
+        key = self._keys.get(kid)
+        if key is None:
+            now = self.clock()
+            missed = self._misses.get(kid)
+            if missed is not None and now - missed < WEBHOOK_KEY_MISS_SECONDS:
+                self._misses.move_to_end(kid)
+                raise WebhookVerificationError(f"unknown key {kid}")
+            while self._lookups and now - self._lookups[0] >= 60:
+                self._lookups.popleft()
+            if len(self._lookups) >= self.lookups_per_minute:
+                raise WebhookVerificationError("too many key lookups; try again later")
+            self._lookups.append(now)
+            key = await self._fetch_key(kid)
+            if key is None:
+                self._misses[kid] = now
+                self._misses.move_to_end(kid)
+                while len(self._misses) > WEBHOOK_KEY_MISS_MAX:
+                    self._misses.popitem(last=False)
+                raise WebhookVerificationError(f"unknown key {kid}")
+            self._misses.pop(kid, None)
+            self._keys[kid] = key
+        if key.get("expired_at"):
+            raise WebhookVerificationError(f"key {kid} has expired")
+        return key
+    
+    async def _fetch_key(self, kid: str) -> Optional[Dict[str, Any]]:
+        try:
+            response = await async_integration_client("plaid").post(
+                f"{_plaid_host().rstrip('/')}/webhook_verification_key/get",
+                json={"client_id": app_config.PLAID_CLIENT_ID, "secret": app_config.PLAID_SECRET, "key_id": kid},
+            )
+        except Exception as e:
+            raise WebhookVerificationError(f"key lookup failed: {e}")
+        if response.status_code >= 500:
+            # Not the key's fault, so no miss is cached; Plaid retries the webhook later
+            raise WebhookVerificationError(f"key lookup failed with {response.status_code}")
+        if response.status_code != 200:
+            return None
+        return response.json().get("key")
+
+
+plaid_sync_scheduler = ItemSyncScheduler()
+plaid_webhook_verifier = PlaidWebhookVerifier()
@@ -14,6 +14,7 @@ import statistics
 from models.expense import Expense
 from models.business_profile import BusinessProfile
 from models.user import User
+from services.category_model import category_models
 
 class ProfitLeakDetector:
     """
@@ -477,75 +478,14 @@ class ProfitLeakDetector:
         AI-powered expense categorization using pattern recognition
         Analyzes description, vendor, and amount patterns from historical data
         """
-        # Get user's historical expenses for pattern learning
-        expenses = self.db.query(Expense).filter(Expense.user_id == self.user_id).all()
-        
-        if not expenses:
-            return self._default_categorization(description, vendor, amount)
-        
-        # Build pattern recognition database
-        patterns = {}
-        vendor_patterns = {}
-        amount_patterns = {}
-        
-        for exp in expenses:
-            if exp.category:
-                category = exp.category.name
-                
-                # Description patterns
-                if exp.description:
-                    words = exp.description.lower().split()
-                    for word in words:
-                        if len(word) > 2:  # Skip short words
-                            if category not in patterns:
-                                patterns[category] = {}
-                            patterns[category][word] = patterns[category].get(word, 0) + 1
-                
-                # Vendor patterns
-                if exp.vendor:
-                    vendor_key = exp.vendor.lower()
-                    if category not in vendor_patterns:
-                        vendor_patterns[category] = {}
-                    vendor_patterns[category][vendor_key] = vendor_patterns[category].get(vendor_key, 0) + 1
-                
-                # Amount range patterns
-                amount_range = self._get_amount_range(exp.amount)
-                if category not in amount_patterns:
-                    amount_patterns[category] = {}
-                amount_patterns[category][amount_range] = amount_patterns[category].get(amount_range, 0) + 1
-        
-        # Score potential categories
-        category_scores = {}
-        
-        # Score based on description
-        desc_words = description.lower().split()
-        for category, words in patterns.items():
-            score = 0
-            for word in desc_words:
-                if word in words:
-                    score += words[word]
-            if score > 0:
-                category_scores[category] = category_scores.get(category, 0) + score
-        
-        # Score based on vendor
-        if vendor:
-            vendor_key = vendor.lower()
-            for category, vendors in vendor_patterns.items():
-                if vendor_key in vendors:
-                    category_scores[category] = category_scores.get(category, 0) + vendors[vendor_key] * 2  # Vendor is strong signal
-        
-        # Score based on amount range
-        amount_range = self._get_amount_range(amount)
-        for category, ranges in amount_patterns.items():
-            if amount_range in ranges:
-                category_scores[category] = category_scores.get(category, 0) + ranges[amount_range]
-        
-        # Get top suggestions
-        sorted_categories = sorted(category_scores.items(), key=lambda x: x[1], reverse=True)
+        # Per-user feature counts, kept up to date on every expense write
+        sorted_categories = category_models.suggest(
+            self.db, self.user_id, description, vendor, int(round((amount or 0) * 100))
+        )
         
         if sorted_categories:
             top_category = sorted_categories[0]
-            confidence = min(top_category[1] / max(sum(category_scores.values()), 1) * 100, 95)  # Cap at 95%
+            confidence = min(top_category[1] / max(sum(score for _, score in sorted_categories), 1) * 100, 95)  # Cap at 95%
             
             return {
                 "suggested_category": top_category[0],
@@ -2,28 +2,128 @@
 """
 🧭 LOCATION: /CORA/services/quickbooks_service.py
 🎯 PURPOSE: QuickBooks service for API interactions and expense synchronization
-🔗 IMPORTS: Requests, SQLAlchemy, models
-📤 EXPORTS: QuickBooksService class
+🔗 IMPORTS: Requests, SQLAlchemy, models, config, services.email_service (RateLimiter), services.integration_http
+📤 EXPORTS: QuickBooksService class, QuickBooksAPIError, ReferenceCache, reference_cache
+🔄 PATTERN: pending expenses (sync state + fingerprint) → cached vendor/account ids → batch requests, bounded concurrency
+
+All API traffic goes over the shared "quickbooks" integration client
+(keep-alive pool, 10 in flight per host, circuit breaker) and a per-realm
+token bucket (QUICKBOOKS_RATE_PER_MINUTE, QBO allows 500/min). Vendor and
+account lists are fetched once per realm per QUICKBOOKS_CACHE_TTL_SECONDS
+and updated in place when a vendor is created. sync_pending_expenses()
+pushes only expenses whose quickbooks_expense_sync row is missing, failed or
+stale, as 30-item batch requests run QUICKBOOKS_SYNC_CONCURRENCY at a time;
+429 and 5xx responses are retried with backoff, honoring Retry-After.
 """
 
+import asyncio
+import hashlib
 import requests
 import json
 import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
-from sqlalchemy.orm import Session
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from weakref import WeakSet
+
+from sqlalchemy import and_, select
+from sqlalchemy.orm import Session, joinedload
 
-from models.quickbooks_integration import QuickBooksIntegration, QuickBooksSyncHistory
+from config import config
+from models.quickbooks_integration import QuickBooksIntegration, QuickBooksSyncHistory, QuickBooksExpenseSync
 from models.expense import Expense
+from models.user import User
+from services.email_service import RateLimiter
+from services.integration_http import IntegrationClient, integration_client
 
 logger = logging.getLogger(__name__)
 
+QBO_MAX_BATCH_ITEMS = 30
+QBO_QUERY_PAGE_SIZE = 1000
+DEFAULT_ACCOUNT_NAME = "Office Supplies"
+UNKNOWN_VENDOR = "Unknown Vendor"
+
+_limiters_lock = threading.Lock()
+_limiters: Dict[str, RateLimiter] = {}
+_state_tables_ready: "WeakSet" = WeakSet()
+
+
+class QuickBooksAPIError(Exception):
+    """QuickBooks answered with an error status after any retries"""
+
+
+def _realm_limiter(realm_id: str) -> RateLimiter:
+    with _limiters_lock:
+        limiter = _limiters.get(realm_id)
+        if limiter is None:
+            limiter = RateLimiter(config.QUICKBOOKS_RATE_PER_MINUTE / 60, burst=10)
+            _limiters[realm_id] = limiter
+        return limiter
+
+
+class ReferenceCache:
+    """Per-realm {lower-cased name: QuickBooks id} maps for vendors and accounts, with a TTL"""
+
+    def __init__(self, ttl_seconds: Optional[float] = None):
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else config.QUICKBOOKS_CACHE_TTL_SECONDS
+        self.stats = {"hits": 0, "loads": 0, "invalidations": 0}
+        self._entries: Dict[Tuple[str, str], Tuple[float, Dict[str, str]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, realm_id: str, entity: str, loader: Callable[[], Dict[str, str]]) -> Dict[str, str]:
+        """Cached map for (realm, entity), calling `loader` when missing or expired"""
+        key = (realm_id, entity)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] < self.ttl_seconds:
+                self.stats["hits"] += 1
+                return entry[1]
+        mapping = loader()
+        with self._lock:
+            self._entries[key] = (time.monotonic(), mapping)
+            self.stats["loads"] += 1
+        return mapping
+
+    def put(self, realm_id: str, entity: str, name: str, quickbooks_id: str) -> None:
+        """Record an entity created through the API without reloading the list"""
+        with self._lock:
+            entry = self._entries.get((realm_id, entity))
+            if entry is not None:
+                entry[1][name.lower()] = quickbooks_id
+
+    def invalidate(self, realm_id: Optional[str] = None, entity: Optional[str] = None) -> None:
+        with self._lock:
+            self.stats["invalidations"] += 1
+            for key in list(self._entries):
+                if (realm_id is None or key[0] == realm_id) and (entity is None or key[1] == entity):
+                    del self._entries[key]
+
+
+reference_cache = ReferenceCache()
+
+
+def expense_fingerprint(expense: Expense) -> str:
+    """Hash of the fields pushed to QuickBooks; changes when the purchase needs an update"""
+    category = expense.category.name if expense.category else ""
+    raw = "|".join(str(value) for value in (
+        expense.amount_cents, expense.expense_date.date() if expense.expense_date else "",
+        expense.vendor or "", category, expense.description or "",
+    ))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
 class QuickBooksService:
     """Service for QuickBooks API interactions and expense synchronization"""
     
-    def __init__(self, integration: QuickBooksIntegration):
+    def __init__(self, integration: QuickBooksIntegration, http: Optional[IntegrationClient] = None,
+                 cache: Optional[ReferenceCache] = None):
         import os
         self.integration = integration
+        self.http = http or integration_client("quickbooks")
+        self.cache = cache or reference_cache
         self.base_url = os.getenv("QUICKBOOKS_USERINFO_URL", "https://sandbox-accounts.platform.intuit.com").replace("/v1/openid_connect/userinfo", "")
         self.api_url = os.getenv("QUICKBOOKS_API_URL", "https://sandbox-quickbooks.api.intuit.com/v3/company")
         
@@ -56,7 +156,7 @@ class QuickBooksService:
                 "Content-Type": "application/x-www-form-urlencoded"
             }
             
-            response = requests.post(token_url, data=data, headers=headers)
+            response = self.http.post(token_url, data=data, headers=headers)
             
             if response.status_code == 200:
                 token_data = response.json()
@@ -98,7 +198,7 @@ class QuickBooksService:
                 "Accept": "application/json"
             }
             
-            response = requests.post(token_url, data=data, headers=headers)
+            response = self.http.post(token_url, data=data, headers=headers)
             response.raise_for_status()
             
             token_data = response.json()
@@ -129,91 +229,107 @@ class QuickBooksService:
         
         return category_mapping.get(cora_category)
     
+    def _url(self, path: str) -> str:
+        return f"{self.api_url}/{self.integration.realm_id}/{path}"
+    
+    def _send(self, method: str, path: str, retries: int = 0, idempotent: Optional[bool] = None,
+              **kwargs) -> requests.Response:
+        """Request through the realm's token bucket; the client retries 429 (and 5xx/network errors
+        when idempotent) `retries` times with backoff, honoring Retry-After"""
+        return getattr(self.http, method)(self._url(path), headers=self._get_headers(), retries=retries,
+                                          idempotent=idempotent, limiter=_realm_limiter(str(self.integration.realm_id)),
+                                          **kwargs)
+    
+    def _query_all(self, entity: str, name_field: str, retries: int = 0) -> Dict[str, str]:
+        """{lower-cased name: id} for every `entity` in the realm, paged through the query API"""
+        mapping: Dict[str, str] = {}
+        start = 1
+        while True:
+            response = self._send("get", "query", retries=retries, params={
+                "query": f"SELECT * FROM {entity} STARTPOSITION {start} MAXRESULTS {QBO_QUERY_PAGE_SIZE}"
+            })
+            if response.status_code != 200:
+                raise QuickBooksAPIError(f"{entity} query failed: HTTP {response.status_code}")
+            page = response.json().get("QueryResponse", {}).get(entity, [])
+            for item in page:
+                mapping.setdefault(item.get(name_field, "").lower(), item.get("Id"))
+            if len(page) < QBO_QUERY_PAGE_SIZE:
+                return mapping
+            start += QBO_QUERY_PAGE_SIZE
+    
+    def _vendors(self, retries: int = 0) -> Dict[str, str]:
+        return self.cache.get(self.integration.realm_id, "Vendor",
+                              lambda: self._query_all("Vendor", "DisplayName", retries))
+    
+    def _accounts(self, retries: int = 0) -> Dict[str, str]:
+        return self.cache.get(self.integration.realm_id, "Account", lambda: self._query_all("Account", "Name", retries))
+    
     def _get_or_create_vendor(self, vendor_name: str) -> Optional[str]:
         """Get or create vendor in QuickBooks"""
         try:
-            # First, try to find existing vendor
-            vendor_url = f"{self.api_url}/{self.integration.realm_id}/vendor"
-            response = requests.get(vendor_url, headers=self._get_headers())
-            
-            if response.status_code == 200:
-                vendors = response.json().get("QueryResponse", {}).get("Vendor", [])
-                for vendor in vendors:
-                    if vendor.get("DisplayName", "").lower() == vendor_name.lower():
-                        return vendor.get("Id")
-            
-            # Create new vendor if not found
-            vendor_data = {
-                "DisplayName": vendor_name,
-                "Active": True
-            }
-            
-            response = requests.post(vendor_url, json=vendor_data, headers=self._get_headers())
-            
+            vendor_id = self._vendors().get(vendor_name.lower())
+            if vendor_id:
+                return vendor_id
+        except Exception as e:
+            logger.warning(f"QuickBooks vendor lookup failed: {e}")
+        
+        try:
+            response = self._send("post", "vendor", json={"DisplayName": vendor_name, "Active": True})
             if response.status_code == 200:
-                vendor = response.json().get("Vendor", {})
-                return vendor.get("Id")
-            
+                vendor_id = response.json().get("Vendor", {}).get("Id")
+                self.cache.put(self.integration.realm_id, "Vendor", vendor_name, vendor_id)
+                return vendor_id
             return None
-            
         except Exception as e:
-            print(f"Vendor creation failed: {e}")
+            logger.error(f"QuickBooks vendor creation failed: {e}")
             return None
     
     def _get_account_id(self, account_name: str) -> Optional[str]:
         """Get QuickBooks account ID by name"""
         try:
-            account_url = f"{self.api_url}/{self.integration.realm_id}/account"
-            response = requests.get(account_url, headers=self._get_headers())
-            
-            if response.status_code == 200:
-                accounts = response.json().get("QueryResponse", {}).get("Account", [])
-                for account in accounts:
-                    if account.get("Name", "").lower() == account_name.lower():
-                        return account.get("Id")
-            
-            return None
-            
+            return self._accounts().get(account_name.lower())
         except Exception as e:
-            print(f"Account lookup failed: {e}")
+            logger.error(f"QuickBooks account lookup failed: {e}")
             return None
     
+    def _account_name(self, expense: Expense) -> str:
+        category = expense.category.name if expense.category else None
+        return self._map_cora_to_quickbooks_category(category) or DEFAULT_ACCOUNT_NAME
+    
+    def _purchase_payload(self, expense: Expense, account_name: str, account_id: Optional[str],
+                          vendor_id: Optional[str]) -> Dict[str, Any]:
+        amount = (expense.amount_cents or 0) / 100
+        return {
+            "Line": [
+                {
+                    "Amount": amount,
+                    "DetailType": "AccountBasedExpenseLineDetail",
+                    "AccountBasedExpenseLineDetail": {
+                        "AccountRef": {
+                            "value": account_id or "7",  # Default to Office Supplies
+                            "name": account_name
+                        }
+                    }
+                }
+            ],
+            "VendorRef": {
+                "value": vendor_id or "1",  # Default vendor
+                "name": expense.vendor or UNKNOWN_VENDOR
+            },
+            "TxnDate": (expense.expense_date or datetime.now()).strftime("%Y-%m-%d"),
+            "PrivateNote": expense.description or f"Expense: {amount:.2f}"
+        }
+    
     def _create_quickbooks_purchase(self, expense: Expense) -> Optional[str]:
         """Create purchase transaction in QuickBooks"""
         try:
-            # Map CORA expense to QuickBooks purchase
-            account_name = self._map_cora_to_quickbooks_category(expense.category)
-            if not account_name:
-                account_name = "Office Supplies"  # Default fallback
-            
-            account_id = self._get_account_id(account_name)
-            vendor_id = self._get_or_create_vendor(expense.vendor or "Unknown Vendor")
-            
-            purchase_data = {
-                "Line": [
-                    {
-                        "Amount": float(expense.amount),
-                        "DetailType": "AccountBasedExpenseLineDetail",
-                        "AccountBasedExpenseLineDetail": {
-                            "AccountRef": {
-                                "value": account_id or "7",  # Default to Office Supplies
-                                "name": account_name
-                            }
-                        }
-                    }
-                ],
-                "VendorRef": {
-                    "value": vendor_id or "1",  # Default vendor
-                    "name": expense.vendor or "Unknown Vendor"
-                },
-                "TxnDate": expense.date.strftime("%Y-%m-%d") if expense.date else datetime.now().strftime("%Y-%m-%d"),
-                "PrivateNote": expense.description or f"Expense: {expense.amount}"
-            }
-            
-            # Create purchase
-            purchase_url = f"{self.api_url}/{self.integration.realm_id}/purchase"
-            response = requests.post(purchase_url, json=purchase_data, headers=self._get_headers())
+            account_name = self._account_name(expense)
+            purchase_data = self._purchase_payload(
+                expense, account_name, self._get_account_id(account_name),
+                self._get_or_create_vendor(expense.vendor or UNKNOWN_VENDOR)
+            )
             
+            response = self._send("post", "purchase", json=purchase_data)
             if response.status_code == 200:
                 purchase = response.json().get("Purchase", {})
                 return purchase.get("Id")
@@ -221,7 +337,7 @@ class QuickBooksService:
             return None
             
         except Exception as e:
-            print(f"Purchase creation failed: {e}")
+            logger.error(f"QuickBooks purchase creation failed: {e}")
             return None
     
     async def sync_expense(self, expense: Expense, db: Session) -> Dict[str, any]:
@@ -314,55 +430,179 @@ class QuickBooksService:
                 "quickbooks_id": None
             }
     
-    async def sync_expenses_by_ids(self, expense_ids: List[int], db: Session) -> Dict[str, any]:
-        """Sync specific expenses by IDs"""
-        results = {
-            "success": True,
-            "synced_count": 0,
-            "errors": [],
-            "sync_history": []
-        }
-        
-        for expense_id in expense_ids:
-            expense = db.query(Expense).filter(Expense.id == expense_id).first()
-            if expense:
-                result = await self.sync_expense(expense, db)
-                if result["success"]:
-                    results["synced_count"] += 1
+    # ------------------------------------------------------------------ batch sync
+    def _post_batch(self, items: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Send one batch request; returns {bId: BatchItemResponse}"""
+        # requestid makes retries of this call idempotent on the QuickBooks side
+        response = self._send("post", "batch", retries=config.QUICKBOOKS_MAX_RETRIES, idempotent=True,
+                              params={"requestid": uuid.uuid4().hex}, json={"BatchItemRequest": items})
+        if response.status_code != 200:
+            raise QuickBooksAPIError(f"Batch request failed: HTTP {response.status_code}")
+        return {item.get("bId"): item for item in response.json().get("BatchItemResponse", [])}
+    
+    def _run_batches(self, items: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Send `items` as batch requests, QUICKBOOKS_SYNC_CONCURRENCY at a time; failed batches become faults"""
+        size = max(1, min(config.QUICKBOOKS_BATCH_SIZE, QBO_MAX_BATCH_ITEMS))
+        chunks = [items[i:i + size] for i in range(0, len(items), size)]
+        results: Dict[str, Dict[str, Any]] = {}
+        if not chunks:
+            return results
+        with ThreadPoolExecutor(max_workers=max(1, min(config.QUICKBOOKS_SYNC_CONCURRENCY, len(chunks))),
+                                thread_name_prefix="qbo-sync") as pool:
+            futures = [(chunk, pool.submit(self._post_batch, chunk)) for chunk in chunks]
+            for chunk, future in futures:
+                try:
+                    results.update(future.result())
+                except Exception as e:
+                    logger.error(f"QuickBooks batch of {len(chunk)} failed: {e}")
+                    for item in chunk:
+                        results[item["bId"]] = {"bId": item["bId"], "Fault": {"Error": [{"Message": str(e)}]}}
+        return results
+    
+    @staticmethod
+    def _fault_message(item: Optional[Dict[str, Any]]) -> str:
+        if not item:
+            return "No response for batch item"
+        errors = item.get("Fault", {}).get("Error") or [{}]
+        return errors[0].get("Detail") or errors[0].get("Message") or "QuickBooks rejected the item"
+    
+    def _resolve_vendors(self, names: List[str]) -> Dict[str, str]:
+        """{lower-cased name: id} for `names`, batch-creating the ones QuickBooks does not have"""
+        vendors = self._vendors(config.QUICKBOOKS_MAX_RETRIES)
+        missing = sorted({name for name in names if name.lower() not in vendors}, key=str.lower)
+        if missing:
+            items = [{"bId": f"vendor-{i}", "operation": "create", "Vendor": {"DisplayName": name, "Active": True}}
+                     for i, name in enumerate(missing)]
+            responses = self._run_batches(items)
+            faulted = False
+            for item, name in zip(items, missing):
+                vendor = responses.get(item["bId"], {}).get("Vendor")
+                if vendor:
+                    self.cache.put(self.integration.realm_id, "Vendor", name, vendor.get("Id"))
                 else:
-                    results["errors"].append(f"Expense {expense_id}: {result['error']}")
-                    results["success"] = False
-            else:
-                results["errors"].append(f"Expense {expense_id} not found")
-                results["success"] = False
+                    faulted = True
+            if faulted:
+                # Usually a duplicate name created elsewhere since the list was cached
+                self.cache.invalidate(self.integration.realm_id, "Vendor")
+                vendors = self._vendors(config.QUICKBOOKS_MAX_RETRIES)
+        return vendors
+    
+    def _ensure_state_table(self, db: Session) -> None:
+        bind = db.get_bind()
+        if bind not in _state_tables_ready:
+            QuickBooksExpenseSync.__table__.create(bind=bind, checkfirst=True)
+            _state_tables_ready.add(bind)
+    
+    def _pending_expenses(self, db: Session, expense_ids: Optional[List[int]]
+                          ) -> Tuple[List[Tuple[Expense, Optional[QuickBooksExpenseSync], str]], int, List[int]]:
+        """(expense, sync state, fingerprint) still to push, count of unchanged ones, requested ids not found"""
+        user_id = select(User.id).where(User.email == self.integration.user_email).scalar_subquery()
+        query = db.query(Expense, QuickBooksExpenseSync).outerjoin(
+            QuickBooksExpenseSync,
+            and_(QuickBooksExpenseSync.expense_id == Expense.id,
+                 QuickBooksExpenseSync.integration_id == self.integration.id)
+        ).options(joinedload(Expense.category)).filter(Expense.user_id == user_id)
+        if expense_ids is not None:
+            query = query.filter(Expense.id.in_(expense_ids))
         
-        return results
+        pending, unchanged, found = [], 0, set()
+        for expense, state in query.order_by(Expense.id):
+            found.add(expense.id)
+            fingerprint = expense_fingerprint(expense)
+            if state is not None and state.status == "success" and state.fingerprint == fingerprint:
+                unchanged += 1
+            else:
+                pending.append((expense, state, fingerprint))
+        missing = [i for i in expense_ids if i not in found] if expense_ids is not None else []
+        return pending, unchanged, missing
     
-    async def sync_all_unsynced_expenses(self, db: Session) -> Dict[str, any]:
-        """Sync all expenses that haven't been synced yet"""
-        # Get all expenses for this user that haven't been synced
-        # (This would need a field to track sync status - TODO: Add to Expense model)
-        expenses = db.query(Expense).filter(
-            Expense.user_id == self.integration.user_id
-        ).all()
+    def sync_pending_expenses(self, db: Session, expense_ids: Optional[List[int]] = None) -> Dict[str, Any]:
+        """Push new and changed expenses (optionally only `expense_ids`) as batched creates/updates"""
+        start_time = datetime.utcnow()
+        results = {"success": True, "synced_count": 0, "skipped_count": 0, "errors": [], "sync_history": []}
+        if not self._refresh_token_if_needed():
+            results.update(success=False, errors=["Token refresh failed"])
+            return results
         
-        results = {
-            "success": True,
-            "synced_count": 0,
-            "errors": [],
-            "sync_history": []
-        }
+        self._ensure_state_table(db)
+        pending, results["skipped_count"], missing = self._pending_expenses(db, expense_ids)
+        results["errors"].extend(f"Expense {expense_id} not found" for expense_id in missing)
+        if not pending:
+            results["success"] = not missing
+            return results
+        
+        try:
+            accounts = self._accounts(config.QUICKBOOKS_MAX_RETRIES)
+            vendors = self._resolve_vendors([expense.vendor or UNKNOWN_VENDOR for expense, _, _ in pending])
+        except Exception as e:
+            logger.error(f"QuickBooks reference data unavailable: {e}")
+            self.integration.last_sync_error = str(e)
+            db.commit()
+            results.update(success=False, errors=results["errors"] + [str(e)])
+            return results
+        
+        items = []
+        for expense, state, _ in pending:
+            account_name = self._account_name(expense)
+            payload = self._purchase_payload(expense, account_name, accounts.get(account_name.lower()),
+                                             vendors.get((expense.vendor or UNKNOWN_VENDOR).lower()))
+            if state is not None and state.quickbooks_id and state.sync_token is not None:
+                payload.update(Id=state.quickbooks_id, SyncToken=state.sync_token, sparse=True)
+                items.append({"bId": str(expense.id), "operation": "update", "Purchase": payload})
+            else:
+                items.append({"bId": str(expense.id), "operation": "create", "Purchase": payload})
+        responses = self._run_batches(items)
         
-        for expense in expenses:
-            result = await self.sync_expense(expense, db)
-            if result["success"]:
+        now = datetime.utcnow()
+        sync_duration = int((now - start_time).total_seconds() * 1000)
+        history = []
+        for (expense, state, fingerprint), item in zip(pending, items):
+            if state is None:
+                state = QuickBooksExpenseSync(integration_id=self.integration.id, expense_id=expense.id)
+                db.add(state)
+            sync_type = "expense_updated" if item["operation"] == "update" else "expense_created"
+            response = responses.get(item["bId"]) or {}
+            purchase = response.get("Purchase")
+            if purchase:
+                state.quickbooks_id = purchase.get("Id")
+                state.sync_token = purchase.get("SyncToken")
+                state.fingerprint = fingerprint
+                state.status, state.error_message, state.synced_at = "success", None, now
                 results["synced_count"] += 1
+                history.append(QuickBooksSyncHistory(
+                    integration_id=self.integration.id, sync_type=sync_type, expense_id=expense.id,
+                    quickbooks_id=state.quickbooks_id, quickbooks_status="success", sync_duration=sync_duration
+                ))
             else:
-                results["errors"].append(f"Expense {expense.id}: {result['error']}")
-                results["success"] = False
+                message = self._fault_message(response)
+                state.status, state.error_message = "error", message
+                results["errors"].append(f"Expense {expense.id}: {message}")
+                history.append(QuickBooksSyncHistory(
+                    integration_id=self.integration.id, sync_type=sync_type, expense_id=expense.id,
+                    quickbooks_status="error", sync_duration=sync_duration, error_message=message
+                ))
+            results["sync_history"].append({"expense_id": expense.id, "quickbooks_id": state.quickbooks_id,
+                                            "status": state.status, "operation": item["operation"]})
         
+        db.add_all(history)
+        self.integration.total_expenses_synced = (self.integration.total_expenses_synced or 0) + results["synced_count"]
+        self.integration.last_sync_at = now
+        self.integration.last_sync_error = results["errors"][-1] if results["errors"] else None
+        db.commit()
+        
+        results["success"] = not results["errors"]
+        logger.info(f"QuickBooks sync for realm {self.integration.realm_id}: {results['synced_count']} pushed, "
+                    f"{results['skipped_count']} unchanged, {len(results['errors'])} errors in {sync_duration}ms")
         return results
     
+    async def sync_expenses_by_ids(self, expense_ids: List[int], db: Session) -> Dict[str, any]:
+        """Sync specific expenses by IDs (unchanged, already-synced ones are skipped)"""
+        return await asyncio.to_thread(self.sync_pending_expenses, db, expense_ids)
+    
+    async def sync_all_unsynced_expenses(self, db: Session) -> Dict[str, any]:
+        """Sync all expenses that are new or changed since their last sync"""
+        return await asyncio.to_thread(self.sync_pending_expenses, db)
+    
     def get_company_info(self) -> Dict[str, any]:
         """Get QuickBooks company information"""
         try:
@@ -370,7 +610,7 @@ class QuickBooksService:
                 return {"error": "Token refresh failed"}
             
             company_url = f"{self.base_url}/v1/openid_connect/userinfo"
-            response = requests.get(company_url, headers=self._get_headers())
+            response = self.http.get(company_url, headers=self._get_headers(), timeout=30)
             
             if response.status_code == 200:
                 return response.json()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/services/realtime_bus.py
+🎯 PURPOSE: Cross-worker fan-out of real-time messages over Redis pub/sub
+🔗 IMPORTS: json, threading, uuid, utils.redis_manager
+📤 EXPORTS: RealtimeBus, CHANNEL
+🔄 PATTERN: publish → Redis channel → listener thread in every worker → local deliver
+
+Each worker delivers its own messages locally and publishes them with an
+origin id; listeners skip their own origin, so every connection receives a
+message exactly once. Without Redis (NullRedis) publishing is a no-op and
+delivery stays in-process, which is correct for a single worker.
+"""
+
+import json
+import logging
+import threading
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+from utils.redis_manager import redis_manager
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "cora:realtime"
+
+# deliver(user_id or None for everyone, message, coalesce_key)
+Deliver = Callable[[Optional[str], Dict[str, Any], Optional[str]], None]
+
+
+class RealtimeBus:
+    """Redis pub/sub transport for WebSocket messages, with in-process fallback"""
+
+    def __init__(self, deliver: Deliver, channel: str = CHANNEL):
+        self.deliver = deliver
+        self.channel = channel
+        self.origin = uuid.uuid4().hex
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def distributed(self) -> bool:
+        """True when a real Redis server is available"""
+        return hasattr(redis_manager.redis_client, "pubsub")
+
+    def publish(self, user_id: Optional[str], message: Dict[str, Any], coalesce_key: Optional[str] = None) -> int:
+        """Publish to other workers; returns the number of subscribers reached"""
+        if not self.distributed:
+            return 0
+        envelope = {"origin": self.origin, "user": user_id, "key": coalesce_key, "message": message}
+        return redis_manager.publish(self.channel, json.dumps(envelope, default=str))
+
+    def start(self):
+        """Start the listener thread (no-op without Redis)"""
+        if not self.distributed or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._listen, name="cora-realtime-bus", daemon=True)
+        self._thread.start()
+        logger.info(f"Realtime bus subscribed to {self.channel}")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def handle(self, raw: str):
+        """Deliver one published envelope unless it came from this worker"""
+        try:
+            envelope = json.loads(raw)
+        except (TypeError, ValueError):
+            return
+        if envelope.get("origin") == self.origin:
+            return
+        self.deliver(envelope.get("user"), envelope.get("message") or {}, envelope.get("key"))
+
+    def _listen(self):
+        backoff = 1.0
+        while not self._stop.is_set():
+            pubsub = None
+            try:
+                pubsub = redis_manager.redis_client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                backoff = 1.0
+                while not self._stop.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message.get("type") == "message":
+                        self.handle(message["data"])
+            except Exception as e:
+                logger.warning(f"Realtime bus listener error, reconnecting in {backoff:.0f}s: {e}")
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/services/report_renderer.py
+🎯 PURPOSE: Render profit intelligence PDFs off the request path, cached by user, section and data version
+🔗 IMPORTS: concurrent.futures, multiprocessing, hashlib, config, utils.pdf_exporter (in worker processes)
+📤 EXPORTS: ReportJob, ReportRenderer, report_renderer, data_version, start_report_renderer, stop_report_renderer
+🔄 PATTERN: request → data version → cached file (ready) | coalesced job on a process pool (pending) → poll → streamed download
+
+ReportLab's doc.build is CPU-bound, so it runs in REPORT_RENDER_WORKERS
+spawned processes instead of the event loop. Output lands in
+REPORTS_DIR/<user_id>/<section>_report_<version>.pdf, where the version is a
+hash of the report data: asking again for unchanged data returns the file
+already on disk, and concurrent requests for the same report share one job.
+Files are written under a temporary name and renamed when complete, so a
+download never sees a partial PDF. A sweeper thread deletes reports older
+than REPORT_RETENTION_HOURS.
+
+Production runs several app workers, and a poll can land on a worker that
+never saw the job. Job ids are therefore `<section>-<version>` rather than
+random, and `get` falls back to the user's directory: the PDF means ready, a
+`.failed` marker carries the error, and a `.pending` marker younger than
+REPORT_RENDER_TIMEOUT_SECONDS means another worker is still rendering.
+"""
+
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import re
+import time
+from collections import Counter
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from config import config
+
+logger = logging.getLogger(__name__)
+
+REPORT_SECTIONS = ("full", "forecasting", "vendors", "jobs", "pricing", "benchmarks")
+_JOB_ID = re.compile(rf"^({'|'.join(REPORT_SECTIONS)})-([0-9a-f]{{20}})$")
+
+
+def data_version(data: Dict[str, Any]) -> str:
+    """Stable hash of the report data; equal data renders to the same file"""
+    raw = json.dumps(data, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:20]
+
+
+def report_filename(section: str, version: str) -> str:
+    prefix = "profit_intelligence_full_report" if section == "full" else f"{section}_report"
+    return f"{prefix}_{version}.pdf"
+
+
+def _marker(path: Path, state: str) -> Path:
+    """`<report>.pdf.pending` / `.failed`: job state other workers can read"""
+    return path.with_name(f"{path.name}.{state}")
+
+
+def _render(section: str, data: Dict[str, Any], output_path: str) -> str:
+    """Worker-process entry point: build the PDF beside its final path, then rename it into place"""
+    from utils.pdf_exporter import pdf_exporter
+
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    try:
+        if section == "full":
+            pdf_exporter.generate_profit_intelligence_report(data, tmp_path)
+        else:
+            pdf_exporter.generate_section_report(section, data, tmp_path)
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return output_path
+
+
+@dataclass
+class ReportJob:
+    """One requested report; `status` is pending, ready or failed"""
+    user_id: int
+    section: str
+    version: str
+    path: Path
+    status: str = "pending"
+    cached: bool = False
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+
+    @property
+    def id(self) -> str:
+        """Derived from the content, so any worker can resolve it"""
+        return f"{self.section}-{self.version}"
+
+    @property
+    def filename(self) -> str:
+        return self.path.name
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "job_id": self.id,
+            "section": self.section,
+            "filename": self.filename,
+            "cached": self.cached,
+            "status_url": f"/api/pdf-export/jobs/{self.id}",
+            "download_url": f"/api/pdf-export/jobs/{self.id}/download",
+            "created_at": self.created_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "error": self.error,
+        }
+
+
+class ReportRenderer:
+    """Queues report renders on a process pool and tracks their jobs"""
+
+    def __init__(self, reports_dir: Optional[str] = None, workers: Optional[int] = None,
+                 retention_seconds: Optional[float] = None, sweep_interval: Optional[float] = None,
+                 render_timeout: Optional[float] = None, executor: Optional[Executor] = None):
+        self.reports_dir = Path(reports_dir or config.REPORTS_DIR)
+        self.workers = workers or config.REPORT_RENDER_WORKERS
+        self.retention_seconds = (retention_seconds if retention_seconds is not None
+                                  else config.REPORT_RETENTION_HOURS * 3600)
+        self.sweep_interval = sweep_interval if sweep_interval is not None else config.REPORT_SWEEP_INTERVAL_SECONDS
+        self.render_timeout = render_timeout if render_timeout is not None else config.REPORT_RENDER_TIMEOUT_SECONDS
+        self.stats: Counter = Counter()
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._by_key: Dict[Tuple[int, str, str], ReportJob] = {}
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._sweeper: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------ jobs
+    def _pool(self) -> Executor:
+        if self._executor is None:
+            # spawn: forking a process that runs threads (scheduler, outbox) can copy held locks
+            self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    def user_dir(self, user_id: int) -> Path:
+        return self.reports_dir / str(int(user_id))
+
+    def user_file(self, user_id: int, filename: str) -> Optional[Path]:
+        """A report in the user's directory, or None (names with path components are rejected)"""
+        if not filename or Path(filename).name != filename or not filename.endswith(".pdf"):
+            return None
+        path = self.user_dir(user_id) / filename
+        return path if path.is_file() else None
+
+    def submit(self, user_id: int, section: str, data: Dict[str, Any]) -> ReportJob:
+        """Return a ready job for already-rendered data, the in-flight job for it, or a newly queued one"""
+        if section not in REPORT_SECTIONS:
+            raise ValueError(f"Unknown report section: {section}")
+        version = data_version(data)
+        key = (user_id, section, version)
+        path = self.user_dir(user_id) / report_filename(section, version)
+        with self._lock:
+            job = self._by_key.get(key)
+            if job is not None and job.status == "pending":
+                self.stats["coalesced"] += 1
+                return job
+            if job is not None and job.status == "ready" and path.exists():
+                os.utime(path)  # restart the retention clock for a report still in use
+                self.stats["cache_hits"] += 1
+                return job
+            job = ReportJob(user_id=user_id, section=section, version=version, path=path)
+            self._by_key[key] = job
+            if path.exists():
+                os.utime(path)
+                job.status, job.cached, job.finished_at = "ready", True, datetime.utcnow()
+                self.stats["cache_hits"] += 1
+                return job
+            path.parent.mkdir(parents=True, exist_ok=True)
+            _marker(path, "failed").unlink(missing_ok=True)
+            _marker(path, "pending").touch()
+            self.stats["queued"] += 1
+            pool = self._pool()
+        try:
+            future = pool.submit(_render, section, data, str(path))
+        except (BrokenProcessPool, RuntimeError) as e:
+            self._finished(job, None, error=e)
+            return job
+        future.add_done_callback(partial(self._finished, job))
+        return job
+
+    def _finished(self, job: ReportJob, future: Optional[Future], error: Optional[BaseException] = None) -> None:
+        if future is not None:
+            error = future.exception() if not future.cancelled() else RuntimeError("render cancelled")
+        with self._lock:
+            job.finished_at = datetime.utcnow()
+            if error is None:
+                job.status = "ready"
+                self.stats["rendered"] += 1
+            else:
+                job.status, job.error = "failed", str(error)[:500]
+                self.stats["failed"] += 1
+                if isinstance(error, BrokenProcessPool) and self._owns_executor:
+                    self._executor = None  # a worker died; start a fresh pool on the next submit
+        try:
+            if error is not None:
+                _marker(job.path, "failed").write_text(job.error, encoding="utf-8")
+            _marker(job.path, "pending").unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning(f"Could not record report job state for {job.path.name}: {e}")
+        if error is not None:
+            logger.error(f"Report {job.section} for user {job.user_id} failed: {error}")
+
+    def get(self, job_id: str, user_id: int) -> Optional[ReportJob]:
+        """`user_id`'s job `job_id`, whichever worker queued it, or None"""
+        match = _JOB_ID.match(job_id or "")
+        if match is None:
+            return None
+        section, version = match.groups()
+        with self._lock:
+            job = self._by_key.get((user_id, section, version))
+        on_disk = self._job_on_disk(user_id, section, version)
+        if job is not None and (on_disk is None or on_disk.status == job.status):
+            return job
+        return on_disk
+
+    def _job_on_disk(self, user_id: int, section: str, version: str) -> Optional[ReportJob]:
+        """The job as the report file and its markers describe it (None when nothing is there)"""
+        path = self.user_dir(user_id) / report_filename(section, version)
+        job = ReportJob(user_id=user_id, section=section, version=version, path=path)
+        try:
+            if path.is_file():
+                job.status = "ready"
+                job.finished_at = datetime.utcfromtimestamp(path.stat().st_mtime)
+                return job
+            failed = _marker(path, "failed")
+            if failed.is_file():
+                job.status, job.error = "failed", failed.read_text(encoding="utf-8")[:500]
+                job.finished_at = datetime.utcfromtimestamp(failed.stat().st_mtime)
+                return job
+            started = _marker(path, "pending").stat().st_mtime
+        except FileNotFoundError:
+            return None
+        job.created_at = datetime.utcfromtimestamp(started)
+        if time.time() - started > self.render_timeout:
+            job.status, job.error = "failed", "Report render did not finish"  # its worker died or was restarted
+        return job
+
+    # ------------------------------------------------------------------ retention
+    def sweep(self, now: Optional[float] = None) -> int:
+        """Delete reports (and stray temp and marker files) older than the retention period; returns files removed"""
+        cutoff = (now if now is not None else time.time()) - self.retention_seconds
+        removed = 0
+        if self.reports_dir.exists():
+            for path in self.reports_dir.rglob("*"):
+                if path.suffix not in (".pdf", ".tmp", ".pending", ".failed") or not path.is_file():
+                    continue
+                try:
+                    if path.stat().st_mtime < cutoff:
+                        path.unlink()
+                        removed += 1
+                except FileNotFoundError:
+                    continue
+        with self._lock:
+            for key, job in list(self._by_key.items()):
+                if job.status != "pending" and not job.path.exists():
+                    del self._by_key[key]
+            self.stats["swept"] += removed
+        if removed:
+            logger.info(f"Report sweeper removed {removed} files")
+        return removed
+
+    def _sweep_loop(self) -> None:
+        while not self._stopping.wait(self.sweep_interval):
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.warning(f"Report sweep failed: {e}")
+
+    def start(self) -> None:
+        if self._sweeper is not None and self._sweeper.is_alive():
+            return
+        self._stopping.clear()
+        self._sweeper = threading.Thread(target=self._sweep_loop, name="report-sweeper", daemon=True)
+        self._sweeper.start()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        if self._sweeper is not None:
+            self._sweeper.join(timeout=5)
+            self._sweeper = None
+        if self._executor is not None and self._owns_executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+report_renderer = ReportRenderer()
+
+
+def start_report_renderer():
+    report_renderer.start()
+
+
+def stop_report_renderer():
+    report_renderer.stop()
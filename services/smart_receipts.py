@@ -11,13 +11,19 @@ import io
 import re
 from datetime import datetime
 from typing import Dict, Any, List, Optional, Tuple
-from PIL import Image
-import pytesseract
 from dataclasses import dataclass
 import json
 
 from sqlalchemy.orm import Session
 from models import Expense
+from services.categorization_engine import (
+    RECEIPT_ITEM_CATEGORIES, receipt_item_matcher, receipt_vendor_matcher
+)
+from utils.lazy_import import lazy_import
+
+# OCR stack is imported on the first receipt, not at worker boot
+Image = lazy_import("PIL.Image")
+pytesseract = lazy_import("pytesseract")
 
 @dataclass
 class ReceiptData:
@@ -38,14 +44,7 @@ class SmartReceiptProcessor:
     def __init__(self, user_id: int, db: Session):
         self.user_id = user_id
         self.db = db
-        self.contractor_categories = {
-            'materials': ['lumber', 'concrete', 'drywall', 'paint', 'nails', 'screws', 'pipe', 'wire'],
-            'tools': ['drill', 'saw', 'hammer', 'level', 'measure', 'tool', 'equipment'],
-            'vehicle': ['gas', 'fuel', 'diesel', 'oil', 'tire', 'maintenance'],
-            'safety': ['helmet', 'gloves', 'boots', 'harness', 'vest', 'goggles'],
-            'office': ['paper', 'ink', 'computer', 'software', 'phone'],
-            'subcontractor': ['labor', 'service', 'installation', 'repair']
-        }
+        self.contractor_categories = RECEIPT_ITEM_CATEGORIES
         
     async def process_receipt(self, image_data: str) -> ReceiptData:
         """Process receipt image and extract structured data"""
@@ -231,26 +230,14 @@ class SmartReceiptProcessor:
     
     def _categorize_item(self, item_name: str) -> str:
         """Categorize individual item"""
-        item_lower = item_name.lower()
-        
-        for category, keywords in self.contractor_categories.items():
-            for keyword in keywords:
-                if keyword in item_lower:
-                    return category
-        
-        return 'materials'  # Default for contractors
+        return receipt_item_matcher.match(item_name)  # 'materials' by default for contractors
     
     def _categorize_receipt(self, vendor: str, items: List[Dict]) -> str:
         """Categorize entire receipt based on vendor and items"""
-        vendor_lower = vendor.lower()
-        
         # Vendor-based categorization
-        if any(v in vendor_lower for v in ['home depot', 'lowes', 'menards']):
-            return 'materials'
-        elif any(v in vendor_lower for v in ['shell', 'exxon', 'chevron', 'gas']):
-            return 'vehicle'
-        elif any(v in vendor_lower for v in ['harbor freight', 'grainger']):
-            return 'tools'
+        category = receipt_vendor_matcher.match(vendor)
+        if category:
+            return category
         
         # Item-based categorization
         if items:
@@ -2,19 +2,53 @@
 """
 🧭 LOCATION: /CORA/services/stripe_service.py
 🎯 PURPOSE: Stripe service for OAuth authentication and transaction synchronization
-🔗 IMPORTS: Stripe SDK, requests, SQLAlchemy
+🔗 IMPORTS: Stripe SDK, SQLAlchemy, services.integration_http
 📤 EXPORTS: StripeService class
+🔄 PATTERN: cursor (created >= high water, resume id) → lazy page generator → one dedup query per page → bulk insert → commit page + cursor
+
+sync_new_transactions() lists only charges created at or after the last
+complete run's high-water mark, newest first. Each page is committed
+together with the cursor position, so a run cut short by an outage or an API
+error resumes after the last committed page. The high-water mark only moves
+once a run reaches the end of the listing. SDK calls and the OAuth refresh
+share the pooled "stripe" integration client (keep-alive, circuit breaker,
+metrics); the SDK keeps ownership of retries.
 """
 
-import stripe
-import requests
+import asyncio
+import logging
 import json
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Any
+from typing import Iterator, List, Dict, Optional, Any, Tuple
+from weakref import WeakSet
+
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from models.stripe_integration import StripeIntegration, StripeSyncHistory, StripeTransaction
 from models.expense import Expense
+from models.expense_category import ExpenseCategory
+from models.stripe_integration import StripeIntegration, StripeSyncCursor, StripeSyncHistory, StripeTransaction
+from models.user import User
+from services.categorization_engine import stripe_description_matcher
+from services.integration_http import integration_client
+from utils.lazy_import import lazy_import
+
+stripe = lazy_import("stripe")
+
+logger = logging.getLogger(__name__)
+
+STRIPE_VENDOR = "Stripe Transaction"
+STRIPE_CONFIDENCE = 85  # High confidence for Stripe data
+
+_cursor_tables_ready: "WeakSet" = WeakSet()
+
+
+def _install_http_client() -> None:
+    """Route the SDK's requests through the shared "stripe" integration client (once per process)"""
+    client = integration_client("stripe")
+    current = stripe.default_http_client
+    if getattr(current, "_session", None) is not client:
+        stripe.default_http_client = stripe.http_client.RequestsClient(session=client)
 
 class StripeService:
     """Service for Stripe API interactions and transaction synchronization"""
@@ -23,6 +57,7 @@ class StripeService:
         self.integration = integration
         # Initialize Stripe with the connected account's access token
         stripe.api_key = integration.access_token
+        _install_http_client()
         
     def _get_headers(self) -> Dict[str, str]:
         """Get headers for Stripe API requests"""
@@ -49,7 +84,7 @@ class StripeService:
                 "client_secret": config.STRIPE_API_KEY
             }
             
-            response = requests.post(refresh_url, data=data)
+            response = integration_client("stripe").post(refresh_url, data=data)
             
             if response.status_code == 200:
                 token_data = response.json()
@@ -93,169 +128,199 @@ class StripeService:
         except Exception as e:
             return {"error": str(e)}
     
+    def _to_transaction(self, charge) -> Dict[str, Any]:
+        return {
+            "id": charge.id,
+            "amount": charge.amount / 100,  # Convert from cents
+            "amount_cents": charge.amount,
+            "currency": charge.currency,
+            "description": charge.description,
+            "receipt_url": charge.receipt_url,
+            "created": datetime.fromtimestamp(charge.created),
+            "created_ts": charge.created,
+            "status": charge.status,
+            "transaction_metadata": dict(charge.metadata or {}),
+            "payment_intent_id": charge.payment_intent,
+            "customer_id": charge.customer
+        }
+    
+    def _list_charges(self, limit: int, starting_after: Optional[str] = None,
+                      created_gte: Optional[int] = None) -> Tuple[List[Dict[str, Any]], bool]:
+        """One page of charges, newest first, as (transactions, has_more); API errors raise"""
+        params: Dict[str, Any] = {"limit": limit}
+        if starting_after:
+            params["starting_after"] = starting_after
+        if created_gte:
+            params["created"] = {"gte": created_gte}
+        page = stripe.Charge.list(api_key=self.integration.access_token, **params)
+        return [self._to_transaction(charge) for charge in page.data], bool(page.has_more)
+    
     def get_transactions(self, limit: int = 100, starting_after: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get recent transactions from Stripe"""
         try:
             if not self._refresh_token_if_needed():
                 return []
-            
-            # Get charges (transactions)
-            params = {
-                "limit": limit,
-                "expand": ["data.payment_intent", "data.receipt_url"]
-            }
-            
-            if starting_after:
-                params["starting_after"] = starting_after
-            
-            charges = stripe.Charge.list(**params)
-            
-            transactions = []
-            for charge in charges.data:
-                transaction = {
-                    "id": charge.id,
-                    "amount": charge.amount / 100,  # Convert from cents
-                    "currency": charge.currency,
-                    "description": charge.description,
-                    "receipt_url": charge.receipt_url,
-                    "created": datetime.fromtimestamp(charge.created),
-                    "status": charge.status,
-                    "transaction_metadata": charge.metadata,
-                    "payment_intent_id": charge.payment_intent,
-                    "customer_id": charge.customer
-                }
-                transactions.append(transaction)
-            
-            return transactions
+            return self._list_charges(limit, starting_after)[0]
             
         except Exception as e:
             print(f"Failed to get transactions: {e}")
             return []
     
+    def iter_transaction_pages(self, created_gte: Optional[int] = None, starting_after: Optional[str] = None,
+                               page_size: int = 100) -> Iterator[Tuple[List[Dict[str, Any]], bool]]:
+        """Lazily page through charges created at or after `created_gte`, yielding (transactions, has_more)"""
+        while True:
+            transactions, has_more = self._list_charges(page_size, starting_after, created_gte)
+            yield transactions, has_more
+            if not has_more or not transactions:
+                return
+            starting_after = transactions[-1]["id"]
+    
     def _map_stripe_to_cora_category(self, transaction: Dict[str, Any]) -> str:
         """Map Stripe transaction to CORA category"""
-        description = transaction.get("description", "").lower()
         transaction_metadata = transaction.get("transaction_metadata", {})
         
         # Check metadata first (most reliable)
         if "category" in transaction_metadata:
             return transaction_metadata["category"]
         
-        # Pattern matching based on description
-        if any(word in description for word in ["office", "supplies", "paper", "ink"]):
-            return "Office Supplies"
-        elif any(word in description for word in ["food", "lunch", "dinner", "restaurant", "coffee"]):
-            return "Meals & Entertainment"
-        elif any(word in description for word in ["uber", "lyft", "taxi", "gas", "fuel"]):
-            return "Transportation"
-        elif any(word in description for word in ["software", "subscription", "saas", "app"]):
-            return "Software & Subscriptions"
-        elif any(word in description for word in ["advertising", "marketing", "facebook", "google"]):
-            return "Marketing & Advertising"
-        elif any(word in description for word in ["shipping", "postage", "delivery"]):
-            return "Shipping & Postage"
-        elif any(word in description for word in ["course", "training", "education", "book"]):
-            return "Professional Development"
-        elif any(word in description for word in ["hotel", "flight", "travel", "airbnb"]):
-            return "Travel"
-        elif any(word in description for word in ["electricity", "water", "internet", "phone"]):
-            return "Utilities"
-        elif any(word in description for word in ["insurance", "premium"]):
-            return "Insurance"
-        else:
-            return "Office Supplies"  # Default fallback
+        # Pattern matching based on description (default: Office Supplies)
+        return stripe_description_matcher.match(transaction.get("description"))
     
-    def sync_transaction_to_cora(self, transaction: Dict[str, Any], db: Session) -> Dict[str, Any]:
-        """Sync a single Stripe transaction to CORA expense"""
-        start_time = datetime.utcnow()
+    def _map_stripe_categories(self, transactions: List[Dict[str, Any]]) -> List[str]:
+        """_map_stripe_to_cora_category for a whole page; repeated descriptions are matched once"""
+        categories: List[Optional[str]] = [None] * len(transactions)
+        unmapped = []
+        for i, transaction in enumerate(transactions):
+            if "category" in transaction.get("transaction_metadata", {}):
+                categories[i] = transaction["transaction_metadata"]["category"]
+            else:
+                unmapped.append(i)
+        matched = stripe_description_matcher.match_many((transactions[i].get("description"),) for i in unmapped)
+        for i, category in zip(unmapped, matched):
+            categories[i] = category
+        return categories
+    
+    # ------------------------------------------------------------------ ingestion
+    def _user_id(self, db: Session) -> Optional[int]:
+        return db.scalar(select(User.id).where(User.email == self.integration.user_email))
+    
+    @staticmethod
+    def _category_ids(db: Session) -> Dict[str, int]:
+        return {name: category_id for name, category_id in db.execute(select(ExpenseCategory.name, ExpenseCategory.id))}
+    
+    def _ingest_page(self, db: Session, transactions: List[Dict[str, Any]], user_id: int,
+                     category_ids: Dict[str, int], results: Dict[str, Any],
+                     categories: Optional[List[str]] = None) -> int:
+        """Insert the page's unseen transactions as expenses, Stripe rows and sync history (not committed)"""
+        ids = [t["id"] for t in transactions]
+        if not ids:
+            return 0
+        seen = set(db.scalars(
+            select(StripeTransaction.stripe_transaction_id).where(StripeTransaction.stripe_transaction_id.in_(ids))
+        ))
+        new, new_categories = [], []
+        for i, transaction in enumerate(transactions):
+            if transaction["id"] in seen:
+                continue
+            seen.add(transaction["id"])
+            new.append(transaction)
+            new_categories.append(categories[i] if categories else None)
+        results["skipped_count"] += len(transactions) - len(new)
+        if not new:
+            return 0
+        if not categories:
+            new_categories = self._map_stripe_categories(new)
         
-        try:
-            # Check if transaction already exists
-            existing_transaction = db.query(StripeTransaction).filter(
-                StripeTransaction.stripe_transaction_id == transaction["id"]
-            ).first()
-            
-            if existing_transaction:
-                return {
-                    "success": True,
-                    "message": "Transaction already synced",
-                    "expense_id": existing_transaction.expense_id
-                }
-            
-            # Create Stripe transaction record
-            stripe_transaction = StripeTransaction(
-                integration_id=self.integration.id,
-                stripe_transaction_id=transaction["id"],
-                stripe_charge_id=transaction["id"],
-                stripe_payment_intent_id=transaction.get("payment_intent_id"),
-                amount=transaction["amount"],
-                currency=transaction["currency"],
-                description=transaction.get("description", ""),
-                receipt_url=transaction.get("receipt_url"),
-                transaction_metadata=json.dumps(transaction.get("metadata", {})),
-                created_at=transaction["created"]
-            )
-            
-            db.add(stripe_transaction)
-            db.flush()  # Get the ID
-            
-            # Map to CORA category
-            category = self._map_stripe_to_cora_category(transaction)
-            
-            # Create CORA expense
-            expense = Expense(
-                user_id=self.integration.user_id,
-                amount=transaction["amount"],
-                description=transaction.get("description", f"Stripe transaction {transaction['id']}"),
-                category=category,
-                vendor="Stripe Transaction",
-                date=transaction["created"].date(),
+        started = datetime.utcnow()
+        expenses = [
+            Expense(
+                user_id=user_id,
+                amount_cents=t.get("amount_cents", round(t["amount"] * 100)),
+                currency=(t.get("currency") or "usd").upper()[:3],
+                description=t.get("description") or f"Stripe transaction {t['id']}",
+                category_id=category_ids.get(category),
+                vendor=STRIPE_VENDOR,
+                expense_date=t["created"],
                 payment_method="Stripe",
                 auto_categorized=True,
-                confidence_score=85.0  # High confidence for Stripe data
+                confidence_score=STRIPE_CONFIDENCE
             )
-            
-            db.add(expense)
-            db.flush()  # Get the expense ID
-            
-            # Link transaction to expense
-            stripe_transaction.expense_id = expense.id
-            stripe_transaction.is_synced_to_cora = True
-            
-            # Record sync history
-            sync_duration = int((datetime.utcnow() - start_time).total_seconds() * 1000)
-            sync_history = StripeSyncHistory(
+            for t, category in zip(new, new_categories)
+        ]
+        db.add_all(expenses)
+        db.flush()  # one multi-row INSERT; assigns the expense ids
+        
+        sync_duration = int((datetime.utcnow() - started).total_seconds() * 1000)
+        rows = []
+        for t, category, expense in zip(new, new_categories, expenses):
+            rows.append(StripeTransaction(
+                integration_id=self.integration.id,
+                stripe_transaction_id=t["id"],
+                stripe_charge_id=t["id"],
+                stripe_payment_intent_id=t.get("payment_intent_id"),
+                amount=t["amount"],
+                currency=t["currency"],
+                description=t.get("description", ""),
+                receipt_url=t.get("receipt_url"),
+                transaction_metadata=json.dumps(t.get("transaction_metadata") or {}),
+                created_at=t["created"],
+                expense_id=expense.id,
+                is_synced_to_cora=True
+            ))
+            rows.append(StripeSyncHistory(
                 integration_id=self.integration.id,
                 sync_type="transaction_created",
-                stripe_transaction_id=transaction["id"],
+                stripe_transaction_id=t["id"],
                 expense_id=expense.id,
                 stripe_status="success",
                 sync_duration=sync_duration,
-                amount=transaction["amount"],
-                currency=transaction["currency"],
-                description=transaction.get("description", ""),
+                amount=t["amount"],
+                currency=t["currency"],
+                description=t.get("description", ""),
                 category=category
-            )
-            
-            db.add(sync_history)
-            
-            # Update integration stats
-            self.integration.total_transactions_synced += 1
-            self.integration.total_amount_synced += transaction["amount"]
+            ))
+            results["sync_history"].append({"success": True, "stripe_transaction_id": t["id"],
+                                            "expense_id": expense.id, "category": category})
+        db.add_all(rows)
+        
+        self.integration.total_transactions_synced = (self.integration.total_transactions_synced or 0) + len(new)
+        self.integration.total_amount_synced = (self.integration.total_amount_synced or 0) + sum(t["amount"] for t in new)
+        results["synced_count"] += len(new)
+        return len(new)
+    
+    def sync_transaction_to_cora(self, transaction: Dict[str, Any], db: Session,
+                                 category: Optional[str] = None) -> Dict[str, Any]:
+        """Sync a single Stripe transaction to CORA expense (`category` precomputed by batch syncs)"""
+        start_time = datetime.utcnow()
+        results = {"synced_count": 0, "skipped_count": 0, "sync_history": []}
+        try:
+            user_id = self._user_id(db)
+            if user_id is None:
+                raise ValueError(f"No CORA user for {self.integration.user_email}")
+            created = self._ingest_page(db, [transaction], user_id, self._category_ids(db), results,
+                                        [category] if category else None)
             self.integration.last_sync_at = datetime.utcnow()
             self.integration.last_sync_error = None
-            
             db.commit()
             
+            if not created:
+                return {
+                    "success": True,
+                    "message": "Transaction already synced",
+                    "expense_id": db.scalar(select(StripeTransaction.expense_id).where(
+                        StripeTransaction.stripe_transaction_id == transaction["id"]))
+                }
+            entry = results["sync_history"][0]
             return {
                 "success": True,
-                "expense_id": expense.id,
-                "sync_duration": sync_duration,
-                "category": category
+                "expense_id": entry["expense_id"],
+                "sync_duration": int((datetime.utcnow() - start_time).total_seconds() * 1000),
+                "category": entry["category"]
             }
             
         except Exception as e:
-            # Record error
+            db.rollback()
             sync_duration = int((datetime.utcnow() - start_time).total_seconds() * 1000)
             
             sync_history = StripeSyncHistory(
@@ -280,38 +345,73 @@ class StripeService:
                 "sync_duration": sync_duration
             }
     
-    async def sync_all_transactions(self, db: Session, limit: int = 100) -> Dict[str, Any]:
-        """Sync all recent transactions from Stripe"""
+    def _cursor(self, db: Session) -> StripeSyncCursor:
+        bind = db.get_bind()
+        if bind not in _cursor_tables_ready:
+            StripeSyncCursor.__table__.create(bind=bind, checkfirst=True)
+            _cursor_tables_ready.add(bind)
+        cursor = db.get(StripeSyncCursor, self.integration.id)
+        if cursor is None:
+            cursor = StripeSyncCursor(integration_id=self.integration.id)
+            db.add(cursor)
+        return cursor
+    
+    def sync_new_transactions(self, db: Session, page_size: int = 100,
+                              max_pages: Optional[int] = None) -> Dict[str, Any]:
+        """Import charges created since the last complete run, committing page by page with the cursor"""
+        results = {"success": True, "synced_count": 0, "skipped_count": 0, "pages": 0,
+                   "errors": [], "sync_history": []}
+        if not self._refresh_token_if_needed():
+            results.update(success=False, errors=["Token refresh failed"])
+            return results
+        user_id = self._user_id(db)
+        if user_id is None:
+            results.update(success=False, errors=[f"No CORA user for {self.integration.user_email}"])
+            return results
+        
+        cursor = self._cursor(db)
+        category_ids = self._category_ids(db)
+        pages = self.iter_transaction_pages(created_gte=cursor.high_water, starting_after=cursor.resume_after,
+                                            page_size=page_size)
         try:
-            if not self._refresh_token_if_needed():
-                return {
-                    "success": False,
-                    "error": "Token refresh failed",
-                    "synced_count": 0
-                }
-            
-            # Get recent transactions
-            transactions = self.get_transactions(limit=limit)
-            
-            results = {
-                "success": True,
-                "synced_count": 0,
-                "errors": [],
-                "sync_history": []
-            }
-            
-            for transaction in transactions:
-                result = self.sync_transaction_to_cora(transaction, db)
-                if result["success"]:
-                    results["synced_count"] += 1
+            for transactions, has_more in pages:
+                self._ingest_page(db, transactions, user_id, category_ids, results)
+                if transactions:
+                    newest = max(t["created_ts"] for t in transactions)
+                    cursor.pending_high_water = max(cursor.pending_high_water or 0, newest)
+                if has_more:
+                    cursor.resume_after = transactions[-1]["id"]
                 else:
-                    results["errors"].append(f"Transaction {transaction['id']}: {result['error']}")
-                    results["success"] = False
-                
-                results["sync_history"].append(result)
-            
-            return results
-            
+                    # Reached the end of the listing: everything up to the newest charge seen is in
+                    cursor.high_water = cursor.pending_high_water or cursor.high_water
+                    cursor.pending_high_water = None
+                    cursor.resume_after = None
+                    cursor.last_completed_at = datetime.utcnow()
+                self.integration.last_sync_at = datetime.utcnow()
+                self.integration.last_sync_error = None
+                db.commit()
+                results["pages"] += 1
+                if has_more and max_pages and results["pages"] >= max_pages:
+                    break
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Stripe sync for integration {self.integration.id} stopped after "
+                         f"{results['pages']} pages: {e}")
+            # A cursor first added in this transaction was discarded by the rollback
+            cursor = self._cursor(db)
+            if isinstance(e, stripe.error.InvalidRequestError) and cursor.resume_after:
+                # The resume charge is gone; restart from the high-water mark (ids dedup the overlap)
+                cursor.resume_after = None
+            self.integration.last_sync_error = str(e)
+            db.commit()
+            results["success"] = False
+            results["errors"].append(str(e))
+        return results
+    
+    async def sync_all_transactions(self, db: Session, limit: int = 100) -> Dict[str, Any]:
+        """Sync transactions created since the last sync from Stripe (`limit` is the page size)"""
+        try:
+            return await asyncio.to_thread(self.sync_new_transactions, db, limit)
         except Exception as e:
             return {
                 "success": False,
@@ -2,35 +2,74 @@
 """
 Task Scheduler Service
 Automatically executes business tasks based on their frequency and schedule
+
+Timing still comes from the `schedule` library, but every run executes on a
+dedicated asyncio loop owned by the scheduler thread. A run fans out one unit
+of work per active user with bounded concurrency; each unit gets its own
+session from the app's pooled engine, a timeout and retry with backoff.
+A unit that times out keeps running in its thread, so it is recorded as a
+timeout instead of retried, and that user is skipped until it finishes.
+Run history is persisted to the task_runs table.
 """
 
 import asyncio
+import random
 import schedule
-import time
 import threading
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, Any, List, Optional
-from sqlalchemy.orm import Session
-from sqlalchemy import create_engine
 import json
-from sqlalchemy.orm import sessionmaker
 
-from models import User
+from config import config
+from models import User, TaskRun, engine, session_scope
 from services.business_task_automation import BusinessTaskAutomation
 
 logger = logging.getLogger(__name__)
 
+# Fleet-wide job that is not driven by business_task_templates.json
+WEEKLY_INSIGHTS_TASK = "weekly_insights_batch"
+
+# Only keep this many per-user failures on a TaskRun row
+MAX_RECORDED_FAILURES = 50
+
+# Units run in executor threads; each thread keeps one event loop for the
+# (async def, but DB-bound) BusinessTaskAutomation handlers
+_thread_state = threading.local()
+
+
+def _thread_loop() -> asyncio.AbstractEventLoop:
+    loop = getattr(_thread_state, "loop", None)
+    if loop is None:
+        loop = asyncio.new_event_loop()
+        _thread_state.loop = loop
+    return loop
+
+
+class UnitTimeout(Exception):
+    """A per-user unit of work exceeded TASK_UNIT_TIMEOUT_SECONDS"""
+
+
 class TaskScheduler:
     """Manages automated task execution based on schedules"""
-    
-    def __init__(self):
+
+    def __init__(self, max_concurrency: Optional[int] = None, unit_timeout: Optional[float] = None,
+                 max_retries: Optional[int] = None, retry_backoff: Optional[float] = None):
         self.is_running = False
         self.scheduler_thread = None
         self.active_tasks = {}
-        self.task_results = {}
+        self.max_concurrency = max_concurrency or config.TASK_MAX_CONCURRENCY
+        self.unit_timeout = unit_timeout if unit_timeout is not None else config.TASK_UNIT_TIMEOUT_SECONDS
+        self.max_retries = max_retries if max_retries is not None else config.TASK_MAX_RETRIES
+        self.retry_backoff = retry_backoff if retry_backoff is not None else config.TASK_RETRY_BACKOFF_SECONDS
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._history_ready = False
+        # (task, user) units still executing in a worker thread, including ones whose wait timed out
+        self._in_flight = set()
         self.load_config()
-        
+
     def load_config(self):
         """Load task configuration"""
         try:
@@ -40,158 +79,303 @@ class TaskScheduler:
         except Exception as e:
             logger.error(f"Failed to load task configuration: {e}")
             self.task_config = {}
-    
+
     def setup_schedules(self):
         """Setup task schedules based on frequency"""
         # Clear existing schedules
         schedule.clear()
-        
-        for task_name, config in self.task_config.items():
-            if not config.get('auto_execute', False):
+
+        for task_name, task_conf in self.task_config.items():
+            if not task_conf.get('auto_execute', False):
                 continue
-                
-            frequency = config.get('frequency', 'DAILY')
-            
+
+            frequency = task_conf.get('frequency', 'DAILY')
+
             if frequency == 'DAILY':
-                schedule.every().day.at("06:00").do(self.execute_task, task_name)
+                schedule.every().day.at("06:00").do(self._submit_scheduled, task_name, frequency)
             elif frequency == 'WEEKLY':
-                schedule.every().monday.at("06:00").do(self.execute_task, task_name)
-            elif frequency == 'MONTHLY':
-                # Schedule for 1st of each month at 6 AM
-                schedule.every().day.at("06:00").do(self.execute_task, task_name)
-            elif frequency == 'QUARTERLY':
-                # Schedule for quarterly tasks (simplified to monthly for now)
-                schedule.every().day.at("06:00").do(self.execute_task, task_name)
-        
+                schedule.every().monday.at("06:00").do(self._submit_scheduled, task_name, frequency)
+            elif frequency in ('MONTHLY', 'QUARTERLY'):
+                # Checked daily; _submit_scheduled skips days that are not due
+                schedule.every().day.at("06:00").do(self._submit_scheduled, task_name, frequency)
+
+        schedule.every().monday.at("07:00").do(self._submit_weekly_insights, WEEKLY_INSIGHTS_TASK)
+
         logger.info(f"Setup {len(schedule.jobs)} scheduled tasks")
-    
-    async def execute_task(self, task_name: str):
-        """Execute a scheduled task for all users"""
-        logger.info(f"Executing scheduled task: {task_name}")
-        
-        try:
-            # Get database session
-            engine = create_engine("sqlite:///data/cora.db")
-            SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-            db = SessionLocal()
-            
-            # Get all active users
-            users = db.query(User).filter(User.is_active == True).all()
-            
-            total_executed = 0
-            total_success = 0
-            total_failed = 0
-            
-            for user in users:
+
+    # ------------------------------------------------------------------ loop
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the scheduler's asyncio loop thread if needed"""
+        if self._loop is not None and self._loop.is_running():
+            return self._loop
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="cora-task")
+        loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def run_loop():
+            asyncio.set_event_loop(loop)
+            loop.call_soon(ready.set)
+            loop.run_forever()
+
+        self.scheduler_thread = threading.Thread(target=run_loop, name="cora-task-scheduler", daemon=True)
+        self.scheduler_thread.start()
+        ready.wait(timeout=5)
+        self._loop = loop
+        return loop
+
+    async def _tick(self):
+        """Drive the `schedule` library from the asyncio loop"""
+        while self.is_running:
+            schedule.run_pending()
+            await asyncio.sleep(30)
+
+    def _submit_scheduled(self, task_name: str, frequency: str):
+        """Called by `schedule` (on the loop thread) when a task is due"""
+        today = datetime.now()
+        if frequency == 'MONTHLY' and today.day != 1:
+            return
+        if frequency == 'QUARTERLY' and not (today.day == 1 and today.month in (1, 4, 7, 10)):
+            return
+        asyncio.ensure_future(self.execute_task(task_name, trigger="scheduled"))
+
+    def _submit_weekly_insights(self, task_name: str):
+        """Called by `schedule` every Monday; task_name keys get_status()['next_runs']"""
+        asyncio.ensure_future(self.execute_weekly_insights(trigger="scheduled"))
+
+    # ------------------------------------------------------------------ history
+    def _ensure_history_table(self):
+        if not self._history_ready:
+            TaskRun.__table__.create(bind=engine, checkfirst=True)
+            self._history_ready = True
+
+    def _start_run(self, task_name: str, trigger: str) -> int:
+        self._ensure_history_table()
+        with session_scope() as db:
+            run = TaskRun(task_name=task_name, trigger=trigger, status="running", started_at=datetime.utcnow())
+            db.add(run)
+            db.flush()
+            return run.id
+
+    def _finish_run(self, run_id: int, **fields):
+        with session_scope() as db:
+            run = db.get(TaskRun, run_id)
+            if run is None:
+                return
+            run.finished_at = datetime.utcnow()
+            run.duration_seconds = (run.finished_at - run.started_at).total_seconds()
+            for key, value in fields.items():
+                setattr(run, key, value)
+
+    @staticmethod
+    def _active_user_ids() -> List[int]:
+        with session_scope() as db:
+            rows = db.query(User.id).filter(User.is_active == "true").order_by(User.id).all()
+            return [row[0] for row in rows]
+
+    # ------------------------------------------------------------------ execution
+    def _run_unit(self, task_name: str, user_id: int) -> Dict[str, Any]:
+        """One user's unit of work, executed in a worker thread with its own session"""
+        with session_scope() as db:
+            user = db.get(User, user_id)
+            if user is None:
+                return {"success": True, "skipped": True}
+            automation = BusinessTaskAutomation(user, db, templates=self.task_config)
+            return _thread_loop().run_until_complete(automation.execute_task(task_name))
+
+    async def _run_for_user(self, task_name: str, user_id: int, gate: asyncio.Semaphore,
+                            stats: Dict[str, Any]):
+        key = (task_name, user_id)
+        async with gate:
+            for attempt in range(self.max_retries + 1):
+                if key in self._in_flight:
+                    # An earlier unit timed out but its thread has not returned; never run two at once
+                    error, timed_out = UnitTimeout("previous unit for this user is still running"), True
+                    break
+                self._in_flight.add(key)
+                unit = self._executor.submit(self._run_unit, task_name, user_id)
+                unit.add_done_callback(lambda _: self._in_flight.discard(key))
                 try:
-                    # Create task automation instance for user
-                    task_automation = BusinessTaskAutomation(user, db)
-                    
-                    # Execute task
-                    result = await task_automation.execute_task(task_name)
-                    
+                    result = await asyncio.wait_for(asyncio.wrap_future(unit), timeout=self.unit_timeout)
+                except asyncio.TimeoutError:
+                    # wait_for only stops waiting; the thread may still be writing, so do not retry
+                    error, timed_out = UnitTimeout(f"timed out after {self.unit_timeout}s"), True
+                    break
+                except Exception as e:
+                    error, timed_out = e, False
+                else:
                     if result.get('success', False):
-                        total_success += 1
-                        logger.info(f"Task {task_name} completed successfully for user {user.id}")
+                        stats["succeeded"] += 1
                     else:
-                        total_failed += 1
-                        logger.error(f"Task {task_name} failed for user {user.id}: {result.get('error', 'Unknown error')}")
-                    
-                    total_executed += 1
-                    
-                except Exception as e:
-                    total_failed += 1
-                    logger.error(f"Task {task_name} failed for user {user.id}: {e}")
-            
-            # Store results
-            self.task_results[task_name] = {
-                "executed_at": datetime.now().isoformat(),
-                "total_executed": total_executed,
-                "total_success": total_success,
-                "total_failed": total_failed,
-                "success_rate": (total_success / total_executed * 100) if total_executed > 0 else 0
-            }
-            
-            logger.info(f"Task {task_name} completed: {total_success}/{total_executed} successful")
-            
+                        # Handled business failure: retrying would give the same answer
+                        stats["failed"] += 1
+                        self._record_failure(stats, user_id, result.get('error', 'Unknown error'))
+                    return
+
+                if attempt < self.max_retries:
+                    stats["retries"] += 1
+                    delay = self.retry_backoff * (2 ** attempt)
+                    await asyncio.sleep(delay + random.uniform(0, delay / 2))
+
+            stats["failed"] += 1
+            if timed_out:
+                stats["timed_out"] += 1
+            self._record_failure(stats, user_id, str(error))
+            logger.error(f"Task {task_name} failed for user {user_id}: {error}")
+
+    @staticmethod
+    def _record_failure(stats: Dict[str, Any], user_id: int, error: str):
+        if len(stats["failures"]) < MAX_RECORDED_FAILURES:
+            stats["failures"].append({"user_id": user_id, "error": error[:500]})
+
+    async def execute_task(self, task_name: str, trigger: str = "scheduled") -> Dict[str, Any]:
+        """Execute a scheduled task for all users"""
+        logger.info(f"Executing scheduled task: {task_name}")
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="cora-task")
+        loop = asyncio.get_running_loop()
+        run_id = await loop.run_in_executor(self._executor, self._start_run, task_name, trigger)
+        self.active_tasks[task_name] = {"run_id": run_id, "started_at": datetime.now().isoformat()}
+        stats: Dict[str, Any] = {"succeeded": 0, "failed": 0, "timed_out": 0, "retries": 0, "failures": []}
+
+        try:
+            user_ids = await loop.run_in_executor(self._executor, self._active_user_ids)
+            gate = asyncio.Semaphore(self.max_concurrency)
+            await asyncio.gather(*(self._run_for_user(task_name, uid, gate, stats) for uid in user_ids))
+
+            fields = dict(status="completed", total_users=len(user_ids), **stats)
+            logger.info(f"Task {task_name} completed: {stats['succeeded']}/{len(user_ids)} successful")
         except Exception as e:
             logger.error(f"Failed to execute task {task_name}: {e}")
-            self.task_results[task_name] = {
-                "executed_at": datetime.now().isoformat(),
-                "error": str(e),
-                "total_executed": 0,
-                "total_success": 0,
-                "total_failed": 0
-            }
-    
+            fields = dict(status="failed", error=str(e), **stats)
+        finally:
+            self.active_tasks.pop(task_name, None)
+
+        await loop.run_in_executor(self._executor, lambda: self._finish_run(run_id, **fields))
+        return self._get_run(run_id)
+
+    async def execute_weekly_insights(self, trigger: str = "scheduled") -> Dict[str, Any]:
+        """Run the weekly insights batch job and record it as a TaskRun"""
+        from services.weekly_insights_batch import run_weekly_insights_batch
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="cora-task")
+        loop = asyncio.get_running_loop()
+        run_id = await loop.run_in_executor(self._executor, self._start_run, WEEKLY_INSIGHTS_TASK, trigger)
+        self.active_tasks[WEEKLY_INSIGHTS_TASK] = {"run_id": run_id, "started_at": datetime.now().isoformat()}
+        try:
+            summary = await loop.run_in_executor(self._executor, run_weekly_insights_batch)
+            fields = dict(status="completed", total_users=summary["considered"],
+                          succeeded=summary["sent"], failed=summary["failed"])
+        except Exception as e:
+            logger.error(f"Weekly insights batch failed: {e}")
+            fields = dict(status="failed", error=str(e))
+        finally:
+            self.active_tasks.pop(WEEKLY_INSIGHTS_TASK, None)
+
+        await loop.run_in_executor(self._executor, lambda: self._finish_run(run_id, **fields))
+        return self._get_run(run_id)
+
+    # ------------------------------------------------------------------ control
     def start_scheduler(self):
         """Start the task scheduler"""
         if self.is_running:
             logger.warning("Task scheduler is already running")
             return
-        
+
         self.setup_schedules()
         self.is_running = True
-        
-        def run_scheduler():
-            while self.is_running:
-                schedule.run_pending()
-                time.sleep(60)  # Check every minute
-        
-        self.scheduler_thread = threading.Thread(target=run_scheduler, daemon=True)
-        self.scheduler_thread.start()
-        
+        loop = self._ensure_loop()
+        asyncio.run_coroutine_threadsafe(self._tick(), loop)
+
         logger.info("Task scheduler started successfully")
-    
+
     def stop_scheduler(self):
         """Stop the task scheduler"""
         self.is_running = False
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
         if self.scheduler_thread:
             self.scheduler_thread.join(timeout=5)
+        self._loop = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
         logger.info("Task scheduler stopped")
-    
+
     def get_status(self) -> Dict[str, Any]:
         """Get scheduler status"""
         return {
             "is_running": self.is_running,
             "scheduled_tasks": len(schedule.jobs),
             "active_tasks": len(self.active_tasks),
-            "last_results": self.task_results,
+            "max_concurrency": self.max_concurrency,
+            "last_results": self._last_results(),
             "next_runs": self._get_next_runs()
         }
-    
+
     def _get_next_runs(self) -> Dict[str, str]:
         """Get next run times for scheduled tasks"""
         next_runs = {}
         for job in schedule.jobs:
-            next_runs[job.job_func.__name__] = job.next_run.isoformat() if job.next_run else "Unknown"
+            name = job.job_func.args[0] if job.job_func.args else job.job_func.__name__
+            next_runs[name] = job.next_run.isoformat() if job.next_run else "Unknown"
         return next_runs
-    
-    def get_task_history(self, task_name: str = None) -> List[Dict[str, Any]]:
+
+    def _get_run(self, run_id: int) -> Dict[str, Any]:
+        with session_scope() as db:
+            run = db.get(TaskRun, run_id)
+            return run.to_dict() if run else {}
+
+    def _last_results(self) -> Dict[str, Any]:
+        try:
+            self._ensure_history_table()
+            with session_scope() as db:
+                latest = {}
+                for run in db.query(TaskRun).order_by(TaskRun.id.desc()).limit(200):
+                    latest.setdefault(run.task_name, run.to_dict())
+                return latest
+        except Exception as e:
+            logger.warning(f"Could not load task history: {e}")
+            return {}
+
+    def get_task_history(self, task_name: str = None, limit: int = 50) -> List[Dict[str, Any]]:
         """Get task execution history"""
-        if task_name:
-            return [self.task_results.get(task_name, {})]
-        return list(self.task_results.values())
-    
-    def manual_execute(self, task_name: str) -> Dict[str, Any]:
-        """Manually execute a task"""
-        if task_name not in self.task_config:
+        self._ensure_history_table()
+        with session_scope() as db:
+            query = db.query(TaskRun)
+            if task_name:
+                query = query.filter(TaskRun.task_name == task_name)
+            return [run.to_dict() for run in query.order_by(TaskRun.id.desc()).limit(limit)]
+
+    def manual_execute(self, task_name: str, wait: bool = False) -> Dict[str, Any]:
+        """Manually execute a task on the scheduler loop
+
+        By default the run is queued and this returns immediately; progress is
+        visible through get_task_history(). Pass wait=True from scripts to block
+        until the run finishes.
+        """
+        if task_name == WEEKLY_INSIGHTS_TASK:
+            coro_factory = lambda: self.execute_weekly_insights(trigger="manual")
+        elif task_name in self.task_config:
+            coro_factory = lambda: self.execute_task(task_name, trigger="manual")
+        else:
             return {
                 "success": False,
                 "error": f"Task '{task_name}' not found"
             }
-        
-        # Create event loop for async execution
+
         try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            result = loop.run_until_complete(self.execute_task(task_name))
-            loop.close()
-            
+            future = asyncio.run_coroutine_threadsafe(coro_factory(), self._ensure_loop())
+            if not wait:
+                return {
+                    "success": True,
+                    "message": f"Task {task_name} queued for execution"
+                }
             return {
                 "success": True,
                 "message": f"Task {task_name} executed manually",
-                "result": result
+                "result": future.result()
             }
         except Exception as e:
             return {
@@ -212,4 +396,4 @@ def stop_task_scheduler():
 
 def get_scheduler_status():
     """Get global scheduler status"""
-    return task_scheduler.get_status() 
\ No newline at end of file
+    return task_scheduler.get_status()
@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/services/voice_parser.py
+🎯 PURPOSE: Compiled parser that turns spoken expense transcripts into amount, vendor, job and category
+🔗 IMPORTS: re, dataclasses (stdlib only)
+📤 EXPORTS: VoiceParse, VoiceParser, voice_parser, VOICE_VENDORS, VOICE_CATEGORY_KEYWORDS, JOB_PATTERNS
+🔄 PATTERN: transcript → one tokenizer pass → number-word grammar | vendor trie | keyword table → VoiceParse
+
+Voice entry is the most frequent mobile path, so everything the parser
+needs is built once when this module is imported: the tokenizer and amount
+regexes, the number-word table, a token trie of known vendors and the
+keyword → category table. A parse lower-cases the transcript, tokenizes it
+once and answers every question from those tokens, matching whole words
+("often" no longer reads as ten, "johnson" no longer contains "on ").
+
+Amounts are read in this order: digits with "$" or "dollars"/"bucks", then
+spoken numbers, then a bare number. Spoken numbers follow a small cardinal
+grammar ("two thousand five hundred", "a hundred and ten") plus the way
+prices are read aloud: "three forty seven" is 347, "twenty three fifty" is
+23.50, "twelve ninety nine" is 12.99. Each field carries a confidence that
+reflects how it was found, so callers can tell an explicit "$42" from a
+guessed reading.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+# Construction vendor mappings (spoken name → default category)
+VOICE_VENDORS = {
+    'home depot': {'category': 'Materials - Hardware', 'common': True},
+    'lowes': {'category': 'Materials - Hardware', 'common': True},
+    'menards': {'category': 'Materials - Hardware', 'common': True},
+    'ace hardware': {'category': 'Materials - Hardware', 'common': True},
+    'lumber yard': {'category': 'Materials - Lumber', 'common': True},
+    'electrical supply': {'category': 'Materials - Electrical', 'common': True},
+    'plumbing supply': {'category': 'Materials - Plumbing', 'common': True},
+    'gas station': {'category': 'Equipment - Fuel', 'common': True},
+    'equipment rental': {'category': 'Equipment - Rental', 'common': True}
+}
+
+# Keywords that override the vendor's category; the first category in table order wins
+VOICE_CATEGORY_KEYWORDS = {
+    'Materials - Lumber': ['lumber', 'wood', 'plywood', '2x4', '2x6', 'boards'],
+    'Materials - Electrical': ['wire', 'outlet', 'breaker', 'electrical'],
+    'Materials - Plumbing': ['pipe', 'fitting', 'valve', 'plumbing'],
+    'Equipment - Fuel': ['gas', 'gasoline', 'diesel', 'fuel'],
+    'Labor - Crew': ['lunch', 'food', 'meal', 'crew'],
+    'Labor - Subcontractors': ['subcontractor', 'sub', 'contractor']
+}
+
+DEFAULT_CATEGORY = 'Materials - Other'
+UNKNOWN_VENDOR = 'Unknown'
+
+# Construction job patterns, tried in order against the lower-cased transcript
+JOB_PATTERNS = [
+    r"\bfor (?:the )?([a-z]+(?:\s+[a-z]+)*?)\s+(?:job|project)\b",
+    r"\bon (?:the )?([a-z]+(?:\s+[a-z]+)*?)\s+(?:job|project|bathroom|kitchen|house|roof|deck)\b",
+    r"\b([a-z]+)\s+(?:bathroom|kitchen|house|roof|deck|basement|garage|addition|remodel)\b",
+    r"\b([a-z]+(?:\s+[a-z]+)*?)\s+(?:job|project)(?:\s|$)"
+]
+_JOB_RES = [re.compile(pattern) for pattern in JOB_PATTERNS]
+# Every job pattern needs one of these words, so transcripts without them skip the regexes
+_JOB_WORDS = frozenset({'job', 'project', 'bathroom', 'kitchen', 'house', 'roof', 'deck',
+                        'basement', 'garage', 'addition', 'remodel'})
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+_MONEY = r"\d{1,3}(?:,\d{3})+(?:\.\d{1,2})?|\d+(?:\.\d{1,2})?"
+_CURRENCY_RE = re.compile(rf"\$\s?({_MONEY})|\b({_MONEY})\s*(?:dollars?|bucks?)\b")
+_BARE_NUMBER_RE = re.compile(rf"(?<![\w.$,])({_MONEY})(?![\w.,])")
+
+_UNITS = ('one', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine')
+_TEENS = ('ten', 'eleven', 'twelve', 'thirteen', 'fourteen', 'fifteen', 'sixteen', 'seventeen',
+          'eighteen', 'nineteen')
+_TENS = ('twenty', 'thirty', 'forty', 'fifty', 'sixty', 'seventy', 'eighty', 'ninety')
+
+# word → (kind, value)
+NUMBER_WORDS: Dict[str, Tuple[str, int]] = {
+    **{word: ('unit', n) for n, word in enumerate(_UNITS, 1)},
+    **{word: ('teen', n) for n, word in enumerate(_TEENS, 10)},
+    **{word: ('tens', n) for n, word in zip(range(20, 100, 10), _TENS)},
+    'hundred': ('hundred', 100),
+    'thousand': ('thousand', 1000),
+}
+_CURRENCY_WORDS = frozenset({'dollar', 'dollars', 'buck', 'bucks'})
+_CENT_WORDS = frozenset({'cent', 'cents'})
+
+# Words that end a vendor name picked out of "at <vendor>" or "<vendor> receipt"
+_VENDOR_STOP = frozenset({
+    'a', 'an', 'the', 'my', 'some', 'this', 'that', 'and', 'at', 'from', 'for', 'on', 'to', 'with',
+    'got', 'bought', 'paid', 'spent', 'receipt', 'purchase',
+    # "from the crew", "at the client's": people, not vendors
+    'crew', 'guys', 'client', 'clients', 'customer', 'boss', 'helper', 'sub', 'me', 'us',
+}) | frozenset(NUMBER_WORDS) | _CURRENCY_WORDS | _JOB_WORDS
+_VENDOR_MAX_WORDS = 3
+
+# Confidence by how a field was found
+AMOUNT_CONFIDENCE = {'currency': 0.95, 'words': 0.9, 'spoken': 0.75, 'digits': 0.6}
+VENDOR_CONFIDENCE = {'known': 0.95, 'phrase': 0.8}
+UNKNOWN_VENDOR_CONFIDENCE = 0.3
+JOB_CONFIDENCE = 0.9
+CATEGORY_CONFIDENCE = 0.85
+DEFAULT_CATEGORY_CONFIDENCE = 0.5
+
+
+def _title(words: str) -> str:
+    return ' '.join(word.capitalize() for word in words.split())
+
+
+def _normalize(token: str) -> str:
+    return token.replace("'", "")
+
+
+def read_number_groups(words: List[str]) -> List[Tuple[int, bool]]:
+    """Split a run of number words into cardinals; each is (value, has_scale_word)
+
+    "two thousand five hundred" → [(2500, True)]; "three forty seven" →
+    [(3, False), (47, False)]. A word that cannot extend the current
+    cardinal starts the next one.
+    """
+    groups: List[Tuple[int, bool]] = []
+    total = chunk = 0
+    tail: Optional[str] = None
+    has_hundred = has_thousand = False
+
+    def flush():
+        nonlocal total, chunk, tail, has_hundred, has_thousand
+        if tail is not None:
+            groups.append((total + chunk, has_hundred or has_thousand))
+        total = chunk = 0
+        tail = None
+        has_hundred = has_thousand = False
+
+    for word in words:
+        kind, value = ('unit', 1) if word == 'a' else NUMBER_WORDS[word]
+        if kind in ('unit', 'teen', 'tens'):
+            if tail in (None, 'thousand'):
+                chunk = value
+            elif tail == 'hundred' or (tail == 'tens' and kind == 'unit'):
+                chunk += value
+                kind = 'tens_unit' if tail == 'tens' else kind
+            else:
+                flush()
+                chunk = value
+            tail = kind
+        elif kind == 'hundred':
+            if tail in ('unit', 'teen', 'tens', 'tens_unit') and not has_hundred:
+                chunk *= 100
+            else:
+                flush()
+                chunk = 100
+            has_hundred, tail = True, 'hundred'
+        else:
+            if tail is not None and tail != 'thousand' and not has_thousand:
+                total, chunk = (total + chunk) * 1000, 0
+            else:
+                flush()
+                total = 1000
+            has_hundred, has_thousand, tail = False, True, 'thousand'
+    flush()
+    return groups
+
+
+def spoken_amount(groups: List[Tuple[int, bool]]) -> Tuple[Optional[float], str]:
+    """Read cardinals as a price: (amount, 'words') for one cardinal, (amount, 'spoken') for price readings"""
+    if not groups:
+        return None, 'words'
+    if len(groups) == 1:
+        return float(groups[0][0]), 'words'
+    (first, first_scaled), (second, second_scaled) = groups[0], groups[1]
+    if not any(scaled for _, scaled in groups) and all(value < 10 for value, _ in groups):
+        # Spoken digits: "three four seven"
+        return float(''.join(str(value) for value, _ in groups)), 'spoken'
+    if len(groups) == 2 and not first_scaled and not second_scaled and 10 <= second < 100 and first < 100:
+        if second == 50 or first >= 10:
+            # Dollars and cents: "twenty three fifty", "twelve ninety nine", "three fifty"
+            return round(first + second / 100, 2), 'spoken'
+        # Hundreds read in pairs: "three forty seven", "one twenty five"
+        return float(first * 100 + second), 'spoken'
+    return float(first), 'spoken'
+
+
+@dataclass
+class VoiceParse:
+    """Structured result of one transcript; to_dict() is the shape the voice route returns"""
+    description: str
+    amount: Optional[float] = None
+    amount_source: Optional[str] = None
+    vendor: str = UNKNOWN_VENDOR
+    vendor_source: Optional[str] = None
+    category: str = DEFAULT_CATEGORY
+    category_source: Optional[str] = None
+    job_name: Optional[str] = None
+    confidence: Dict[str, float] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict:
+        return {
+            'amount': self.amount,
+            'vendor': self.vendor,
+            'category': self.category,
+            'job_name': self.job_name,
+            'description': self.description,
+            'confidence': dict(self.confidence),
+        }
+
+
+class VoiceParser:
+    """Parses expense transcripts with tables compiled once at construction"""
+
+    def __init__(self, vendors: Optional[Dict[str, Dict]] = None,
+                 category_keywords: Optional[Dict[str, List[str]]] = None):
+        self.vendors = vendors if vendors is not None else VOICE_VENDORS
+        self.category_keywords = category_keywords if category_keywords is not None else VOICE_CATEGORY_KEYWORDS
+
+        # Token trie: {token: {token: {..., None: vendor name}}}
+        self._vendor_trie: Dict = {}
+        for name in self.vendors:
+            node = self._vendor_trie
+            for token in _TOKEN_RE.findall(name.lower()):
+                node = node.setdefault(_normalize(token), {})
+            node[None] = name
+
+        self._category_rank: Dict[str, int] = {}
+        self._categories = list(self.category_keywords)
+        for rank, keywords in enumerate(self.category_keywords.values()):
+            for keyword in keywords:
+                self._category_rank.setdefault(keyword.lower(), rank)
+
+    # ------------------------------------------------------------------ fields
+    def _known_vendor(self, tokens: List[str]) -> Optional[str]:
+        """The first known vendor in the transcript (longest name at that position)"""
+        trie = self._vendor_trie
+        for start in range(len(tokens)):
+            node, found = trie, None
+            for token in tokens[start:]:
+                node = node.get(token)
+                if node is None:
+                    break
+                found = node.get(None, found)
+            if found is not None:
+                return found
+        return None
+
+    @staticmethod
+    def _vendor_phrase(tokens: List[str]) -> Optional[str]:
+        """A vendor named as "at/from <vendor>" or "<vendor> receipt/purchase" """
+        for i, token in enumerate(tokens):
+            if token in ('at', 'from'):
+                words = tokens[i + 1:]
+                if words[:1] == ['the']:
+                    words = words[1:]
+                name = []
+                for word in words[:_VENDOR_MAX_WORDS]:
+                    if word in _VENDOR_STOP or not word.isalpha():
+                        break
+                    name.append(word)
+                if name:
+                    return ' '.join(name)
+        for i, token in enumerate(tokens):
+            if token in ('receipt', 'purchase'):
+                name = []
+                for word in reversed(tokens[max(0, i - _VENDOR_MAX_WORDS):i]):
+                    if word in _VENDOR_STOP or not word.isalpha():
+                        break
+                    name.insert(0, word)
+                if name:
+                    return ' '.join(name)
+        return None
+
+    @staticmethod
+    def _number_runs(tokens: List[str]) -> List[Tuple[int, int, List[str]]]:
+        """(start, end, words) for each run of number words; "and" and "a" are kept only between/before them"""
+        runs = []
+        i, count = 0, len(tokens)
+        while i < count:
+            token = tokens[i]
+            nxt = tokens[i + 1] if i + 1 < count else None
+            if token in NUMBER_WORDS or (token == 'a' and nxt in ('hundred', 'thousand')):
+                start, words = i, []
+                while i < count:
+                    token = tokens[i]
+                    nxt = tokens[i + 1] if i + 1 < count else None
+                    if token in NUMBER_WORDS:
+                        words.append(token)
+                    elif token == 'a' and nxt in ('hundred', 'thousand') and not words:
+                        words.append(token)
+                    elif token == 'and' and words and nxt in NUMBER_WORDS:
+                        pass
+                    else:
+                        break
+                    i += 1
+                runs.append((start, i, words))
+            else:
+                i += 1
+        return runs
+
+    @staticmethod
+    def _amount(text: str, tokens: List[str]) -> Tuple[Optional[float], Optional[str]]:
+        match = _CURRENCY_RE.search(text)
+        if match:
+            value = float((match.group(1) or match.group(2)).replace(',', ''))
+            if value:
+                return value, 'currency'
+
+        runs = VoiceParser._number_runs(tokens)
+        by_start = {start: (end, words) for start, end, words in runs}
+        for start, end, words in runs:
+            if end < len(tokens) and tokens[end] in _CURRENCY_WORDS:
+                amount, _ = spoken_amount(read_number_groups(words))
+                # "... dollars and fifty cents"
+                cents_at = end + 2 if end + 1 < len(tokens) and tokens[end + 1] == 'and' else end + 1
+                if cents_at in by_start:
+                    cents_end, cent_words = by_start[cents_at]
+                    if cents_end < len(tokens) and tokens[cents_end] in _CENT_WORDS:
+                        cents, _ = spoken_amount(read_number_groups(cent_words))
+                        if cents and cents < 100:
+                            amount = round(amount + cents / 100, 2)
+                if amount:
+                    return amount, 'words'
+        for start, end, words in runs:
+            if end < len(tokens) and tokens[end] in _CENT_WORDS:
+                continue
+            groups = read_number_groups(words)
+            amount, source = spoken_amount(groups)
+            # A lone "one" or "two" is usually a count, not a price
+            if amount and (len(words) > 1 or amount >= 10):
+                return amount, source
+
+        bare = _BARE_NUMBER_RE.findall(text)
+        if bare:
+            value = float(bare[-1].replace(',', ''))
+            if value:
+                return value, 'digits'
+        return None, None
+
+    def _category(self, tokens: List[str]) -> Optional[str]:
+        ranks = set()
+        for token in tokens:
+            rank = self._category_rank.get(token)
+            if rank is None and token.endswith('s'):
+                rank = self._category_rank.get(token[:-1])
+            if rank is not None:
+                ranks.add(rank)
+        return self._categories[min(ranks)] if ranks else None
+
+    @staticmethod
+    def _job(text: str, tokens: List[str]) -> Optional[str]:
+        if _JOB_WORDS.isdisjoint(tokens):
+            return None
+        for pattern in _JOB_RES:
+            match = pattern.search(text)
+            if match:
+                return _title(match.group(1).strip())
+        return None
+
+    # ------------------------------------------------------------------ public
+    def parse(self, transcript: str) -> VoiceParse:
+        text = (transcript or '').lower()
+        tokens = [_normalize(token) for token in _TOKEN_RE.findall(text)]
+        result = VoiceParse(description=transcript)
+
+        result.amount, result.amount_source = self._amount(text, tokens)
+        result.job_name = self._job(text, tokens)
+
+        known = self._known_vendor(tokens)
+        if known is not None:
+            result.vendor, result.vendor_source = _title(known), 'known'
+            result.category, result.category_source = self.vendors[known]['category'], 'vendor'
+        else:
+            phrase = self._vendor_phrase(tokens)
+            if phrase:
+                result.vendor, result.vendor_source = _title(phrase), 'phrase'
+
+        category = self._category(tokens)
+        if category is not None:
+            result.category, result.category_source = category, 'keyword'
+
+        result.confidence = {
+            'amount': AMOUNT_CONFIDENCE[result.amount_source] if result.amount else 0,
+            'vendor': VENDOR_CONFIDENCE.get(result.vendor_source, UNKNOWN_VENDOR_CONFIDENCE),
+            'job': JOB_CONFIDENCE if result.job_name else 0,
+            'category': CATEGORY_CONFIDENCE if result.category_source else DEFAULT_CATEGORY_CONFIDENCE,
+        }
+        return result
+
+
+voice_parser = VoiceParser()
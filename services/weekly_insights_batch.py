@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/services/weekly_insights_batch.py
+🎯 PURPOSE: Fleet-wide weekly insights: grouped SQL metrics, batched delivery, resumable
+🔗 IMPORTS: SQLAlchemy, jinja2, config, services.email_service
+📤 EXPORTS: compute_weekly_metrics, render_weekly_insights_email, run_weekly_insights_batch
+🔄 PATTERN: Keyset-paginated user chunks → one SendGrid request per chunk
+
+💡 AI HINT: The per-user POST /api/weekly/generate endpoint renders the same
+   template through render_weekly_insights_email(), so both paths stay in sync.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from sqlalchemy import func, distinct
+from sqlalchemy.orm import Session
+
+from config import config
+from models import User, Expense, WeeklyInsightsDelivery, engine, session_scope
+from services.email_service import send_personalized_batch, MAX_PERSONALIZATIONS
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_DIR = Path(__file__).parent.parent / "web" / "templates" / "emails"
+TEMPLATE_NAME = "weekly_insights.html"
+UNSUBSCRIBE_BASE_URL = "https://coraai.tech/unsubscribe?token="
+
+# Same thresholds as services.weekly_report_service.validate_weekly_report
+MIN_TOTAL_EXPENSES = 5
+MIN_RECENT_EXPENSES = 3
+MIN_ACTIVE_DAYS = 3
+
+BATCH_SIZE = min(config.WEEKLY_INSIGHTS_BATCH_SIZE, MAX_PERSONALIZATIONS)
+SEND_CONCURRENCY = config.WEEKLY_INSIGHTS_SEND_CONCURRENCY
+
+# Per-recipient values sent as SendGrid substitutions
+SUBSTITUTION_FIELDS = ("total_spent", "expense_count", "daily_average", "categories_used", "unsubscribe_url")
+
+_env = Environment(
+    loader=FileSystemLoader(str(TEMPLATE_DIR)),
+    autoescape=select_autoescape(["html"]),
+)
+_template = None
+
+
+def _get_template():
+    """Compile the email template once per process"""
+    global _template
+    if _template is None:
+        _template = _env.get_template(TEMPLATE_NAME)
+    return _template
+
+
+def render_weekly_insights_email(report_data: Dict[str, Any], unsubscribe_url: str) -> str:
+    """Render the weekly insights email for a single user"""
+    metrics = report_data["metrics"]
+    return _get_template().render(
+        period=report_data["period"],
+        generated_at=report_data["generated_at"],
+        total_spent=f"{metrics['total_spent']:.2f}",
+        expense_count=metrics["expense_count"],
+        daily_average=f"{metrics['daily_average']:.2f}",
+        categories_used=metrics["categories_used"],
+        unsubscribe_url=unsubscribe_url,
+    )
+
+
+def _render_batch_body(period: str, generated_at: str) -> str:
+    """Render the shared body once with -field- substitution tokens"""
+    tokens = {name: f"-{name}-" for name in SUBSTITUTION_FIELDS}
+    return _get_template().render(period=period, generated_at=generated_at, **tokens)
+
+
+def week_key_for(now: datetime) -> str:
+    year, week, _ = now.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+@dataclass
+class UserWeeklyMetrics:
+    user_id: int
+    email: str
+    total_count: int = 0
+    recent_count: int = 0
+    recent_cents: int = 0
+    active_days: int = 0
+    categories_used: int = 0
+
+    @property
+    def eligible(self) -> bool:
+        return (self.total_count >= MIN_TOTAL_EXPENSES
+                and self.recent_count >= MIN_RECENT_EXPENSES
+                and self.active_days >= MIN_ACTIVE_DAYS)
+
+
+def compute_weekly_metrics(db: Session, users: List[Tuple[int, str]], window_days: int,
+                           now: datetime) -> List[UserWeeklyMetrics]:
+    """Weekly metrics for a chunk of users with two grouped queries"""
+    by_id = {uid: UserWeeklyMetrics(uid, email) for uid, email in users}
+    if not by_id:
+        return []
+    ids = list(by_id)
+    cutoff = now - timedelta(days=window_days)
+
+    totals = db.query(Expense.user_id, func.count(Expense.id)).filter(
+        Expense.user_id.in_(ids)
+    ).group_by(Expense.user_id)
+    for uid, count in totals:
+        by_id[uid].total_count = count
+
+    recent = db.query(
+        Expense.user_id,
+        func.count(Expense.id),
+        func.coalesce(func.sum(Expense.amount_cents), 0),
+        func.count(distinct(func.date(Expense.expense_date))),
+        func.count(distinct(func.coalesce(Expense.category_id, 0))),
+    ).filter(
+        Expense.user_id.in_(ids),
+        Expense.expense_date >= cutoff
+    ).group_by(Expense.user_id)
+    for uid, count, cents, days, categories in recent:
+        m = by_id[uid]
+        m.recent_count, m.recent_cents, m.active_days, m.categories_used = count, int(cents), days, categories
+
+    return list(by_id.values())
+
+
+@dataclass
+class BatchSummary:
+    week_key: str
+    dry_run: bool
+    considered: int = 0
+    already_sent: int = 0
+    skipped_insufficient: int = 0
+    sent: int = 0
+    failed: int = 0
+    batches: int = 0
+    started_at: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+    finished_at: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.__dict__)
+
+
+def _iter_user_chunks(batch_size: int):
+    """Opted-in active users in id order, one keyset page at a time"""
+    last_id = 0
+    while True:
+        with session_scope() as db:
+            rows = db.query(User.id, User.email).filter(
+                User.id > last_id,
+                User.is_active == "true",
+                func.coalesce(User.weekly_insights_opt_in, "true") == "true",
+                User.email.isnot(None)
+            ).order_by(User.id).limit(batch_size).all()
+        if not rows:
+            return
+        last_id = rows[-1][0]
+        yield [(r[0], r[1]) for r in rows]
+
+
+def _substitutions(m: UserWeeklyMetrics, window_days: int, token_factory: Callable[[int], str]) -> Dict[str, str]:
+    total = m.recent_cents / 100
+    return {
+        "-total_spent-": f"{total:.2f}",
+        "-expense_count-": str(m.recent_count),
+        "-daily_average-": f"{(total / window_days if window_days else 0):.2f}",
+        "-categories_used-": str(m.categories_used),
+        "-unsubscribe_url-": f"{UNSUBSCRIBE_BASE_URL}{token_factory(m.user_id)}",
+    }
+
+
+def _record_sent(week_key: str, user_ids: List[int]) -> None:
+    with session_scope() as db:
+        now = datetime.utcnow()
+        db.bulk_insert_mappings(WeeklyInsightsDelivery, [
+            {"week_key": week_key, "user_id": uid, "status": "sent", "sent_at": now} for uid in user_ids
+        ])
+
+
+def run_weekly_insights_batch(
+    now: Optional[datetime] = None,
+    window_days: int = 7,
+    dry_run: bool = False,
+    batch_size: int = BATCH_SIZE,
+    concurrency: int = SEND_CONCURRENCY,
+    sender: Callable[..., bool] = send_personalized_batch,
+    token_factory: Optional[Callable[[int], str]] = None,
+) -> Dict[str, Any]:
+    """Compute and deliver weekly insights for every opted-in user
+
+    Users already recorded in weekly_insights_deliveries for this ISO week are
+    skipped, so re-running after a crash resumes where the previous run stopped.
+    A batch is checkpointed only after the provider accepted it.
+    """
+    now = now or datetime.utcnow()
+    week_key = week_key_for(now)
+    summary = BatchSummary(week_key=week_key, dry_run=dry_run)
+    if token_factory is None:
+        from dependencies.auth import create_unsubscribe_token
+        token_factory = create_unsubscribe_token
+
+    WeeklyInsightsDelivery.__table__.create(bind=engine, checkfirst=True)
+    period = f"Last {window_days} days"
+    subject = f"Your Weekly Insights Report - {period}"
+    body = _render_batch_body(period, now.isoformat())
+
+    def deliver(batch: List[UserWeeklyMetrics]) -> Tuple[List[int], bool]:
+        recipients = [(m.email, _substitutions(m, window_days, token_factory)) for m in batch]
+        ok = sender(subject, body, recipients)
+        if ok:
+            _record_sent(week_key, [m.user_id for m in batch])
+        return [m.user_id for m in batch], ok
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="weekly-insights") as pool:
+        pending = {}  # future → user ids, so a batch that raises still counts as failed
+        for users in _iter_user_chunks(batch_size):
+            summary.considered += len(users)
+            with session_scope() as db:
+                done = {
+                    row[0] for row in db.query(WeeklyInsightsDelivery.user_id).filter(
+                        WeeklyInsightsDelivery.week_key == week_key,
+                        WeeklyInsightsDelivery.user_id.in_([uid for uid, _ in users])
+                    )
+                }
+                todo = [u for u in users if u[0] not in done]
+                summary.already_sent += len(users) - len(todo)
+                metrics = compute_weekly_metrics(db, todo, window_days, now)
+
+            ready = [m for m in metrics if m.eligible]
+            summary.skipped_insufficient += len(metrics) - len(ready)
+            if not ready or dry_run:
+                summary.sent += len(ready) if dry_run else 0
+                continue
+            summary.batches += 1
+            pending[pool.submit(deliver, ready)] = [m.user_id for m in ready]
+
+        for future, batch_user_ids in pending.items():
+            try:
+                user_ids, ok = future.result()
+            except Exception as e:
+                logger.error(f"Weekly insights batch of {len(batch_user_ids)} users failed: {e}")
+                summary.failed += len(batch_user_ids)
+                continue
+            if ok:
+                summary.sent += len(user_ids)
+            else:
+                summary.failed += len(user_ids)
+
+    summary.finished_at = datetime.utcnow().isoformat()
+    logger.info(f"Weekly insights {week_key}: sent={summary.sent} failed={summary.failed} "
+                f"skipped={summary.skipped_insufficient} resumed={summary.already_sent}")
+    return summary.to_dict()
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Send weekly insights to all opted-in users")
+    parser.add_argument("--dry-run", action="store_true", help="Compute metrics without sending")
+    parser.add_argument("--window-days", type=int, default=7)
+    args = parser.parse_args()
+    print(json.dumps(run_weekly_insights_batch(window_days=args.window_days, dry_run=args.dry_run), indent=2))
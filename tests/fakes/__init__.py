@@ -0,0 +1 @@
+"""Local HTTP stand-ins for third-party APIs, used by the tests and tests/load_testing"""
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/tests/fakes/fake_email_sink.py
+🎯 PURPOSE: Local stand-in for SendGrid's mail/send endpoint for tests and dev
+🔗 IMPORTS: http.server, json, threading
+📤 EXPORTS: FakeEmailSink
+
+Point the app at it with:
+    SENDGRID_API_KEY=dev SENDGRID_API_URL=http://127.0.0.1:8025/v3/mail/send
+and run `python -m tests.fakes.fake_email_sink --port 8025` to print every email.
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+
+
+class FakeEmailSink:
+    """Records mail/send payloads and answers 202, or queued failure codes"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, echo: bool = False):
+        self.messages: List[Dict[str, Any]] = []
+        self.requests = 0
+        self.echo = echo
+        self._failures: List[int] = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v3/mail/send"
+
+    @property
+    def recipients(self) -> List[str]:
+        with self._lock:
+            return [to["email"] for m in self.messages for p in m.get("personalizations", []) for to in p.get("to", [])]
+
+    def fail_next(self, count: int = 1, status: int = 500):
+        """Answer the next `count` requests with `status` instead of accepting them"""
+        with self._lock:
+            self._failures.extend([status] * count)
+
+    def _handler(self):
+        sink = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                with sink._lock:
+                    sink.requests += 1
+                    status = sink._failures.pop(0) if sink._failures else 202
+                    if status == 202:
+                        sink.messages.append(payload)
+                if sink.echo and status == 202:
+                    to = ", ".join(t["email"] for p in payload.get("personalizations", []) for t in p.get("to", []))
+                    print(f"[FAKE SENDGRID] {to}: {payload.get('subject')}")
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "FakeEmailSink":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeEmailSink":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Fake SendGrid mail/send endpoint")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8025)
+    args = parser.parse_args()
+    sink = FakeEmailSink(args.host, args.port, echo=True)
+    print(f"Fake SendGrid listening on {sink.url}")
+    try:
+        sink._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
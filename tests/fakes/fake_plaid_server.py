@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/tests/fakes/fake_plaid_server.py
+🎯 PURPOSE: Local stand-in for Plaid's /transactions/sync and webhook verification key endpoints for tests and dev
+🔗 IMPORTS: http.server, json, threading, uuid, datetime, cryptography, jose
+📤 EXPORTS: FakePlaidServer
+
+Each item (access token) keeps an ordered change log. /transactions/sync
+answers from the caller's cursor: up to `count` changes split into added,
+modified and removed, a `next_cursor` and `has_more`, the way Plaid does.
+Errors use Plaid's JSON error shape; fail_next() can inject e.g.
+TRANSACTIONS_SYNC_MUTATION_DURING_PAGINATION. sign_webhook() returns the
+Plaid-Verification JWT for a webhook body, signed with a key served from
+/webhook_verification_key/get. Point the app at it with:
+    PLAID_API_URL=http://127.0.0.1:8028
+and run `python -m tests.fakes.fake_plaid_server --port 8028 --transactions 500`.
+"""
+
+import argparse
+import hashlib
+import json
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+_LOCATION = {"address": None, "city": None, "region": None, "postal_code": None, "country": None,
+             "lat": None, "lon": None, "store_number": None}
+_PAYMENT_META = {"reference_number": None, "ppd_id": None, "payee": None, "by_order_of": None, "payer": None,
+                 "payment_method": None, "payment_processor": None, "reason": None}
+
+
+class FakePlaidServer:
+    """In-memory Plaid items behind the transactions endpoint shapes"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.items: Dict[str, Dict[str, Any]] = {}
+        self.calls: Counter = Counter()
+        self.requests: List[Dict[str, Any]] = []
+        self._failures: List[tuple] = []
+        self._next = 0
+        self._lock = threading.Lock()
+        self.webhook_kid = "fake-webhook-key"
+        self._webhook_pem, self.webhook_jwk = self._webhook_key()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    # ------------------------------------------------------------------ data
+    def add_item(self, access_token: str, item_id: Optional[str] = None) -> Dict[str, Any]:
+        with self._lock:
+            item = {"item_id": item_id or f"item-{access_token}", "transactions": {}, "log": []}
+            self.items[access_token] = item
+            return item
+
+    def add_transactions(self, access_token: str, account_id: str, count: int, amount: float = -42.5,
+                         start: date = date(2026, 5, 1), name: str = "Card purchase", pending: bool = False,
+                         merchant_name: Optional[str] = "Staples", category: Optional[List[str]] = None,
+                         pending_transaction_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Append `count` transactions, one day apart from `start`, to the item's change log"""
+        with self._lock:
+            item = self.items[access_token]
+            added = []
+            for i in range(count):
+                self._next += 1
+                transaction = {
+                    "transaction_id": f"txn_{self._next:08d}", "account_id": account_id, "amount": amount,
+                    "iso_currency_code": "USD", "unofficial_currency_code": None,
+                    "category": category or ["Shops", "Office Supplies"], "category_id": "19000000",
+                    "date": (start + timedelta(days=i)).isoformat(), "location": dict(_LOCATION),
+                    "name": f"{name} {self._next}", "payment_meta": dict(_PAYMENT_META), "pending": pending,
+                    "pending_transaction_id": pending_transaction_id, "account_owner": None,
+                    "authorized_date": None, "authorized_datetime": None, "datetime": None,
+                    "payment_channel": "in store", "transaction_code": None, "merchant_name": merchant_name,
+                    "check_number": None,
+                }
+                item["transactions"][transaction["transaction_id"]] = transaction
+                item["log"].append(("added", transaction["transaction_id"]))
+                added.append(transaction)
+            return added
+
+    def modify(self, access_token: str, transaction_id: str, **changes) -> Dict[str, Any]:
+        with self._lock:
+            item = self.items[access_token]
+            item["transactions"][transaction_id].update(changes)
+            item["log"].append(("modified", transaction_id))
+            return item["transactions"][transaction_id]
+
+    def remove(self, access_token: str, transaction_id: str) -> None:
+        with self._lock:
+            item = self.items[access_token]
+            del item["transactions"][transaction_id]
+            item["log"].append(("removed", transaction_id))
+
+    def post_pending(self, access_token: str, pending_id: str, **changes) -> Dict[str, Any]:
+        """Settle a pending transaction: removed under its pending id, added under a new posted id"""
+        pending = self.items[access_token]["transactions"][pending_id]
+        self.remove(access_token, pending_id)
+        posted = self.add_transactions(access_token, pending["account_id"], 1, amount=pending["amount"],
+                                       start=date.fromisoformat(pending["date"]), pending=False,
+                                       merchant_name=pending["merchant_name"], category=pending["category"],
+                                       pending_transaction_id=pending_id)[0]
+        if changes:
+            posted = self.modify(access_token, posted["transaction_id"], **changes)
+        return posted
+
+    def fail_next(self, count: int = 1, error_code: str = "INTERNAL_SERVER_ERROR", status: int = 500,
+                  error_type: str = "API_ERROR"):
+        """Answer the next `count` requests with a Plaid error"""
+        with self._lock:
+            self._failures.extend([(status, error_type, error_code)] * count)
+
+    # ------------------------------------------------------------------ webhooks
+    @staticmethod
+    def _webhook_key():
+        from cryptography.hazmat.primitives import serialization
+        from cryptography.hazmat.primitives.asymmetric import ec
+        from jose import jwk
+
+        pem = ec.generate_private_key(ec.SECP256R1()).private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()).decode()
+        return pem, jwk.construct(pem, "ES256").public_key().to_dict()
+
+    def sign_webhook(self, body: bytes, iat: Optional[float] = None, kid: Optional[str] = None) -> str:
+        """Plaid-Verification header value for `body`"""
+        from jose import jwt
+
+        claims = {"iat": int(time.time() if iat is None else iat),
+                  "request_body_sha256": hashlib.sha256(body).hexdigest()}
+        return jwt.encode(claims, self._webhook_pem, algorithm="ES256", headers={"kid": kid or self.webhook_kid})
+
+    def _verification_key(self, body: Dict[str, Any]):
+        if body.get("key_id") != self.webhook_kid:
+            return 400, self._error("INVALID_INPUT", "INVALID_WEBHOOK_VERIFICATION_KEY_ID")
+        key = dict(self.webhook_jwk, kid=self.webhook_kid, use="sig", created_at=1700000000, expired_at=None)
+        return 200, {"key": key, "request_id": uuid.uuid4().hex[:12]}
+
+    # ------------------------------------------------------------------ endpoints
+    def _sync(self, body: Dict[str, Any]):
+        item = self.items.get(body.get("access_token"))
+        if item is None:
+            return 400, self._error("INVALID_INPUT", "INVALID_ACCESS_TOKEN")
+        count = int(body.get("count") or 100)
+        if not 1 <= count <= 500:
+            return 400, self._error("INVALID_REQUEST", "INVALID_FIELD")
+        cursor = body.get("cursor") or ""
+        position = int(cursor) if cursor.isdigit() else 0
+        changes = item["log"][position:position + count]
+        page = {"added": [], "modified": [], "removed": []}
+        for kind, transaction_id in changes:
+            if kind == "removed":
+                page["removed"].append({"transaction_id": transaction_id})
+            elif transaction_id in item["transactions"]:
+                page[kind].append(item["transactions"][transaction_id])
+        position += len(changes)
+        return 200, dict(page, next_cursor=str(position), has_more=position < len(item["log"]),
+                         request_id=uuid.uuid4().hex[:12])
+
+    @staticmethod
+    def _error(error_type: str, error_code: str, message: str = "") -> Dict[str, Any]:
+        return {"error_type": error_type, "error_code": error_code, "error_message": message or error_code,
+                "display_message": None, "request_id": uuid.uuid4().hex[:12]}
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}") if length else {}
+                with server._lock:
+                    server.calls[self.path] += 1
+                    server.requests.append({"path": self.path, "cursor": body.get("cursor"),
+                                            "count": body.get("count")})
+                    failure = server._failures.pop(0) if server._failures else None
+                    if failure:
+                        status, payload = failure[0], server._error(failure[1], failure[2])
+                    elif self.path == "/transactions/sync":
+                        status, payload = server._sync(body)
+                    elif self.path == "/webhook_verification_key/get":
+                        status, payload = server._verification_key(body)
+                    else:
+                        status, payload = 404, server._error("INVALID_REQUEST", "UNKNOWN_FIELDS")
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "FakePlaidServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-plaid", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakePlaidServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Plaid transactions API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8028)
+    parser.add_argument("--access-token", default="access-sandbox-local")
+    parser.add_argument("--transactions", type=int, default=250, help="transactions to seed on one account")
+    args = parser.parse_args()
+    server = FakePlaidServer(args.host, args.port)
+    server.add_item(args.access_token)
+    server.add_transactions(args.access_token, "acc_checking", args.transactions)
+    print(f"Fake Plaid API on {server.url} (access token {args.access_token})")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/tests/fakes/fake_qbo_server.py
+🎯 PURPOSE: Local stand-in for the QuickBooks Online accounting API for tests, benchmarks and dev
+🔗 IMPORTS: http.server, json, threading, urllib
+📤 EXPORTS: FakeQBOServer
+
+Implements the subset CORA uses under /v3/company/<realm>/: query (Vendor,
+Account with STARTPOSITION/MAXRESULTS paging), vendor and purchase create,
+and batch (create/update, 30 items max). Like the real service it answers
+429 past `max_concurrent` in-flight requests or `rate_per_minute` requests
+per realm, and can add per-request latency. Point the app at it with:
+    QUICKBOOKS_API_URL=http://127.0.0.1:8026/v3/company
+and run `python -m tests.fakes.fake_qbo_server --port 8026`.
+"""
+
+import argparse
+import json
+import re
+import threading
+import time
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+DEFAULT_ACCOUNTS = ["Office Supplies", "Meals and Entertainment", "Automobile", "Computer and Internet Expenses",
+                    "Advertising and Promotion", "Shipping and Delivery", "Travel", "Utilities", "Insurance"]
+_QUERY = re.compile(r"select \* from (\w+)(?: startposition (\d+))?(?: maxresults (\d+))?", re.I)
+
+
+class FakeQBOServer:
+    """In-memory QuickBooks company data behind the QBO REST shapes"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 max_concurrent: int = 10, rate_per_minute: Optional[int] = None,
+                 accounts: List[str] = DEFAULT_ACCOUNTS):
+        self.latency = latency
+        self.max_concurrent = max_concurrent
+        self.rate_per_minute = rate_per_minute
+        self.vendors: List[Dict[str, Any]] = []
+        self.accounts = [{"Id": str(i), "Name": name, "AccountType": "Expense"} for i, name in enumerate(accounts, 7)]
+        self.purchases: Dict[str, Dict[str, Any]] = {}
+        self.calls: Counter = Counter()
+        self.throttled = 0
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self._recent: deque = deque()
+        self._request_ids: Dict[str, Any] = {}
+        self._next_id = 1000
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v3/company"
+
+    # ------------------------------------------------------------------ entities
+    def _new_id(self) -> str:
+        self._next_id += 1
+        return str(self._next_id)
+
+    def _create_vendor(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        name = body.get("DisplayName", "")
+        if any(v["DisplayName"].lower() == name.lower() for v in self.vendors):
+            return {"Fault": {"Error": [{"Message": "Duplicate Name Exists Error", "code": "6240"}],
+                              "type": "ValidationFault"}}
+        vendor = {"Id": self._new_id(), "DisplayName": name, "Active": True, "SyncToken": "0"}
+        self.vendors.append(vendor)
+        return {"Vendor": vendor}
+
+    def _save_purchase(self, body: Dict[str, Any], operation: str) -> Dict[str, Any]:
+        if operation == "update":
+            current = self.purchases.get(body.get("Id"))
+            if current is None or current["SyncToken"] != body.get("SyncToken"):
+                return {"Fault": {"Error": [{"Message": "Stale Object Error", "code": "5010"}],
+                                  "type": "ValidationFault"}}
+            purchase = dict(current, **{k: v for k, v in body.items() if k != "sparse"})
+            purchase["SyncToken"] = str(int(current["SyncToken"]) + 1)
+        else:
+            purchase = dict(body, Id=self._new_id(), SyncToken="0")
+        self.purchases[purchase["Id"]] = purchase
+        return {"Purchase": purchase}
+
+    def _query(self, query: str) -> Dict[str, Any]:
+        match = _QUERY.match(query.strip())
+        entity = match.group(1).capitalize() if match else ""
+        rows = {"Vendor": self.vendors, "Account": self.accounts}.get(entity, [])
+        start = int(match.group(2) or 1)
+        limit = int(match.group(3) or 100)
+        page = rows[start - 1:start - 1 + limit]
+        return {"QueryResponse": {entity: page, "startPosition": start, "maxResults": len(page)}}
+
+    def _batch(self, items: List[Dict[str, Any]]) -> Dict[str, Any]:
+        responses = []
+        for item in items:
+            entity = "Vendor" if "Vendor" in item else "Purchase"
+            if entity == "Vendor":
+                result = self._create_vendor(item["Vendor"])
+            else:
+                result = self._save_purchase(item["Purchase"], item.get("operation", "create"))
+            responses.append(dict(result, bId=item.get("bId")))
+        return {"BatchItemResponse": responses}
+
+    # ------------------------------------------------------------------ http
+    def _admit(self, realm: str) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            while self._recent and now - self._recent[0][0] > 60:
+                self._recent.popleft()
+            recent = sum(1 for _, r in self._recent if r == realm)
+            if self._in_flight >= self.max_concurrent or (self.rate_per_minute and recent >= self.rate_per_minute):
+                self.throttled += 1
+                return False
+            self._recent.append((now, realm))
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+            return True
+
+    def _dispatch(self, method: str, resource: str, query: Dict[str, List[str]], body: Dict[str, Any]):
+        with self._lock:
+            self.calls[f"{method} {resource}"] += 1
+            if method == "GET" and resource == "query":
+                return 200, self._query(query.get("query", [""])[0])
+            if method == "POST" and resource == "vendor":
+                result = self._create_vendor(body)
+                return (400 if "Fault" in result else 200), result
+            if method == "POST" and resource == "purchase":
+                return 200, self._save_purchase(body, "create")
+            if method == "POST" and resource == "batch":
+                items = body.get("BatchItemRequest", [])
+                if len(items) > 30:
+                    return 400, {"Fault": {"Error": [{"Message": "Batch size exceeds 30"}]}}
+                request_id = query.get("requestid", [None])[0]
+                if request_id and request_id in self._request_ids:
+                    return 200, self._request_ids[request_id]
+                result = self._batch(items)
+                if request_id:
+                    self._request_ids[request_id] = result
+                return 200, result
+        return 404, {"Fault": {"Error": [{"Message": f"Unsupported {method} {resource}"}]}}
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _serve(self, method: str):
+                parsed = urlparse(self.path)
+                parts = parsed.path.strip("/").split("/")  # v3/company/<realm>/<resource>
+                realm, resource = (parts[2], parts[3]) if len(parts) >= 4 else ("", "")
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}") if length else {}
+                if not server._admit(realm):
+                    self._reply(429, {"Fault": {"Error": [{"Message": "Throttled"}]}}, {"Retry-After": "1"})
+                    return
+                try:
+                    if server.latency:
+                        time.sleep(server.latency)
+                    status, payload = server._dispatch(method, resource, parse_qs(parsed.query), body)
+                finally:
+                    with server._lock:
+                        server._in_flight -= 1
+                self._reply(status, payload)
+
+            def _reply(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._serve("GET")
+
+            def do_POST(self):
+                self._serve("POST")
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "FakeQBOServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-qbo", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake QuickBooks Online API")
+    parser.add_argument("--port", type=int, default=8026)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    args = parser.parse_args()
+    server = FakeQBOServer(port=args.port, latency=args.latency)
+    print(f"Fake QBO API on {server.url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
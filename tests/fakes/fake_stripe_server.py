@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/tests/fakes/fake_stripe_server.py
+🎯 PURPOSE: Local stand-in for Stripe's charge listing API for tests and dev
+🔗 IMPORTS: http.server, json, threading, urllib
+📤 EXPORTS: FakeStripeServer
+
+Serves GET /v1/charges the way Stripe does: newest first, `limit`,
+`starting_after` and `created[gte]`, with `has_more`. Point the SDK at it
+with `stripe.api_base = server.url`, or run
+`python -m tests.fakes.fake_stripe_server --port 8027 --charges 500`.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+
+class FakeStripeServer:
+    """In-memory charges behind the Stripe list-endpoint shapes"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.charges: List[Dict[str, Any]] = []
+        self.requests: List[Dict[str, List[str]]] = []
+        self._failures: List[int] = []
+        self._next = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def add_charges(self, count: int, created: Optional[int] = None, description: str = "Charge",
+                    amount: int = 1500, metadata: Optional[Dict[str, str]] = None) -> List[Dict[str, Any]]:
+        """Append `count` charges, one second apart, starting at `created` (default: now)"""
+        created = created or int(time.time())
+        with self._lock:
+            added = []
+            for i in range(count):
+                self._next += 1
+                added.append({
+                    "id": f"ch_{self._next:08d}", "object": "charge", "amount": amount, "currency": "usd",
+                    "description": f"{description} {self._next}", "receipt_url": None, "created": created + i,
+                    "status": "succeeded", "metadata": dict(metadata or {}), "payment_intent": None,
+                    "customer": None,
+                })
+            self.charges.extend(added)
+            return added
+
+    def fail_next(self, count: int = 1, status: int = 500):
+        """Answer the next `count` list requests with `status`"""
+        with self._lock:
+            self._failures.extend([status] * count)
+
+    def _list(self, query: Dict[str, List[str]]):
+        limit = min(int(query.get("limit", ["10"])[0]), 100)
+        newest_first = sorted(self.charges, key=lambda c: (c["created"], c["id"]), reverse=True)
+        if "created[gte]" in query:
+            floor = int(query["created[gte]"][0])
+            newest_first = [c for c in newest_first if c["created"] >= floor]
+        if "starting_after" in query:
+            ids = [c["id"] for c in newest_first]
+            after = query["starting_after"][0]
+            if after not in ids:
+                return 400, {"error": {"type": "invalid_request_error", "param": "starting_after",
+                                       "message": f"No such charge: '{after}'"}}
+            newest_first = newest_first[ids.index(after) + 1:]
+        page = newest_first[:limit]
+        return 200, {"object": "list", "url": "/v1/charges", "data": page, "has_more": len(newest_first) > limit}
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                query = parse_qs(parsed.query)
+                with server._lock:
+                    server.requests.append(query)
+                    failure = server._failures.pop(0) if server._failures else None
+                    if failure:
+                        status, payload = failure, {"error": {"type": "api_error", "message": "Injected failure"}}
+                    elif parsed.path == "/v1/charges":
+                        status, payload = server._list(query)
+                    else:
+                        status, payload = 404, {"error": {"type": "invalid_request_error",
+                                                          "message": f"Unrecognized request URL {parsed.path}"}}
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "FakeStripeServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeStripeServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Fake Stripe charge listing API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8027)
+    parser.add_argument("--charges", type=int, default=250, help="charges to seed")
+    args = parser.parse_args()
+    fake = FakeStripeServer(args.host, args.port)
+    fake.add_charges(args.charges, created=int(time.time()) - args.charges)
+    print(f"Fake Stripe API on {fake.url} with {args.charges} charges")
+    try:
+        fake._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
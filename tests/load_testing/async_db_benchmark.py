@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/tests/load_testing/async_db_benchmark.py
+🎯 PURPOSE: Event-loop responsiveness under slow reads: sync Session in async handlers vs AsyncSession
+🔗 IMPORTS: asyncio, httpx, FastAPI, models.base, models.async_base
+📤 EXPORTS: build_app, run_variant, run_benchmark, main
+
+The hot read endpoints are `async def` handlers, so a blocking sync query
+stalls every other request on the worker until it returns. Each variant
+serves GET /list (a deliberately slow aggregate over an expenses-like table)
+and GET /ping (no I/O) from a scratch SQLite database built with the app's
+engine settings. --clients concurrent callers hammer /list while a probe
+hits /ping; reports list throughput and ping p50/p99 latency.
+
+    python tests/load_testing/async_db_benchmark.py --clients 16 --requests 20
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT)
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from models.async_base import build_async_engine
+from models.base import build_engine
+
+# Self-join keeps SQLite busy for a few milliseconds per request
+_SLOW_LIST = text(
+    "SELECT a.vendor, COUNT(*), SUM(a.amount_cents) FROM expenses a "
+    "JOIN expenses b ON b.vendor = a.vendor AND b.id <= a.id "
+    "WHERE a.user_id = :u GROUP BY a.vendor ORDER BY 3 DESC"
+)
+
+
+def _seed(engine, rows: int):
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE expenses (id INTEGER PRIMARY KEY, user_id INTEGER, "
+                          "vendor TEXT, amount_cents INTEGER)"))
+        conn.execute(text("INSERT INTO expenses (user_id, vendor, amount_cents) VALUES (:u, :v, :a)"),
+                     [{"u": n % 4, "v": f"vendor-{n % 25}", "a": n * 7 % 50000} for n in range(rows)])
+
+
+def build_app(variant: str, url: str) -> FastAPI:
+    app = FastAPI()
+
+    if variant == "sync":
+        sessions = sessionmaker(bind=build_engine(url))
+
+        @app.get("/list")
+        async def list_sync():
+            with sessions() as db:
+                return [list(row) for row in db.execute(_SLOW_LIST, {"u": 1})]
+    else:
+        sessions = async_sessionmaker(build_async_engine(url), class_=AsyncSession)
+
+        @app.get("/list")
+        async def list_async():
+            async with sessions() as db:
+                return [list(row) for row in await db.execute(_SLOW_LIST, {"u": 1})]
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    return app
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))] if ordered else 0.0
+
+
+async def run_variant(variant: str, url: str, clients: int, requests: int) -> Dict:
+    app = build_app(variant, url)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.get("/list")  # warm the pool
+        done = asyncio.Event()
+        pings: List[float] = []
+
+        async def caller():
+            for _ in range(requests):
+                (await client.get("/list")).raise_for_status()
+
+        async def probe():
+            while not done.is_set():
+                started = time.perf_counter()
+                await client.get("/ping")
+                pings.append(time.perf_counter() - started)
+                await asyncio.sleep(0.005)
+
+        probing = asyncio.create_task(probe())
+        started = time.perf_counter()
+        await asyncio.gather(*(caller() for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await probing
+
+    total = clients * requests
+    return {
+        "variant": variant,
+        "requests": total,
+        "seconds": elapsed,
+        "requests_per_second": total / elapsed if elapsed else 0.0,
+        "ping_p50_ms": statistics.median(pings) * 1000 if pings else 0.0,
+        "ping_p99_ms": _percentile(pings, 0.99) * 1000,
+        "pings": len(pings),
+    }
+
+
+def run_benchmark(clients: int = 16, requests: int = 20, rows: int = 4000) -> List[Dict]:
+    with tempfile.TemporaryDirectory(prefix="cora-async-bench-") as workdir:
+        url = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+        _seed(build_engine(url), rows)
+        return [asyncio.run(run_variant(variant, url, clients, requests)) for variant in ("sync", "async")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync vs async read path benchmark")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=20, help="list requests per client")
+    parser.add_argument("--rows", type=int, default=4000)
+    parser.add_argument("--json", action="store_true", help="print the raw results as JSON")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.clients, args.requests, args.rows)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{args.clients} clients x {args.requests} list requests over {args.rows} rows")
+    print(f"{'variant':<8} {'list/s':>8} {'ping p50 ms':>12} {'ping p99 ms':>12} {'pings':>6}")
+    for row in results:
+        print(f"{row['variant']:<8} {row['requests_per_second']:>8.1f} {row['ping_p50_ms']:>12.2f} "
+              f"{row['ping_p99_ms']:>12.2f} {row['pings']:>6}")
+
+
+if __name__ == "__main__":
+    main()
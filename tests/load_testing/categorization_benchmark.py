@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/tests/load_testing/categorization_benchmark.py
+🎯 PURPOSE: Categorization throughput: nested substring loops vs the compiled engine (single and batch)
+🔗 IMPORTS: random, time, services.categorization_engine
+📤 EXPORTS: make_rows, legacy_categorize, run_benchmark, main
+
+Generates an import-shaped workload (vendor + description + amount, with
+merchants repeating the way bank feeds do) and times three ways of
+categorizing it: the per-category keyword loops the routes used before,
+ExpenseCategorizer.categorize() per row, and categorize_many() over the
+whole batch. Every variant must return identical results.
+
+    python tests/load_testing/categorization_benchmark.py --rows 20000 --distinct 0.1
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT)
+
+from services.categorization_engine import AMOUNT_HINTS, CATEGORY_PATTERNS, expense_categorizer
+
+_FILLER = ["job", "site", "truck", "invoice", "order", "weekly", "north", "main st", "#4471", "misc"]
+
+
+def legacy_categorize(description: str, vendor: Optional[str] = None,
+                      amount_cents: Optional[int] = None) -> Tuple[str, int]:
+    """The O(categories x keywords) substring scan the routes used before the engine"""
+    desc_lower = description.lower() if description else ""
+    vendor_lower = vendor.lower() if vendor else ""
+    category_scores = {}
+    for category, patterns in CATEGORY_PATTERNS.items():
+        score = 0
+        for vendor_pattern in patterns["vendors"]:
+            if vendor_pattern in vendor_lower:
+                score += 50
+                break
+        for keyword in patterns["keywords"]:
+            if keyword in desc_lower:
+                score += 20
+            if vendor and keyword in vendor_lower:
+                score += 15
+        if amount_cents and category in AMOUNT_HINTS:
+            low, high = AMOUNT_HINTS[category]
+            if amount_cents >= low and (high is None or amount_cents <= high):
+                score += 10
+        if score > 0:
+            category_scores[category] = score
+    if category_scores:
+        best = max(category_scores, key=category_scores.get)
+        return best, min(category_scores[best], 95)
+    return "Other", 0
+
+
+def make_rows(rows: int, distinct: float, seed: int = 42) -> List[Tuple[str, str, int]]:
+    """`rows` expenses drawn from int(rows * distinct) distinct (description, vendor, amount) rows"""
+    rng = random.Random(seed)
+    words = sorted({w for p in CATEGORY_PATTERNS.values() for w in p["vendors"] + p["keywords"]})
+    pool = []
+    for _ in range(max(1, int(rows * distinct))):
+        description = " ".join(rng.choice(words + _FILLER) for _ in range(rng.randint(2, 6)))
+        vendor = f"{rng.choice(words).title()} {rng.choice(_FILLER)}"
+        pool.append((description, vendor, rng.choice([0, 799, 2450, 8800, 61000])))
+    return [rng.choice(pool) for _ in range(rows)]
+
+
+def _timed(fn) -> Tuple[List, float]:
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def run_benchmark(rows: int = 20000, distinct: float = 0.1) -> List[Dict]:
+    data = make_rows(rows, distinct)
+    variants = {
+        "legacy loops": lambda: [legacy_categorize(*row) for row in data],
+        "engine": lambda: [expense_categorizer.categorize(*row) for row in data],
+        "engine batch": lambda: expense_categorizer.categorize_many(data),
+    }
+    results, expected = [], None
+    for name, fn in variants.items():
+        output, seconds = _timed(fn)
+        if expected is None:
+            expected = output
+        elif output != expected:
+            raise AssertionError(f"{name} disagrees with the legacy scan")
+        results.append({"variant": name, "rows": rows, "seconds": seconds,
+                        "rows_per_ms": rows / (seconds * 1000) if seconds else 0.0,
+                        "us_per_row": seconds / rows * 1e6})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Expense categorization micro-benchmark")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--distinct", type=float, default=0.1, help="share of distinct rows in the batch")
+    parser.add_argument("--json", action="store_true", help="print the raw results as JSON")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.rows, args.distinct)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{args.rows} rows, {args.distinct:.0%} distinct")
+    print(f"{'variant':<14} {'rows/ms':>9} {'us/row':>8}")
+    for row in results:
+        print(f"{row['variant']:<14} {row['rows_per_ms']:>9.1f} {row['us_per_row']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
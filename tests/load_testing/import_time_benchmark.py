@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/tests/load_testing/import_time_benchmark.py
+🎯 PURPOSE: Import-time and RSS report for a cold worker boot (`python -X importtime` style)
+🔗 IMPORTS: subprocess, utils.lazy_import
+📤 EXPORTS: parse_importtime, run_benchmark, main
+
+Boots `import app` in a fresh interpreter with -X importtime and reports
+wall time, peak RSS, self time per top-level package and the slowest
+project modules. "lazy" is the normal boot; "eager" additionally imports
+the post-startup warm-up modules up front, which is what every worker paid
+at boot before the SDK imports were deferred.
+
+    python tests/load_testing/import_time_benchmark.py --top 15
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT)
+
+from utils.lazy_import import WARM_UP_MODULES
+
+PROJECT_PACKAGES = {"app", "config", "core", "dependencies", "middleware", "models", "routes",
+                    "services", "tools", "utils"}
+
+_BOOT = """
+import json, resource, sys, time
+started = time.perf_counter()
+import app
+{extra}
+print("@@" + json.dumps({{
+    "seconds": time.perf_counter() - started,
+    "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "modules": len(sys.modules),
+}}))
+"""
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """(module, self µs, cumulative µs) for every `import time:` line"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|", 2))
+        if not self_us.isdigit():  # header line
+            continue
+        rows.append((name, int(self_us), int(cumulative_us)))
+    return rows
+
+
+def _boot(eager: bool) -> Dict:
+    # Plain import statements: importlib.import_module bypasses -X importtime
+    extra = "\n".join(f"import {name}" for name in WARM_UP_MODULES) if eager else ""
+    env = dict(os.environ)
+    env.setdefault("ENV", "testing")
+    env.setdefault("SECRET_KEY", "import-benchmark")
+    env.setdefault("ALLOWED_HOSTS", "*")
+    env.setdefault("DATABASE_URL", "sqlite:////tmp/cora_import_benchmark.db")
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", _BOOT.format(extra=extra)],
+                          cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    summary = next(json.loads(line[2:]) for line in proc.stdout.splitlines() if line.startswith("@@"))
+    rows = parse_importtime(proc.stderr)
+    by_package = defaultdict(int)
+    for name, self_us, _ in rows:
+        by_package[name.split(".")[0]] += self_us
+    summary["packages_ms"] = {pkg: us / 1000 for pkg, us in sorted(by_package.items(), key=lambda kv: -kv[1])}
+    project = {}
+    for name, _, cumulative in sorted(rows, key=lambda r: -r[2]):
+        if name.split(".")[0] in PROJECT_PACKAGES and name != "app":
+            project.setdefault(name, cumulative / 1000)
+    summary["project_modules_ms"] = project
+    imported = {name for name, _, _ in rows}
+    summary["deferred_loaded"] = [m for m in WARM_UP_MODULES if m in imported]
+    return summary
+
+
+def run_benchmark() -> Dict[str, Dict]:
+    """Boot summaries for the lazy (default) and eager import paths"""
+    return {"lazy": _boot(eager=False), "eager": _boot(eager=True)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Worker cold-boot import report")
+    parser.add_argument("--top", type=int, default=12)
+    parser.add_argument("--json", action="store_true", help="print the raw report as JSON")
+    args = parser.parse_args()
+
+    results = run_benchmark()
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'variant':<8} {'boot s':>8} {'RSS MB':>8} {'modules':>8}  deferred SDKs loaded")
+    for name, row in results.items():
+        print(f"{name:<8} {row['seconds']:>8.2f} {row['rss_mb']:>8.1f} {row['modules']:>8}  "
+              f"{', '.join(row['deferred_loaded']) or '-'}")
+
+    lazy = results["lazy"]
+    print(f"\nSelf time by top-level package (lazy boot, top {args.top})")
+    for pkg, ms in list(lazy["packages_ms"].items())[:args.top]:
+        print(f"  {pkg:<32} {ms:>8.1f} ms")
+    print(f"\nSlowest project modules, cumulative (lazy boot, top {args.top})")
+    for name, ms in list(lazy["project_modules_ms"].items())[:args.top]:
+        print(f"  {name:<32} {ms:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
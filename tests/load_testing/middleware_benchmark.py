@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/tests/load_testing/middleware_benchmark.py
+🎯 PURPOSE: Micro-benchmark of per-request middleware overhead, layered vs single pipeline
+🔗 IMPORTS: asyncio, fastapi, starlette, core.pipeline
+📤 EXPORTS: run_benchmark, main
+
+Drives the ASGI app in-process (no sockets, no HTTP client) so the numbers are
+framework + middleware cost only. "layered" wraps each hook in its own
+@app.middleware("http") layer, which is how request-id, access log, security
+headers and rate limiting were installed before; "pipeline" runs the same hooks
+in one RequestPipeline.
+
+    python tests/load_testing/middleware_benchmark.py --requests 5000
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from fastapi import FastAPI, Request
+
+from core.access_log import AccessLogHook
+from core.pipeline import RequestContext, RequestPipeline
+from core.request_id import RequestIdHook
+from core.security import SecurityHeadersHook
+from middleware.monitoring import MetricsHook
+from middleware.rate_limiting import RateLimitHook
+
+
+def _hooks():
+    return [MetricsHook(), RequestIdHook(), AccessLogHook(), SecurityHeadersHook(), RateLimitHook()]
+
+
+def _endpoint_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/cached")
+    async def cached():
+        return {"ok": True, "items": [1, 2, 3]}
+
+    return app
+
+
+def _as_http_middleware(app: FastAPI, hook) -> None:
+    """Run one hook as its own BaseHTTPMiddleware layer (the old installation style)"""
+
+    @app.middleware("http")
+    async def _layer(request: Request, call_next):
+        ctx = RequestContext(request.scope)
+        try:
+            early = hook.on_request(ctx)
+            if early is not None:
+                return early
+            response = await call_next(request)
+            ctx.status = response.status_code
+            hook.on_response(ctx, response.headers)
+            return response
+        finally:
+            hook.on_complete(ctx)
+
+
+def build_apps() -> Dict[str, FastAPI]:
+    bare = _endpoint_app()
+
+    layered = _endpoint_app()
+    for hook in reversed(_hooks()):
+        _as_http_middleware(layered, hook)
+
+    pipeline = _endpoint_app()
+    pipeline.add_middleware(RequestPipeline, hooks=_hooks())
+    return {"bare": bare, "layered": layered, "pipeline": pipeline}
+
+
+async def _drive(app, requests: int) -> List[float]:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/api/cached", "raw_path": b"/api/cached", "root_path": "",
+        "query_string": b"", "headers": [(b"host", b"localhost"), (b"user-agent", b"bench")],
+        "client": ("127.0.0.1", 5000), "server": ("localhost", 8000),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    timings = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        await app(dict(scope), receive, send)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+async def _run(apps: Dict[str, FastAPI], requests: int, warmup: int) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for name, app in apps.items():
+        await _drive(app, warmup)
+        timings = sorted(await _drive(app, requests))
+        results[name] = {
+            "p50_us": statistics.median(timings) * 1e6,
+            "p99_us": timings[int(len(timings) * 0.99) - 1] * 1e6,
+            "mean_us": statistics.fmean(timings) * 1e6,
+        }
+    return results
+
+
+def run_benchmark(requests: int = 2000, warmup: int = 200) -> Dict[str, Dict[str, float]]:
+    """Per-request latency (microseconds) for each app variant"""
+    logging.getLogger("cora.access").setLevel(logging.WARNING)
+    apps = build_apps()
+    return asyncio.run(_run(apps, requests, warmup))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Middleware overhead micro-benchmark")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=200)
+    args = parser.parse_args()
+
+    results = run_benchmark(args.requests, args.warmup)
+    bare = results["bare"]["p50_us"]
+    print(f"{'variant':<10} {'p50 µs':>9} {'p99 µs':>9} {'mean µs':>9} {'overhead p50':>13}")
+    for name, row in results.items():
+        print(f"{name:<10} {row['p50_us']:>9.1f} {row['p99_us']:>9.1f} {row['mean_us']:>9.1f} "
+              f"{row['p50_us'] - bare:>12.1f}µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/tests/load_testing/quickbooks_sync_benchmark.py
+🎯 PURPOSE: First-sync cost of N expenses: one purchase at a time vs the batched sync engine
+🔗 IMPORTS: sqlalchemy, models, services.quickbooks_service, tests.fakes.fake_qbo_server
+📤 EXPORTS: run_benchmark, main
+
+Both variants push the same expenses to a fake QBO server that adds
+--latency seconds per request and enforces the real per-realm limits
+(10 concurrent, 500/min). "per expense" is the previous behaviour:
+vendor list + account list + purchase create for every expense (a reference
+cache TTL of 0). "batched" is sync_pending_expenses(). The projection
+multiplies each variant's sequential request rounds by --project-latency
+(QBO round trips are typically 200-500 ms) and adds the rate-limit floor.
+
+    python tests/load_testing/quickbooks_sync_benchmark.py --expenses 600 --latency 0.02
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT)
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from config import config
+from models import Base, Expense, ExpenseCategory, User
+from models.quickbooks_integration import QuickBooksIntegration
+from services.quickbooks_service import QuickBooksService, ReferenceCache
+from tests.fakes.fake_qbo_server import FakeQBOServer
+
+QBO_RATE_PER_MINUTE = 500
+
+
+def _seed(path: str, expenses: int, vendors: int):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add_all([User(id=1, email="bench@example.com", hashed_password="x"), ExpenseCategory(id=1, name="Travel")])
+    db.add(QuickBooksIntegration(id=1, user_email="bench@example.com", realm_id=uuid.uuid4().hex,
+                                 access_token="token", refresh_token="refresh",
+                                 token_expires_at=datetime.utcnow() + timedelta(hours=2)))
+    db.add_all([Expense(user_id=1, amount_cents=1000 + i, category_id=1, description=f"expense {i}",
+                        vendor=f"Vendor {i % vendors}", expense_date=datetime(2026, 3, 1)) for i in range(expenses)])
+    db.commit()
+    return engine, db
+
+
+def _run(variant: str, expenses: int, vendors: int, latency: float) -> Dict:
+    with tempfile.TemporaryDirectory() as td, FakeQBOServer(latency=latency, rate_per_minute=10 ** 6) as qbo:
+        engine, db = _seed(os.path.join(td, "bench.db"), expenses, vendors)
+        integration = db.get(QuickBooksIntegration, 1)
+        started = time.perf_counter()
+        if variant == "per expense":
+            service = QuickBooksService(integration, cache=ReferenceCache(ttl_seconds=0))
+            service.api_url = qbo.url
+            synced = sum(1 for expense in db.query(Expense) if service._create_quickbooks_purchase(expense))
+            rounds = sum(qbo.calls.values())
+        else:
+            service = QuickBooksService(integration, cache=ReferenceCache())
+            service.api_url = qbo.url
+            synced = service.sync_pending_expenses(db)["synced_count"]
+            batches = qbo.calls["POST batch"] - math.ceil(vendors / config.QUICKBOOKS_BATCH_SIZE)
+            rounds = qbo.calls["GET query"] + math.ceil(vendors / config.QUICKBOOKS_BATCH_SIZE) + \
+                math.ceil(batches / config.QUICKBOOKS_SYNC_CONCURRENCY)
+        seconds = time.perf_counter() - started
+        requests = sum(qbo.calls.values())
+        db.close()
+        engine.dispose()
+    return {"variant": variant, "expenses": expenses, "synced": synced, "seconds": seconds,
+            "requests": requests, "sequential_rounds": rounds}
+
+
+def run_benchmark(expenses: int = 600, vendors: int = 60, latency: float = 0.02,
+                  project_expenses: int = 3000, project_latency: float = 0.3) -> List[Dict]:
+    # The fake server is local: lift the client token bucket and apply QBO's limit in the projection
+    config.QUICKBOOKS_RATE_PER_MINUTE = 10 ** 6
+    results = []
+    for variant in ("per expense", "batched"):
+        row = _run(variant, expenses, vendors, latency)
+        scale = project_expenses / expenses
+        rate_floor = row["requests"] * scale / QBO_RATE_PER_MINUTE * 60
+        row["projected_seconds"] = max(row["sequential_rounds"] * scale * project_latency, rate_floor)
+        results.append(row)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="QuickBooks first-sync benchmark against the fake QBO server")
+    parser.add_argument("--expenses", type=int, default=600)
+    parser.add_argument("--vendors", type=int, default=60)
+    parser.add_argument("--latency", type=float, default=0.02, help="fake server seconds per request")
+    parser.add_argument("--project-expenses", type=int, default=3000)
+    parser.add_argument("--project-latency", type=float, default=0.3, help="real QBO seconds per round trip")
+    parser.add_argument("--json", action="store_true", help="print the raw results as JSON")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.expenses, args.vendors, args.latency, args.project_expenses, args.project_latency)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{args.expenses} expenses, {args.vendors} vendors, {args.latency * 1000:.0f} ms fake latency")
+    print(f"{'variant':<12} {'seconds':>8} {'requests':>9} {'rounds':>7} "
+          f"{'projected (' + str(args.project_expenses) + ' @ ' + str(int(args.project_latency * 1000)) + 'ms)':>26}")
+    for row in results:
+        print(f"{row['variant']:<12} {row['seconds']:>8.2f} {row['requests']:>9} {row['sequential_rounds']:>7} "
+              f"{row['projected_seconds'] / 60:>22.1f} min")
+
+
+if __name__ == "__main__":
+    main()
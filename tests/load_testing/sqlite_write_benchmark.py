@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/tests/load_testing/sqlite_write_benchmark.py
+🎯 PURPOSE: SQLite write throughput and latency under concurrency: direct commits vs the write queue
+🔗 IMPORTS: threading, models.base, utils.write_queue
+📤 EXPORTS: run_variant, run_benchmark, main
+
+Each of --threads workers performs --writes small inserts (an activity-log
+style row) against a scratch database built with the app's engine settings
+and PRAGMA profile. "direct" opens a session and commits per write, as the
+request handlers used to; "queue" hands each write to WriteQueue and waits
+for its group commit. Reports writes/s, p50/p99 latency and lock errors.
+
+    python tests/load_testing/sqlite_write_benchmark.py --threads 32 --writes 200
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT)
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from models.base import build_engine
+from utils.write_queue import WriteQueue
+
+_INSERT = text("INSERT INTO activity (user_id, action, details, created_at) VALUES (:u, :a, :d, :t)")
+
+
+def _write(db, user_id: int, n: int) -> None:
+    db.execute(_INSERT, {"u": user_id, "a": "create_expense", "d": f"/api/expenses/{n}", "t": time.time()})
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))] if ordered else 0.0
+
+
+def run_variant(variant: str, threads: int, writes: int, workdir: str) -> Dict:
+    """Run one variant on a fresh database file; returns the summary row"""
+    engine = build_engine(f"sqlite:///{os.path.join(workdir, variant + '.db')}",
+                          pool_size=threads, max_overflow=0)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE activity (id INTEGER PRIMARY KEY, user_id INTEGER, "
+                          "action TEXT, details TEXT, created_at REAL)"))
+    sessions = sessionmaker(bind=engine)
+    writer = WriteQueue(session_factory=sessions, enabled=True) if variant == "queue" else None
+
+    latencies: List[float] = []
+    errors = [0]
+    lock = threading.Lock()
+    start_gate = threading.Barrier(threads + 1)
+
+    def worker(user_id: int):
+        own = []
+        start_gate.wait()
+        for n in range(writes):
+            started = time.perf_counter()
+            try:
+                if writer is not None:
+                    writer.run(_write, user_id, n)
+                else:
+                    with sessions() as db:
+                        _write(db, user_id, n)
+                        db.commit()
+            except OperationalError:
+                with lock:
+                    errors[0] += 1
+                continue
+            own.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(own)
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for t in pool:
+        t.start()
+    start_gate.wait()
+    started = time.perf_counter()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT COUNT(*) FROM activity")).scalar()
+    summary = {
+        "variant": variant,
+        "writes": rows,
+        "seconds": elapsed,
+        "writes_per_second": rows / elapsed if elapsed else 0.0,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p99_ms": _percentile(latencies, 0.99) * 1000,
+        "lock_errors": errors[0],
+    }
+    if writer is not None:
+        writer.stop()
+        summary["batches"] = writer.stats["batches"]
+        summary["max_batch"] = writer.stats["max_batch"]
+    engine.dispose()
+    return summary
+
+
+def run_benchmark(threads: int = 16, writes: int = 100) -> List[Dict]:
+    with tempfile.TemporaryDirectory(prefix="cora-write-bench-") as workdir:
+        return [run_variant(variant, threads, writes, workdir) for variant in ("direct", "queue")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite concurrent write benchmark")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--writes", type=int, default=100, help="writes per thread")
+    parser.add_argument("--json", action="store_true", help="print the raw results as JSON")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.threads, args.writes)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{args.threads} threads x {args.writes} writes")
+    print(f"{'variant':<8} {'writes/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'locked':>7} {'batches':>8}")
+    for row in results:
+        print(f"{row['variant']:<8} {row['writes_per_second']:>10.0f} {row['p50_ms']:>8.2f} "
+              f"{row['p99_ms']:>8.2f} {row['lock_errors']:>7} {row.get('batches', '-'):>8}")
+
+
+if __name__ == "__main__":
+    main()
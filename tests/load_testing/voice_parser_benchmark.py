@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/tests/load_testing/voice_parser_benchmark.py
+🎯 PURPOSE: Voice expense parsing latency and accuracy: per-call regex rebuilds vs the compiled parser
+🔗 IMPORTS: json, re, time, services.voice_parser
+📤 EXPORTS: load_corpus, legacy_parse_voice_expense, score, run_benchmark, main
+
+Parses the labelled transcripts in tests/voice_expense_corpus.json with the
+parser the voice route used before (dict and alternation regex rebuilt on
+every call, IGNORECASE searches, substring vendor scan) and with the
+compiled VoiceParser, and reports both speed and per-field accuracy so a
+faster parser that gets amounts wrong shows up in the same table.
+
+    python tests/load_testing/voice_parser_benchmark.py --iterations 200
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from typing import Callable, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT)
+
+from services.voice_parser import voice_parser
+
+CORPUS_PATH = os.path.join(ROOT, "tests", "voice_expense_corpus.json")
+FIELDS = ("amount", "vendor", "category", "job_name")
+
+_LEGACY_JOB_PATTERNS = [
+    r"for (?:the )?([a-zA-Z]+(?:\s+[a-zA-Z]+)*?)\s+(?:job|project)",
+    r"on (?:the )?([a-zA-Z]+(?:\s+[a-zA-Z]+)*?)\s+(?:job|project|bathroom|kitchen|house|roof|deck)",
+    r"([a-zA-Z]+)\s+(bathroom|kitchen|house|roof|deck|basement|garage|addition|remodel)",
+    r"([a-zA-Z]+(?:\s+[a-zA-Z]+)*?)\s+(?:job|project)(?:\s|$)"
+]
+_LEGACY_VENDORS = {
+    'home depot': 'Materials - Hardware', 'lowes': 'Materials - Hardware', 'menards': 'Materials - Hardware',
+    'ace hardware': 'Materials - Hardware', 'lumber yard': 'Materials - Lumber',
+    'electrical supply': 'Materials - Electrical', 'plumbing supply': 'Materials - Plumbing',
+    'gas station': 'Equipment - Fuel', 'equipment rental': 'Equipment - Rental'
+}
+
+
+def legacy_parse_voice_expense(transcript: str) -> dict:
+    """The parser routes/expenses.py ran before the compiled engine (same output fields)"""
+    text = transcript.lower()
+    job_name = None
+    for pattern in _LEGACY_JOB_PATTERNS:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            job_name = ' '.join(word.capitalize() for word in match.group(1).strip().split())
+            break
+
+    amount = None
+    for pattern in (r'\$(\d+(?:\.\d{2})?)', r'(\d+(?:\.\d{2})?)\s*dollars?', r'(\d+)\s*(?:bucks?|dollars?)'):
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            amount = float(match.group(1))
+            break
+    if not amount:
+        word_numbers = {
+            'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6, 'seven': 7, 'eight': 8, 'nine': 9,
+            'ten': 10, 'eleven': 11, 'twelve': 12, 'thirteen': 13, 'fourteen': 14, 'fifteen': 15,
+            'sixteen': 16, 'seventeen': 17, 'eighteen': 18, 'nineteen': 19, 'twenty': 20, 'thirty': 30,
+            'forty': 40, 'fifty': 50, 'sixty': 60, 'seventy': 70, 'eighty': 80, 'ninety': 90,
+            'hundred': 100, 'thousand': 1000
+        }
+        alternation = '|'.join(word_numbers.keys())
+        compound_pattern = rf'({alternation})\s+({alternation})(?:\s+({alternation}))?'
+        match = re.search(compound_pattern, text)
+        if match:
+            parts = [g for g in match.groups() if g]
+            values = [word_numbers.get(part, 0) for part in parts]
+            if len(parts) == 3:
+                first, second, third = values
+                if parts[1] == 'hundred':
+                    amount = first * 100 + third
+                elif parts[2] == 'fifty':
+                    amount = first + second + 0.50 if 20 <= first <= 90 else second + 0.50
+                else:
+                    amount = first * 100 + second + third
+            else:
+                first, second = values
+                if parts[1] == 'fifty' and first < 100:
+                    amount = first + 0.50
+                elif 20 <= first <= 90 and second < 10:
+                    amount = first + second
+                else:
+                    amount = first * 10 + second
+    if not amount:
+        for word, value in word_numbers.items():
+            if word in text and value >= 10:
+                amount = value
+                break
+
+    vendor = None
+    category = 'Materials - Other'
+    for vendor_name, vendor_category in _LEGACY_VENDORS.items():
+        if vendor_name in text:
+            vendor = ' '.join(word.capitalize() for word in vendor_name.split())
+            category = vendor_category
+            break
+    if not vendor:
+        for pattern in (r'(?:at|from)\s+([a-zA-Z]+(?:\s+[a-zA-Z]+)*?)(?:\s+for|\s+on|\s|$)',
+                        r'([a-zA-Z]+(?:\s+[a-zA-Z]+)*?)\s+(?:receipt|purchase)'):
+            match = re.search(pattern, text, re.IGNORECASE)
+            if match:
+                vendor = ' '.join(word.capitalize() for word in match.group(1).strip().split())
+                break
+    vendor = vendor or 'Unknown'
+
+    category_keywords = {
+        'Materials - Lumber': ['lumber', 'wood', 'plywood', '2x4', '2x6', 'boards'],
+        'Materials - Electrical': ['wire', 'outlet', 'breaker', 'electrical'],
+        'Materials - Plumbing': ['pipe', 'fitting', 'valve', 'plumbing'],
+        'Equipment - Fuel': ['gas', 'diesel', 'fuel'],
+        'Labor - Crew': ['lunch', 'food', 'meal', 'crew'],
+        'Labor - Subcontractors': ['subcontractor', 'sub', 'contractor']
+    }
+    for cat, keywords in category_keywords.items():
+        if any(keyword in text for keyword in keywords):
+            category = cat
+            break
+
+    return {'amount': amount, 'vendor': vendor, 'category': category, 'job_name': job_name}
+
+
+def load_corpus(path: str = CORPUS_PATH) -> List[Dict]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def score(parse: Callable[[str], dict], corpus: List[Dict]) -> Dict[str, float]:
+    """Share of corpus entries each field is right for, plus `exact` (all fields right)"""
+    hits = {name: 0 for name in FIELDS + ("exact",)}
+    for case in corpus:
+        parsed = parse(case["transcript"])
+        right = [parsed[name] == case["expected"][name] for name in FIELDS]
+        for name, ok in zip(FIELDS, right):
+            hits[name] += ok
+        hits["exact"] += all(right)
+    return {name: count / len(corpus) for name, count in hits.items()}
+
+
+def run_benchmark(iterations: int = 200, corpus: List[Dict] = None) -> List[Dict]:
+    corpus = corpus or load_corpus()
+    transcripts = [case["transcript"] for case in corpus]
+    variants = {
+        "legacy": legacy_parse_voice_expense,
+        "compiled": lambda transcript: voice_parser.parse(transcript).to_dict(),
+    }
+    results = []
+    for name, parse in variants.items():
+        started = time.perf_counter()
+        for _ in range(iterations):
+            for transcript in transcripts:
+                parse(transcript)
+        seconds = time.perf_counter() - started
+        calls = iterations * len(transcripts)
+        results.append({"variant": name, "calls": calls, "seconds": seconds,
+                        "us_per_parse": seconds / calls * 1e6, "accuracy": score(parse, corpus)})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Voice expense parser latency and accuracy")
+    parser.add_argument("--iterations", type=int, default=200, help="passes over the corpus per variant")
+    parser.add_argument("--corpus", default=CORPUS_PATH)
+    parser.add_argument("--json", action="store_true", help="print the raw results as JSON")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    results = run_benchmark(args.iterations, corpus)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{len(corpus)} transcripts x {args.iterations} passes")
+    print(f"{'variant':<10} {'us/parse':>9} " + " ".join(f"{name:>9}" for name in FIELDS + ("exact",)))
+    for row in results:
+        accuracy = " ".join(f"{row['accuracy'][name]:>9.0%}" for name in FIELDS + ("exact",))
+        print(f"{row['variant']:<10} {row['us_per_parse']:>9.1f} {accuracy}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/tests/test_account_purge_engine.py
+🎯 PURPOSE: Validate the set-based account purge: data graph, delete order, chunking, dry-run report and files
+🔗 IMPORTS: pytest, SQLAlchemy, models, services.account_purge_service
+📤 EXPORTS: Tests for PurgePlan and AccountPurgeService against a full-schema SQLite database
+"""
+
+import itertools
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import (JSON, Boolean, Date, DateTime, Float, Integer, Numeric, create_engine, event,
+                        func, select, text)
+
+from models import Base
+from services.account_purge_service import AccountPurgeService, PurgePlan
+
+NOW = datetime(2026, 6, 1, 12, 0, 0)
+_seq = itertools.count(1)
+
+
+def _insert(conn, name, **values):
+    """Insert a row, filling required columns that the test does not care about"""
+    table = Base.metadata.tables[name]
+    for column in table.columns:
+        if column.name in values or column.nullable or column.default is not None or column.server_default is not None:
+            continue
+        if column.primary_key and isinstance(column.type, Integer) and not column.foreign_keys:
+            continue
+        n = next(_seq)
+        if isinstance(column.type, (DateTime,)):
+            values[column.name] = NOW
+        elif isinstance(column.type, Date):
+            values[column.name] = date(2026, 1, 1)
+        elif isinstance(column.type, Boolean):
+            values[column.name] = False
+        elif isinstance(column.type, (Integer, Numeric, Float)):
+            values[column.name] = n
+        elif isinstance(column.type, JSON):
+            values[column.name] = {}
+        else:
+            values[column.name] = f"x{n}"
+    return conn.execute(table.insert().values(**values)).inserted_primary_key[0]
+
+
+def _user_graph(conn, user_id, email, receipt=None):
+    """One user with a row in each kind of owned table"""
+    expense = _insert(conn, "expenses", user_id=user_id, amount_cents=100, receipt_path=receipt)
+    job = _insert(conn, "jobs", user_id=user_id)
+    _insert(conn, "job_notes", job_id=job, user_id=user_id)
+    _insert(conn, "job_alerts", job_id=job, user_id=user_id)
+    plaid = _insert(conn, "plaid_integrations", user_email=email)
+    account = _insert(conn, "plaid_accounts", integration_id=plaid)
+    _insert(conn, "plaid_transactions", account_id=account, expense_id=expense)
+    _insert(conn, "plaid_sync_cursors", integration_id=plaid)
+    stripe = _insert(conn, "stripe_integrations", user_email=email)
+    _insert(conn, "stripe_transactions", integration_id=stripe, expense_id=expense)
+    quickbooks = _insert(conn, "quickbooks_integrations", user_email=email)
+    _insert(conn, "quickbooks_expense_sync", integration_id=quickbooks, expense_id=expense)
+    _insert(conn, "user_activity", user_id=user_id)
+    _insert(conn, "feedback", user_email=email)
+    _insert(conn, "email_verification_tokens", email=email)
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'purge.db'}")
+
+    @event.listens_for(engine, "connect")
+    def _fk(dbapi_connection, _):
+        dbapi_connection.execute("PRAGMA foreign_keys=ON")  # a wrong delete order fails loudly
+
+    Base.metadata.create_all(engine)
+    uploads = tmp_path / "uploads" / "receipts"
+    uploads.mkdir(parents=True)
+    kept_receipt = tmp_path / "elsewhere.jpg"
+    kept_receipt.write_bytes(b"jpg")
+    scheduled = (NOW - timedelta(days=40)).isoformat()
+    with engine.begin() as conn:
+        conn.exec_driver_sql("ALTER TABLE users ADD COLUMN deletion_scheduled TEXT")
+        users = [
+            (1, "gone1@example.com", "false", scheduled, uploads / "r1.jpg"),
+            (2, "gone2@example.com", "false", scheduled, kept_receipt),  # outside the upload root
+            (3, "back@example.com", "true", scheduled, None),  # reactivated
+            (4, "recent@example.com", "false", (NOW - timedelta(days=5)).isoformat(), None),
+            (5, "live@example.com", "true", None, None),
+        ]
+        for user_id, email, active, when, receipt in users:
+            _insert(conn, "users", id=user_id, email=email, is_active=active)
+            conn.execute(text("UPDATE users SET deletion_scheduled = :when WHERE id = :id"),
+                         {"when": when, "id": user_id})
+            if receipt is not None and receipt.parent == uploads:
+                receipt.write_bytes(b"jpg")
+            _user_graph(conn, user_id, email, receipt=str(receipt) if receipt else None)
+    reports = tmp_path / "reports"
+    (reports / "1").mkdir(parents=True)
+    (reports / "1" / "full_report_abc.pdf").write_bytes(b"%PDF")
+    yield engine, tmp_path
+    engine.dispose()
+
+
+def _service(engine, tmp_path, **kwargs):
+    return AccountPurgeService(engine=engine, upload_dir=str(tmp_path / "uploads"),
+                               reports_dir=str(tmp_path / "reports"), pause_seconds=0, **kwargs)
+
+
+def _owned_rows(engine, plan, user_ids):
+    with engine.connect() as conn:
+        return plan.count(conn, user_ids)
+
+
+def test_plan_covers_the_user_data_graph_in_delete_order(db):
+    engine, _ = db
+    plan = PurgePlan(engine)
+    names = [t.name for t in plan.tables]
+    for name in ("expenses", "jobs", "job_notes", "job_alerts", "plaid_integrations", "plaid_accounts",
+                 "plaid_transactions", "stripe_transactions", "quickbooks_expense_sync", "user_activity",
+                 "feedback", "email_verification_tokens", "category_feature_counts"):
+        assert name in names
+    assert "expense_categories" not in names and "task_runs" not in names
+    assert names.index("plaid_transactions") < names.index("plaid_accounts") < names.index("plaid_integrations")
+    assert names.index("job_notes") < names.index("jobs") and names.index("quickbooks_expense_sync") < names.index(
+        "expenses")
+    assert ("expense_id", "expenses", "id") in plan.links["plaid_transactions"]
+
+
+def test_dry_run_reports_row_counts_without_deleting(db):
+    engine, tmp_path = db
+    result = _service(engine, tmp_path).purge(dry_run=True, now=NOW)
+
+    assert result.to_purge_count == 3 and result.skipped_active_count == 1 and result.purged_count == 2
+    assert {d["id"]: d["status"] for d in result.details} == {1: "purge_candidate", 2: "purge_candidate",
+                                                              3: "skipped_active"}
+    assert result.row_counts["users"] == 2 and result.row_counts["expenses"] == 2
+    assert result.row_counts["plaid_transactions"] == 2 and result.row_counts["feedback"] == 2
+    assert result.files_removed == 1  # only the receipt under the upload root would go
+    with engine.connect() as conn:
+        assert conn.execute(select(func.count()).select_from(Base.metadata.tables["users"])).scalar() == 5
+    assert (tmp_path / "uploads" / "receipts" / "r1.jpg").exists()
+
+
+def test_purge_deletes_each_table_with_one_statement_per_chunk(db):
+    engine, tmp_path = db
+    plan = PurgePlan(engine)
+    before = _owned_rows(engine, plan, [3, 4, 5])
+    statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _log(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("DELETE"):
+            statements.append(statement)
+
+    result = _service(engine, tmp_path, chunk_size=10).purge(dry_run=False, now=NOW)
+
+    assert result.purged_count == 2 and result.chunks == 1
+    assert len(statements) == len(plan.tables) + 1  # not one per user or per row
+    assert {d["id"]: d["status"] for d in result.details}[1] == "purged"
+    assert all(count == 0 for count in _owned_rows(engine, plan, [1, 2]).values())
+    assert _owned_rows(engine, plan, [3, 4, 5]) == before  # other users untouched
+
+    assert not (tmp_path / "uploads" / "receipts" / "r1.jpg").exists()
+    assert (tmp_path / "elsewhere.jpg").exists()
+    assert not (tmp_path / "reports" / "1").exists()
+    assert result.files_removed == 2  # receipt + rendered report
+    assert result.row_counts["expenses"] == 2 and result.row_counts["users"] == 2
+
+
+def test_chunks_commit_separately_and_recheck_users_inside_the_transaction(db):
+    engine, tmp_path = db
+    service = _service(engine, tmp_path, chunk_size=1)
+    original = service._delete_chunk
+    calls = []
+
+    def reactivate_second(session, plan, user_ids):
+        calls.append(list(user_ids))
+        if user_ids == [2]:
+            # user 2 logged back in after candidates were picked; their chunk must skip them
+            session.execute(text("UPDATE users SET is_active = 'true' WHERE id = 2"))
+        return original(session, plan, user_ids)
+
+    service._delete_chunk = reactivate_second
+    result = service.purge(dry_run=False, now=NOW)
+
+    assert calls == [[1], [2]] and result.chunks == 2
+    assert result.purged_count == 1
+    with engine.connect() as conn:
+        remaining = {row[0] for row in conn.execute(text("SELECT id FROM users"))}
+    assert remaining == {2, 3, 4, 5}
+
+
+def test_legacy_users_only_schema_still_works(tmp_path):
+    path = tmp_path / "legacy.db"
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE users (id INTEGER PRIMARY KEY, email TEXT, is_active TEXT, "
+                             "deletion_scheduled TEXT)")
+        conn.exec_driver_sql("INSERT INTO users (email, is_active, deletion_scheduled) VALUES "
+                             "('old@example.com', 'false', '2026-01-01 00:00:00'), "
+                             "('new@example.com', 'false', NULL)")
+    engine.dispose()
+
+    service = AccountPurgeService(db_path=str(path), pause_seconds=0)
+    assert service.purge(dry_run=True, now=NOW).row_counts == {"users": 1}
+    result = service.purge(dry_run=False, now=NOW)
+    assert result.purged_count == 1 and result.row_counts == {"users": 1}
+    with service.engine.connect() as conn:
+        assert [row[0] for row in conn.execute(text("SELECT email FROM users"))] == ["new@example.com"]
+    service.engine.dispose()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/tests/test_async_db.py
+🎯 PURPOSE: Validate the AsyncSession read path against the sync engine it shares a database with
+🔗 IMPORTS: pytest, asyncio, sqlalchemy, models.async_base, utils.query_optimizer, routes.dashboard_routes
+📤 EXPORTS: Tests for async_database_url, build_async_engine, AsyncQueryOptimizer and _jobs_payload
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from models import Base, Expense, Job, User
+from models.async_base import async_database_url, build_async_engine
+from models.base import build_engine
+from routes.dashboard_routes import _jobs_payload
+from utils.query_optimizer import AsyncQueryOptimizer, QueryOptimizer
+
+
+class _NoCache:
+    def get(self, key):
+        return None
+
+    def setex(self, key, ttl, value):
+        pass
+
+
+@pytest.fixture
+def seeded(tmp_path):
+    url = f"sqlite:///{tmp_path / 'async.db'}"
+    engine = build_engine(url)
+    Base.metadata.create_all(engine)
+    now = datetime.utcnow()
+    with sessionmaker(bind=engine)() as db:
+        user = User(email="async@example.com", hashed_password="x")
+        db.add(user)
+        db.flush()
+        db.add_all([
+            Job(user_id=user.id, job_id="JOB-1", job_name="Kitchen", quoted_amount=1000, status="active"),
+            Job(user_id=user.id, job_id="JOB-2", job_name="Deck", quoted_amount=500, status="completed"),
+        ])
+        for n, (cents, job_id) in enumerate([(10000, "JOB-1"), (2500, "JOB-1"), (7000, "JOB-2"), (999, None)]):
+            db.add(Expense(user_id=user.id, amount_cents=cents, description=f"expense {n}",
+                           vendor="Home Depot", job_id=job_id, expense_date=now - timedelta(days=n)))
+        db.commit()
+        user_id = user.id
+    yield url, engine, user_id
+    engine.dispose()
+
+
+def _read(url, fn):
+    async def run():
+        engine = build_async_engine(url)
+        try:
+            async with async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)() as db:
+                return await fn(db)
+        finally:
+            await engine.dispose()
+    return asyncio.run(run())
+
+
+def test_async_database_url_maps_the_driver():
+    assert async_database_url("sqlite:///./cora.db") == "sqlite+aiosqlite:///./cora.db"
+    assert async_database_url("postgresql://u:p@db/cora") == "postgresql+asyncpg://u:p@db/cora"
+    with pytest.raises(ValueError):
+        async_database_url("mysql://u:p@db/cora")
+
+
+def test_async_expense_list_matches_the_sync_optimizer(seeded):
+    url, engine, user_id = seeded
+    with sessionmaker(bind=engine)() as db:
+        expected = QueryOptimizer(db, _NoCache()).get_expenses_optimized(user_id)
+
+    async def fetch(db):
+        return await AsyncQueryOptimizer(db, _NoCache()).get_expenses_optimized(user_id)
+
+    assert _read(url, fetch) == expected
+    assert [e["amount_cents"] for e in expected] == [10000, 2500, 7000, 999]
+
+
+def test_jobs_payload_totals_costs_per_job(seeded):
+    url, _, user_id = seeded
+    start, end = datetime.utcnow() - timedelta(days=30), datetime.utcnow()
+
+    async def fetch(db):
+        return await _jobs_payload(db, user_id, start, end)
+
+    jobs = {j["name"]: j for j in _read(url, fetch)}
+    assert jobs["Kitchen"]["cost"] == 125.0 and jobs["Kitchen"]["profit"] == 875.0
+    assert jobs["Deck"]["cost"] == 70.0 and jobs["Deck"]["margin"] == 86.0
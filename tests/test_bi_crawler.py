@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/tests/test_bi_crawler.py
+🎯 PURPOSE: Validate the concurrent, conditional-GET BI snapshot crawler against a local fixture server
+🔗 IMPORTS: pytest, http.server, scripts.bi.snapshot
+📤 EXPORTS: Tests for crawl_sources and CrawlState
+"""
+
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import pytest
+
+import scripts.bi.snapshot as snapshot
+from scripts.bi.snapshot import CRAWL_INDEX_FILE, CRAWL_RESULTS_FILE, crawl_sources, make_session
+
+DELAY = 0.2
+
+
+class FixtureSite:
+    """Pricing pages with ETag/Last-Modified validators; per-host in-flight tracking"""
+
+    def __init__(self, validators: bool = True):
+        self.pages = {}
+        self.validators = validators
+        self.requests = []
+        self.in_flight = Counter()
+        self.max_in_flight = Counter()
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    @property
+    def port(self):
+        return self.server.server_address[1]
+
+    def url(self, path, host="127.0.0.1"):
+        return f"http://{host}:{self.port}{path}"
+
+    def _handler(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                host = self.headers.get("Host")
+                with site.lock:
+                    site.requests.append({"path": self.path, "if_none_match": self.headers.get("If-None-Match"),
+                                          "if_modified_since": self.headers.get("If-Modified-Since")})
+                    site.in_flight[host] += 1
+                    site.max_in_flight[host] = max(site.max_in_flight[host], site.in_flight[host])
+                time.sleep(DELAY)
+                with site.lock:
+                    site.in_flight[host] -= 1
+                body = site.pages.get(self.path)
+                if body is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                etag = f'"{abs(hash(body))}"'
+                if site.validators and self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                data = body.encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                if site.validators:
+                    self.send_header("ETag", etag)
+                    self.send_header("Last-Modified", "Mon, 01 Jun 2026 00:00:00 GMT")
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _page(price):
+    return f"<html><body><div class='pricing'>Solo plan ${price}/mo</div></body></html>"
+
+
+@pytest.fixture
+def cache_base(tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshot, "CACHE_BASE_PATH", tmp_path)
+    return tmp_path
+
+
+def _day(cache_base, name):
+    path = cache_base / name
+    path.mkdir()
+    return path
+
+
+def _sources(site, count):
+    hosts = ("127.0.0.1", "localhost")
+    sources = []
+    for n in range(count):
+        site.pages[f"/vendor{n}/pricing"] = _page(10 + n)
+        sources.append({"name": f"Vendor {n}", "urls": [site.url(f"/vendor{n}/pricing", hosts[n % 2])]})
+    return sources
+
+
+def test_crawl_runs_sources_concurrently_within_per_host_limits(cache_base):
+    site = FixtureSite()
+    try:
+        sources = _sources(site, 12)
+        today = _day(cache_base, "2026-06-02")
+        started = time.time()
+        results, crawl = crawl_sources(sources, today, make_session(), workers=12, host_concurrency=3)
+        elapsed = time.time() - started
+    finally:
+        site.close()
+
+    # 12 pages at 0.2s each: serial would take 2.4s; two hosts x 3 slots bound it at ~0.4s
+    assert elapsed < 12 * DELAY / 2
+    assert max(site.max_in_flight.values()) == 3 and len(site.max_in_flight) == 2
+    assert [r["vendor"] for r in results] == [s["name"] for s in sources]
+    assert all(r["urls_processed"][0]["status"] == "success" for r in results)
+    assert crawl.stats["extracted"] == 12
+
+    lines = (today / CRAWL_RESULTS_FILE).read_text().splitlines()
+    assert sorted(json.loads(line)["vendor"] for line in lines) == sorted(s["name"] for s in sources)
+    index = json.loads((today / CRAWL_INDEX_FILE).read_text())
+    entry = index[sources[0]["urls"][0]]
+    assert entry["etag"] and entry["sha256"] and entry["snippets"] == ["Solo plan $10/mo"]
+    assert (today / entry["html_file"]).exists()
+
+
+def test_next_run_sends_conditional_requests_and_skips_unchanged_pages(cache_base):
+    site = FixtureSite()
+    try:
+        sources = _sources(site, 4)
+        crawl_sources(sources, _day(cache_base, "2026-06-01"), make_session(), workers=4)
+        site.pages["/vendor3/pricing"] = _page(99)
+        site.requests.clear()
+
+        today = _day(cache_base, "2026-06-02")
+        with patch.object(snapshot, "extract_pricing_snippets", wraps=snapshot.extract_pricing_snippets) as extract:
+            results, crawl = crawl_sources(sources, today, make_session(), workers=4)
+    finally:
+        site.close()
+
+    assert crawl.baseline_dir == cache_base / "2026-06-01"
+    assert all(r["if_none_match"] and r["if_modified_since"] for r in site.requests)
+    assert crawl.stats["not_modified"] == 3 and crawl.stats["unchanged"] == 3 and crawl.stats["extracted"] == 1
+    assert extract.call_count == 1  # only the page that changed was parsed
+    assert [r["urls_processed"][0].get("unchanged", False) for r in results] == [True, True, True, False]
+    assert results[0]["urls_processed"][0]["snippets_found"] == 1
+
+    # Unchanged pages still get today's HTML, JSON and index entries
+    slug = snapshot.sanitize_filename(sources[0]["urls"][0])
+    assert (today / f"{slug}.html").read_text() == _page(10)
+    assert json.loads((today / f"{slug}.json").read_text())["snippets"] == ["Solo plan $10/mo"]
+    index = json.loads((today / CRAWL_INDEX_FILE).read_text())
+    assert index[sources[3]["urls"][0]]["snippets"] == ["Solo plan $99/mo"] and len(index) == 4
+
+
+def test_content_hash_skips_extraction_when_the_server_sends_no_validators(cache_base):
+    site = FixtureSite(validators=False)
+    try:
+        sources = _sources(site, 3)
+        crawl_sources(sources, _day(cache_base, "2026-06-01"), make_session())
+        site.pages["/vendor0/pricing"] = _page(55)
+        site.requests.clear()
+        with patch.object(snapshot, "extract_pricing_snippets", wraps=snapshot.extract_pricing_snippets) as extract:
+            results, crawl = crawl_sources(sources, _day(cache_base, "2026-06-02"), make_session())
+    finally:
+        site.close()
+
+    assert not any(r["if_none_match"] or r["if_modified_since"] for r in site.requests)
+    assert crawl.stats["not_modified"] == 0 and crawl.stats["unchanged"] == 2 and extract.call_count == 1
+    assert results[0]["urls_processed"][0]["snippets_found"] == 1
+
+
+def test_failed_sources_are_reported_without_stopping_the_crawl(cache_base):
+    site = FixtureSite()
+    try:
+        sources = _sources(site, 2) + [{"name": "Gone", "urls": [site.url("/missing")]}]
+        today = _day(cache_base, "2026-06-02")
+        results, crawl = crawl_sources(sources, today, make_session(retries=0))
+    finally:
+        site.close()
+
+    assert [r["urls_processed"][0]["status"] for r in results] == ["success", "success", "error"]
+    assert len((today / CRAWL_RESULTS_FILE).read_text().splitlines()) == 3
+    assert site.url("/missing") not in json.loads((today / CRAWL_INDEX_FILE).read_text())
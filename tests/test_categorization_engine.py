@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/tests/test_categorization_engine.py
+🎯 PURPOSE: Validate the compiled categorization engine and the ingestion paths built on it
+🔗 IMPORTS: pytest, services.categorization_engine, services.plaid_service, services.stripe_service
+📤 EXPORTS: Tests for KeywordAutomaton, RuleMatcher, ExpenseCategorizer and batch mapping
+"""
+
+import random
+
+from services.categorization_engine import (
+    KeywordAutomaton, RuleMatcher, expense_categorizer, receipt_matcher, receipt_vendor_matcher
+)
+from services.plaid_service import PlaidService
+from services.stripe_service import StripeService
+
+
+def test_automaton_finds_overlapping_patterns_like_substring_search():
+    patterns = ["he", "she", "his", "hers", "gas", "gasoline", "ab", "bab"]
+    automaton = KeywordAutomaton(patterns)
+    assert {patterns[i] for i in automaton.find("USHERS filled Gasoline")} == {"he", "she", "hers", "gas",
+                                                                             "gasoline"}
+    rng = random.Random(7)
+    for _ in range(2000):
+        text = "".join(rng.choice("abehirsglno ") for _ in range(rng.randint(0, 12)))
+        assert automaton.find(text) == {i for i, p in enumerate(patterns) if p in text}
+    assert automaton.find(None) == set()
+
+
+def test_expense_scores_match_the_pattern_model():
+    assert expense_categorizer.categorize("2x4 framing lumber", "Home Depot") == ("Materials - Lumber", 95)
+    assert expense_categorizer.categorize("coffee with client", "Starbucks", 800) == ("Meals & Entertainment", 80)
+    assert expense_categorizer.categorize("gas", None) == ("Equipment - Fuel", 20)  # tie: earlier category
+    assert expense_categorizer.categorize("misc", None) == ("Other", 0)
+    assert expense_categorizer.categorize("", None, 60000) == ("Professional Development", 10)
+
+
+def test_first_match_follows_table_order():
+    matcher = RuleMatcher({"fuel": ["gas"], "utilities": ["gas", "water"]}, default="other")
+    assert matcher.match("GAS and water") == "fuel"
+    assert matcher.match("water bill") == "utilities"
+    assert matcher.match(None, "nothing") == "other"
+    assert receipt_matcher.match("Shell gas station") == "transportation"
+    assert receipt_vendor_matcher.match("Corner Store") is None
+
+
+def test_batch_apis_agree_with_single_calls():
+    rows = [("lumber", "Lowes", 5000), ("uber ride", None, 2500), ("lumber", "Lowes", 5000), ("", "", None)]
+    assert expense_categorizer.categorize_many(rows) == [expense_categorizer.categorize(*r) for r in rows]
+
+    plaid = PlaidService.__new__(PlaidService)  # category mapping needs no API client
+    transactions = [
+        {"category": ["Travel"], "merchant_name": "Delta", "name": "DELTA AIR"},
+        {"category": [], "merchant_name": "Starbucks", "name": "STARBUCKS 123"},
+        {"merchant_name": None, "name": "VERIZON WIRELESS"},
+        {"merchant_name": "Starbucks", "name": "STARBUCKS 123"},
+    ]
+    assert plaid._map_plaid_categories(transactions) == [plaid._map_plaid_to_cora_category(t) for t in transactions]
+    assert plaid._map_plaid_categories(transactions)[:3] == ["Travel", "Meals & Entertainment", "Utilities"]
+
+    stripe = StripeService.__new__(StripeService)
+    charges = [
+        {"description": "Team lunch", "transaction_metadata": {}},
+        {"description": "Anything", "transaction_metadata": {"category": "Travel"}},
+        {"description": None, "transaction_metadata": {}},
+    ]
+    assert stripe._map_stripe_categories(charges) == ["Meals & Entertainment", "Travel", "Office Supplies"]
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/tests/test_category_model.py
+🎯 PURPOSE: Validate incremental categorization counts, cached per-user models and the rebuild path
+🔗 IMPORTS: pytest, sqlalchemy, models.category_model, services.category_model
+📤 EXPORTS: Tests for CategoryFeatureCount upkeep and CategoryModelStore
+"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from models import Base, Expense, ExpenseCategory, User
+from models.category_model import CategoryFeatureCount
+from services.category_model import CategoryModelStore, category_models
+from services.profit_leak_detector import ProfitLeakDetector
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'categories.db'}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([User(id=1, email="a@example.com", hashed_password="x"),
+                     User(id=2, email="b@example.com", hashed_password="x"),
+                     ExpenseCategory(id=1, name="Materials"), ExpenseCategory(id=2, name="Fuel")])
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _expense(user_id, category_id, description, vendor, amount_cents):
+    return Expense(user_id=user_id, category_id=category_id, description=description, vendor=vendor,
+                   amount_cents=amount_cents, expense_date=datetime(2026, 1, 5))
+
+
+def _counts(db):
+    return {(r.user_id, r.kind, r.feature, r.category_id): r.count
+            for r in db.scalars(select(CategoryFeatureCount)) if r.count}
+
+
+def test_incremental_counts_match_a_full_rebuild(db):
+    lumber = _expense(1, 1, "framing lumber order", "Home Depot", 45000)
+    diesel = _expense(1, 2, "diesel for truck", "Shell", 9000)
+    other = _expense(2, 1, "lumber", "Lowes", 1000)
+    db.add_all([lumber, diesel, other, _expense(1, None, "uncategorized", "Shell", 500)])
+    db.commit()
+    assert _counts(db)[(1, "token", "lumber", 1)] == 1
+
+    diesel.category_id = 1          # recategorize
+    lumber.description = "lumber"   # edit
+    db.commit()
+    db.delete(other)
+    db.commit()
+
+    lumber.vendor = "Lowes"
+    db.rollback()                   # never flushed: no change
+
+    incremental = _counts(db)
+    assert (2, "token", "lumber", 1) not in incremental
+    assert (1, "vendor", "shell", 2) not in incremental
+    assert incremental[(1, "vendor", "shell", 1)] == 1
+
+    assert CategoryModelStore().rebuild(db) == {"users": 1, "expenses": 2, "rows": len(incremental)}
+    assert _counts(db) == incremental
+
+
+def test_suggestions_follow_committed_writes(db):
+    db.add_all([_expense(1, 1, "lumber delivery", "Home Depot", 30000),
+                _expense(1, 1, "lumber", "Home Depot", 12000),
+                _expense(1, 2, "diesel", "Shell", 8000)])
+    db.commit()
+    category_models.invalidate()
+
+    detector = ProfitLeakDetector(db, 1)
+    result = detector.intelligent_expense_categorization("more lumber", "Home Depot", 150)
+    assert result["suggested_category"] == "Materials" and result["alternatives"] == ["Fuel"]
+    assert category_models.suggest(db, 1, "diesel", "shell", 9000)[0] == ("Fuel", 4)
+
+    hits = category_models.stats["hits"]
+    db.add(_expense(1, 2, "diesel", "Shell", 9000))
+    db.commit()
+    assert category_models.suggest(db, 1, "diesel", "shell", 9000)[0] == ("Fuel", 8)
+    assert category_models.stats["hits"] == hits + 1  # served from the cache, updated in place
+
+    assert detector.intelligent_expense_categorization("xyz", "", 0)["suggested_category"] == "General"
+    assert ProfitLeakDetector(db, 2).intelligent_expense_categorization("lumber")["suggested_category"] == "Materials"
+
+
+def test_store_backfills_missing_counts_and_evicts_least_recent(db):
+    db.add_all([_expense(1, 1, "lumber", "Lowes", 1000), _expense(2, 2, "diesel", "Shell", 1000)])
+    db.commit()
+    db.query(CategoryFeatureCount).delete()  # data written before the counts existed
+    db.commit()
+
+    store = CategoryModelStore(max_users=1, ttl_seconds=60)
+    assert store.suggest(db, 1, "lumber")[0] == ("Materials", 2)
+    assert store.stats["backfills"] == 1
+    assert store.suggest(db, 2, "diesel")[0] == ("Fuel", 2)
+    assert store.get_stats()["users"] == 1 and store.stats["evictions"] == 1
+    assert store.suggest(db, 1, "lumber")[0] == ("Materials", 2)
+    assert store.stats["backfills"] == 2  # one per user; counts persisted, no repeat
+
+
+def test_counts_table_survives_a_rolled_back_first_request(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+    tables = [t for t in Base.metadata.sorted_tables if t.name != CategoryFeatureCount.__tablename__]
+    Base.metadata.create_all(bind=engine, tables=tables)
+    Session = sessionmaker(bind=engine)
+    with Session() as setup:
+        setup.add_all([User(id=1, email="a@example.com", hashed_password="x"), ExpenseCategory(id=1, name="Materials")])
+        setup.commit()
+
+    first = Session()
+    first.add(_expense(1, 1, "lumber", "Lowes", 1000))
+    first.flush()
+    first.rollback()  # like get_db closing a request without committing
+    first.close()
+
+    with Session() as second:
+        second.add(_expense(1, 1, "framing lumber", "Lowes", 2000))
+        second.commit()
+        assert _counts(second)[(1, "token", "lumber", 1)] == 1
+        assert CategoryModelStore().suggest(second, 1, "lumber")[0] == ("Materials", 2)
+    engine.dispose()
+
+
+def test_counts_table_is_created_after_the_session_already_wrote(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}", connect_args={"timeout": 1})
+    tables = [t for t in Base.metadata.sorted_tables if t.name != CategoryFeatureCount.__tablename__]
+    Base.metadata.create_all(bind=engine, tables=tables)
+    with sessionmaker(bind=engine)() as session:
+        session.add_all([User(id=1, email="a@example.com", hashed_password="x"), ExpenseCategory(id=1, name="Materials")])
+        session.flush()  # the session now holds SQLite's write lock
+        session.add(_expense(1, 1, "lumber", "Lowes", 1000))
+        session.commit()
+        assert _counts(session)[(1, "token", "lumber", 1)] == 1
+    engine.dispose()
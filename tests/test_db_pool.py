@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/tests/test_db_pool.py
+🎯 PURPOSE: Validate engine pool sizing, pool metrics, leak detection and session helpers
+🔗 IMPORTS: pytest, sqlalchemy, models.base, utils.db_pool
+📤 EXPORTS: Tests for pool_settings, build_engine, PoolMonitor and with_session
+"""
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from models import base
+from utils.db_pool import MonitoredQueuePool, PoolMonitor, pool_monitor
+
+
+def test_pool_settings_match_the_dialect():
+    sqlite = base.pool_settings("sqlite:////tmp/cora.db")
+    assert sqlite["poolclass"] is MonitoredQueuePool
+    assert (sqlite["pool_size"], sqlite["max_overflow"]) == (5, 0)
+    assert sqlite["connect_args"]["check_same_thread"] is False
+
+    postgres = base.pool_settings("postgresql://u:p@localhost/cora")
+    assert (postgres["pool_size"], postgres["max_overflow"]) == (20, 30)
+    assert "connect_args" not in postgres
+
+    assert base.pool_settings("sqlite://")["poolclass"] is StaticPool
+
+
+def test_engine_counts_checkouts_and_flags_leaks(tmp_path, monkeypatch):
+    engine = base.build_engine(f"sqlite:///{tmp_path / 'pool.db'}", pool_size=2)
+    monitor = PoolMonitor(leak_seconds=0)
+    monitor.install(engine)
+    monkeypatch.setattr(pool_monitor, "leak_seconds", 3600)
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        assert len(monitor.held()) == 1
+    assert monitor.held() == []
+    assert monitor.stats["checkouts"] == 1
+
+    leaked = engine.connect()
+    try:
+        assert len(monitor.check_leaks()) == 1
+        assert len(monitor.check_leaks()) == 1  # still held, logged only once
+        assert monitor.stats["leaks"] == 1
+        status = monitor.sample()
+        assert status["checked_out"] == 1 and status["pool_size"] == 2
+    finally:
+        leaked.close()
+        engine.dispose()
+    assert monitor.held() == []
+
+
+def test_pool_timeout_is_counted(tmp_path):
+    engine = base.build_engine(f"sqlite:///{tmp_path / 'wait.db'}", pool_size=1, max_overflow=0,
+                               pool_timeout=0.05)
+    before = pool_monitor.stats["timeouts"]
+    holder = engine.connect()
+    try:
+        with pytest.raises(Exception):
+            engine.connect()
+    finally:
+        holder.close()
+        engine.dispose()
+    assert pool_monitor.stats["timeouts"] == before + 1
+    assert pool_monitor.stats["wait_seconds_max"] >= 0.05
+
+
+def test_with_session_commits_and_rolls_back(tmp_path, monkeypatch):
+    engine = base.build_engine(f"sqlite:///{tmp_path / 'uow.db'}")
+    monkeypatch.setattr(base, "SessionLocal", sessionmaker(bind=engine))
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE jobs (name TEXT)"))
+
+    @base.with_session
+    def add_job(db, name, fail=False):
+        db.execute(text("INSERT INTO jobs (name) VALUES (:n)"), {"n": name})
+        if fail:
+            raise RuntimeError("job failed")
+        return name
+
+    assert add_job("kept") == "kept"
+    with pytest.raises(RuntimeError):
+        add_job("dropped", fail=True)
+
+    with engine.connect() as conn:
+        assert [row[0] for row in conn.execute(text("SELECT name FROM jobs"))] == ["kept"]
+    engine.dispose()
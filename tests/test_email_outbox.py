@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/tests/test_email_outbox.py
+🎯 PURPOSE: Validate the email outbox against the fake SendGrid sink
+🔗 IMPORTS: functools, sqlalchemy, services.email_outbox, tests.fakes.fake_email_sink
+📤 EXPORTS: Tests for EmailOutbox and RateLimiter
+"""
+
+import tempfile
+import time
+from contextlib import contextmanager
+from functools import partial
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import services.email_outbox as outbox_module
+from models import EmailOutboxMessage
+from services.email_outbox import EmailOutbox
+from services.email_service import RateLimiter, post_mail
+from tests.fakes.fake_email_sink import FakeEmailSink
+
+
+@pytest.fixture
+def temp_db(monkeypatch):
+    with tempfile.TemporaryDirectory() as td:
+        engine = create_engine(f"sqlite:///{Path(td) / 'outbox.db'}")
+        Session = sessionmaker(bind=engine)
+
+        @contextmanager
+        def scope():
+            db = Session()
+            try:
+                yield db
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+
+        monkeypatch.setattr(outbox_module, "engine", engine)
+        monkeypatch.setattr(outbox_module, "session_scope", scope)
+        yield scope
+        engine.dispose()
+
+
+@pytest.fixture
+def sink():
+    with FakeEmailSink() as s:
+        yield s
+
+
+def _outbox(sink, **kwargs):
+    kwargs.setdefault("retry_backoff", 0)
+    return EmailOutbox(transport=partial(post_mail, url=sink.url), **kwargs)
+
+
+def _statuses(scope):
+    with scope() as db:
+        return [row.status for row in db.query(EmailOutboxMessage).order_by(EmailOutboxMessage.id)]
+
+
+def test_enqueue_persists_and_delivers(temp_db, sink):
+    outbox = _outbox(sink)
+    outbox.start = lambda: None  # drive the dispatcher by hand
+    assert outbox.enqueue("a@x.com", "Hello", "body", "<p>hi</p>", from_name="CORA Alerts")
+    assert _statuses(temp_db) == ["pending"]  # committed before enqueue returns
+    assert outbox.process_due() == 1
+    assert sink.recipients == ["a@x.com"]
+    assert sink.messages[0]["from"]["name"] == "CORA Alerts"
+    assert _statuses(temp_db) == ["sent"]
+
+
+def test_dedup_key_sends_once(temp_db, sink):
+    outbox = _outbox(sink)
+    outbox.start = lambda: None
+    for _ in range(3):
+        assert outbox.enqueue("a@x.com", "Report", "body", dedup_key="weekly:1:2026-10-19")
+    assert _statuses(temp_db) == ["pending"]
+    outbox.process_due()
+    assert sink.recipients == ["a@x.com"]
+
+
+def test_transient_failures_retry_and_client_errors_are_dead(temp_db, sink):
+    outbox = _outbox(sink, max_attempts=3)
+    outbox.start = lambda: None
+    outbox.enqueue("retry@x.com", "One", "body")
+    outbox.enqueue("bad@x.com", "Two", "body")
+    sink.fail_next(1, status=503)
+    sink.fail_next(1, status=400)
+    outbox._pool = None  # deliver sequentially so failures map to rows in order
+    assert outbox.process_due() == 2
+    assert _statuses(temp_db) == ["pending", "dead"]
+    assert outbox.process_due() == 1
+    assert _statuses(temp_db) == ["sent", "dead"]
+    assert sink.recipients == ["retry@x.com"]
+
+
+def test_payload_and_transport_errors_are_recorded(temp_db, monkeypatch):
+    real_build = outbox_module.build_payload
+
+    def build_payload(to_email, *args):
+        if to_email == "gone@x.com":
+            raise OSError("attachment vanished")
+        return real_build(to_email, *args)
+
+    def transport(payload):
+        raise ValueError("socket wrapper bug")
+
+    monkeypatch.setattr(outbox_module, "build_payload", build_payload)
+    outbox = EmailOutbox(transport=transport, max_attempts=3, retry_backoff=0)
+    outbox.start = lambda: None
+    outbox.enqueue("gone@x.com", "Report", "body")
+    outbox.enqueue("flaky@x.com", "Hi", "body")
+    outbox._pool = None
+    assert outbox.process_due() == 2
+    with temp_db() as db:
+        gone, flaky = db.query(EmailOutboxMessage).order_by(EmailOutboxMessage.id).all()
+        # a message that cannot be built never heals: dead at once instead of stuck in "sending"
+        assert (gone.status, gone.attempts) == ("dead", 1) and "could not build message" in gone.last_error
+        assert (flaky.status, flaky.attempts, flaky.last_error) == ("pending", 1, "socket wrapper bug")
+
+
+def test_accepted_email_survives_a_process_that_dies_before_sending(temp_db, sink):
+    crashed = _outbox(sink)
+    crashed.start = lambda: None  # the dispatcher never runs: the process dies right after enqueue
+    assert crashed.enqueue("a@x.com", "Invoice", "body")
+
+    restarted = _outbox(sink)
+    restarted.start = lambda: None
+    assert restarted.process_due() == 1
+    assert sink.recipients == ["a@x.com"] and _statuses(temp_db) == ["sent"]
+
+
+def test_background_dispatcher_delivers(temp_db, sink):
+    outbox = _outbox(sink, poll_interval=0.05)
+    start = time.perf_counter()
+    for i in range(20):
+        outbox.enqueue(f"u{i}@x.com", "Hi", "body")
+    enqueue_seconds = time.perf_counter() - start
+    deadline = time.time() + 10
+    while len(sink.messages) < 20 and time.time() < deadline:
+        time.sleep(0.02)
+    outbox.stop()
+    assert len(sink.messages) == 20
+    assert enqueue_seconds < 0.5
+    assert outbox.stats() == {"sent": 20}
+
+
+def test_disabled_without_credentials(monkeypatch):
+    monkeypatch.setattr(outbox_module.email_service, "SENDGRID_API_KEY", "")
+    assert EmailOutbox().enqueue("a@x.com", "Hi", "body") is False
+
+
+def test_rate_limiter_paces_requests():
+    limiter = RateLimiter(50, burst=1)
+    start = time.monotonic()
+    for _ in range(6):
+        limiter.acquire()
+    assert time.monotonic() - start >= 0.08
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/tests/test_integration_http.py
+🎯 PURPOSE: Validate retries, circuit breaking, host limits and pooling of the shared integration HTTP clients
+🔗 IMPORTS: pytest, requests, http.server, services.integration_http
+📤 EXPORTS: Tests for IntegrationClient, AsyncIntegrationClient and CircuitBreaker
+"""
+
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+import services.integration_http as integration_http
+from services.integration_http import (
+    AsyncIntegrationClient, CircuitBreaker, CircuitOpenError, IntegrationClient, ProviderPolicy, provider_stats
+)
+
+
+class ScriptedServer:
+    """HTTP/1.1 server answering from a queue of (status, headers) and then 200s"""
+
+    def __init__(self, delay: float = 0.0):
+        self.script = []
+        self.delay = delay
+        self.requests = []
+        self.peers = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _answer(self):
+                length = int(self.headers.get("Content-Length", 0))
+                if length:
+                    self.rfile.read(length)
+                with server.lock:
+                    server.requests.append((self.command, self.path))
+                    server.peers.add(self.client_address)
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                    status, headers = server.script.pop(0) if server.script else (200, {})
+                time.sleep(server.delay)
+                with server.lock:
+                    server.in_flight -= 1
+                body = b'{"ok": true}'
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = _answer
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def server():
+    s = ScriptedServer()
+    yield s
+    s.close()
+
+
+@pytest.fixture(autouse=True)
+def fresh_clients():
+    integration_http.reset_clients()
+    yield
+    integration_http.reset_clients()
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    waits = []
+    monkeypatch.setattr(integration_http, "_sleep", waits.append)
+    return waits
+
+
+def _client(**overrides):
+    overrides.setdefault("backoff", 0.5)
+    return IntegrationClient("test", ProviderPolicy.for_provider("test", **overrides))
+
+
+def test_get_retries_5xx_and_honors_retry_after(server, sleeps):
+    server.script = [(503, {}), (429, {"Retry-After": "7"})]
+    response = _client(max_retries=2).get(f"{server.url}/items")
+    assert response.status_code == 200 and len(server.requests) == 3
+    assert 0.25 <= sleeps[0] <= 0.5  # equal jitter on backoff * 2**0
+    assert sleeps[1] == 7
+
+    server.script = [(500, {})] * 3
+    response = _client(max_retries=2).get(f"{server.url}/items")
+    assert response.status_code == 500  # exhausted: the last response is returned
+    assert provider_stats()["test"]["retries"] == 4
+
+
+def test_post_is_retried_on_429_but_not_on_5xx_unless_idempotent(server, sleeps):
+    client = _client(max_retries=2, max_retry_wait=5)
+    server.script = [(500, {})]
+    assert client.post(f"{server.url}/charge", json={}).status_code == 500
+    assert len(server.requests) == 1 and not sleeps
+
+    server.script = [(429, {"Retry-After": "120"})]
+    assert client.post(f"{server.url}/charge", json={}).status_code == 200
+    assert sleeps == [5]  # Retry-After capped at max_retry_wait
+
+    server.script = [(502, {})]
+    assert client.post(f"{server.url}/batch", json={}, idempotent=True).status_code == 200
+    assert len(server.requests) == 5
+
+
+def test_breaker_opens_fails_fast_and_closes_after_a_successful_trial(server, sleeps):
+    client = _client(max_retries=0, breaker_failures=3, breaker_reset=30)
+    server.script = [(500, {})] * 3
+    for _ in range(3):
+        assert client.get(f"{server.url}/x").status_code == 500
+    with pytest.raises(CircuitOpenError):
+        client.get(f"{server.url}/x")
+    assert len(server.requests) == 3  # the open circuit never reached the server
+    stats = provider_stats()["test"]
+    assert stats["circuit_open"] == 1 and stats["circuit_opened"] == 1
+    assert list(stats["circuits"].values()) == ["open"]
+
+    breaker = client.state.breaker(server.url.split("//")[1])
+    breaker.opened_at -= 31
+    assert client.get(f"{server.url}/x").status_code == 200
+    assert breaker.state == "closed" and client.get(f"{server.url}/x").status_code == 200
+
+
+def test_breaker_half_open_allows_one_trial_and_reopens_on_failure():
+    now = [0.0]
+    breaker = CircuitBreaker(failures=2, reset_seconds=10, clock=lambda: now[0])
+    breaker.record_failure()
+    assert breaker.record_failure() and not breaker.allow()
+    now[0] = 10
+    assert breaker.state == "half_open" and breaker.allow() and not breaker.allow()
+    assert breaker.record_failure() and breaker.state == "open"
+    now[0] = 25
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
+
+
+def test_client_errors_and_throttling_do_not_trip_the_breaker(server, sleeps):
+    client = _client(max_retries=0, breaker_failures=2)
+    server.script = [(404, {}), (400, {}), (429, {}), (404, {})]
+    for _ in range(4):
+        client.get(f"{server.url}/missing")
+    assert list(provider_stats()["test"]["circuits"].values()) == ["closed"]
+
+
+def test_busy_slots_and_throttling_neither_reset_nor_close_the_breaker():
+    client = _client(breaker_failures=3, breaker_reset=30)
+    host = "hung.example.com"
+    breaker = client.state.breaker(host)
+    for outcome in ("network_error", "network_error", "busy", "throttled", "network_error"):
+        client.state.record(host, outcome)
+    assert breaker.state == "open"  # the slot timeout and the 429 did not reset the count
+
+    client.state.record(host, "busy")
+    client.state.record(host, "throttled")
+    assert breaker.state == "open" and not breaker.allow()
+
+    breaker.opened_at -= 31
+    assert breaker.allow()  # trial request...
+    client.state.record(host, "throttled")  # ...answered 429: no verdict, but not stuck half-open
+    assert breaker.allow()
+    client.state.record(host, "ok")
+    assert breaker.state == "closed"
+
+
+def test_host_concurrency_is_capped_and_connections_are_reused():
+    slow = ScriptedServer(delay=0.05)
+    try:
+        client = _client(host_concurrency=3)
+        threads = [threading.Thread(target=client.get, args=(f"{slow.url}/{n}",)) for n in range(12)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(slow.requests) == 12 and slow.max_in_flight == 3
+        assert len(slow.peers) <= 3  # keep-alive: at most one connection per slot
+
+        slow.peers.clear()
+        for n in range(5):
+            client.get(f"{slow.url}/seq/{n}")
+        assert len(slow.peers) == 1
+    finally:
+        slow.close()
+
+
+def test_network_errors_retry_only_idempotent_requests(sleeps):
+    client = _client(max_retries=2, timeout=0.5)
+    with pytest.raises(requests.ConnectionError):
+        client.get("http://127.0.0.1:9/unreachable")
+    assert len(sleeps) == 2
+    sleeps.clear()
+    with pytest.raises(requests.ConnectionError):
+        client.post("http://127.0.0.1:9/unreachable", json={})
+    assert not sleeps
+    assert provider_stats()["test"]["network_error"] == 4
+
+
+def test_observe_records_sdk_calls_against_the_breaker():
+    client = _client(breaker_failures=2)
+
+    class ApiError(Exception):
+        def __init__(self, status):
+            self.status = status
+
+    for status in (400, 500, 503):
+        with pytest.raises(ApiError):
+            with client.observe("sdk.example.com"):
+                raise ApiError(status)
+    with pytest.raises(CircuitOpenError):
+        with client.observe("sdk.example.com"):
+            pass
+    stats = provider_stats()["test"]
+    assert stats["client_error"] == 1 and stats["server_error"] == 2 and stats["circuit_open"] == 1
+
+
+def test_async_client_retries_and_shares_breaker_and_stats_with_sync(server, monkeypatch):
+    waits = []
+
+    async def no_sleep(seconds):
+        waits.append(seconds)
+
+    monkeypatch.setattr(integration_http.asyncio, "sleep", no_sleep)
+    policy = ProviderPolicy.for_provider("test", max_retries=1, breaker_failures=3)
+    server.script = [(503, {"Retry-After": "2"})]
+
+    async def run():
+        client = AsyncIntegrationClient("test", policy)
+        try:
+            first = await client.get(f"{server.url}/a")
+            results = await asyncio.gather(*(client.get(f"{server.url}/b/{n}") for n in range(10)))
+            return first, results
+        finally:
+            await client.aclose()
+
+    first, results = asyncio.run(run())
+    assert first.status_code == 200 and waits == [2]
+    assert all(r.status_code == 200 for r in results)
+
+    IntegrationClient("test", policy).get(f"{server.url}/sync")
+    stats = provider_stats()["test"]
+    assert stats["requests"] == 13 and stats["ok"] == 12 and stats["server_error"] == 1
+    assert stats["p50_seconds"] is not None and stats["p95_seconds"] >= stats["p50_seconds"]
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/tests/test_knowledge_index.py
+🎯 PURPOSE: Validate knowledge index lookups, prompt snippets and hot reload
+🔗 IMPORTS: json, os, tempfile, services.knowledge_index
+📤 EXPORTS: Tests for KnowledgeIndex
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from services.knowledge_index import KnowledgeIndex, tokenize
+
+
+KNOWLEDGE = {
+    "pricing": {"tiers": [
+        {"name": "BASIC", "price": 47, "description": "Essential Profit Tracking"},
+        {"name": "PROFESSIONAL", "price": 97, "description": "With Profit Intelligence"},
+    ]},
+    "features": {"core": {"voice_entry": {"description": "Speak expenses from the truck"}}},
+    "integrations_guide": {"quickbooks": {"name": "QuickBooks Online", "setup": "Connect in settings"}},
+    "comparisons": {"quickbooks": {"advantages": ["Built for contractors"]}},
+}
+
+
+def _write(path: Path, data) -> None:
+    path.write_text(json.dumps(data))
+
+
+def _index(td: str) -> KnowledgeIndex:
+    kb = Path(td) / "kb.json"
+    _write(kb, KNOWLEDGE)
+    return KnowledgeIndex(sources={"knowledge": kb}, check_interval=0)
+
+
+def test_tokenize_drops_stopwords_and_folds_plurals():
+    assert tokenize("How much are the Integrations?") == ["much", "integration"]
+
+
+def test_structured_lookups():
+    with tempfile.TemporaryDirectory() as td:
+        idx = _index(td)
+        assert idx.pricing_tier("professional")["price"] == 97
+        assert idx.pricing_tier("missing") == {}
+        assert idx.feature("voice")["description"].startswith("Speak")
+        assert idx.integration("quickbooks online")["setup"] == "Connect in settings"
+        assert idx.comparison("QuickBooks")["advantages"] == ["Built for contractors"]
+
+
+def test_relevant_context_only_includes_matching_snippets():
+    with tempfile.TemporaryDirectory() as td:
+        idx = _index(td)
+        context = idx.relevant_context("what does the professional price include?")
+        assert "PROFESSIONAL" in context
+        assert "voice_entry" not in context
+        assert idx.relevant_context("zzzz") == ""
+
+
+def test_reload_on_file_change():
+    with tempfile.TemporaryDirectory() as td:
+        idx = _index(td)
+        first = idx.version
+        kb = Path(td) / "kb.json"
+        updated = dict(KNOWLEDGE, pricing={"tiers": [{"name": "BASIC", "price": 59}]})
+        _write(kb, updated)
+        st = kb.stat()
+        os.utime(kb, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        assert idx.pricing_tier("basic")["price"] == 59
+        assert idx.version != first
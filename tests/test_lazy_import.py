@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/tests/test_lazy_import.py
+🎯 PURPOSE: Validate deferred SDK imports and that a worker boot does not load them
+🔗 IMPORTS: subprocess, sys, utils.lazy_import
+📤 EXPORTS: Tests for LazyModule, lazy_import and warm_up
+"""
+
+import os
+import subprocess
+import sys
+
+from utils.lazy_import import WARM_UP_MODULES, lazy_import, warm_up
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _fake_sdk(tmp_path, monkeypatch, name="fake_sdk"):
+    (tmp_path / f"{name}.py").write_text("api_key = None\nclass Client:\n    def __init__(self, key):\n        self.key = key\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, name, raising=False)
+    return name
+
+
+def test_proxy_imports_on_first_use_and_forwards_state(tmp_path, monkeypatch):
+    name = _fake_sdk(tmp_path, monkeypatch)
+    sdk = lazy_import(name)
+    assert name not in sys.modules and not sdk.is_loaded
+
+    sdk.api_key = "sk_test"
+    assert sys.modules[name].api_key == "sk_test"
+    assert sdk.Client(sdk.api_key).key == "sk_test"
+
+    client_cls = lazy_import(name, "Client")
+    assert client_cls("k").key == "k"
+
+
+def test_optional_missing_sdk_is_none_and_warm_up_skips_it(tmp_path, monkeypatch):
+    assert lazy_import("cora_missing_sdk", optional=True) is None
+    name = _fake_sdk(tmp_path, monkeypatch)
+    assert lazy_import(name, optional=True) is not None
+    assert name not in sys.modules
+
+    timings = warm_up([name, "cora_missing_sdk"])
+    assert list(timings) == [name]
+    assert name in sys.modules
+
+
+def test_worker_boot_does_not_import_deferred_sdks():
+    env = dict(os.environ, ENV="testing", SECRET_KEY="lazy-import-test", ALLOWED_HOSTS="*",
+               DATABASE_URL="sqlite:////tmp/cora_lazy_import_test.db")
+    probe = "import app, sys; print('@@' + ','.join(m for m in sys.argv[1:] if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", probe, *WARM_UP_MODULES], cwd=ROOT, env=env,
+                            capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr[-2000:]
+    loaded = next(line[2:] for line in result.stdout.splitlines() if line.startswith("@@"))
+    assert loaded == ""
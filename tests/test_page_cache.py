@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/tests/test_page_cache.py
+🎯 PURPOSE: Validate the rendered-page cache used by public marketing, SEO and blog routes
+🔗 IMPORTS: os, fastapi, utils.page_cache
+📤 EXPORTS: Tests for PageCache and cached_page
+"""
+
+import os
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import HTMLResponse
+from fastapi.testclient import TestClient
+
+from utils.page_cache import PageCache, cached_page
+
+
+def _app(cache, renders):
+    app = FastAPI()
+
+    @app.get("/page")
+    @cached_page(vary_query=("lang",), cache=cache)
+    async def page(request: Request):
+        renders.append(request.url.path)
+        return HTMLResponse(f"<h1>render {len(renders)}</h1>")
+
+    @app.get("/cookie")
+    @cached_page(cache=cache)
+    async def cookie(request: Request):
+        renders.append(request.url.path)
+        response = HTMLResponse("<h1>hi</h1>")
+        response.set_cookie("session", "x")
+        return response
+
+    return app
+
+
+def _cache(tmp_path, **kwargs):
+    template = tmp_path / "index.html"
+    template.write_text("<h1>v1</h1>")
+    return PageCache(watch=[tmp_path], check_seconds=0, **kwargs), template
+
+
+def test_hit_miss_and_conditional_requests(tmp_path):
+    cache, _ = _cache(tmp_path)
+    renders = []
+    client = TestClient(_app(cache, renders))
+
+    first = client.get("/page")
+    second = client.get("/page")
+    assert first.headers["x-page-cache"] == "MISS"
+    assert second.headers["x-page-cache"] == "HIT"
+    assert second.text == first.text == "<h1>render 1</h1>"
+    assert second.headers["content-type"].startswith("text/html")
+    assert client.get("/page?lang=es").headers["x-page-cache"] == "MISS"
+    assert client.get("/page?utm_source=ad").headers["x-page-cache"] == "HIT"
+
+    not_modified = client.get("/page", headers={"If-None-Match": first.headers["etag"]})
+    assert not_modified.status_code == 304 and not_modified.content == b""
+    since = client.get("/page", headers={"If-Modified-Since": first.headers["last-modified"]})
+    assert since.status_code == 304
+    assert len(renders) == 2
+    assert cache.get_stats()["not_modified"] == 2
+
+
+def test_credentials_and_set_cookie_bypass(tmp_path):
+    cache, _ = _cache(tmp_path)
+    renders = []
+    client = TestClient(_app(cache, renders))
+
+    client.get("/page", headers={"Authorization": "Bearer t"})
+    client.get("/page", cookies={"access_token": "t"})
+    assert "x-page-cache" not in client.get("/page", headers={"Authorization": "Bearer t"}).headers
+    client.get("/cookie")
+    assert client.get("/cookie").headers.get("set-cookie")
+    assert len(renders) == 5
+    assert len(cache) == 0
+
+
+def test_template_change_invalidates_everything(tmp_path):
+    cache, template = _cache(tmp_path)
+    renders = []
+    client = TestClient(_app(cache, renders))
+
+    client.get("/page")
+    assert client.get("/page").headers["x-page-cache"] == "HIT"
+    stat = template.stat()
+    os.utime(template, (stat.st_atime, stat.st_mtime + 10))
+    assert client.get("/page").headers["x-page-cache"] == "HIT"  # requests never rescan
+    cache.refresh()  # what the watcher thread does every PAGE_CACHE_CHECK_SECONDS
+    response = client.get("/page")
+    assert response.headers["x-page-cache"] == "MISS"
+    assert response.text == "<h1>render 2</h1>"
+    assert cache.get_stats()["invalidations"] == 1
+
+
+def test_lru_bound(tmp_path):
+    cache, _ = _cache(tmp_path, max_entries=2)
+    renders = []
+    client = TestClient(_app(cache, renders))
+
+    for lang in ("a", "b", "a", "c"):
+        client.get(f"/page?lang={lang}")
+    assert len(cache) == 2
+    assert client.get("/page?lang=a").headers["x-page-cache"] == "HIT"
+    assert client.get("/page?lang=b").headers["x-page-cache"] == "MISS"
+
+
+def test_requests_never_scan_and_the_watcher_picks_up_changes(tmp_path):
+    template = tmp_path / "index.html"
+    template.write_text("<h1>v1</h1>")
+    cache = PageCache(watch=[tmp_path], check_seconds=0.02)
+    scans = []
+    real_scan = cache._scan_mtime
+    cache._scan_mtime = lambda: scans.append(1) or real_scan()
+    renders = []
+    client = TestClient(_app(cache, renders))
+
+    cache.start()
+    try:
+        assert len(scans) == 1  # at startup, before any request
+        cache.stop()
+        scans.clear()
+        for _ in range(5):
+            client.get("/page")
+        assert scans == [] and len(renders) == 1
+
+        cache.start()
+        stat = template.stat()
+        os.utime(template, (stat.st_atime, stat.st_mtime + 10))
+        deadline = time.time() + 5
+        while cache.get_stats()["invalidations"] == 0 and time.time() < deadline:
+            time.sleep(0.01)
+        assert client.get("/page").headers["x-page-cache"] == "MISS"
+    finally:
+        cache.stop()
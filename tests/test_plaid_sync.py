@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/tests/test_plaid_sync.py
+🎯 PURPOSE: Validate cursor-based Plaid sync, concurrent item sync and the webhook against the local Plaid stand-in
+🔗 IMPORTS: pytest, fastapi, sqlalchemy, services.plaid_service, tests.fakes.fake_plaid_server
+📤 EXPORTS: Tests for PlaidService.sync_transactions, sync_items and the /webhook route
+"""
+
+import asyncio
+import json
+import time
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from config import config
+from models import Base, Expense, ExpenseCategory, User, get_db
+from models.plaid_integration import (
+    PlaidAccount, PlaidIntegration, PlaidSyncCursor, PlaidSyncHistory, PlaidTransaction
+)
+from services.plaid_service import (ItemSyncScheduler, PlaidService, PlaidWebhookVerifier, WebhookVerificationError,
+                                    sync_items)
+from tests.fakes.fake_plaid_server import FakePlaidServer
+
+MUTATION = "TRANSACTIONS_SYNC_MUTATION_DURING_PAGINATION"
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    with FakePlaidServer() as server:
+        monkeypatch.setattr(config, "PLAID_API_URL", server.url)
+        monkeypatch.setattr(config, "PLAID_CLIENT_ID", "client")
+        monkeypatch.setattr(config, "PLAID_SECRET", "secret")
+        for n in (1, 2, 3):
+            server.add_item(f"access-{n}", item_id=f"item-{n}")
+        yield server
+
+
+@pytest.fixture
+def factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'plaid.db'}")
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as db:
+        db.add_all([User(id=1, email="owner@example.com", hashed_password="x"),
+                    ExpenseCategory(id=4, name="Office Supplies")])
+        for n in (1, 2, 3):
+            db.add(PlaidIntegration(id=n, user_email="owner@example.com", access_token=f"access-{n}",
+                                    item_id=f"item-{n}"))
+            db.add_all([
+                PlaidAccount(id=n * 10, integration_id=n, plaid_account_id=f"checking-{n}",
+                             account_name="Checking", account_type="depository", mask="1234"),
+                PlaidAccount(id=n * 10 + 1, integration_id=n, plaid_account_id=f"savings-{n}",
+                             account_name="Savings", account_type="depository", is_sync_enabled=False),
+            ])
+        db.commit()
+    yield factory
+    engine.dispose()
+
+
+@pytest.fixture
+def db(factory):
+    with factory() as session:
+        yield session
+
+
+def _service(db, n=1):
+    return PlaidService(db.get(PlaidIntegration, n))
+
+
+def test_first_sync_pages_everything_then_a_caught_up_item_costs_one_call(fake, db):
+    fake.add_transactions("access-1", "checking-1", 1100)
+    fake.add_transactions("access-1", "checking-1", 40, amount=250.0, name="Deposit")  # income is skipped
+
+    result = _service(db).sync_transactions(db)
+    assert result["success"] and result["pages"] == 3
+    assert result["synced_count"] == 1100 and result["skipped_count"] == 40
+    assert db.query(Expense).count() == 1100 and db.query(PlaidSyncHistory).count() == 1100
+    expense = db.query(Expense).first()
+    assert expense.amount_cents == 4250 and expense.category.name == "Office Supplies"
+    assert expense.payment_method == "Bank - Checking •••• 1234"
+    assert db.get(PlaidSyncCursor, 1).cursor == "1140" and db.get(PlaidSyncCursor, 1).pending_cursor is None
+
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+    fake.requests.clear()
+    result = _service(db).sync_transactions(db)
+    assert result["success"] and result["synced_count"] == 0 and result["pages"] == 1
+    assert fake.requests == [{"path": "/transactions/sync", "cursor": "1140", "count": 500}]
+    # Re-reading a 30-day window cost ~3 statements per transaction; now a fixed handful and no row writes
+    assert len(statements) <= 8
+    assert not [s for s in statements if s.lstrip().upper().startswith(("INSERT", "DELETE"))]
+
+
+def test_modified_removed_and_pending_to_posted_changes_are_applied(fake, db):
+    first, second, third = fake.add_transactions("access-1", "checking-1", 3)
+    pending = fake.add_transactions("access-1", "checking-1", 1, pending=True, name="Pending")[0]
+    service = _service(db)
+    assert service.sync_transactions(db)["synced_count"] == 4
+    expense_ids = {row.plaid_transaction_id: row.expense_id for row in db.query(PlaidTransaction)}
+
+    fake.modify("access-1", first["transaction_id"], amount=-99.99, name="Corrected purchase")
+    fake.remove("access-1", second["transaction_id"])
+    posted = fake.post_pending("access-1", pending["transaction_id"], amount=-45.0)
+
+    result = service.sync_transactions(db)
+    assert result["success"] and result["synced_count"] == 0
+    assert result["modified_count"] == 3 and result["removed_count"] == 1  # modify, post + its follow-up edit
+
+    modified = db.get(Expense, expense_ids[first["transaction_id"]])
+    assert modified.amount_cents == 9999 and modified.description == "Corrected purchase"
+    assert db.get(Expense, expense_ids[second["transaction_id"]]) is None
+    assert db.query(PlaidTransaction).filter_by(plaid_transaction_id=second["transaction_id"]).count() == 0
+    # The posted transaction keeps the expense created for its pending version
+    row = db.query(PlaidTransaction).filter_by(plaid_transaction_id=posted["transaction_id"]).one()
+    assert row.expense_id == expense_ids[pending["transaction_id"]] and row.pending is False
+    assert row.expense.amount_cents == 4500
+    assert db.query(Expense).count() == 3 and db.get(Expense, expense_ids[third["transaction_id"]]) is not None
+    assert db.query(PlaidSyncHistory).filter_by(sync_type="transaction_removed").count() == 1
+
+
+def test_interrupted_sync_resumes_and_mutation_restarts_the_loop(fake, db):
+    fake.add_transactions("access-1", "checking-1", 250)
+    service = _service(db)
+    result = service.sync_transactions(db, page_size=100, max_pages=1)
+    assert result["synced_count"] == 100 and db.get(PlaidSyncCursor, 1).pending_cursor == "100"
+
+    fake.requests.clear()
+    fake.fail_next(error_code=MUTATION, status=400, error_type="TRANSACTIONS_ERROR")
+    result = service.sync_transactions(db, page_size=100)
+    assert result["success"], result["errors"]
+    # Resumed at the committed page, hit the mutation error, restarted from the start of the loop
+    assert [r["cursor"] for r in fake.requests] == ["100", None, "100", "200"]
+    assert db.query(Expense).count() == 250 and db.query(PlaidTransaction).count() == 250
+    cursor = db.get(PlaidSyncCursor, 1)
+    assert cursor.cursor == "250" and cursor.pending_cursor is None and cursor.last_completed_at
+
+
+def test_api_errors_are_recorded_and_the_next_run_retries(fake, db):
+    fake.add_transactions("access-1", "checking-1", 10)
+    fake.fail_next()  # only the mutation error is retried within a run
+    result = _service(db).sync_transactions(db)
+    assert not result["success"] and result["synced_count"] == 0
+    assert db.get(PlaidIntegration, 1).last_sync_error
+
+    result = _service(db).sync_transactions(db)
+    assert result["success"] and result["synced_count"] == 10
+    assert db.get(PlaidIntegration, 1).last_sync_error is None
+
+
+def test_disabled_and_unknown_accounts_create_no_expenses(fake, db):
+    fake.add_transactions("access-1", "savings-1", 5)
+    fake.add_transactions("access-1", "brokerage-1", 2)
+    result = _service(db).sync_transactions(db)
+    assert result["success"] and result["synced_count"] == 0 and result["skipped_count"] == 2
+    rows = db.query(PlaidTransaction).all()
+    assert len(rows) == 5 and all(row.expense_id is None and not row.is_synced_to_cora for row in rows)
+    assert db.query(Expense).count() == 0
+
+
+def test_items_sync_concurrently_on_a_bounded_pool(fake, factory):
+    for n in (1, 2, 3):
+        fake.add_transactions(f"access-{n}", f"checking-{n}", 50 * n)
+    results = sync_items([1, 2, 3], factory, concurrency=2)
+    assert {n: r["synced_count"] for n, r in results.items()} == {1: 50, 2: 100, 3: 150}
+    with factory() as db:
+        assert db.query(Expense).count() == 300
+        assert {c.integration_id: c.cursor for c in db.query(PlaidSyncCursor)} == {1: "50", 2: "100", 3: "150"}
+
+
+@pytest.fixture
+def webhook(fake, factory, monkeypatch):
+    """TestClient for the webhook route, its scheduler, and a poster that signs bodies like Plaid"""
+    import routes.plaid_integration as plaid_routes
+
+    scheduler = ItemSyncScheduler(factory, concurrency=2)
+    monkeypatch.setattr(plaid_routes, "plaid_sync_scheduler", scheduler)
+    monkeypatch.setattr(plaid_routes, "plaid_webhook_verifier", PlaidWebhookVerifier())
+    app = FastAPI()
+    app.include_router(plaid_routes.plaid_router)
+
+    def _db():
+        with factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = _db
+    client = TestClient(app)
+
+    def post(body, token=None, **sign):
+        raw = body if isinstance(body, bytes) else json.dumps(body).encode()
+        token = fake.sign_webhook(raw, **sign) if token is None else token
+        return client.post("/api/integrations/plaid/webhook", content=raw,
+                           headers={"Content-Type": "application/json", "Plaid-Verification": token})
+
+    return post, scheduler
+
+
+def test_webhook_schedules_a_sync_for_the_affected_item_only(fake, factory, webhook):
+    post, scheduler = webhook
+    for n in (1, 2):
+        fake.add_transactions(f"access-{n}", f"checking-{n}", 20)
+
+    response = post({"webhook_type": "TRANSACTIONS", "webhook_code": "SYNC_UPDATES_AVAILABLE", "item_id": "item-2"})
+    assert response.status_code == 200 and response.json()["scheduled"] is True
+    assert scheduler.wait_idle(timeout=30)
+    assert fake.calls == {"/webhook_verification_key/get": 1, "/transactions/sync": 1}
+
+    ignored = [
+        {"webhook_type": "ITEM", "webhook_code": "ERROR", "item_id": "item-1"},
+        {"webhook_type": "TRANSACTIONS", "webhook_code": "SYNC_UPDATES_AVAILABLE", "item_id": "item-unknown"},
+    ]
+    for body in ignored:
+        assert post(body).json()["scheduled"] is False
+    assert scheduler.wait_idle(timeout=30)
+    assert fake.calls["/webhook_verification_key/get"] == 1  # key cached by kid
+
+    with factory() as db:
+        synced = {row.integration_id for row in db.query(PlaidSyncHistory)}
+        assert synced == {2} and db.query(Expense).count() == 20
+        assert db.get(PlaidIntegration, 2).last_sync_at <= datetime.utcnow()
+    assert scheduler.stats["scheduled"] == 1 and scheduler.stats["runs"] == 1
+
+
+def test_forged_webhooks_are_rejected_before_any_sync(fake, webhook):
+    post, scheduler = webhook
+    body = {"webhook_type": "TRANSACTIONS", "webhook_code": "SYNC_UPDATES_AVAILABLE", "item_id": "item-1"}
+    raw = json.dumps(body).encode()
+    other = FakePlaidServer()  # same kid, different private key
+    try:
+        forged = {
+            "no header": post(raw, token=""),
+            "garbage": post(raw, token="not-a-jwt"),
+            "wrong key": post(raw, token=other.sign_webhook(raw)),
+            "other body": post(raw, token=fake.sign_webhook(b'{"item_id": "item-2"}')),
+            "stale": post(raw, iat=time.time() - 600),
+            "unknown kid": post(raw, kid="rotated-away"),
+        }
+    finally:
+        other._server.server_close()
+    assert {name: r.status_code for name, r in forged.items()} == {name: 401 for name in forged}
+    assert scheduler.stats["scheduled"] == 0 and "/transactions/sync" not in fake.calls
+    # a token that fails the cheap checks never costs a key lookup; the unknown kid costs one
+    assert fake.calls["/webhook_verification_key/get"] == 2
+    post(raw, kid="rotated-away")
+    assert fake.calls["/webhook_verification_key/get"] == 2  # misses are cached too
+
+
+def test_unknown_key_ids_are_rate_limited_and_their_misses_bounded(fake, monkeypatch):
+    import services.plaid_service as plaid_module
+
+    monkeypatch.setattr(plaid_module, "WEBHOOK_KEY_MISS_MAX", 3)
+    now = [time.time()]
+    verifier = PlaidWebhookVerifier(lookups_per_minute=5, clock=lambda: now[0])
+    raw = b'{"item_id": "item-1"}'
+
+    async def flood(count):
+        for n in range(count):
+            # well-formed claims are free to forge, so each fresh kid gets past the unverified checks
+            with pytest.raises(WebhookVerificationError):
+                await verifier.verify(raw, fake.sign_webhook(raw, iat=now[0], kid=f"random-{now[0]}-{n}"))
+
+    asyncio.run(flood(20))
+    assert fake.calls["/webhook_verification_key/get"] == 5  # one minute's budget
+    assert len(verifier._misses) == 3
+    with pytest.raises(WebhookVerificationError, match="too many"):
+        asyncio.run(verifier.verify(raw, fake.sign_webhook(raw, iat=now[0])))
+
+    now[0] += 61  # the window frees up; a genuine key verifies again
+    assert asyncio.run(verifier.verify(raw, fake.sign_webhook(raw, iat=now[0])))["request_body_sha256"]
+    assert fake.calls["/webhook_verification_key/get"] == 6
+
+
+def test_signed_webhook_with_a_non_object_body_is_a_bad_request(webhook):
+    post, _ = webhook
+    assert post([1, 2, 3]).status_code == 400
+    assert post(b"not json").status_code == 400
\ No newline at end of file
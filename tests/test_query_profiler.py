@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/tests/test_query_profiler.py
+🎯 PURPOSE: Validate request-scoped query profiling, N+1 detection and Server-Timing
+🔗 IMPORTS: sqlalchemy, starlette, middleware.query_monitoring
+📤 EXPORTS: Tests for QueryProfiler and QueryMonitoringMiddleware
+"""
+
+import asyncio
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from middleware.query_monitoring import (
+    QueryMonitoringMiddleware, QueryProfiler, current_profile, normalize_statement
+)
+
+
+def _engine(profiler):
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE c (id INTEGER PRIMARY KEY, name TEXT)"))
+        conn.execute(text("INSERT INTO c (id, name) VALUES (1, 'a'), (2, 'b'), (3, 'c')"))
+    profiler.install(engine)
+    return engine
+
+
+def test_normalize_collapses_literals_and_in_lists():
+    assert normalize_statement("SELECT * FROM c\n WHERE id = 5 AND name = 'x'") == \
+        "SELECT * FROM c WHERE id = ? AND name = ?"
+    assert normalize_statement("SELECT * FROM c WHERE id IN (?, ?, ?)") == \
+        normalize_statement("SELECT * FROM c WHERE id IN (?, ?)")
+
+
+def test_profile_counts_only_its_own_queries_and_flags_n_plus_one():
+    profiler = QueryProfiler(n_plus_one_threshold=3)
+    engine = _engine(profiler)
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))  # outside any profile
+        with profiler.profile("lazy loads") as profile:
+            for i in range(1, 4):
+                for _ in range(2):
+                    conn.execute(text("SELECT name FROM c WHERE id = :id"), {"id": i})
+    assert profile.count == 6
+    assert profiler.get_n_plus_one()[0]["count"] == 6
+    assert profiler.get_n_plus_one()[0]["endpoint"] == "lazy loads"
+    assert profiler.get_statement_histogram(order_by="count")[0]["count"] == 6
+    assert profiler.get_query_statistics()["total_queries"] == 7
+
+
+def test_middleware_sets_server_timing_per_request():
+    profiler = QueryProfiler(n_plus_one_threshold=2)
+    engine = _engine(profiler)
+
+    def rows(request):
+        n = int(request.query_params["n"])
+        with engine.connect() as conn:
+            for i in range(n):
+                conn.execute(text("SELECT name FROM c WHERE id = :id"), {"id": i})
+        return JSONResponse({"seen": current_profile().count})
+
+    async def slow_async(request):
+        await asyncio.sleep(0.05)
+        return JSONResponse({"seen": current_profile().count})
+
+    app = Starlette(routes=[Route("/rows", rows), Route("/nodb", slow_async)])
+    app.add_middleware(QueryMonitoringMiddleware, profiler=profiler)
+
+    with TestClient(app) as client:
+        one = client.get("/rows?n=1")
+        many = client.get("/rows?n=4")
+        none = client.get("/nodb")
+    assert one.json() == {"seen": 1}
+    assert 'desc="1 queries"' in one.headers["server-timing"]
+    assert 'desc="4 queries, 1 N+1"' in many.headers["server-timing"]
+    assert "server-timing" not in none.headers
+    assert profiler.get_n_plus_one()[0]["endpoint"] == "GET /rows"
+
+
+def test_ring_buffers_are_bounded():
+    profiler = QueryProfiler(slow_query_threshold=0)
+    engine = _engine(profiler)
+    with engine.connect() as conn:
+        for _ in range(300):
+            conn.execute(text("SELECT 1"))
+    assert len(profiler.get_slow_queries(limit=1000)) == profiler.slow_queries.maxlen
@@ -140,7 +140,7 @@ def test_token_refresh_logic():
     
     service = QuickBooksService(mock_integration)
     
-    with patch('requests.post') as mock_post:
+    with patch.object(service.http, 'post') as mock_post:
         mock_post.return_value.status_code = 200
         mock_post.return_value.json.return_value = mock_refresh_response
         
@@ -177,20 +177,18 @@ def test_purchase_creation():
     mock_integration.access_token = "test_token"
     mock_integration.realm_id = "test_realm"
     
+    from models.expense_category import ExpenseCategory
+    
     # Create test expense
-    test_expense = Mock(spec=Expense)
-    test_expense.amount = 100.00
-    test_expense.category = "Office Supplies"
-    test_expense.vendor = "Office Depot"
-    test_expense.description = "Printer paper"
-    test_expense.date = datetime.now()
+    test_expense = Expense(amount_cents=10000, vendor="Office Depot", description="Printer paper",
+                           expense_date=datetime.now(), category=ExpenseCategory(name="Office Supplies"))
     
     service = QuickBooksService(mock_integration)
     
     # Mock vendor and account creation
     with patch.object(service, '_get_or_create_vendor', return_value="vendor_123"):
         with patch.object(service, '_get_account_id', return_value="account_456"):
-            with patch('requests.post') as mock_post:
+            with patch.object(service.http, 'post') as mock_post:
                 mock_post.return_value.status_code = 200
                 mock_post.return_value.json.return_value = {"Purchase": {"Id": "purchase_789"}}
                 
@@ -198,6 +196,7 @@ def test_purchase_creation():
                 
                 assert result == "purchase_789"
                 assert mock_post.called
+                assert mock_post.call_args.kwargs["json"]["Line"][0]["Amount"] == 100.0
 
 def test_connection_testing():
     """Test QuickBooks connection testing"""
@@ -288,8 +287,8 @@ def test_vendor_creation_and_caching():
     service = QuickBooksService(mock_integration)
     
     # Test new vendor creation
-    with patch('requests.get') as mock_get:
-        with patch('requests.post') as mock_post:
+    with patch.object(service.http, 'get') as mock_get:
+        with patch.object(service.http, 'post') as mock_post:
             # Mock no existing vendor
             mock_get.return_value.status_code = 200
             mock_get.return_value.json.return_value = {"QueryResponse": {"Vendor": []}}
@@ -313,7 +312,7 @@ def test_quickbooks_api_rate_limiting():
     service = QuickBooksService(mock_integration)
     
     # Test rate limit response
-    with patch('requests.post') as mock_post:
+    with patch.object(service.http, 'post') as mock_post:
         mock_post.return_value.status_code = 429  # Too Many Requests
         mock_post.return_value.headers = {"Retry-After": "60"}
         
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/tests/test_quickbooks_sync.py
+🎯 PURPOSE: Validate the batched QuickBooks sync engine against the fake QBO server
+🔗 IMPORTS: pytest, sqlalchemy, services.quickbooks_service, tests.fakes.fake_qbo_server
+📤 EXPORTS: Tests for delta sync, batching, throttling and the reference cache
+"""
+
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from config import config
+from models import Base, Expense, ExpenseCategory, User
+from models.quickbooks_integration import QuickBooksExpenseSync, QuickBooksIntegration, QuickBooksSyncHistory
+from services.quickbooks_service import QuickBooksService, ReferenceCache
+from tests.fakes.fake_qbo_server import FakeQBOServer
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'qbo.db'}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([User(id=1, email="owner@example.com", hashed_password="x"),
+                     ExpenseCategory(id=1, name="Travel"), ExpenseCategory(id=2, name="Meals & Entertainment")])
+    session.add(QuickBooksIntegration(id=1, user_email="owner@example.com", realm_id=uuid.uuid4().hex,
+                                      access_token="token", refresh_token="refresh",
+                                      token_expires_at=datetime.utcnow() + timedelta(hours=2)))
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def qbo():
+    with FakeQBOServer() as server:
+        yield server
+
+
+def _add_expenses(db, count, vendors=5):
+    db.add_all([Expense(user_id=1, amount_cents=1000 + i, category_id=1 + i % 2, description=f"trip {i}",
+                        vendor=f"Vendor {i % vendors}", expense_date=datetime(2026, 3, 1)) for i in range(count)])
+    db.commit()
+
+
+def _service(db, qbo):
+    integration = db.get(QuickBooksIntegration, 1)
+    service = QuickBooksService(integration, cache=ReferenceCache(ttl_seconds=60))
+    service.api_url = qbo.url
+    return service
+
+
+def test_first_sync_batches_and_later_syncs_push_only_deltas(db, qbo):
+    _add_expenses(db, 75)
+    service = _service(db, qbo)
+
+    result = service.sync_pending_expenses(db)
+    assert result["success"] and result["synced_count"] == 75 and result["errors"] == []
+    assert len(qbo.purchases) == 75 and len(qbo.vendors) == 5
+    assert qbo.calls["POST batch"] == 3 + 1  # 75 purchases in 30s, plus one batch of new vendors
+    assert qbo.calls["GET query"] == 2       # vendor and account lists, once each
+    assert db.query(QuickBooksSyncHistory).count() == 75
+    assert db.get(QuickBooksIntegration, 1).total_expenses_synced == 75
+
+    assert service.sync_pending_expenses(db)["skipped_count"] == 75
+    assert qbo.calls["POST batch"] == 4
+
+    changed = db.query(Expense).filter(Expense.description == "trip 3").one()
+    changed.amount_cents = 99900
+    db.commit()
+    result = asyncio.run(service.sync_expenses_by_ids([changed.id, 12345], db))
+    assert result["synced_count"] == 1 and result["errors"] == ["Expense 12345 not found"]
+    assert result["sync_history"][0]["operation"] == "update"
+    state = db.query(QuickBooksExpenseSync).filter_by(expense_id=changed.id).one()
+    assert qbo.purchases[state.quickbooks_id]["Line"][0]["Amount"] == 999.0 and state.sync_token == "1"
+    assert len(qbo.purchases) == 75
+
+
+def test_throttled_batches_are_retried_within_the_concurrency_limit(db, qbo, monkeypatch):
+    monkeypatch.setattr(config, "QUICKBOOKS_SYNC_CONCURRENCY", 4)
+    monkeypatch.setattr(config, "QUICKBOOKS_BATCH_SIZE", 5)
+    qbo.max_concurrent = 2
+    qbo.latency = 0.05
+    _add_expenses(db, 40, vendors=1)
+
+    result = _service(db, qbo).sync_pending_expenses(db)
+    assert result["success"] and result["synced_count"] == 40
+    assert len(qbo.purchases) == 40  # retried batches were not applied twice
+    assert qbo.throttled > 0 and qbo.max_in_flight <= 2
+
+
+def test_failed_items_are_recorded_and_retried_next_time(db, qbo):
+    _add_expenses(db, 3, vendors=3)
+    service = _service(db, qbo)
+    original = qbo._save_purchase
+    qbo._save_purchase = lambda body, op: ({"Fault": {"Error": [{"Message": "Invalid Reference Id"}]}}
+                                          if body["PrivateNote"] == "trip 1" else original(body, op))
+
+    result = service.sync_pending_expenses(db)
+    assert result["synced_count"] == 2 and not result["success"]
+    assert result["errors"] == ["Expense 2: Invalid Reference Id"]
+    assert db.query(QuickBooksExpenseSync).filter_by(status="error").count() == 1
+
+    qbo._save_purchase = original
+    result = service.sync_pending_expenses(db)
+    assert result["synced_count"] == 1 and result["skipped_count"] == 2 and result["success"]
+
+
+def test_reference_cache_is_per_realm_and_updated_on_create(db, qbo):
+    service = _service(db, qbo)
+    assert service._get_account_id("travel") == "13"
+    assert service._get_or_create_vendor("Acme Supply") == service._get_or_create_vendor("ACME SUPPLY")
+    assert qbo.calls["POST vendor"] == 1 and qbo.calls["GET query"] == 2
+
+    service.cache.invalidate(service.integration.realm_id, "Vendor")
+    assert service._get_or_create_vendor("acme supply") is not None
+    assert qbo.calls["GET query"] == 3 and qbo.calls["POST vendor"] == 1
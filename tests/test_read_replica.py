@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/tests/test_read_replica.py
+🎯 PURPOSE: Validate analytics session routing to the replica, staleness fallback and per-engine pool metrics
+🔗 IMPORTS: pytest, sqlalchemy, models.base, models.replica, utils.db_pool
+📤 EXPORTS: Tests for ReplicaRouter
+"""
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from models.base import build_engine
+from models.replica import ReplicaRouter
+from utils.db_pool import pool_monitor
+
+
+def _database(path, label):
+    engine = build_engine(f"sqlite:///{path}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE origin (label TEXT)"))
+        conn.execute(text("INSERT INTO origin VALUES (:l)"), {"l": label})
+    return engine
+
+
+@pytest.fixture
+def databases(tmp_path):
+    primary = _database(tmp_path / "primary.db", "primary")
+    _database(tmp_path / "replica.db", "replica").dispose()
+    yield f"sqlite:///{tmp_path / 'replica.db'}", sessionmaker(bind=primary)
+    primary.dispose()
+
+
+def _served_by(router):
+    with router.session() as db:
+        return db.execute(text("SELECT label FROM origin")).scalar()
+
+
+def test_fresh_replica_serves_analytics(databases):
+    replica_url, primary = databases
+    router = ReplicaRouter(url=replica_url, primary_sessions=primary, check_seconds=60)
+    try:
+        assert _served_by(router) == "replica"
+        assert _served_by(router) == "replica"
+        assert router.stats["checks"] == 1  # cached until check_seconds pass
+        assert "replica" in pool_monitor.sample()["engines"]
+    finally:
+        router.dispose()
+
+    assert _served_by(ReplicaRouter(url="", primary_sessions=primary)) == "primary"
+
+
+def test_lagging_replica_falls_back_until_it_catches_up(databases):
+    replica_url, primary = databases
+    lag = {"seconds": 120.0}
+    router = ReplicaRouter(url=replica_url, primary_sessions=primary, max_lag_seconds=30,
+                           check_seconds=0, lag_probe=lambda conn: lag["seconds"])
+    try:
+        assert _served_by(router) == "primary"
+        assert router.status()["lag_seconds"] == 120.0 and router.stats["primary_fallbacks"] == 1
+
+        lag["seconds"] = 2.0
+        assert _served_by(router) == "replica"
+        assert router.status()["healthy"] is True
+    finally:
+        router.dispose()
+
+
+def test_unreachable_replica_falls_back_to_primary(databases, tmp_path):
+    _, primary = databases
+    router = ReplicaRouter(url=f"sqlite:///{tmp_path / 'missing' / 'replica.db'}", primary_sessions=primary)
+    assert _served_by(router) == "primary"
+    assert router.stats["check_errors"] == 1 and router.lag_seconds is None
+    router.dispose()
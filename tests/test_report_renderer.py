@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/tests/test_report_renderer.py
+🎯 PURPOSE: Validate background PDF rendering, the data-version cache, the 202/poll API and the retention sweeper
+🔗 IMPORTS: pytest, fastapi, services.report_renderer, routes.pdf_export
+📤 EXPORTS: Tests for ReportRenderer and the /api/pdf-export job endpoints
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import routes.pdf_export as pdf_routes
+import services.report_renderer as renderer_module
+from dependencies.auth import get_current_user
+from models import get_db
+from services.report_renderer import ReportRenderer, data_version
+
+DATA = pdf_routes.DEMO_REPORT_DATA
+
+
+@pytest.fixture
+def renderer(tmp_path):
+    pool = ThreadPoolExecutor(max_workers=2)
+    r = ReportRenderer(reports_dir=str(tmp_path / "reports"), executor=pool, retention_seconds=3600)
+    yield r
+    pool.shutdown(wait=True)
+
+
+def _wait(job, timeout=30):
+    deadline = time.time() + timeout
+    while job.status == "pending" and time.time() < deadline:
+        time.sleep(0.02)
+    return job
+
+
+def test_renders_once_per_data_version_and_serves_repeats_from_disk(renderer):
+    job = _wait(renderer.submit(7, "vendors", DATA))
+    assert job.status == "ready" and not job.cached
+    assert job.path.parent.name == "7" and job.path.read_bytes().startswith(b"%PDF")
+    assert not list(job.path.parent.glob("*.tmp"))
+
+    again = renderer.submit(7, "vendors", dict(DATA))
+    assert again is job and again.status == "ready"
+    assert renderer.stats["rendered"] == 1 and renderer.stats["cache_hits"] == 1
+
+    # A fresh renderer (e.g. after a restart) still finds the file by version
+    restarted = ReportRenderer(reports_dir=str(renderer.reports_dir), executor=renderer._executor)
+    cached = restarted.submit(7, "vendors", DATA)
+    assert cached.status == "ready" and cached.cached and cached.path == job.path
+    assert restarted.stats["queued"] == 0
+
+    changed = _wait(renderer.submit(7, "vendors", dict(DATA, letterGrade="A")))
+    assert changed.path != job.path and changed.version != job.version
+    other_user = _wait(renderer.submit(8, "vendors", DATA))
+    assert other_user.path.parent.name == "8"
+
+
+def test_concurrent_requests_share_one_render(renderer, monkeypatch):
+    release = threading.Event()
+    calls = []
+
+    def slow_render(section, data, output_path):
+        calls.append(section)
+        release.wait(10)
+        with open(output_path, "wb") as f:
+            f.write(b"%PDF-1.4 stub")
+        return output_path
+
+    monkeypatch.setattr(renderer_module, "_render", slow_render)
+    jobs = [renderer.submit(1, "full", DATA) for _ in range(5)]
+    assert all(job is jobs[0] and job.status == "pending" for job in jobs)
+    release.set()
+    assert _wait(jobs[0]).status == "ready"
+    assert calls == ["full"] and renderer.stats["coalesced"] == 4
+
+
+def test_failed_render_is_reported_and_retried_on_the_next_request(renderer, monkeypatch):
+    def broken(section, data, output_path):
+        raise RuntimeError("font missing")
+
+    monkeypatch.setattr(renderer_module, "_render", broken)
+    job = _wait(renderer.submit(1, "jobs", DATA))
+    assert job.status == "failed" and "font missing" in job.error
+
+    monkeypatch.undo()
+    retry = _wait(renderer.submit(1, "jobs", DATA))
+    assert retry is not job and retry.status == "ready"
+
+
+def test_any_worker_resolves_a_job_from_the_shared_reports_dir(renderer, monkeypatch):
+    release = threading.Event()
+
+    def slow_render(section, data, output_path):
+        release.wait(10)
+        if section == "jobs":
+            raise RuntimeError("font missing")
+        with open(output_path, "wb") as f:
+            f.write(b"%PDF-1.4 stub")
+        return output_path
+
+    monkeypatch.setattr(renderer_module, "_render", slow_render)
+    other = ReportRenderer(reports_dir=str(renderer.reports_dir), executor=renderer._executor)  # another worker
+    job = renderer.submit(1, "full", DATA)
+    failing = renderer.submit(1, "jobs", DATA)
+    assert job.id == f"full-{data_version(DATA)}"
+
+    polled = other.get(job.id, 1)
+    assert polled is not None and polled.status == "pending" and polled.path == job.path
+    assert other.get(job.id, 2) is None and other.get("full-../../1", 1) is None
+
+    release.set()
+    _wait(job), _wait(failing)
+    assert other.get(job.id, 1).status == "ready" and other.get(job.id, 1).path.is_file()
+    assert not list(job.path.parent.glob("*.pending"))
+    failed = other.get(failing.id, 1)
+    assert failed.status == "failed" and "font missing" in failed.error
+
+    # A worker that died mid-render leaves a pending marker that eventually reads as failed
+    orphan = job.path.parent / f"{renderer_module.report_filename('vendors', 'a' * 20)}.pending"
+    orphan.touch()
+    assert other.get(f"vendors-{'a' * 20}", 1).status == "pending"
+    stale = time.time() - other.render_timeout - 1
+    os.utime(orphan, (stale, stale))
+    assert other.get(f"vendors-{'a' * 20}", 1).status == "failed"
+
+
+def test_sweeper_deletes_expired_reports_and_forgets_their_jobs(renderer):
+    old = _wait(renderer.submit(1, "pricing", DATA))
+    fresh = _wait(renderer.submit(1, "benchmarks", DATA))
+    legacy = renderer.reports_dir / "pricing_report_1_20250101_000000.pdf"  # pre-cache flat layout
+    legacy.write_bytes(b"%PDF")
+    stale = time.time() - 2 * 3600
+    os.utime(old.path, (stale, stale))
+    os.utime(legacy, (stale, stale))
+
+    assert renderer.sweep() == 2
+    assert not old.path.exists() and not legacy.exists() and fresh.path.exists()
+    assert renderer.get(old.id, 1) is None and renderer.get(fresh.id, 1) is fresh
+    assert _wait(renderer.submit(1, "pricing", DATA)).status == "ready"  # re-rendered on demand
+
+
+def test_user_file_rejects_paths_outside_the_users_directory(renderer):
+    job = _wait(renderer.submit(3, "jobs", DATA))
+    assert renderer.user_file(3, job.filename) == job.path
+    assert renderer.user_file(4, job.filename) is None
+    assert renderer.user_file(3, f"../3/{job.filename}") is None
+    assert renderer.user_file(3, "secrets.txt") is None
+
+
+def test_process_pool_renders_a_pdf(tmp_path):
+    renderer = ReportRenderer(reports_dir=str(tmp_path), workers=1)
+    try:
+        job = _wait(renderer.submit(5, "forecasting", DATA), timeout=120)
+        assert job.status == "ready", job.error
+        assert job.path.read_bytes().startswith(b"%PDF")
+    finally:
+        renderer.stop()
+
+
+def test_api_queues_polls_and_streams_the_download(renderer, monkeypatch):
+    monkeypatch.setattr(pdf_routes, "report_renderer", renderer)
+    monkeypatch.setattr(pdf_routes, "calculate_intelligence_score", lambda db, user_id: 81)
+    release = threading.Event()
+    real_render = renderer_module._render
+    monkeypatch.setattr(renderer_module, "_render",
+                        lambda *args: release.wait(10) and real_render(*args))
+
+    app = FastAPI()
+    app.include_router(pdf_routes.router)
+    user = SimpleNamespace(id=42, email="owner@example.com")
+    app.dependency_overrides[get_current_user] = lambda: user
+    app.dependency_overrides[get_db] = lambda: None
+    client = TestClient(app)
+
+    queued = client.post("/api/pdf-export/profit-intelligence/full-report")
+    assert queued.status_code == 202 and queued.json()["status"] == "pending"
+    body = queued.json()
+    assert client.get(body["download_url"]).status_code == 409
+    assert client.get(body["status_url"]).status_code == 202
+
+    release.set()
+    deadline = time.time() + 30
+    while (poll := client.get(body["status_url"])).status_code == 202 and time.time() < deadline:
+        time.sleep(0.05)
+    assert poll.status_code == 200 and poll.json()["status"] == "ready"
+
+    download = client.get(body["download_url"])
+    assert download.status_code == 200 and download.headers["content-type"] == "application/pdf"
+    assert download.content.startswith(b"%PDF")
+
+    # The poll and the download may reach a worker that never saw the job
+    monkeypatch.setattr(pdf_routes, "report_renderer",
+                        ReportRenderer(reports_dir=str(renderer.reports_dir), executor=renderer._executor))
+    assert client.get(body["status_url"]).json()["status"] == "ready"
+    assert client.get(body["download_url"]).content.startswith(b"%PDF")
+    monkeypatch.setattr(pdf_routes, "report_renderer", renderer)
+
+    repeat = client.post("/api/pdf-export/profit-intelligence/full-report")
+    assert repeat.status_code == 200 and repeat.json()["job_id"] == body["job_id"]
+    expected = data_version(dict(DATA, is_demo_data=True, intelligenceScore=81, monthlySavingsPotential=15420,
+                                 costTrend=-12.5, vendorCount=23))
+    assert expected in body["filename"]
+
+    listed = client.get("/api/pdf-export/reports/list").json()
+    assert [r["filename"] for r in listed["reports"]] == [body["filename"]]
+    assert client.get(f"/api/pdf-export/download/{body['filename']}").status_code == 200
+    assert client.post("/api/pdf-export/profit-intelligence/section/unknown").status_code == 400
+
+    user.id = 43  # another user can see neither the job nor the file
+    assert client.get(body["status_url"]).status_code == 404
+    assert client.get(f"/api/pdf-export/download/{body['filename']}").status_code == 404
+    assert client.delete(f"/api/pdf-export/reports/{body['filename']}").status_code == 404
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/tests/test_request_pipeline.py
+🎯 PURPOSE: Validate the single-pass pure-ASGI request pipeline and its hooks
+🔗 IMPORTS: fastapi, core.pipeline, core.request_id, core.security, middleware.rate_limiting
+📤 EXPORTS: Tests for RequestPipeline and the default hooks
+"""
+
+import logging
+
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from core.access_log import AccessLogHook
+from core.pipeline import PipelineHook, RequestPipeline
+from core.request_id import RequestIdHook, get_request_id
+from core.security import SecurityHeadersHook
+from middleware.rate_limiting import RateLimitHook, RateLimiter, RATE_LIMITS
+
+
+def _app(hooks):
+    app = FastAPI()
+
+    @app.get("/rid")
+    def rid():
+        return {"rid": get_request_id()}
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(iter([b"a", b"b", b"c"]), media_type="text/plain")
+
+    app.add_middleware(RequestPipeline, hooks=hooks)
+    return app
+
+
+def test_request_id_is_visible_to_handlers_and_echoed():
+    with TestClient(_app([RequestIdHook(), SecurityHeadersHook()])) as client:
+        given = client.get("/rid", headers={"X-Request-ID": "abc-123"})
+        generated = client.get("/rid")
+    assert given.json() == {"rid": "abc-123"}
+    assert given.headers["x-request-id"] == "abc-123"
+    assert generated.json()["rid"] == generated.headers["x-request-id"] != "-"
+    assert given.headers["x-frame-options"] == "DENY"
+    assert get_request_id() == "-"
+
+
+class OneRequestLimiter(RateLimiter):
+    """In-memory limiter (NullRedis never counts without a server)"""
+
+    def __init__(self):
+        super().__init__(max_requests=1, window_seconds=60)
+        self.seen = set()
+
+    def is_allowed(self, key):
+        allowed = key not in self.seen
+        self.seen.add(key)
+        return allowed
+
+    def get_remaining(self, key):
+        return 0 if key in self.seen else 1
+
+
+def test_short_circuit_still_gets_outer_hooks_headers(monkeypatch):
+    monkeypatch.setitem(RATE_LIMITS, "default", OneRequestLimiter())
+    with TestClient(_app([RequestIdHook(), SecurityHeadersHook(), RateLimitHook()])) as client:
+        first = client.get("/rid")
+        response = client.get("/rid")
+        health = client.get("/health")
+    assert first.status_code == 200
+    assert first.headers["x-ratelimit-limit"] == "1"
+    assert response.status_code == 429
+    assert response.headers["x-ratelimit-remaining"] == "0"
+    assert response.headers["x-frame-options"] == "DENY"
+    assert "x-request-id" in response.headers
+    assert health.status_code == 404  # exempt path reaches the app
+
+
+def test_streaming_responses_pass_through_and_access_log_sees_status(caplog):
+    with caplog.at_level(logging.INFO, logger="cora.access"):
+        with TestClient(_app([RequestIdHook(), AccessLogHook()])) as client:
+            response = client.get("/stream")
+    assert response.text == "abc"
+    records = [r for r in caplog.records if r.name == "cora.access"]
+    assert records[-1].status_code == 200
+    assert records[-1].path == "/stream"
+
+
+def test_hooks_complete_in_reverse_order_even_when_app_fails():
+    calls = []
+
+    class Recorder(PipelineHook):
+        def __init__(self, name):
+            self.name = name
+
+        def on_request(self, ctx):
+            calls.append(("request", self.name))
+
+        def on_complete(self, ctx):
+            calls.append(("complete", self.name, ctx.status))
+
+    app = FastAPI()
+
+    @app.get("/boom")
+    def boom():
+        raise RuntimeError("boom")
+
+    app.add_middleware(RequestPipeline, hooks=[Recorder("outer"), Recorder("inner")])
+    with TestClient(app, raise_server_exceptions=False) as client:
+        assert client.get("/boom").status_code == 500
+    assert calls == [
+        ("request", "outer"), ("request", "inner"),
+        ("complete", "inner", 500), ("complete", "outer", 500),
+    ]
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/tests/test_route_metrics.py
+🎯 PURPOSE: Validate route-template request metrics and in-process response stats
+🔗 IMPORTS: prometheus_client, fastapi, middleware.monitoring, utils.api_response_optimizer
+📤 EXPORTS: Tests for MetricsMiddleware, route_template and ResponsePerformanceMonitor
+"""
+
+from prometheus_client import REGISTRY
+from fastapi import FastAPI
+from fastapi.staticfiles import StaticFiles
+from fastapi.testclient import TestClient
+
+from middleware.monitoring import MetricsMiddleware, get_metrics, get_system_health
+from utils.api_response_optimizer import ResponsePerformanceMonitor, performance_monitor
+
+
+def _count(route, status, method="GET"):
+    value = REGISTRY.get_sample_value(
+        "http_requests_total", {"method": method, "route": route, "status": status}
+    )
+    return value or 0
+
+
+def _app(static_dir=None):
+    app = FastAPI()
+
+    @app.get("/test-metrics/items/{item_id}")
+    def item(item_id: int):
+        return {"id": item_id}
+
+    if static_dir is not None:
+        app.mount("/test-metrics/static", StaticFiles(directory=str(static_dir)), name="static")
+    app.add_middleware(MetricsMiddleware)
+    return app
+
+
+def test_requests_are_labelled_by_route_template():
+    before = _count("/test-metrics/items/{item_id}", "200")
+    unmatched = _count("unmatched", "404")
+    with TestClient(_app()) as client:
+        for i in range(25):
+            assert client.get(f"/test-metrics/items/{i}").status_code == 200
+        assert client.get("/no-such-page-123").status_code == 404
+        assert client.get("/no-such-page-456").status_code == 404
+
+    assert _count("/test-metrics/items/{item_id}", "200") == before + 25
+    assert _count("unmatched", "404") == unmatched + 2
+    exposition = get_metrics().decode()
+    assert "/test-metrics/items/3" not in exposition
+    assert "no-such-page" not in exposition
+    assert REGISTRY.get_sample_value(
+        "http_request_duration_seconds_count", {"method": "GET", "route": "/test-metrics/items/{item_id}"}
+    ) >= 25
+
+
+def test_mounted_apps_use_the_mount_prefix(tmp_path):
+    (tmp_path / "app.css").write_text("body {}")
+    before = _count("/test-metrics/static", "200")
+    with TestClient(_app(tmp_path)) as client:
+        assert client.get("/test-metrics/static/app.css").status_code == 200
+    assert _count("/test-metrics/static", "200") == before + 1
+    assert "app.css" not in get_metrics().decode()
+
+
+def test_performance_monitor_is_bounded_and_in_process():
+    monitor = ResponsePerformanceMonitor(max_samples=10, max_endpoints=2)
+    for i in range(20):
+        monitor.record_response_time("/a/{id}", i / 100, 200)
+    monitor.record_response_time("/b", 0.5, 500)
+    monitor.record_response_time("/c", 0.1, 200)
+    monitor.record_response_time("/d", 0.1, 200)
+
+    stats = monitor.get_performance_stats("/a/{id}")
+    assert stats["count"] == 10
+    assert stats["min_response_time"] == 0.1
+    assert stats["max_response_time"] == 0.19
+    assert monitor.get_endpoints() == ["/a/{id}", "/b", "other"]
+    assert monitor.get_performance_stats()["status_codes"] == {200: 12, 500: 1}
+
+
+def test_middleware_feeds_the_shared_performance_monitor():
+    with TestClient(_app()) as client:
+        client.get("/test-metrics/items/7")
+    assert performance_monitor.get_performance_stats("/test-metrics/items/{item_id}")["count"] >= 1
+    assert "cpu_usage" in get_system_health()
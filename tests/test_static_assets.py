@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/tests/test_static_assets.py
+🎯 PURPOSE: Validate the fingerprinted asset build and the precompressed static handler
+🔗 IMPORTS: gzip, starlette, utils.static_assets
+📤 EXPORTS: Tests for build_assets, AssetManifest and PrecompressedStaticFiles
+"""
+
+import gzip
+
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.testclient import TestClient
+
+from utils.static_assets import AssetManifest, PrecompressedStaticFiles, build_assets
+
+CSS = "@import url('core/reset.css');\nbody { background: url(\"../img/bg.png?v=1\"); }\n" + "/* pad */\n" * 100
+RESET = "* { margin: 0; }\n" * 60
+ENTRY = 'import{a}from"./chunk-ABC.js";a();\n//# sourceMappingURL=entry.js.map\n' + "// pad\n" * 100
+CHUNK = "export function a(){}\n" * 60
+
+
+def _static(tmp_path):
+    (tmp_path / "css" / "core").mkdir(parents=True)
+    (tmp_path / "img").mkdir()
+    (tmp_path / "js" / "bundles").mkdir(parents=True)
+    (tmp_path / "css" / "main.css").write_text(CSS)
+    (tmp_path / "css" / "core" / "reset.css").write_text(RESET)
+    (tmp_path / "img" / "bg.png").write_bytes(b"\x89PNG fake")
+    (tmp_path / "js" / "bundles" / "entry.js").write_text(ENTRY)
+    (tmp_path / "js" / "bundles" / "entry.js.map").write_text("{}")
+    (tmp_path / "js" / "bundles" / "chunk-ABC.js").write_text(CHUNK)
+    (tmp_path / "archive.zip").write_bytes(b"PK")
+    return tmp_path
+
+
+def _client(static_dir):
+    app = Starlette(routes=[Mount("/static", PrecompressedStaticFiles(directory=str(static_dir)))])
+    return TestClient(app)
+
+
+def test_build_fingerprints_and_rewrites_references(tmp_path):
+    manifest = build_assets(_static(tmp_path))
+    assert "archive.zip" not in manifest
+    main = (tmp_path / manifest["css/main.css"]).read_text()
+    assert "core/" + manifest["css/core/reset.css"].rsplit("/", 1)[1] in main
+    assert "../img/" + manifest["img/bg.png"].rsplit("/", 1)[1] + "?v=1" in main
+    entry = (tmp_path / manifest["js/bundles/entry.js"]).read_text()
+    assert './' + manifest["js/bundles/chunk-ABC.js"].rsplit("/", 1)[1] in entry
+    assert (tmp_path / (manifest["js/bundles/entry.js"] + ".gz")).exists()
+
+    # Changing a dependency changes the importing file's fingerprint too
+    (tmp_path / "css" / "core" / "reset.css").write_text(RESET + "a {}\n")
+    rebuilt = build_assets(tmp_path)
+    assert rebuilt["css/main.css"] != manifest["css/main.css"]
+    assert rebuilt["img/bg.png"] == manifest["img/bg.png"]
+
+
+def test_manifest_urls_fall_back_without_a_build(tmp_path):
+    static_dir = _static(tmp_path)
+    assets = AssetManifest(static_dir)
+    assert assets.url("js/bundles/entry.js") == "/static/js/bundles/entry.js"
+    build_assets(static_dir)
+    assets.reload()
+    assert assets.url("/js/bundles/entry.js").startswith("/static/dist/js/bundles/entry.")
+    assert set(assets.bundle_manifest()["files"]) == {"entry", "chunk-ABC"}
+
+
+def test_handler_serves_precompressed_variants_with_cache_headers(tmp_path):
+    static_dir = _static(tmp_path)
+    built = build_assets(static_dir)["js/bundles/entry.js"]
+    path, body = "/static/" + built, (static_dir / built).read_text()
+    client = _client(static_dir)
+
+    compressed = client.get(path, headers={"Accept-Encoding": "gzip, br;q=0"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.headers["content-type"].startswith("text/javascript")
+    assert compressed.headers["cache-control"] == "public, max-age=31536000, immutable"
+    assert compressed.headers["vary"] == "Accept-Encoding"
+    assert compressed.text == body  # httpx decodes transparently
+    assert int(compressed.headers["content-length"]) == len(gzip.compress(body.encode(), 9, mtime=0))
+
+    identity = client.get(path, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in identity.headers
+    assert identity.text == body
+
+    cached = client.get(path, headers={"Accept-Encoding": "gzip", "If-None-Match": compressed.headers["etag"]})
+    assert cached.status_code == 304
+    assert compressed.headers["etag"] != identity.headers["etag"]
+
+
+def test_unfingerprinted_assets_revalidate(tmp_path):
+    client = _client(_static(tmp_path))
+    response = client.get("/static/css/main.css")
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "public, no-cache"
+    assert client.get("/static/missing.css").status_code == 404
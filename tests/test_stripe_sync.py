@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/tests/test_stripe_sync.py
+🎯 PURPOSE: Validate cursor-paginated incremental Stripe sync against the local Stripe stand-in
+🔗 IMPORTS: pytest, stripe, sqlalchemy, services.stripe_service, tests.fakes.fake_stripe_server
+📤 EXPORTS: Tests for StripeService.sync_new_transactions
+"""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+import stripe
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from models import Base, Expense, ExpenseCategory, User
+from models.stripe_integration import StripeIntegration, StripeSyncCursor, StripeSyncHistory, StripeTransaction
+from services.stripe_service import StripeService
+from tests.fakes.fake_stripe_server import FakeStripeServer
+
+START = int(datetime(2026, 5, 1).timestamp())
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    with FakeStripeServer() as server:
+        monkeypatch.setattr(stripe, "api_base", server.url)
+        yield server
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'stripe.db'}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([User(id=1, email="owner@example.com", hashed_password="x"), ExpenseCategory(id=3, name="Travel")])
+    session.add(StripeIntegration(id=1, user_email="owner@example.com", stripe_account_id="acct_1",
+                                  access_token="sk_test_fake"))
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _service(db):
+    return StripeService(db.get(StripeIntegration, 1))
+
+
+def test_sync_pages_everything_once_then_only_new_activity(fake, db):
+    fake.add_charges(250, created=START)
+    result = asyncio.run(_service(db).sync_all_transactions(db, limit=100))
+    assert result["success"] and result["synced_count"] == 250 and result["pages"] == 3
+    assert db.query(Expense).count() == 250 and db.query(StripeSyncHistory).count() == 250
+    assert db.get(StripeSyncCursor, 1).high_water == START + 249
+
+    fake.requests.clear()
+    result = _service(db).sync_new_transactions(db)
+    assert result["synced_count"] == 0 and result["skipped_count"] == 1  # the boundary charge, deduped
+    assert fake.requests == [{"limit": ["100"], "created[gte]": [str(START + 249)]}]
+
+    fake.add_charges(5, created=START + 300, metadata={"category": "Travel"})
+    result = _service(db).sync_new_transactions(db)
+    assert result["synced_count"] == 5 and db.query(Expense).count() == 255
+    assert db.get(StripeIntegration, 1).total_transactions_synced == 255
+
+
+def test_interrupted_runs_resume_after_the_last_committed_page(fake, db):
+    fake.add_charges(250, created=START)
+    assert _service(db).sync_new_transactions(db, max_pages=1)["synced_count"] == 100
+    cursor = db.get(StripeSyncCursor, 1)
+    assert cursor.high_water is None and cursor.resume_after == "ch_00000151"
+
+    fake.add_charges(10, created=START + 1000)  # arrives during the outage
+    fake.fail_next()
+    result = _service(db).sync_new_transactions(db)
+    assert not result["success"] and db.get(StripeIntegration, 1).last_sync_error
+
+    fake.requests.clear()
+    assert _service(db).sync_new_transactions(db)["synced_count"] == 150
+    assert fake.requests[0]["starting_after"] == ["ch_00000151"]
+    assert _service(db).sync_new_transactions(db)["synced_count"] == 10
+    assert db.query(StripeTransaction).count() == 260
+
+
+def test_failed_first_run_keeps_a_live_cursor(fake, db):
+    fake.add_charges(5, created=START)
+    fake.fail_next(status=400)
+    assert not _service(db).sync_new_transactions(db)["success"]
+    cursor = db.get(StripeSyncCursor, 1)  # re-added after the rollback, not a discarded transient object
+    assert cursor is not None and cursor.resume_after is None and cursor.high_water is None
+    assert _service(db).sync_new_transactions(db)["synced_count"] == 5
+
+
+def test_vanished_resume_charge_restarts_from_the_high_water_mark(fake, db):
+    fake.add_charges(150, created=START)
+    _service(db).sync_new_transactions(db, max_pages=1)
+    fake.charges = [c for c in fake.charges if c["id"] != "ch_00000051"]
+
+    assert not _service(db).sync_new_transactions(db)["success"]
+    result = _service(db).sync_new_transactions(db)
+    assert result["synced_count"] == 50 and result["skipped_count"] == 99
+    assert db.query(Expense).count() == 150
+
+
+def test_single_transaction_sync_maps_fields_and_dedups(fake, db):
+    charge = fake.add_charges(1, created=START, amount=4250, metadata={"category": "Travel"})[0]
+    transaction = _service(db).get_transactions(limit=1)[0]
+    assert transaction["id"] == charge["id"]
+
+    result = _service(db).sync_transaction_to_cora(transaction, db)
+    assert result["success"] and result["category"] == "Travel"
+    expense = db.get(Expense, result["expense_id"])
+    assert (expense.amount_cents, expense.category_id, expense.currency, expense.vendor) == \
+        (4250, 3, "USD", "Stripe Transaction")
+
+    again = _service(db).sync_transaction_to_cora(transaction, db)
+    assert again == {"success": True, "message": "Transaction already synced", "expense_id": expense.id}
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/tests/test_task_scheduler.py
+🎯 PURPOSE: Validate fleet task fan-out: concurrency bound, retries, timeouts, no overlapping units
+🔗 IMPORTS: asyncio, threading, services.task_scheduler
+📤 EXPORTS: Tests for TaskScheduler.execute_task
+"""
+
+import asyncio
+import threading
+import time
+
+from services.task_scheduler import TaskScheduler
+
+
+class StubScheduler(TaskScheduler):
+    """TaskScheduler with DB access replaced by in-memory stand-ins"""
+
+    def __init__(self, user_ids, unit, **kwargs):
+        super().__init__(**kwargs)
+        self.user_ids = user_ids
+        self.unit = unit
+        self.finished = {}
+
+    def _start_run(self, task_name, trigger):
+        return 1
+
+    def _finish_run(self, run_id, **fields):
+        self.finished = fields
+
+    def _active_user_ids(self):
+        return list(self.user_ids)
+
+    def _get_run(self, run_id):
+        return dict(self.finished)
+
+    def _run_unit(self, task_name, user_id):
+        return self.unit(user_id)
+
+
+def test_fan_out_respects_concurrency_limit():
+    lock = threading.Lock()
+    state = {"current": 0, "peak": 0}
+
+    def unit(user_id):
+        with lock:
+            state["current"] += 1
+            state["peak"] = max(state["peak"], state["current"])
+        time.sleep(0.02)
+        with lock:
+            state["current"] -= 1
+        return {"success": True}
+
+    sched = StubScheduler(range(20), unit, max_concurrency=4, unit_timeout=5, max_retries=0)
+    result = asyncio.run(sched.execute_task("daily_expense_categorization"))
+    assert result["status"] == "completed"
+    assert result["succeeded"] == 20
+    assert state["peak"] <= 4
+
+
+def test_retry_then_success_and_timeout_recorded():
+    attempts = {}
+
+    def unit(user_id):
+        attempts[user_id] = attempts.get(user_id, 0) + 1
+        if user_id == 1 and attempts[user_id] == 1:
+            raise RuntimeError("transient")
+        if user_id == 2:
+            time.sleep(0.3)
+        if user_id == 3:
+            return {"success": False, "error": "no data"}
+        return {"success": True}
+
+    sched = StubScheduler([1, 2, 3], unit, max_concurrency=3, unit_timeout=0.1,
+                          max_retries=1, retry_backoff=0.01)
+    result = asyncio.run(sched.execute_task("daily_expense_categorization"))
+    assert result["succeeded"] == 1
+    assert result["failed"] == 2
+    assert result["timed_out"] == 1
+    assert result["retries"] == 1  # user 1 retried; user 2's timed-out unit is not
+    assert attempts[2] == 1
+    assert attempts[3] == 1  # business failures are not retried
+    assert {f["user_id"] for f in result["failures"]} == {2, 3}
+
+
+def test_timed_out_unit_never_runs_twice_at_once():
+    lock = threading.Lock()
+    state = {"running": 0, "peak": 0, "calls": 0}
+    release = threading.Event()
+
+    def unit(user_id):
+        with lock:
+            state["calls"] += 1
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+        release.wait(2)
+        with lock:
+            state["running"] -= 1
+        return {"success": True}
+
+    sched = StubScheduler([7], unit, max_concurrency=2, unit_timeout=0.05,
+                          max_retries=3, retry_backoff=0.01)
+    first = asyncio.run(sched.execute_task("daily_expense_categorization"))
+    # The hung unit is still running: a second run must skip the user instead of starting another copy
+    second = asyncio.run(sched.execute_task("daily_expense_categorization"))
+    release.set()
+    sched._executor.shutdown(wait=True)
+
+    assert first["timed_out"] == 1 and first["retries"] == 0
+    assert second["timed_out"] == 1 and "still running" in second["failures"][0]["error"]
+    assert state["calls"] == 1 and state["peak"] == 1
+    assert not sched._in_flight
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/tests/test_voice_parser_accuracy.py
+🎯 PURPOSE: Validate the compiled voice parser against the labelled transcript corpus and its number grammar
+🔗 IMPORTS: json, pytest, services.voice_parser, routes.expenses
+📤 EXPORTS: Corpus accuracy, number grammar, vendor trie and confidence tests
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from routes.expenses import parse_voice_expense
+from services.voice_parser import VoiceParser, read_number_groups, spoken_amount, voice_parser
+
+CORPUS = json.loads((Path(__file__).parent / "voice_expense_corpus.json").read_text(encoding="utf-8"))
+
+
+@pytest.mark.parametrize("case", CORPUS, ids=[case["transcript"][:40] for case in CORPUS])
+def test_corpus_transcripts_parse_to_their_labels(case):
+    parsed = parse_voice_expense(case["transcript"])
+    assert {name: parsed[name] for name in case["expected"]} == case["expected"]
+    assert parsed["description"] == case["transcript"]
+
+
+@pytest.mark.parametrize("words, amount", [
+    ("forty two", 42), ("three forty seven", 347), ("one twenty five", 125), ("twenty three fifty", 23.5),
+    ("three fifty", 3.5), ("twelve ninety nine", 12.99), ("three seventy five", 375), ("three four seven", 347),
+    ("two hundred", 200), ("two hundred and twelve", 212), ("a hundred", 100), ("fifteen hundred", 1500),
+    ("two thousand five hundred", 2500), ("one hundred thousand", 100000), ("nineteen", 19),
+])
+def test_number_word_grammar(words, amount):
+    assert spoken_amount(read_number_groups(words.replace(" and ", " ").split()))[0] == amount
+
+
+def test_number_groups_split_where_a_cardinal_cannot_continue():
+    assert read_number_groups(["three", "forty", "seven"]) == [(3, False), (47, False)]
+    assert read_number_groups(["two", "thousand", "five", "hundred"]) == [(2500, True)]
+    assert read_number_groups(["twenty", "three", "fifty"]) == [(23, False), (50, False)]
+    assert read_number_groups([]) == []
+
+
+def test_words_match_whole_tokens_only():
+    assert voice_parser.parse("often at the store").amount is None  # not "ten"
+    assert voice_parser.parse("Johnson deck project").job_name == "Johnson"  # not "on deck"
+    assert voice_parser.parse("flowers for the office").vendor == "Unknown"  # not "lowes"
+
+
+def test_vendor_trie_prefers_the_longest_name_and_normalizes_apostrophes():
+    parser = VoiceParser(vendors={"home": {"category": "A"}, "home depot": {"category": "B"},
+                                  "lowes": {"category": "C"}})
+    parsed = parser.parse("the Home Depot on fifth")
+    assert (parsed.vendor, parsed.category, parsed.vendor_source) == ("Home Depot", "B", "known")
+    assert parser.parse("LOWE'S forty dollars").vendor == "Lowes"
+    assert parser.parse("bought it at home").vendor == "Home"
+
+
+def test_confidence_reflects_how_each_field_was_found():
+    explicit = voice_parser.parse("$42 at Home Depot for the Smith job")
+    assert explicit.amount_source == "currency" and explicit.confidence == {
+        "amount": 0.95, "vendor": 0.95, "job": 0.9, "category": 0.85}
+
+    guessed = voice_parser.parse("three forty seven at Dunkin")
+    assert guessed.amount_source == "spoken" and guessed.vendor_source == "phrase"
+    assert guessed.confidence == {"amount": 0.75, "vendor": 0.8, "job": 0, "category": 0.5}
+
+    assert voice_parser.parse("").to_dict() == {
+        "amount": None, "vendor": "Unknown", "category": "Materials - Other", "job_name": None,
+        "description": "", "confidence": {"amount": 0, "vendor": 0.3, "job": 0, "category": 0.5}}
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/tests/test_websocket_fanout.py
+🎯 PURPOSE: Validate WebSocket fan-out: slow consumers, coalescing, reaping, cross-worker bus
+🔗 IMPORTS: asyncio, json, routes.websocket, services.realtime_bus
+📤 EXPORTS: Tests for ConnectionManager and RealtimeBus
+"""
+
+import asyncio
+import json
+
+import routes.websocket as websocket_module
+from routes.websocket import ConnectionManager
+from services.realtime_bus import RealtimeBus
+
+
+class FakeSocket:
+    def __init__(self, delay: float = 0.0, block: bool = False):
+        self.sent = []
+        self.closed_with = None
+        self.delay = delay
+        self.block = block
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, message):
+        if self.block:
+            await asyncio.Event().wait()
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent.append(message)
+
+    async def close(self, code=1000, reason=""):
+        self.closed_with = code
+
+    def types(self):
+        return [m["type"] for m in self.sent]
+
+
+class LocalBus:
+    """Stands in for Redis: delivers publishes to the other linked managers"""
+
+    def __init__(self):
+        self.peers = []
+        self.distributed = True
+
+    def start(self):
+        pass
+
+    def publish(self, user_id, message, coalesce_key=None):
+        for peer in self.peers:
+            peer(user_id, message, coalesce_key)
+        return len(self.peers)
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0.01)
+
+
+def test_slow_client_is_dropped_without_stalling_others():
+    async def scenario():
+        manager = ConnectionManager(queue_size=5, send_timeout=5)
+        fast, stuck = FakeSocket(), FakeSocket(block=True)
+        await manager.connect(fast, "a@x.com")
+        await manager.connect(stuck, "a@x.com")
+        for i in range(10):
+            await manager.broadcast_to_user("a@x.com", {"type": "n", "i": i})
+            await asyncio.sleep(0)  # broadcasts arrive from separate requests
+        await _settle()
+        assert [m["i"] for m in fast.sent if m["type"] == "n"] == list(range(10))
+        assert stuck.closed_with == 1013
+        assert manager.active_connections["a@x.com"] == {fast}
+        assert manager.stats["dropped_slow"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_bursts_for_same_key_coalesce_to_latest():
+    async def scenario():
+        manager = ConnectionManager()
+        ws = FakeSocket(delay=0.02)
+        await manager.connect(ws, "a@x.com")
+        for version in range(20):
+            await manager.broadcast_to_user("a@x.com", {"type": "job_update", "v": version}, coalesce_key="job:1")
+        await asyncio.sleep(0.1)
+        updates = [m["v"] for m in ws.sent if m["type"] == "job_update"]
+        assert updates[-1] == 19
+        assert len(updates) < 5
+        assert manager.stats["coalesced"] >= 15
+
+    asyncio.run(scenario())
+
+
+def test_idle_clients_are_reaped_and_live_ones_get_heartbeats():
+    async def scenario():
+        manager = ConnectionManager(idle_timeout=0.05, heartbeat_interval=60)
+        idle, live = FakeSocket(), FakeSocket()
+        await manager.connect(idle, "a@x.com")
+        await manager.connect(live, "b@x.com")
+        await asyncio.sleep(0.08)
+        manager.touch(live)
+        manager.reap_idle()
+        await _settle()
+        assert idle.closed_with == 1001
+        assert "heartbeat" in live.types()
+        assert manager.get_stats()["connections"] == 1
+
+    asyncio.run(scenario())
+
+
+class ListeningSocket(FakeSocket):
+    """A listen-only client: sends nothing except, optionally, heartbeat acks"""
+
+    def __init__(self, ack: bool):
+        super().__init__()
+        self.query_params = {"token": "t"}
+        self.ack = ack
+        self.acked = 0
+
+    async def receive_json(self):
+        while True:
+            if self.ack and self.closed_with is None and self.types().count("heartbeat") > self.acked:
+                self.acked += 1
+                return {"type": "heartbeat_ack"}
+            await asyncio.sleep(0.005)
+
+
+def test_listen_only_client_that_acks_heartbeats_is_not_reaped(monkeypatch):
+    async def fake_user(token):
+        return "a@x.com"
+
+    async def scenario():
+        manager = ConnectionManager(idle_timeout=0.15, heartbeat_interval=0.05)
+        monkeypatch.setattr(websocket_module, "manager", manager)
+        monkeypatch.setattr(websocket_module, "get_user_from_token", fake_user)
+        acking, silent = ListeningSocket(ack=True), ListeningSocket(ack=False)
+        endpoints = [asyncio.create_task(websocket_module.websocket_endpoint(ws, None)) for ws in (acking, silent)]
+        await asyncio.sleep(0.5)
+        for task in endpoints:
+            task.cancel()
+        assert acking.closed_with is None and acking.acked >= 3
+        assert "echo" not in acking.types()  # acks are consumed silently
+        assert silent.closed_with == 1001
+
+    asyncio.run(scenario())
+
+
+def test_broadcast_reaches_clients_on_other_workers():
+    async def scenario():
+        bus_a, bus_b = LocalBus(), LocalBus()
+        worker_a = ConnectionManager(bus=bus_a)
+        worker_b = ConnectionManager(bus=bus_b)
+        bus_a.peers.append(worker_b.deliver_local)
+        bus_b.peers.append(worker_a.deliver_local)
+        on_a, on_b, other_user = FakeSocket(), FakeSocket(), FakeSocket()
+        await worker_a.connect(on_a, "a@x.com")
+        await worker_b.connect(on_b, "a@x.com")
+        await worker_b.connect(other_user, "b@x.com")
+        await worker_a.broadcast_to_user("a@x.com", {"type": "alert"})
+        await _settle()
+        assert on_a.types().count("alert") == 1
+        assert on_b.types().count("alert") == 1
+        assert "alert" not in other_user.types()
+
+    asyncio.run(scenario())
+
+
+def test_bus_skips_its_own_messages():
+    received = []
+    bus = RealtimeBus(lambda user, message, key: received.append((user, message, key)))
+    envelope = {"origin": "other-worker", "user": "a@x.com", "key": "job:1", "message": {"type": "job_update"}}
+    bus.handle(json.dumps(envelope))
+    bus.handle(json.dumps(dict(envelope, origin=bus.origin)))
+    bus.handle("not json")
+    assert received == [("a@x.com", {"type": "job_update"}, "job:1")]
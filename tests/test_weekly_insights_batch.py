@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/tests/test_weekly_insights_batch.py
+🎯 PURPOSE: Validate weekly insights batch: grouped metrics, batching, resume
+🔗 IMPORTS: contextlib, datetime, sqlalchemy, services.weekly_insights_batch
+📤 EXPORTS: Tests for run_weekly_insights_batch
+"""
+
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import services.weekly_insights_batch as batch
+from models import User, Expense, ExpenseCategory, WeeklyInsightsDelivery
+
+NOW = datetime(2026, 10, 19, 7, 0)
+
+
+@pytest.fixture
+def temp_db(monkeypatch):
+    with tempfile.TemporaryDirectory() as td:
+        engine = create_engine(f"sqlite:///{Path(td) / 'weekly.db'}")
+        for model in (User, ExpenseCategory, Expense, WeeklyInsightsDelivery):
+            model.__table__.create(bind=engine)
+        Session = sessionmaker(bind=engine)
+
+        @contextmanager
+        def scope():
+            db = Session()
+            try:
+                yield db
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+
+        monkeypatch.setattr(batch, "engine", engine)
+        monkeypatch.setattr(batch, "session_scope", scope)
+        yield scope
+        engine.dispose()
+
+
+def _seed(scope, users):
+    """users: list of (email, opt_in, recent_days) - recent_days are day offsets of recent expenses"""
+    with scope() as db:
+        for i, (email, opt_in, recent_days) in enumerate(users, start=1):
+            db.add(User(id=i, email=email, hashed_password="x", is_active="true", weekly_insights_opt_in=opt_in))
+            db.flush()
+            for offset in recent_days:
+                db.add(Expense(user_id=i, amount_cents=1000, description="lumber",
+                               expense_date=NOW - timedelta(days=offset)))
+            for _ in range(3):
+                db.add(Expense(user_id=i, amount_cents=500, description="old",
+                               expense_date=NOW - timedelta(days=60)))
+
+
+def _run(scope, sender, **kwargs):
+    return batch.run_weekly_insights_batch(now=NOW, sender=sender, token_factory=lambda uid: f"tok{uid}", **kwargs)
+
+
+def test_grouped_metrics_and_eligibility(temp_db):
+    _seed(temp_db, [("a@x.com", "true", [1, 2, 3]), ("b@x.com", "true", [1, 1, 1])])
+    with temp_db() as db:
+        a, b = batch.compute_weekly_metrics(db, [(1, "a@x.com"), (2, "b@x.com")], 7, NOW)
+    assert (a.total_count, a.recent_count, a.recent_cents, a.active_days) == (6, 3, 3000, 3)
+    assert a.eligible
+    assert b.active_days == 1 and not b.eligible
+
+
+def test_batches_skip_opted_out_and_substitute_values(temp_db):
+    _seed(temp_db, [("u%d@x.com" % i, "false" if i == 3 else "true", [1, 2, 3]) for i in range(1, 6)])
+    calls = []
+
+    def sender(subject, body, recipients):
+        calls.append((body, recipients))
+        return True
+
+    summary = _run(temp_db, sender, batch_size=2, concurrency=2)
+    assert summary["sent"] == 4 and summary["considered"] == 4
+    assert all(len(recipients) <= 2 for _, recipients in calls)
+    body, recipients = calls[0]
+    assert "-total_spent-" in body and "-unsubscribe_url-" in body
+    assert recipients[0][1]["-total_spent-"] == "30.00"
+    assert recipients[0][1]["-unsubscribe_url-"].endswith("tok1")
+
+
+def test_rerun_resumes_after_failed_batch(temp_db):
+    _seed(temp_db, [("u%d@x.com" % i, "true", [1, 2, 3]) for i in range(1, 5)])
+    first = _run(temp_db, lambda s, b, r: r[0][0] != "u3@x.com", batch_size=2, concurrency=1)
+    assert (first["sent"], first["failed"]) == (2, 2)
+
+    resent = []
+    second = _run(temp_db, lambda s, b, r: resent.extend(e for e, _ in r) or True, batch_size=2)
+    assert resent == ["u3@x.com", "u4@x.com"]
+    assert second["already_sent"] == 2
+    with temp_db() as db:
+        assert db.query(WeeklyInsightsDelivery).filter_by(week_key="2026-W43").count() == 4
+
+
+def test_batch_that_raises_counts_its_users_as_failed(temp_db):
+    _seed(temp_db, [("u%d@x.com" % i, "true", [1, 2, 3]) for i in range(1, 5)])
+
+    def sender(subject, body, recipients):
+        if recipients[0][0] == "u1@x.com":
+            raise RuntimeError("provider exploded")
+        return True
+
+    summary = _run(temp_db, sender, batch_size=2, concurrency=2)
+    assert (summary["sent"], summary["failed"]) == (2, 2)
+
+
+def test_dry_run_sends_nothing(temp_db):
+    _seed(temp_db, [("a@x.com", "true", [1, 2, 3])])
+    summary = _run(temp_db, lambda *a: pytest.fail("dry run must not send"), dry_run=True)
+    assert summary["sent"] == 1 and summary["batches"] == 0
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/tests/test_write_queue.py
+🎯 PURPOSE: Validate SQLite group commits, failure isolation, maintenance and the PRAGMA profile
+🔗 IMPORTS: pytest, sqlalchemy, models.base, utils.write_queue
+📤 EXPORTS: Tests for WriteQueue and sqlite_pragmas
+"""
+
+import threading
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from config import config
+from models.base import build_engine
+from utils.write_queue import WriteQueue
+
+
+@pytest.fixture
+def scratch(tmp_path):
+    engine = build_engine(f"sqlite:///{tmp_path / 'writes.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE notes (id INTEGER PRIMARY KEY, body TEXT NOT NULL)"))
+    yield engine, sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def _add(db, body):
+    db.execute(text("INSERT INTO notes (body) VALUES (:b)"), {"b": body})
+    return body
+
+
+def _bodies(engine):
+    with engine.connect() as conn:
+        return sorted(row[0] for row in conn.execute(text("SELECT body FROM notes")))
+
+
+def test_concurrent_writes_are_group_committed(scratch):
+    engine, sessions = scratch
+    writer = WriteQueue(session_factory=sessions, enabled=True, batch_window=0.05)
+    gate = threading.Barrier(20)
+    results = []
+
+    def worker(n):
+        gate.wait()
+        results.append(writer.run(_add, f"note-{n:02d}", timeout=10))
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    writer.stop()
+
+    assert len(results) == 20
+    assert _bodies(engine) == [f"note-{n:02d}" for n in range(20)]
+    assert writer.stats["batches"] < 20 and writer.stats["max_batch"] > 1
+
+
+def test_failing_job_does_not_roll_back_its_batch(scratch):
+    engine, sessions = scratch
+    writer = WriteQueue(session_factory=sessions, enabled=True, batch_window=0.05)
+    futures = [writer.submit(_add, "kept-1"), writer.submit(_add, None), writer.submit(_add, "kept-2")]
+
+    assert futures[0].result(timeout=10) == "kept-1"
+    with pytest.raises(Exception):
+        futures[1].result(timeout=10)
+    assert futures[2].result(timeout=10) == "kept-2"
+    writer.stop()
+    assert _bodies(engine) == ["kept-1", "kept-2"]
+    assert writer.stats["failed"] == 1
+
+
+def test_disabled_queue_runs_inline_and_maintenance_checkpoints(scratch):
+    engine, sessions = scratch
+    inline = WriteQueue(session_factory=sessions, enabled=False)
+    assert inline.run(_add, "inline") == "inline"
+    assert inline.status()["running"] is False
+
+    writer = WriteQueue(session_factory=sessions, enabled=True, checkpoint_seconds=0, optimize_seconds=0)
+    writer.run(_add, "queued", timeout=10)
+    writer.stop()
+    assert writer.stats["checkpoints"] >= 1 and writer.stats["optimizes"] >= 1
+    assert _bodies(engine) == ["inline", "queued"]
+
+
+def test_connections_get_the_pragma_profile(scratch):
+    engine, _ = scratch
+    with engine.connect() as conn:
+        pragma = lambda name: conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+        assert pragma("journal_mode") == "wal"
+        assert pragma("busy_timeout") == config.SQLITE_BUSY_TIMEOUT_MS
+        assert pragma("cache_size") == -config.SQLITE_CACHE_SIZE_KB
+        assert pragma("mmap_size") == config.SQLITE_MMAP_SIZE_MB * 1024 * 1024
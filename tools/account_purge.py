@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """
 🧭 LOCATION: /CORA/tools/account_purge.py
-🎯 PURPOSE: CLI entrypoint to run 30-day purge (dry-run by default)
+🎯 PURPOSE: CLI entrypoint to run the account purge (dry-run by default; --execute deletes)
 🔗 IMPORTS: argparse, json
 📤 EXPORTS: __main__
 """
@@ -14,9 +14,11 @@ from services.account_purge_service import AccountPurgeService
 
 
 def main():
-    parser = argparse.ArgumentParser(description="Run 30-day account purge (dry-run by default)")
-    parser.add_argument("--db", default="cora.db", help="Path to SQLite DB (default: cora.db)")
-    parser.add_argument("--dry-run", action="store_true", help="Do not delete; only report")
+    parser = argparse.ArgumentParser(description="Run the account purge (dry-run by default)")
+    parser.add_argument("--db", default=None, help="Path to a SQLite DB (default: the app's DATABASE_URL)")
+    parser.add_argument("--dry-run", action="store_true", help="Do not delete; only report (the default)")
+    parser.add_argument("--execute", action="store_true", help="Delete the accounts and their data")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Users per transaction")
     parser.add_argument("--now", default=None, help="Override current time (ISO-8601)")
     args = parser.parse_args()
 
@@ -24,15 +26,9 @@ def main():
     if args.now:
         now = datetime.fromisoformat(args.now)
 
-    svc = AccountPurgeService(db_path=args.db)
-    result = svc.purge(dry_run=args.dry_run or True, now=now)
-    print(json.dumps({
-        "dry_run": result.dry_run,
-        "now": result.now,
-        "to_purge_count": result.to_purge_count,
-        "skipped_active_count": result.skipped_active_count,
-        "details": result.details,
-    }, indent=2))
+    svc = AccountPurgeService(db_path=args.db, chunk_size=args.chunk_size)
+    result = svc.purge(dry_run=args.dry_run or not args.execute, now=now)
+    print(json.dumps(result.to_dict(), indent=2))
 
 
 if __name__ == "__main__":
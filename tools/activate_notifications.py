@@ -74,7 +74,7 @@ def test_email_notification():
         db = SessionLocal()
         service = NotificationService(db)
         
-        if service.sendgrid_client:
+        if service.email_enabled:
             # Test with a job alert
             test_data = {
                 'name': 'Test Job',
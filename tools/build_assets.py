@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/tools/build_assets.py
+🎯 PURPOSE: CLI entrypoint for the static asset build (fingerprint + precompress)
+🔗 IMPORTS: argparse, utils.static_assets
+📤 EXPORTS: __main__
+
+Run after `node web/build.mjs` (esbuild bundles) and before deploying:
+    python tools/build_assets.py
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.static_assets import STATIC_DIR, DIST_DIRNAME, MANIFEST_NAME, brotli, build_assets
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fingerprint and precompress web/static into web/static/dist")
+    parser.add_argument("--static-dir", default=str(STATIC_DIR), help="Static root (default: web/static)")
+    args = parser.parse_args()
+
+    static_dir = Path(args.static_dir)
+    manifest = build_assets(static_dir)
+    dist = static_dir / DIST_DIRNAME
+    gz = len(list(dist.rglob("*.gz")))
+    br = len(list(dist.rglob("*.br")))
+    print(f"Fingerprinted {len(manifest)} assets into {dist}")
+    print(f"Precompressed: {gz} .gz, {br} .br" + ("" if brotli is not None else " (install Brotli for .br)"))
+    print(f"Manifest: {dist / MANIFEST_NAME}")
+
+
+if __name__ == "__main__":
+    main()
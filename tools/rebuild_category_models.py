@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/tools/rebuild_category_models.py
+🎯 PURPOSE: CLI entrypoint to rebuild per-user categorization counts from the expenses table
+🔗 IMPORTS: argparse, json, models.base, services.category_model
+📤 EXPORTS: __main__
+"""
+
+import argparse
+import json
+
+from models.base import SessionLocal
+from services.category_model import category_models
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild category_feature_counts (all users by default)")
+    parser.add_argument("--user", type=int, action="append", dest="users",
+                        help="Only rebuild this user id (repeatable)")
+    parser.add_argument("--batch-size", type=int, default=500, help="Users per transaction (default: 500)")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        result = category_models.rebuild(db, user_ids=args.users, batch_size=args.batch_size)
+    finally:
+        db.close()
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
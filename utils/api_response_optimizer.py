@@ -10,6 +10,8 @@ import json
 import gzip
 import time
 import logging
+import threading
+from collections import deque
 from typing import Any, Dict, Optional, Union, List
 from datetime import datetime, timedelta
 from functools import wraps
@@ -367,10 +369,19 @@ def batch_optimize_responses(
 
 # Performance monitoring utilities
 class ResponsePerformanceMonitor:
-    """Monitor and track response performance metrics"""
+    """Monitor and track response performance metrics
+
+    Samples are kept in-process per endpoint (route template, not raw path) in
+    bounded ring buffers, so recording is a deque append rather than three
+    Redis round trips per request. Figures are per worker; the Prometheus
+    histograms in middleware.monitoring aggregate across workers.
+    """
     
-    def __init__(self, redis_client: Redis = None):
-        self.redis = redis_client or get_redis_client()
+    def __init__(self, redis_client: Redis = None, max_samples: int = 1000, max_endpoints: int = 500):
+        self.max_samples = max_samples
+        self.max_endpoints = max_endpoints
+        self._samples: Dict[str, deque] = {}
+        self._lock = threading.Lock()
     
     def record_response_time(
         self,
@@ -380,24 +391,17 @@ class ResponsePerformanceMonitor:
         user_id: Optional[str] = None
     ):
         """Record response time for performance tracking"""
-        try:
-            key = f"response_performance:{endpoint}"
-            data = {
-                'endpoint': endpoint,
-                'response_time': response_time,
-                'status_code': status_code,
-                'timestamp': datetime.utcnow().isoformat(),
-                'user_id': user_id
-            }
-            
-            # Store in Redis with TTL
-            self.redis.lpush(key, json.dumps(data, separators=(',', ':')))
-            self.redis.expire(key, 3600)  # Keep for 1 hour
-            
-            # Trim list to keep only last 100 entries
-            self.redis.ltrim(key, 0, 99)
-        except Exception as e:
-            logger.error(f"Failed to record response time: {e}")
+        samples = self._samples.get(endpoint)
+        if samples is None:
+            with self._lock:
+                if endpoint not in self._samples and len(self._samples) >= self.max_endpoints:
+                    endpoint = "other"
+                samples = self._samples.setdefault(endpoint, deque(maxlen=self.max_samples))
+        samples.append((time.time(), response_time, status_code))
+    
+    def get_endpoints(self) -> List[str]:
+        """Endpoints with recorded samples"""
+        return sorted(self._samples)
     
     def get_performance_stats(
         self,
@@ -405,52 +409,39 @@ class ResponsePerformanceMonitor:
         hours: int = 1
     ) -> Dict[str, Any]:
         """Get performance statistics for endpoints"""
-        try:
-            if endpoint:
-                keys = [f"response_performance:{endpoint}"]
-            else:
-                keys = self.redis.keys("response_performance:*")
-            
-            all_times = []
-            status_codes = {}
-            
-            for key in keys:
-                data_list = self.redis.lrange(key, 0, -1)
-                for data_str in data_list:
-                    try:
-                        data = json.loads(data_str)
-                        response_time = data.get('response_time', 0)
-                        status_code = data.get('status_code', 200)
-                        
-                        all_times.append(response_time)
-                        status_codes[status_code] = status_codes.get(status_code, 0) + 1
-                    except:
-                        continue
-            
-            if not all_times:
-                return {
-                    'count': 0,
-                    'avg_response_time': 0,
-                    'min_response_time': 0,
-                    'max_response_time': 0,
-                    'p95_response_time': 0,
-                    'status_codes': {}
-                }
-            
-            all_times.sort()
-            count = len(all_times)
-            
+        cutoff = time.time() - hours * 3600
+        with self._lock:
+            buffers = [self._samples.get(endpoint, ())] if endpoint else list(self._samples.values())
+            rows = [sample for buffer in buffers for sample in list(buffer) if sample[0] >= cutoff]
+        
+        if not rows:
             return {
-                'count': count,
-                'avg_response_time': sum(all_times) / count,
-                'min_response_time': min(all_times),
-                'max_response_time': max(all_times),
-                'p95_response_time': all_times[int(count * 0.95)] if count > 0 else 0,
-                'status_codes': status_codes
+                'count': 0,
+                'avg_response_time': 0,
+                'min_response_time': 0,
+                'max_response_time': 0,
+                'p95_response_time': 0,
+                'status_codes': {}
             }
-        except Exception as e:
-            logger.error(f"Failed to get performance stats: {e}")
-            return {}
+        
+        all_times = sorted(row[1] for row in rows)
+        status_codes: Dict[int, int] = {}
+        for row in rows:
+            status_codes[row[2]] = status_codes.get(row[2], 0) + 1
+        count = len(all_times)
+        
+        return {
+            'count': count,
+            'avg_response_time': sum(all_times) / count,
+            'min_response_time': all_times[0],
+            'max_response_time': all_times[-1],
+            'p95_response_time': all_times[min(int(count * 0.95), count - 1)],
+            'status_codes': status_codes
+        }
+    
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
 
 # Global performance monitor instance
 performance_monitor = ResponsePerformanceMonitor()
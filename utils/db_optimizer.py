@@ -4,56 +4,58 @@ Database Optimization Utilities for CORA
 Simple database performance improvements without complex dependencies
 """
 
-import sqlite3
 import logging
-from pathlib import Path
 from typing import List, Dict, Any
 
+from sqlalchemy import inspect, text
+
 logger = logging.getLogger(__name__)
 
 class DatabaseOptimizer:
-    """Simple database optimization utilities"""
+    """Simple database optimization utilities (runs on the app's shared engine)"""
     
-    def __init__(self, db_path: str = "cora.db"):
-        self.db_path = Path(db_path)
+    def __init__(self, engine=None):
+        if engine is None:
+            from models.base import engine
+        self.engine = engine
+        
+    def _database_size_mb(self, conn) -> float:
+        if self.engine.dialect.name == "sqlite":
+            pages = conn.exec_driver_sql("PRAGMA page_count").scalar() or 0
+            page_size = conn.exec_driver_sql("PRAGMA page_size").scalar() or 0
+            return pages * page_size / (1024*1024)
+        if self.engine.dialect.name == "postgresql":
+            return conn.execute(text("SELECT pg_database_size(current_database())")).scalar() / (1024*1024)
+        return 0.0
         
     def analyze_database(self) -> Dict[str, Any]:
         """Analyze database performance and structure"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Get basic stats
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-            tables = [row[0] for row in cursor.fetchall()]
-            
-            stats = {
-                "database_size_mb": self.db_path.stat().st_size / (1024*1024),
-                "total_tables": len(tables),
-                "tables": []
-            }
+            inspector = inspect(self.engine)
+            tables = inspector.get_table_names()
             
-            # Analyze each table
-            for table in tables:
-                if table == 'sqlite_sequence':
-                    continue
-                    
-                try:
-                    cursor.execute(f"SELECT COUNT(*) FROM {table}")
-                    row_count = cursor.fetchone()[0]
-                    
-                    cursor.execute(f"PRAGMA table_info({table})")
-                    columns = cursor.fetchall()
-                    
-                    stats["tables"].append({
-                        "name": table,
-                        "row_count": row_count,
-                        "column_count": len(columns)
-                    })
-                except Exception as e:
-                    logger.warning(f"Could not analyze table {table}: {e}")
+            with self.engine.connect() as conn:
+                stats = {
+                    "database_size_mb": self._database_size_mb(conn),
+                    "total_tables": len(tables),
+                    "tables": []
+                }
+                
+                # Analyze each table
+                for table in tables:
+                    if table == 'sqlite_sequence':
+                        continue
+                        
+                    try:
+                        row_count = conn.execute(text(f'SELECT COUNT(*) FROM "{table}"')).scalar()
+                        stats["tables"].append({
+                            "name": table,
+                            "row_count": row_count,
+                            "column_count": len(inspector.get_columns(table))
+                        })
+                    except Exception as e:
+                        logger.warning(f"Could not analyze table {table}: {e}")
             
-            conn.close()
             return stats
             
         except Exception as e:
@@ -69,22 +71,21 @@ class DatabaseOptimizer:
         }
         
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # 1. Run VACUUM to reclaim space
-            try:
-                cursor.execute("VACUUM")
-                results["operations"].append("VACUUM completed - reclaimed unused space")
-            except Exception as e:
-                results["errors"].append(f"VACUUM failed: {e}")
-            
-            # 2. Run ANALYZE to update statistics
-            try:
-                cursor.execute("ANALYZE")
-                results["operations"].append("ANALYZE completed - updated query statistics")
-            except Exception as e:
-                results["errors"].append(f"ANALYZE failed: {e}")
+            # VACUUM cannot run inside a transaction
+            with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                # 1. Run VACUUM to reclaim space
+                try:
+                    conn.exec_driver_sql("VACUUM")
+                    results["operations"].append("VACUUM completed - reclaimed unused space")
+                except Exception as e:
+                    results["errors"].append(f"VACUUM failed: {e}")
+                
+                # 2. Run ANALYZE to update statistics
+                try:
+                    conn.exec_driver_sql("ANALYZE")
+                    results["operations"].append("ANALYZE completed - updated query statistics")
+                except Exception as e:
+                    results["errors"].append(f"ANALYZE failed: {e}")
             
             # 3. Check and add basic indexes if missing
             basic_indexes = [
@@ -93,21 +94,19 @@ class DatabaseOptimizer:
                 ("idx_business_profiles_email", "business_profiles", "user_email"),
             ]
             
-            for index_name, table_name, column_name in basic_indexes:
-                try:
-                    # Check if table exists
-                    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table_name,))
-                    if cursor.fetchone():
-                        # Check if index exists
-                        cursor.execute("SELECT name FROM sqlite_master WHERE type='index' AND name=?", (index_name,))
-                        if not cursor.fetchone():
-                            cursor.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name}({column_name})")
+            inspector = inspect(self.engine)
+            tables = set(inspector.get_table_names())
+            with self.engine.begin() as conn:
+                for index_name, table_name, column_name in basic_indexes:
+                    try:
+                        if table_name not in tables:
+                            continue
+                        existing = {index["name"] for index in inspector.get_indexes(table_name)}
+                        if index_name not in existing:
+                            conn.exec_driver_sql(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name}({column_name})")
                             results["operations"].append(f"Created index: {index_name}")
-                except Exception as e:
-                    results["errors"].append(f"Index creation failed for {index_name}: {e}")
-            
-            conn.commit()
-            conn.close()
+                    except Exception as e:
+                        results["errors"].append(f"Index creation failed for {index_name}: {e}")
             
             if results["errors"]:
                 results["success"] = False
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/utils/db_pool.py
+🎯 PURPOSE: Connection-pool metrics (checked out, overflow, wait time) and leak detection
+🔗 IMPORTS: sqlalchemy.pool, prometheus_client, core.request_id
+📤 EXPORTS: MonitoredQueuePool, PoolMonitor, pool_monitor
+🔄 PATTERN: pool events → in-process counters → sampled into Prometheus gauges (labelled per engine)
+
+The app engine is built with MonitoredQueuePool, which times how long a
+caller waits for a connection. Checkout/checkin events stamp each pooled
+connection with when and by which request it was taken, so a connection
+held longer than DB_POOL_LEAK_SECONDS (a session that was never closed,
+typically `next(get_db())`) is reported once with the request id that
+took it. Every engine is installed under a name (primary, async, replica),
+which labels its gauges and wait histogram; engines share the names via
+pool_logging_name so the pool itself knows which series to report to.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+from config import config
+
+logger = logging.getLogger(__name__)
+
+WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+_CHECKOUT_KEY = "cora_checked_out"
+
+DEFAULT_ENGINE = "primary"
+
+POOL_SIZE = Gauge("db_pool_size", "Configured connection pool size", ["engine"], multiprocess_mode="livesum")
+POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Connections currently checked out", ["engine"],
+                         multiprocess_mode="livesum")
+POOL_OVERFLOW = Gauge("db_pool_overflow", "Connections open beyond pool_size", ["engine"],
+                      multiprocess_mode="livesum")
+POOL_WAIT = Histogram("db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection", ["engine"],
+                      buckets=WAIT_BUCKETS)
+POOL_TIMEOUTS = Counter("db_pool_timeouts_total", "Checkouts that gave up after pool_timeout", ["engine"])
+POOL_LEAKS = Counter("db_pool_leaks_total", "Connections held longer than the leak threshold")
+
+
+class PoolMonitor:
+    """Counts checkouts and flags connections held too long"""
+
+    def __init__(self, leak_seconds: Optional[float] = None):
+        self.leak_seconds = leak_seconds if leak_seconds is not None else config.DB_POOL_LEAK_SECONDS
+        self.stats = {"checkouts": 0, "timeouts": 0, "leaks": 0, "wait_seconds_total": 0.0,
+                      "wait_seconds_max": 0.0}
+        self._held: Dict[int, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._engines = []
+        self._key = (_CHECKOUT_KEY, id(self))  # per monitor: several may watch one engine
+
+    def install(self, engine, name: str = DEFAULT_ENGINE) -> None:
+        """Attach checkout/checkin listeners to `engine` once (they survive engine.dispose())"""
+        if any(e is engine for _, e in self._engines):
+            return
+        self._engines.append((name, engine))
+
+        def on_checkout(dbapi_connection, connection_record, connection_proxy):
+            self._on_checkout(name, connection_record)
+
+        event.listen(engine, "checkout", on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+        event.listen(engine, "close", self._on_close)
+        if isinstance(engine.pool, QueuePool):
+            POOL_SIZE.labels(name).inc(engine.pool.size())
+
+    # ------------------------------------------------------------------ events
+    def observe_wait(self, seconds: float, timed_out: bool = False, engine: str = DEFAULT_ENGINE) -> None:
+        with self._lock:
+            self.stats["wait_seconds_total"] += seconds
+            self.stats["wait_seconds_max"] = max(self.stats["wait_seconds_max"], seconds)
+            if timed_out:
+                self.stats["timeouts"] += 1
+        POOL_WAIT.labels(engine).observe(seconds)
+        if timed_out:
+            POOL_TIMEOUTS.labels(engine).inc()
+
+    def _on_checkout(self, name: str, connection_record):
+        from core.request_id import get_request_id
+
+        holder = {"since": time.monotonic(), "request_id": get_request_id(), "engine": name,
+                  "thread": threading.current_thread().name, "reported": False}
+        connection_record.info[self._key] = holder
+        with self._lock:
+            self.stats["checkouts"] += 1
+            self._held[id(connection_record)] = holder
+        POOL_CHECKED_OUT.labels(name).inc()
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        holder = connection_record.info.pop(self._key, None)
+        if holder is None:
+            return
+        with self._lock:
+            self._held.pop(id(connection_record), None)
+        POOL_CHECKED_OUT.labels(holder["engine"]).dec()
+
+    def _on_close(self, dbapi_connection, connection_record):
+        self._on_checkin(dbapi_connection, connection_record)
+
+    # ------------------------------------------------------------------ reads
+    def held(self) -> List[Dict[str, Any]]:
+        """Connections checked out right now, oldest first"""
+        now = time.monotonic()
+        with self._lock:
+            holders = list(self._held.values())
+        return sorted(({"held_seconds": round(now - h["since"], 3), "request_id": h["request_id"],
+                        "engine": h["engine"], "thread": h["thread"]} for h in holders), key=lambda h: -h["held_seconds"])
+
+    def check_leaks(self) -> List[Dict[str, Any]]:
+        """Log each connection held past the threshold once; returns all current offenders"""
+        now = time.monotonic()
+        leaks = []
+        with self._lock:
+            holders = list(self._held.values())
+        for holder in holders:
+            held_for = now - holder["since"]
+            if held_for < self.leak_seconds:
+                continue
+            leaks.append({"held_seconds": round(held_for, 3), "request_id": holder["request_id"],
+                          "engine": holder["engine"], "thread": holder["thread"]})
+            if not holder["reported"]:
+                holder["reported"] = True
+                with self._lock:
+                    self.stats["leaks"] += 1
+                POOL_LEAKS.inc()
+                logger.warning(
+                    f"Possible DB connection leak: held {held_for:.0f}s "
+                    f"(request {holder['request_id']}, thread {holder['thread']})"
+                )
+        return leaks
+
+    def sample(self) -> Dict[str, Any]:
+        """Pool status for health endpoints; also refreshes the Prometheus gauges"""
+        status = dict(self.stats, held=len(self._held))
+        engines: Dict[str, Dict[str, int]] = {}
+        for name, engine in self._engines:
+            pool = engine.pool
+            if not isinstance(pool, QueuePool):
+                continue
+            row = engines.setdefault(name, {"pool_size": 0, "checked_out": 0, "overflow": 0, "idle": 0})
+            row["pool_size"] += pool.size()
+            row["checked_out"] += pool.checkedout()
+            row["overflow"] += max(pool.overflow(), 0)
+            row["idle"] += pool.checkedin()
+        if engines:  # totals across engines, plus the per-engine breakdown
+            for key in ("pool_size", "checked_out", "overflow", "idle"):
+                status[key] = sum(row[key] for row in engines.values())
+            for name, row in engines.items():
+                POOL_SIZE.labels(name).set(row["pool_size"])
+                POOL_OVERFLOW.labels(name).set(row["overflow"])
+            status["engines"] = engines
+        status["leaks_now"] = len(self.check_leaks())
+        return status
+
+
+pool_monitor = PoolMonitor()
+
+
+class MonitoredQueuePool(QueuePool):
+    """QueuePool that reports how long each checkout waited for a connection"""
+
+    def _do_get(self):
+        engine = self._orig_logging_name or DEFAULT_ENGINE  # pool_logging_name from build_engine()
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            pool_monitor.observe_wait(time.perf_counter() - started, timed_out=True, engine=engine)
+            raise
+        pool_monitor.observe_wait(time.perf_counter() - started, engine=engine)
+        return connection
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/utils/lazy_import.py
+🎯 PURPOSE: Defer heavy SDK imports (openai, stripe, plaid, numpy, PIL, reportlab) until first use
+🔗 IMPORTS: importlib, threading
+📤 EXPORTS: LazyModule, lazy_import, module_available, warm_up, start_warm_up, WARM_UP_MODULES
+🔄 PATTERN: module-level proxy → first attribute access imports → post-startup warm-up pre-imports
+
+Route modules are registered eagerly (routing and OpenAPI need the route
+table) but the SDKs they call are only touched inside handlers. Binding the
+SDK name to a LazyModule keeps `stripe.Customer.create(...)` call sites
+unchanged while taking the import off the worker boot path. After startup a
+background thread imports the same modules so the first real request does
+not pay for them either.
+"""
+
+import importlib
+import importlib.util
+import logging
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Imported by the post-startup warm-up, most frequently used first
+WARM_UP_MODULES = (
+    "utils.pdf_exporter",
+    "stripe",
+    "openai",
+    "plaid.api.plaid_api",
+    "numpy",
+    "PIL.Image",
+    "pytesseract",
+)
+
+
+class LazyModule:
+    """Stand-in for a module (or one of its attributes) imported on first access.
+
+    Attribute reads and writes are forwarded to the real object, so module
+    state such as `stripe.api_key = ...` lands where the SDK reads it.
+    """
+
+    def __init__(self, name: str, attribute: Optional[str] = None):
+        object.__setattr__(self, "_lazy_name", name)
+        object.__setattr__(self, "_lazy_attribute", attribute)
+        object.__setattr__(self, "_lazy_module", None)
+
+    def _load(self):
+        module = object.__getattribute__(self, "_lazy_module")
+        if module is None:
+            module = importlib.import_module(object.__getattribute__(self, "_lazy_name"))
+            attribute = object.__getattribute__(self, "_lazy_attribute")
+            if attribute is not None:
+                module = getattr(module, attribute)
+            object.__setattr__(self, "_lazy_module", module)
+        return module
+
+    @property
+    def is_loaded(self) -> bool:
+        return object.__getattribute__(self, "_lazy_module") is not None
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __delattr__(self, attr):
+        delattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __call__(self, *args, **kwargs):
+        return self._load()(*args, **kwargs)
+
+    def __repr__(self):
+        name = object.__getattribute__(self, "_lazy_name")
+        attribute = object.__getattribute__(self, "_lazy_attribute")
+        if attribute is not None:
+            name = f"{name}.{attribute}"
+        state = "loaded" if self.is_loaded else "not loaded"
+        return f"<lazy module '{name}' ({state})>"
+
+
+def module_available(name: str) -> bool:
+    """True if `name` can be imported, without importing it"""
+    if name in sys.modules:
+        return sys.modules[name] is not None
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def lazy_import(name: str, attribute: Optional[str] = None, optional: bool = False) -> Optional[LazyModule]:
+    """Proxy for module `name` (or `name.attribute`), imported on first use.
+
+    With optional=True, returns None when the top-level package is not
+    installed, so optional SDKs keep their `if stripe is None` fallbacks
+    without being imported.
+    """
+    if optional and name not in sys.modules and not module_available(name.split(".")[0]):
+        return None
+    return LazyModule(name, attribute)
+
+
+def warm_up(modules: Iterable[str] = WARM_UP_MODULES) -> Dict[str, float]:
+    """Import each module now; returns seconds spent per module (skips missing)"""
+    timings = {}
+    for name in modules:
+        started = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except Exception as e:  # a broken optional SDK must not take the worker down
+            logger.debug(f"Warm-up skipped {name}: {e}")
+            continue
+        timings[name] = time.perf_counter() - started
+    return timings
+
+
+def start_warm_up(modules: Iterable[str] = WARM_UP_MODULES, delay: float = 0.0,
+                  tasks: Iterable[Callable[[], object]] = ()) -> threading.Thread:
+    """Run warm_up() and then each of `tasks` on a daemon thread after `delay` seconds"""
+    modules, tasks = tuple(modules), tuple(tasks)
+
+    def _run():
+        if delay:
+            time.sleep(delay)
+        timings = warm_up(modules)
+        for task in tasks:
+            try:
+                task()
+            except Exception as e:
+                logger.debug(f"Warm-up task {task!r} failed: {e}")
+        logger.info(f"Warmed up {len(timings)} deferred modules in {sum(timings.values()):.2f}s")
+
+    thread = threading.Thread(target=_run, name="lazy-import-warm-up", daemon=True)
+    thread.start()
+    return thread
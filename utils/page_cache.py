@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/utils/page_cache.py
+🎯 PURPOSE: In-process full-response cache for anonymous GETs of public pages
+🔗 IMPORTS: hashlib, threading, starlette responses, core.version
+📤 EXPORTS: PageCache, page_cache, cached_page, start_page_cache, stop_page_cache
+🔄 PATTERN: @cached_page() on a route → hit: stored bytes (or 304) → miss: render once and store
+
+Marketing, SEO and blog pages only change when templates or the deploy
+change, so each (path, host, selected query params) is rendered once per
+version. The version combines core.version, DEPLOY_VERSION, the newest
+template mtime and the static asset manifest mtime; any change drops every
+entry. Walking web/templates is file-system work, so requests never do it:
+the version is scanned at startup and then rescanned by a watcher thread
+every PAGE_CACHE_CHECK_SECONDS (0 scans only at startup). Requests carrying
+credentials bypass the cache.
+"""
+
+import functools
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+from fastapi import Request
+from starlette.responses import Response
+
+from config import config
+from core.version import __version__
+
+logger = logging.getLogger(__name__)
+
+ROOT = Path(__file__).resolve().parent.parent
+TEMPLATES_DIR = ROOT / "web" / "templates"
+ASSET_MANIFEST = ROOT / "web" / "static" / "dist" / "manifest.json"
+CACHEABLE_HEADERS = ("content-type", "content-language", "x-robots-tag", "cache-control")
+CACHE_CONTROL = "public, no-cache"
+
+
+class _Entry:
+    __slots__ = ("body", "status", "headers", "etag", "last_modified")
+
+    def __init__(self, body: bytes, status: int, headers: Dict[str, str], last_modified: float):
+        self.body = body
+        self.status = status
+        self.headers = headers
+        self.etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+        self.last_modified = last_modified
+
+
+class PageCache:
+    """LRU of rendered responses, invalidated as a whole when the version changes"""
+
+    def __init__(self, max_entries: Optional[int] = None, check_seconds: Optional[float] = None,
+                 watch: Iterable[Path] = (TEMPLATES_DIR, ASSET_MANIFEST)):
+        self.max_entries = max_entries or config.PAGE_CACHE_MAX_ENTRIES
+        self.check_seconds = check_seconds if check_seconds is not None else config.PAGE_CACHE_CHECK_SECONDS
+        self.enabled = config.PAGE_CACHE_ENABLED
+        self.watch = [Path(p) for p in watch]
+        self.stats = {"hits": 0, "misses": 0, "not_modified": 0, "bypassed": 0, "invalidations": 0}
+        self._entries: "OrderedDict[Tuple, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._version: Optional[str] = None
+        self._version_mtime = 0.0
+        self._stopping = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+
+    def _scan_mtime(self) -> float:
+        newest = 0.0
+        for path in self.watch:
+            if path.is_dir():
+                for root, _dirs, files in os.walk(path):
+                    for name in files:
+                        try:
+                            newest = max(newest, os.stat(os.path.join(root, name)).st_mtime)
+                        except OSError:
+                            pass
+            else:
+                try:
+                    newest = max(newest, path.stat().st_mtime)
+                except OSError:
+                    pass
+        return newest
+
+    def version(self) -> str:
+        """Current content version (scanned on first use if the watcher has not started)"""
+        if self._version is None:
+            self.refresh()
+        return self._version
+
+    def refresh(self) -> str:
+        """Rescan the watched files; clears the cache when the version moves"""
+        mtime = self._scan_mtime()
+        version = f"{__version__}:{os.getenv('DEPLOY_VERSION', '')}:{mtime:.0f}"
+        with self._lock:
+            if version != self._version:
+                if self._version is not None:
+                    self.stats["invalidations"] += 1
+                    logger.info("Page cache invalidated (templates or deploy changed)")
+                self._entries.clear()
+                self._version = version
+                self._version_mtime = mtime or time.time()
+        return self._version
+
+    @property
+    def last_modified(self) -> float:
+        """Timestamp of the newest watched file (deploy time as seen by the cache)"""
+        self.version()
+        return self._version_mtime
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get(self, key: Tuple) -> Optional[_Entry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: Tuple, entry: _Entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, int]:
+        return dict(self.stats, entries=len(self._entries), max_entries=self.max_entries)
+
+    # ------------------------------------------------------------------ watcher
+    def _watch_loop(self) -> None:
+        while not self._stopping.wait(self.check_seconds):
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning(f"Page cache version scan failed: {e}")
+
+    def start(self) -> None:
+        """Scan now, then keep the version current in the background"""
+        self.refresh()
+        if self.check_seconds <= 0 or (self._watcher is not None and self._watcher.is_alive()):
+            return
+        self._stopping.clear()
+        self._watcher = threading.Thread(target=self._watch_loop, name="page-cache-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=5)
+            self._watcher = None
+
+
+page_cache = PageCache()
+
+
+def start_page_cache():
+    if page_cache.enabled:
+        page_cache.start()
+
+
+def stop_page_cache():
+    page_cache.stop()
+
+
+def _is_anonymous(request: Request) -> bool:
+    return "authorization" not in request.headers and "access_token" not in request.cookies
+
+
+def _not_modified(request: Request, entry: _Entry) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return entry.etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")] \
+            or if_none_match.strip() == "*"
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(entry.last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _respond(request: Request, store: PageCache, entry: _Entry, state: str) -> Response:
+    headers = {"cache-control": CACHE_CONTROL}
+    headers.update(entry.headers)
+    headers.update({
+        "etag": entry.etag,
+        "last-modified": formatdate(entry.last_modified, usegmt=True),
+        "x-page-cache": state,
+    })
+    if _not_modified(request, entry):
+        store.stats["not_modified"] += 1
+        return Response(status_code=304, headers={k: v for k, v in headers.items() if k != "content-type"})
+    return Response(content=entry.body, status_code=entry.status, headers=headers)
+
+
+def cached_page(vary_query: Iterable[str] = (), vary: Optional[Callable[[Request], Hashable]] = None,
+                cache: Optional[PageCache] = None) -> Callable:
+    """Cache an async page handler's response for anonymous GETs.
+
+    The handler must take `request: Request`. Only 200 responses with a
+    complete body and no Set-Cookie are stored. The key is the path, host name
+    (templates switch on localhost), the `vary_query` parameters and
+    `vary(request)` for any other input the page depends on.
+    """
+    vary_query = tuple(vary_query)
+
+    def decorator(handler):
+        @functools.wraps(handler)
+        async def wrapper(*args, **kwargs):
+            store = cache if cache is not None else page_cache
+            request: Request = kwargs.get("request") or next(a for a in args if isinstance(a, Request))
+            if not store.enabled or request.method not in ("GET", "HEAD") or not _is_anonymous(request):
+                store.stats["bypassed"] += 1
+                return await handler(*args, **kwargs)
+
+            store.version()
+            key = (request.url.path, request.url.hostname,
+                   tuple(request.query_params.get(name, "") for name in vary_query),
+                   vary(request) if vary is not None else None)
+            entry = store.get(key)
+            if entry is not None:
+                store.stats["hits"] += 1
+                return _respond(request, store, entry, "HIT")
+
+            store.stats["misses"] += 1
+            response = await handler(*args, **kwargs)
+            body = getattr(response, "body", None)
+            if response.status_code != 200 or body is None or "set-cookie" in response.headers:
+                return response
+            headers = {name: response.headers[name] for name in CACHEABLE_HEADERS if name in response.headers}
+            entry = _Entry(bytes(body), response.status_code, headers, store.last_modified)
+            store.put(key, entry)
+            return _respond(request, store, entry, "MISS")
+
+        return wrapper
+
+    return decorator
@@ -3,14 +3,20 @@
 🧭 LOCATION: /CORA/utils/query_optimizer.py
 🎯 PURPOSE: Query optimization utilities for CORA's performance bottlenecks
 🔗 IMPORTS: SQLAlchemy, Redis, logging, functools
-📤 EXPORTS: QueryOptimizer class with optimized query patterns
+📤 EXPORTS: QueryOptimizer / AsyncQueryOptimizer with optimized query patterns
+🔄 PATTERN: shared select() builders → executed by a sync Session or an AsyncSession
+
+The dashboard summary and expense list are built from the same statements on
+both paths, so the AsyncSession endpoints return exactly what the sync ones
+did; only how the statements are executed differs.
 """
 
 import logging
 import functools
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
-from sqlalchemy import func, and_, desc
+from sqlalchemy import func, and_, case, desc, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy.exc import SQLAlchemyError
 from redis import Redis
@@ -21,7 +27,206 @@ from models import Expense, ExpenseCategory, Job
 
 logger = logging.getLogger(__name__)
 
-class QueryOptimizer:
+DEDUCTIBLE_CATEGORIES = [
+    'Office Supplies', 'Professional Development',
+    'Software & Subscriptions', 'Marketing & Advertising',
+    'Travel', 'Meals & Entertainment'
+]
+
+
+# ---------------------------------------------------------------- statements
+def _periods(now: datetime) -> Dict[str, datetime]:
+    return {
+        "month": now.replace(day=1, hour=0, minute=0, second=0, microsecond=0),
+        "year": now.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0),
+        "last_30_days": now - timedelta(days=30),
+    }
+
+
+def _summary_totals_query(user_id, periods: Dict[str, datetime]):
+    """Single query with conditional aggregation for all dashboard totals"""
+    return select(
+        # Monthly totals
+        func.sum(case((Expense.expense_date >= periods["month"], Expense.amount_cents), else_=0)
+                 ).label('monthly_expenses'),
+        # Yearly totals
+        func.sum(case((Expense.expense_date >= periods["year"], Expense.amount_cents), else_=0)
+                 ).label('yearly_expenses'),
+        # 30-day count
+        func.count(case((Expense.expense_date >= periods["last_30_days"], Expense.id), else_=None)
+                   ).label('expense_count_30d'),
+        # Voice expenses (30 days)
+        func.count(case((and_(Expense.expense_date >= periods["last_30_days"],
+                              Expense.description.like('%voice%')), Expense.id), else_=None)
+                   ).label('voice_expense_count'),
+        # Tax deductions (yearly)
+        func.sum(case((and_(Expense.expense_date >= periods["year"],
+                            ExpenseCategory.name.in_(DEDUCTIBLE_CATEGORIES)), Expense.amount_cents), else_=0)
+                 ).label('deductions_found'),
+    ).select_from(Expense).join(
+        ExpenseCategory, Expense.category_id == ExpenseCategory.id, isouter=True
+    ).where(Expense.user_id == user_id)
+
+
+def _category_breakdown_query(user_id, periods: Dict[str, datetime]):
+    return select(
+        ExpenseCategory.name,
+        ExpenseCategory.icon,
+        func.sum(Expense.amount_cents).label('total')
+    ).join(
+        Expense, Expense.category_id == ExpenseCategory.id
+    ).where(
+        Expense.user_id == user_id,
+        Expense.expense_date >= periods["month"]
+    ).group_by(
+        ExpenseCategory.id, ExpenseCategory.name, ExpenseCategory.icon
+    )
+
+
+def _expenses_query(user_id, skip: int = 0, limit: int = 100):
+    """Expenses newest first with category and owner eager-loaded (no lazy loads afterwards)"""
+    return select(Expense).options(
+        joinedload(Expense.category),
+        joinedload(Expense.user)
+    ).where(
+        Expense.user_id == user_id
+    ).order_by(
+        desc(Expense.expense_date)
+    ).offset(skip).limit(limit)
+
+
+def _wellness_query(user_id, now: datetime):
+    """Single query for all wellness metrics"""
+    return select(
+        # Tracking consistency (expenses in last 30 days)
+        func.count(case((Expense.expense_date >= now - timedelta(days=30), Expense.id), else_=None)
+                   ).label('recent_expenses'),
+        # Categorization rate
+        func.count(case((Expense.category_id.isnot(None), Expense.id), else_=None)
+                   ).label('categorized_expenses'),
+        # Receipt capture rate
+        func.count(case((Expense.receipt_url.isnot(None), Expense.id), else_=None)
+                   ).label('receipt_expenses'),
+        # Total expenses
+        func.count(Expense.id).label('total_expenses')
+    ).where(Expense.user_id == user_id)
+
+
+# ---------------------------------------------------------------- payloads
+def _wellness_payload(metrics) -> Dict[str, float]:
+    total_expenses = metrics.total_expenses or 1  # Avoid division by zero
+    return {
+        "tracking_consistency": min(100.0, (metrics.recent_expenses or 0) / 30.0 * 100),
+        "categorization_rate": (metrics.categorized_expenses or 0) / total_expenses * 100,
+        "receipt_capture_rate": (metrics.receipt_expenses or 0) / total_expenses * 100
+    }
+
+
+EMPTY_WELLNESS = {
+    "tracking_consistency": 0.0,
+    "categorization_rate": 0.0,
+    "receipt_capture_rate": 0.0
+}
+
+
+def _summary_payload(dashboard_data, category_data, recent_expenses, wellness_metrics) -> Dict[str, Any]:
+    return {
+        "status": "success",
+        "summary": {
+            "total_expenses_this_month": (dashboard_data.monthly_expenses or 0) / 100.0,
+            "total_expenses_this_year": (dashboard_data.yearly_expenses or 0) / 100.0,
+            "deductions_found": (dashboard_data.deductions_found or 0) / 100.0,
+            "time_saved_hours": round((dashboard_data.voice_expense_count or 0) * 3 / 60.0, 1),
+            "expense_count_30d": dashboard_data.expense_count_30d or 0,
+            "categories": [
+                {
+                    "name": cat.name,
+                    "icon": cat.icon,
+                    "total": cat.total / 100.0,
+                    "percentage": round(
+                        (cat.total / (dashboard_data.monthly_expenses or 1) * 100), 1
+                    )
+                }
+                for cat in category_data
+            ],
+            "recent_expenses": [
+                {
+                    "id": exp.id,
+                    "vendor": exp.vendor or "Unknown",
+                    "amount": exp.amount,
+                    "category": exp.category.name if exp.category else "Uncategorized",
+                    "date": exp.expense_date.isoformat(),
+                    "description": exp.description
+                }
+                for exp in recent_expenses
+            ]
+        },
+        "wellness_metrics": wellness_metrics
+    }
+
+
+def _expense_dict(exp: Expense) -> Dict[str, Any]:
+    return {
+        "id": exp.id,
+        "expense_date": exp.expense_date.isoformat(),
+        "description": exp.description,
+        "amount_cents": exp.amount_cents,
+        "currency": exp.currency,
+        "vendor": exp.vendor,
+        "category_id": exp.category_id,
+        "category_name": exp.category.name if exp.category else None,
+        "receipt_url": exp.receipt_url,
+        "payment_method": exp.payment_method,
+        "user_email": exp.user.email if exp.user else None,
+        "created_at": exp.created_at.isoformat(),
+        "updated_at": exp.updated_at.isoformat() if exp.updated_at else None,
+        "confidence_score": exp.confidence_score,
+        "auto_categorized": exp.auto_categorized,
+        "job_name": exp.job_name,
+        "job_id": exp.job_id
+    }
+
+
+class _CachedQueries:
+    """Redis read-through cache shared by the sync and async optimizers"""
+
+    def _get_cache(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get data from cache"""
+        try:
+            if self.redis:
+                cached = self.redis.get(key)
+                if cached:
+                    return json.loads(cached)
+        except Exception as e:
+            logger.warning(f"Cache get failed: {e}")
+        return None
+    
+    def _set_cache(self, key: str, data: Dict[str, Any], ttl: int) -> bool:
+        """Set data in cache"""
+        try:
+            if self.redis:
+                self.redis.setex(key, ttl, json.dumps(data))
+                return True
+        except Exception as e:
+            logger.warning(f"Cache set failed: {e}")
+        return False
+    
+    def invalidate_user_cache(self, user_id: str) -> bool:
+        """Invalidate all cache entries for a user"""
+        try:
+            if self.redis:
+                # Get all keys for this user
+                pattern = f"*:{user_id}:*"
+                keys = self.redis.keys(pattern)
+                if keys:
+                    self.redis.delete(*keys)
+                return True
+        except Exception as e:
+            logger.warning(f"Cache invalidation failed: {e}")
+        return False
+
+
+class QueryOptimizer(_CachedQueries):
     """Optimized query patterns for CORA's performance bottlenecks"""
     
     def __init__(self, db: Session, redis_client: Redis = None):
@@ -41,130 +246,13 @@ class QueryOptimizer:
             return cached
         
         try:
-            # Single optimized query for all dashboard data
-            now = datetime.utcnow()
-            start_of_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            start_of_year = now.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
-            last_30_days = now - timedelta(days=30)
-            
-            # Single query with conditional aggregation
-            dashboard_data = self.db.query(
-                # Monthly totals
-                func.sum(
-                    func.case(
-                        (Expense.expense_date >= start_of_month, Expense.amount_cents),
-                        else_=0
-                    )
-                ).label('monthly_expenses'),
-                
-                # Yearly totals
-                func.sum(
-                    func.case(
-                        (Expense.expense_date >= start_of_year, Expense.amount_cents),
-                        else_=0
-                    )
-                ).label('yearly_expenses'),
-                
-                # 30-day count
-                func.count(
-                    func.case(
-                        (Expense.expense_date >= last_30_days, Expense.id),
-                        else_=None
-                    )
-                ).label('expense_count_30d'),
-                
-                # Voice expenses (30 days)
-                func.count(
-                    func.case(
-                        (and_(
-                            Expense.expense_date >= last_30_days,
-                            Expense.description.like('%voice%')
-                        ), Expense.id),
-                        else_=None
-                    )
-                ).label('voice_expense_count'),
-                
-                # Tax deductions (yearly)
-                func.sum(
-                    func.case(
-                        (and_(
-                            Expense.expense_date >= start_of_year,
-                            ExpenseCategory.name.in_([
-                                'Office Supplies', 'Professional Development', 
-                                'Software & Subscriptions', 'Marketing & Advertising',
-                                'Travel', 'Meals & Entertainment'
-                            ])
-                        ), Expense.amount_cents),
-                        else_=0
-                    )
-                ).label('deductions_found')
-                
-            ).join(
-                ExpenseCategory, Expense.category_id == ExpenseCategory.id, isouter=True
-            ).filter(
-                Expense.user_id == user_id
-            ).first()
-            
-            # Get category breakdown in separate optimized query
-            category_data = self.db.query(
-                ExpenseCategory.name,
-                ExpenseCategory.icon,
-                func.sum(Expense.amount_cents).label('total')
-            ).join(
-                Expense, Expense.category_id == ExpenseCategory.id
-            ).filter(
-                Expense.user_id == user_id,
-                Expense.expense_date >= start_of_month
-            ).group_by(
-                ExpenseCategory.id, ExpenseCategory.name, ExpenseCategory.icon
-            ).all()
-            
-            # Get recent expenses with eager loading
-            recent_expenses = self.db.query(Expense).options(
-                joinedload(Expense.category)
-            ).filter(
-                Expense.user_id == user_id
-            ).order_by(
-                desc(Expense.expense_date)
-            ).limit(10).all()
-            
-            # Calculate wellness metrics efficiently
+            periods = _periods(datetime.utcnow())
+            dashboard_data = self.db.execute(_summary_totals_query(user_id, periods)).first()
+            category_data = self.db.execute(_category_breakdown_query(user_id, periods)).all()
+            recent_expenses = self.db.execute(_expenses_query(user_id, 0, 10)).scalars().all()
             wellness_metrics = self._calculate_wellness_metrics_optimized(user_id)
             
-            # Build response
-            result = {
-                "status": "success",
-                "summary": {
-                    "total_expenses_this_month": (dashboard_data.monthly_expenses or 0) / 100.0,
-                    "total_expenses_this_year": (dashboard_data.yearly_expenses or 0) / 100.0,
-                    "deductions_found": (dashboard_data.deductions_found or 0) / 100.0,
-                    "time_saved_hours": round((dashboard_data.voice_expense_count or 0) * 3 / 60.0, 1),
-                    "expense_count_30d": dashboard_data.expense_count_30d or 0,
-                    "categories": [
-                        {
-                            "name": cat.name,
-                            "icon": cat.icon,
-                            "total": cat.total / 100.0,
-                            "percentage": round(
-                                (cat.total / (dashboard_data.monthly_expenses or 1) * 100), 1
-                            )
-                        }
-                        for cat in category_data
-                    ],
-                    "recent_expenses": [
-                        {
-                            "id": exp.id,
-                            "vendor": exp.vendor or "Unknown",
-                            "amount": exp.amount,
-                            "category": exp.category.name if exp.category else "Uncategorized",
-                            "date": exp.expense_date.isoformat(),
-                            "description": exp.description
-                        }
-                        for exp in recent_expenses
-                    ]
-                },
-                "wellness_metrics": wellness_metrics
-            }
+            result = _summary_payload(dashboard_data, category_data, recent_expenses, wellness_metrics)
             
             # Cache the result
             self._set_cache(cache_key, result, cache_ttl)
@@ -187,38 +275,8 @@ class QueryOptimizer:
             return cached
         
         try:
-            # Optimized query with eager loading
-            expenses = self.db.query(Expense).options(
-                joinedload(Expense.category)
-            ).filter(
-                Expense.user_id == user_id
-            ).order_by(
-                desc(Expense.expense_date)
-            ).offset(skip).limit(limit).all()
-            
-            # Convert to dict format
-            result = [
-                {
-                    "id": exp.id,
-                    "expense_date": exp.expense_date.isoformat(),
-                    "description": exp.description,
-                    "amount_cents": exp.amount_cents,
-                    "currency": exp.currency,
-                    "vendor": exp.vendor,
-                    "category_id": exp.category_id,
-                    "category_name": exp.category.name if exp.category else None,
-                    "receipt_url": exp.receipt_url,
-                    "payment_method": exp.payment_method,
-                    "user_email": exp.user_email,
-                    "created_at": exp.created_at.isoformat(),
-                    "updated_at": exp.updated_at.isoformat() if exp.updated_at else None,
-                    "confidence_score": exp.confidence_score,
-                    "auto_categorized": exp.auto_categorized,
-                    "job_name": exp.job_name,
-                    "job_id": exp.job_id
-                }
-                for exp in expenses
-            ]
+            expenses = self.db.execute(_expenses_query(user_id, skip, limit)).scalars().all()
+            result = [_expense_dict(exp) for exp in expenses]
             
             # Cache the result
             self._set_cache(cache_key, result, cache_ttl)
@@ -228,7 +286,8 @@ class QueryOptimizer:
             logger.error(f"Expenses query failed: {e}")
             return []
     
-    def get_job_profitability_optimized(self, user_id: str, job_id: str = None) -> Dict[str, Any]:
+    def get_job_profitability_optimized(self, user_id: str, job_id: str = None,
+                                        cache_ttl: int = 300) -> Dict[str, Any]:
         """
         Optimized job profitability calculation with single query
         """
@@ -318,89 +377,63 @@ class QueryOptimizer:
         Optimized wellness metrics calculation with single query
         """
         try:
-            # Single query for all wellness metrics
-            metrics = self.db.query(
-                # Tracking consistency (expenses in last 30 days)
-                func.count(
-                    func.case(
-                        (Expense.expense_date >= datetime.utcnow() - timedelta(days=30), Expense.id),
-                        else_=None
-                    )
-                ).label('recent_expenses'),
-                
-                # Categorization rate
-                func.count(
-                    func.case(
-                        (Expense.category_id.isnot(None), Expense.id),
-                        else_=None
-                    )
-                ).label('categorized_expenses'),
-                
-                # Receipt capture rate
-                func.count(
-                    func.case(
-                        (Expense.receipt_url.isnot(None), Expense.id),
-                        else_=None
-                    )
-                ).label('receipt_expenses'),
-                
-                # Total expenses
-                func.count(Expense.id).label('total_expenses')
-                
-            ).filter(
-                Expense.user_id == user_id
-            ).first()
-            
-            total_expenses = metrics.total_expenses or 1  # Avoid division by zero
-            
-            return {
-                "tracking_consistency": min(100.0, (metrics.recent_expenses or 0) / 30.0 * 100),
-                "categorization_rate": (metrics.categorized_expenses or 0) / total_expenses * 100,
-                "receipt_capture_rate": (metrics.receipt_expenses or 0) / total_expenses * 100
-            }
-            
+            return _wellness_payload(self.db.execute(_wellness_query(user_id, datetime.utcnow())).first())
         except SQLAlchemyError as e:
             logger.error(f"Wellness metrics calculation failed: {e}")
-            return {
-                "tracking_consistency": 0.0,
-                "categorization_rate": 0.0,
-                "receipt_capture_rate": 0.0
-            }
-    
-    def _get_cache(self, key: str) -> Optional[Dict[str, Any]]:
-        """Get data from cache"""
+            return dict(EMPTY_WELLNESS)
+
+
+class AsyncQueryOptimizer(_CachedQueries):
+    """The dashboard summary and expense list over an AsyncSession"""
+
+    def __init__(self, db: AsyncSession, redis_client: Redis = None):
+        self.db = db
+        self.redis = redis_client or get_redis_client()
+
+    async def get_dashboard_summary_optimized(self, user_id: str, cache_ttl: int = 300) -> Dict[str, Any]:
+        cache_key = f"dashboard_summary:{user_id}"
+        cached = self._get_cache(cache_key)
+        if cached:
+            return cached
+
         try:
-            if self.redis:
-                cached = self.redis.get(key)
-                if cached:
-                    return json.loads(cached)
-        except Exception as e:
-            logger.warning(f"Cache get failed: {e}")
-        return None
-    
-    def _set_cache(self, key: str, data: Dict[str, Any], ttl: int) -> bool:
-        """Set data in cache"""
+            periods = _periods(datetime.utcnow())
+            dashboard_data = (await self.db.execute(_summary_totals_query(user_id, periods))).first()
+            category_data = (await self.db.execute(_category_breakdown_query(user_id, periods))).all()
+            recent_expenses = (await self.db.execute(_expenses_query(user_id, 0, 10))).scalars().all()
+            wellness_metrics = await self._calculate_wellness_metrics_optimized(user_id)
+
+            result = _summary_payload(dashboard_data, category_data, recent_expenses, wellness_metrics)
+            self._set_cache(cache_key, result, cache_ttl)
+            return result
+
+        except SQLAlchemyError as e:
+            logger.error(f"Dashboard summary query failed: {e}")
+            return {"status": "error", "message": "Failed to load dashboard data"}
+
+    async def get_expenses_optimized(self, user_id: str, skip: int = 0, limit: int = 100,
+                                     cache_ttl: int = 300) -> List[Dict[str, Any]]:
+        cache_key = f"expenses:{user_id}:{skip}:{limit}"
+        cached = self._get_cache(cache_key)
+        if cached:
+            return cached
+
         try:
-            if self.redis:
-                self.redis.setex(key, ttl, json.dumps(data))
-                return True
-        except Exception as e:
-            logger.warning(f"Cache set failed: {e}")
-        return False
-    
-    def invalidate_user_cache(self, user_id: str) -> bool:
-        """Invalidate all cache entries for a user"""
+            expenses = (await self.db.execute(_expenses_query(user_id, skip, limit))).scalars().all()
+            result = [_expense_dict(exp) for exp in expenses]
+            self._set_cache(cache_key, result, cache_ttl)
+            return result
+
+        except SQLAlchemyError as e:
+            logger.error(f"Expenses query failed: {e}")
+            return []
+
+    async def _calculate_wellness_metrics_optimized(self, user_id: str) -> Dict[str, float]:
         try:
-            if self.redis:
-                # Get all keys for this user
-                pattern = f"*:{user_id}:*"
-                keys = self.redis.keys(pattern)
-                if keys:
-                    self.redis.delete(*keys)
-                return True
-        except Exception as e:
-            logger.warning(f"Cache invalidation failed: {e}")
-        return False
+            return _wellness_payload((await self.db.execute(_wellness_query(user_id, datetime.utcnow()))).first())
+        except SQLAlchemyError as e:
+            logger.error(f"Wellness metrics calculation failed: {e}")
+            return dict(EMPTY_WELLNESS)
 
 # Convenience functions for easy integration
 def get_optimized_dashboard_summary(db: Session, user_id: str) -> Dict[str, Any]:
@@ -416,4 +449,14 @@ def get_optimized_expenses(db: Session, user_id: str, skip: int = 0, limit: int
 def get_optimized_job_profitability(db: Session, user_id: str, job_id: str = None) -> Dict[str, Any]:
     """Get optimized job profitability"""
     optimizer = QueryOptimizer(db)
-    return optimizer.get_job_profitability_optimized(user_id, job_id) 
\ No newline at end of file
+    return optimizer.get_job_profitability_optimized(user_id, job_id)
+
+
+async def get_optimized_dashboard_summary_async(db: AsyncSession, user_id: str) -> Dict[str, Any]:
+    """Get optimized dashboard summary (AsyncSession)"""
+    return await AsyncQueryOptimizer(db).get_dashboard_summary_optimized(user_id)
+
+async def get_optimized_expenses_async(db: AsyncSession, user_id: str, skip: int = 0,
+                                       limit: int = 100) -> List[Dict[str, Any]]:
+    """Get optimized expense list (AsyncSession)"""
+    return await AsyncQueryOptimizer(db).get_expenses_optimized(user_id, skip, limit)
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/utils/static_assets.py
+🎯 PURPOSE: Fingerprinted, precompressed static assets and the handler that serves them
+🔗 IMPORTS: hashlib, gzip, brotli (optional), starlette.staticfiles
+📤 EXPORTS: build_assets, AssetManifest, asset_manifest, install_asset_helpers, PrecompressedStaticFiles
+🔄 PATTERN: build (hash + .gz/.br siblings + manifest) → templates call asset_url() → handler picks variant
+
+`python tools/build_assets.py` copies web/static/<path> to
+web/static/dist/<path with content hash> plus .gz/.br siblings and writes
+dist/manifest.json. Templates link via asset_url("js/security.js"), which
+falls back to the plain /static path when no build has been run (dev).
+Fingerprinted URLs never change content, so they are served with
+Cache-Control: immutable; everything else revalidates with ETag/304.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import posixpath
+import re
+import shutil
+import stat
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import anyio
+from starlette.staticfiles import StaticFiles
+
+try:
+    import brotli  # type: ignore
+except ImportError:  # optional: only .gz siblings without it
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+STATIC_DIR = Path(__file__).resolve().parent.parent / "web" / "static"
+STATIC_URL = "/static"
+DIST_DIRNAME = "dist"
+MANIFEST_NAME = "manifest.json"
+
+FINGERPRINT_EXTENSIONS = {".js", ".mjs", ".css", ".svg", ".png", ".jpg", ".jpeg", ".gif", ".webp",
+                          ".ico", ".woff", ".woff2", ".ttf", ".json", ".map"}
+COMPRESS_EXTENSIONS = {".js", ".mjs", ".css", ".svg", ".json", ".map", ".ico", ".ttf", ".txt", ".html"}
+MIN_COMPRESS_BYTES = 512
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "public, no-cache"
+
+
+_CSS_REF_RE = re.compile(r"""(url\(\s*['"]?|@import\s+['"])([^'")\s]+)""")
+_JS_REF_RE = re.compile(r"""((?:\bfrom|\bimport)\s*\(?\s*['"])(\.{1,2}/[^'"]+)""")
+_SOURCEMAP_RE = re.compile(r"(sourceMappingURL=)([^\s*]+)")
+_REF_PATTERNS = {
+    ".css": (_CSS_REF_RE, _SOURCEMAP_RE),
+    ".js": (_JS_REF_RE, _SOURCEMAP_RE),
+    ".mjs": (_JS_REF_RE, _SOURCEMAP_RE),
+}
+
+
+def _fingerprinted_name(rel_path: str, digest: str) -> str:
+    stem, ext = os.path.splitext(rel_path)
+    return f"{stem}.{digest}{ext}"
+
+
+def _compress_siblings(path: Path) -> List[str]:
+    """Write .gz (and .br when available) next to `path` if they are smaller"""
+    data = path.read_bytes()
+    written = []
+    if len(data) < MIN_COMPRESS_BYTES:
+        return written
+    variants = [(".gz", gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append((".br", brotli.compress(data, quality=11)))
+    for suffix, payload in variants:
+        if len(payload) < len(data):
+            Path(str(path) + suffix).write_bytes(payload)
+            written.append(suffix)
+    return written
+
+
+class _AssetBuilder:
+    """Hashes dependencies first so a parent's hash covers the rewritten references"""
+
+    def __init__(self, static_dir: Path, sources: Dict[str, Path]):
+        self.static_dir = static_dir
+        self.sources = sources
+        self.manifest: Dict[str, str] = {}
+        self._in_progress = set()
+
+    def _rewrite(self, rel: str, text: str, patterns) -> str:
+        base_dir = posixpath.dirname(rel)
+
+        def replace(match):
+            prefix, ref = match.group(1), match.group(2)
+            path, sep, suffix = _split_ref(ref)
+            if path.startswith(STATIC_URL + "/"):
+                target = self.build(path[len(STATIC_URL) + 1:])
+                return prefix + (f"{STATIC_URL}/{target}{sep}{suffix}" if target else ref)
+            if not path or path.startswith(("/", "data:", "http:", "https:", "#")):
+                return match.group(0)
+            target = self.build(posixpath.normpath(posixpath.join(base_dir, path)))
+            if not target:
+                return match.group(0)
+            own_dir = posixpath.join(DIST_DIRNAME, base_dir) if base_dir else DIST_DIRNAME
+            relative = posixpath.relpath(target, own_dir)
+            if path.startswith("./") and not relative.startswith("."):
+                relative = "./" + relative
+            return prefix + relative + sep + suffix
+
+        for pattern in patterns:
+            text = pattern.sub(replace, text)
+        return text
+
+    def build(self, rel: str) -> Optional[str]:
+        """Fingerprint one logical path; returns its dist path or None"""
+        if rel in self.manifest:
+            return self.manifest[rel]
+        source = self.sources.get(rel)
+        if source is None or rel in self._in_progress:
+            return None
+        self._in_progress.add(rel)
+        try:
+            data = source.read_bytes()
+            patterns = _REF_PATTERNS.get(source.suffix.lower())
+            if patterns:
+                try:
+                    text = data.decode("utf-8")
+                except UnicodeDecodeError:
+                    pass
+                else:
+                    data = self._rewrite(rel, text, patterns).encode("utf-8")
+            digest = hashlib.sha256(data).hexdigest()[:10]
+            target_rel = f"{DIST_DIRNAME}/{_fingerprinted_name(rel, digest)}"
+            target = self.static_dir / target_rel
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(data)
+            shutil.copystat(source, target)
+            if source.suffix.lower() in COMPRESS_EXTENSIONS:
+                _compress_siblings(target)
+            self.manifest[rel] = target_rel
+            return target_rel
+        finally:
+            self._in_progress.discard(rel)
+
+
+def _split_ref(ref: str):
+    """'a.css?v=2' → ('a.css', '?', 'v=2')"""
+    match = re.search(r"[?#]", ref)
+    if not match:
+        return ref, "", ""
+    return ref[:match.start()], ref[match.start()], ref[match.start() + 1:]
+
+
+def build_assets(static_dir: Path = STATIC_DIR, extensions: Iterable[str] = FINGERPRINT_EXTENSIONS) -> Dict[str, str]:
+    """Fingerprint and precompress assets under static_dir into static_dir/dist.
+
+    Relative references inside CSS (url(), @import) and ES modules (import
+    ... from "./chunk.js", sourceMappingURL) are rewritten to the hashed
+    names. Returns the manifest mapping logical path ("js/security.js") to
+    the path relative to static_dir ("dist/js/security.1a2b3c4d5e.js").
+    """
+    static_dir = Path(static_dir)
+    dist = static_dir / DIST_DIRNAME
+    if dist.exists():
+        shutil.rmtree(dist)
+    extensions = set(extensions)
+    sources = {
+        path.relative_to(static_dir).as_posix(): path
+        for path in sorted(static_dir.rglob("*"))
+        if path.is_file() and path.suffix.lower() in extensions
+    }
+    builder = _AssetBuilder(static_dir, sources)
+    for rel in sources:
+        builder.build(rel)
+
+    dist.mkdir(parents=True, exist_ok=True)
+    (dist / MANIFEST_NAME).write_text(json.dumps(builder.manifest, indent=2, sort_keys=True))
+    logger.info(f"Built {len(builder.manifest)} fingerprinted assets into {dist}")
+    return builder.manifest
+
+
+class AssetManifest:
+    """Logical asset path → URL, loaded lazily from dist/manifest.json"""
+
+    def __init__(self, static_dir: Path = STATIC_DIR, url_prefix: str = STATIC_URL):
+        self.static_dir = Path(static_dir)
+        self.url_prefix = url_prefix
+        self._entries: Optional[Dict[str, str]] = None
+
+    @property
+    def entries(self) -> Dict[str, str]:
+        if self._entries is None:
+            path = self.static_dir / DIST_DIRNAME / MANIFEST_NAME
+            try:
+                self._entries = json.loads(path.read_text())
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def reload(self):
+        self._entries = None
+
+    def url(self, logical_path: str) -> str:
+        logical_path = logical_path.lstrip("/")
+        return f"{self.url_prefix}/{self.entries.get(logical_path, logical_path)}"
+
+    def bundle_manifest(self) -> Dict[str, Dict[str, str]]:
+        """Shape the base templates expect: {"files": {bundle name: url}}"""
+        prefix = "js/bundles/"
+        return {"files": {
+            logical[len(prefix):-3]: f"{self.url_prefix}/{hashed}"
+            for logical, hashed in self.entries.items()
+            if logical.startswith(prefix) and logical.endswith(".js") and "/" not in logical[len(prefix):]
+        }}
+
+
+asset_manifest = AssetManifest()
+
+
+def install_asset_helpers(templates, manifest: AssetManifest = asset_manifest):
+    """Expose asset_url() and bundle_manifest to a Jinja2Templates environment"""
+    templates.env.globals["asset_url"] = manifest.url
+    templates.env.globals["bundle_manifest"] = manifest.bundle_manifest()
+    return templates
+
+
+def _accepted_encodings(scope) -> List[str]:
+    """br/gzip accepted by the client, in our preference order"""
+    for key, value in scope.get("headers", []):
+        if key == b"accept-encoding":
+            accepted = set()
+            for part in value.decode("latin-1").lower().split(","):
+                name, _, params = part.strip().partition(";")
+                if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+                    continue
+                accepted.add(name.strip())
+            return [enc for enc in ("br", "gzip") if enc in accepted]
+    return []
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles that serves .br/.gz siblings and sets cache headers.
+
+    FileResponse already provides ETag/Last-Modified with 304s, Range
+    support, and zero-copy `http.response.pathsend` on servers that offer it.
+    """
+
+    ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+    async def get_response(self, path: str, scope):
+        response = None
+        ext = os.path.splitext(path)[1].lower()
+        compressible = ext in COMPRESS_EXTENSIONS
+        if compressible and scope["method"] in ("GET", "HEAD"):
+            accepted = _accepted_encodings(scope)
+            for encoding, suffix in self.ENCODINGS:
+                if encoding not in accepted:
+                    continue
+                full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path + suffix)
+                if stat_result and stat.S_ISREG(stat_result.st_mode):
+                    response = self.file_response(full_path, stat_result, scope)
+                    if response.status_code == 200 or response.status_code == 206:
+                        response.headers["content-encoding"] = encoding
+                        media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+                        if media_type.startswith("text/") or media_type.endswith(("javascript", "json", "+xml")):
+                            media_type += "; charset=utf-8"
+                        response.headers["content-type"] = media_type
+                    break
+        if response is None:
+            response = await super().get_response(path, scope)
+
+        if compressible:
+            response.headers["vary"] = "Accept-Encoding"
+        if response.status_code in (200, 206, 304):
+            normalized = path.replace("\\", "/").lstrip("/")
+            immutable = normalized.startswith(DIST_DIRNAME + "/") and not normalized.endswith(MANIFEST_NAME)
+            response.headers["cache-control"] = IMMUTABLE_CACHE if immutable else REVALIDATE_CACHE
+        return response
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+🧭 LOCATION: /CORA/utils/write_queue.py
+🎯 PURPOSE: Single-writer queue for SQLite: small writes are batched into group commits
+🔗 IMPORTS: threading, concurrent.futures, SQLAlchemy, prometheus_client, models.base
+📤 EXPORTS: WriteQueue, write_queue, start_write_queue, stop_write_queue
+🔄 PATTERN: submit(fn) → writer thread → one transaction per batch → futures resolved after commit
+
+SQLite allows one writer at a time. When request threads each open a write
+transaction they queue on the database lock (busy_timeout) and eventually
+fail with `database is locked`. Here one thread owns all queued writes: it
+takes whatever jobs arrived within SQLITE_WRITE_BATCH_WINDOW_MS (up to
+SQLITE_WRITE_BATCH_MAX), runs them in one session and commits once, so N
+small inserts cost a single WAL append. If a job fails, the batch is rolled
+back and replayed one job per transaction so only the failing job errors.
+
+Jobs are `fn(db, *args, **kwargs)` and should return plain values (ids),
+not ORM objects, which are expired once the writer's session closes. When
+idle, the writer runs `PRAGMA wal_checkpoint(PASSIVE)` and `PRAGMA optimize`
+on their intervals. On PostgreSQL (or with the queue disabled) jobs run
+inline in session_scope(), so callers do not need to know the backend.
+"""
+
+import asyncio
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+from prometheus_client import Histogram
+from sqlalchemy.pool import StaticPool
+
+from config import config
+
+logger = logging.getLogger(__name__)
+
+WRITE_BATCH_SIZE = Histogram("db_write_batch_size", "Jobs committed per SQLite group commit",
+                             buckets=(1, 2, 4, 8, 16, 32, 64, 128))
+WRITE_LATENCY = Histogram("db_write_queue_seconds", "Submit-to-commit latency of queued writes",
+                          buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0, 5.0))
+
+_STOP = object()
+
+
+class _Job:
+    __slots__ = ("fn", "args", "kwargs", "future", "submitted")
+
+    def __init__(self, fn: Callable, args: tuple, kwargs: dict):
+        self.fn, self.args, self.kwargs = fn, args, kwargs
+        self.future: Future = Future()
+        self.submitted = time.perf_counter()
+
+
+class WriteQueue:
+    """One writer thread per process that group-commits queued SQLite writes"""
+
+    def __init__(self, session_factory: Optional[Callable] = None, enabled: Optional[bool] = None,
+                 batch_max: Optional[int] = None, batch_window: Optional[float] = None,
+                 checkpoint_seconds: Optional[float] = None, optimize_seconds: Optional[float] = None):
+        self._session_factory = session_factory
+        self._enabled = enabled
+        self.batch_max = batch_max or config.SQLITE_WRITE_BATCH_MAX
+        self.batch_window = (batch_window if batch_window is not None
+                             else config.SQLITE_WRITE_BATCH_WINDOW_MS / 1000)
+        self.checkpoint_seconds = (checkpoint_seconds if checkpoint_seconds is not None
+                                   else config.SQLITE_CHECKPOINT_SECONDS)
+        self.optimize_seconds = optimize_seconds if optimize_seconds is not None else config.SQLITE_OPTIMIZE_SECONDS
+        self.stats = {"jobs": 0, "batches": 0, "max_batch": 0, "failed": 0, "replays": 0,
+                      "checkpoints": 0, "optimizes": 0}
+        self._queue: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()  # inline jobs finish on caller threads
+        self._last_checkpoint = self._last_optimize = time.monotonic()
+
+    # ------------------------------------------------------------------ setup
+    def _sessions(self):
+        if self._session_factory is not None:
+            return self._session_factory
+        from models.base import SessionLocal
+        return SessionLocal
+
+    @property
+    def enabled(self) -> bool:
+        """True when writes go through the writer thread (file-backed SQLite)"""
+        if self._enabled is None:
+            bind = self._sessions().kw["bind"]
+            self._enabled = (config.SQLITE_WRITE_QUEUE_ENABLED and bind.dialect.name == "sqlite"
+                             and not isinstance(bind.pool, StaticPool))
+        return self._enabled
+
+    def start(self):
+        """Start the writer thread if it is not running in this process"""
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()  # a forked worker needs its own writer
+            self._thread = threading.Thread(target=self._run, name="cora-sqlite-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 10):
+        """Commit everything already queued, then stop the writer thread"""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout=timeout)
+        self._thread = None
+
+    # ------------------------------------------------------------------ producers
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """Queue `fn(db, *args, **kwargs)`; the future resolves once its batch commits"""
+        job = _Job(fn, args, kwargs)
+        if not self.enabled:
+            self._run_inline(job)
+            return job.future
+        self.start()
+        self._queue.put(job)
+        return job.future
+
+    def run(self, fn: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """submit() and wait for the result (re-raises the job's exception)"""
+        return self.submit(fn, *args, **kwargs).result(timeout=timeout)
+
+    async def run_async(self, fn: Callable, *args, **kwargs) -> Any:
+        """Awaitable run(): the event loop is never blocked on the write"""
+        if self.enabled:
+            return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, lambda: self.run(fn, *args, **kwargs))
+
+    def enqueue(self, fn: Callable, *args, **kwargs) -> None:
+        """Fire-and-forget write; failures are logged, not raised"""
+        self.submit(fn, *args, **kwargs).add_done_callback(self._log_failure)
+
+    @staticmethod
+    def _log_failure(future: Future):
+        error = future.exception()
+        if error is not None:
+            logger.warning(f"Queued write failed: {error}")
+
+    # ------------------------------------------------------------------ writer
+    def _run(self):
+        while True:
+            try:
+                first = self._queue.get(timeout=self._until_maintenance())
+            except queue.Empty:
+                self._maintain()
+                continue
+            if first is _STOP:
+                return
+            batch, stopping = self._collect(first)
+            try:
+                self._commit(batch)
+            except Exception as e:  # e.g. no connection: fail the batch, keep the writer alive
+                logger.error(f"SQLite writer batch failed: {e}")
+                for job in batch:
+                    if not job.future.done():
+                        self._finish(job, error=e)
+            self._maintain()
+            if stopping:
+                return
+
+    def _collect(self, first: _Job):
+        """The first job plus whatever arrives within the batch window"""
+        batch: List[_Job] = [first]
+        deadline = time.perf_counter() + self.batch_window
+        while len(batch) < self.batch_max:
+            remaining = deadline - time.perf_counter()
+            try:
+                job = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is _STOP:
+                return batch, True
+            batch.append(job)
+        return batch, False
+
+    def _commit(self, batch: List[_Job]):
+        db = self._sessions()()
+        try:
+            results = [job.fn(db, *job.args, **job.kwargs) for job in batch]
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            db.close()
+            if len(batch) == 1:
+                self._finish(batch[0], error=e)
+            else:
+                # Replay one job per transaction so only the failing one errors
+                self.stats["replays"] += 1
+                for job in batch:
+                    self._run_inline(job)
+            return
+        db.close()
+        self.stats["batches"] += 1
+        self.stats["max_batch"] = max(self.stats["max_batch"], len(batch))
+        WRITE_BATCH_SIZE.observe(len(batch))
+        for job, result in zip(batch, results):
+            self._finish(job, result=result)
+
+    def _run_inline(self, job: _Job):
+        db = self._sessions()()
+        try:
+            result = job.fn(db, *job.args, **job.kwargs)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            self._finish(job, error=e)
+        else:
+            self._finish(job, result=result)
+        finally:
+            db.close()
+
+    def _finish(self, job: _Job, result: Any = None, error: Optional[BaseException] = None):
+        with self._stats_lock:
+            self.stats["jobs"] += 1
+            if error is not None:
+                self.stats["failed"] += 1
+        WRITE_LATENCY.observe(time.perf_counter() - job.submitted)
+        if error is not None:
+            job.future.set_exception(error)
+        else:
+            job.future.set_result(result)
+
+    # ------------------------------------------------------------------ maintenance
+    def _until_maintenance(self) -> float:
+        now = time.monotonic()
+        due = min(self._last_checkpoint + self.checkpoint_seconds, self._last_optimize + self.optimize_seconds)
+        return max(due - now, 0.05)
+
+    def _maintain(self):
+        """PASSIVE checkpoint and PRAGMA optimize when due; never waits on readers"""
+        now = time.monotonic()
+        tasks = []
+        if now - self._last_checkpoint >= self.checkpoint_seconds:
+            tasks.append(("PRAGMA wal_checkpoint(PASSIVE)", "checkpoints"))
+            self._last_checkpoint = now
+        if now - self._last_optimize >= self.optimize_seconds:
+            tasks.append(("PRAGMA optimize", "optimizes"))
+            self._last_optimize = now
+        if not tasks:
+            return
+        try:
+            with self._sessions().kw["bind"].connect() as conn:
+                for statement, stat in tasks:
+                    conn.exec_driver_sql(statement)
+                    self.stats[stat] += 1
+        except Exception as e:
+            logger.debug(f"SQLite maintenance skipped: {e}")
+
+    def status(self) -> Dict[str, Any]:
+        return dict(self.stats, enabled=self.enabled, queued=self._queue.qsize(),
+                    running=self._thread is not None and self._thread.is_alive())
+
+
+write_queue = WriteQueue()
+
+
+def start_write_queue():
+    if write_queue.enabled:
+        write_queue.start()
+
+
+def stop_write_queue():
+    write_queue.stop()
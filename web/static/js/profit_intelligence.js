@@ -520,9 +520,23 @@ async function downloadReport(type, title) {
             throw new Error(`HTTP error! status: ${response.status}`);
         }
         
-        const result = await response.json();
+        let result = await response.json();
         
-        if (result.status === 'success') {
+        // Rendering happens in the background: poll until the report is ready
+        while (result.status === 'pending') {
+            await new Promise(resolve => setTimeout(resolve, 1000));
+            const poll = await fetch(result.status_url, {
+                headers: {
+                    'Authorization': `Bearer ${localStorage.getItem('access_token')}`
+                }
+            });
+            if (!poll.ok) {
+                throw new Error(`HTTP error! status: ${poll.status}`);
+            }
+            result = await poll.json();
+        }
+        
+        if (result.status === 'ready') {
             // Download the generated PDF
             const downloadResponse = await fetch(result.download_url, {
                 headers: {
@@ -547,7 +561,7 @@ async function downloadReport(type, title) {
                 throw new Error('Failed to download report');
             }
         } else {
-            throw new Error(result.message || 'Failed to generate report');
+            throw new Error(result.error || 'Failed to generate report');
         }
         
     } catch (error) {
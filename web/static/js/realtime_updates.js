@@ -130,6 +130,11 @@ class RealtimeUpdates {
     
     handleMessage(data) {
         switch (data.type) {
+            case 'heartbeat':
+                // The server only counts received frames as liveness; answer so a
+                // listen-only dashboard is not closed as idle
+                this.sendHeartbeatAck();
+                break;
             case 'expense.created':
                 this.handleExpenseCreated(data.payload);
                 break;
@@ -150,6 +155,12 @@ class RealtimeUpdates {
         }
     }
     
+    sendHeartbeatAck() {
+        if (this.ws && this.ws.readyState === WebSocket.OPEN) {
+            this.ws.send(JSON.stringify({ type: 'heartbeat_ack' }));
+        }
+    }
+    
     handleUpdates(updates) {
         updates.forEach(update => {
             this.handleMessage(update);